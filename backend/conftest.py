@@ -67,6 +67,8 @@ if "open_webui.internal.db" not in sys.modules:
 
     _db_mod.get_db_context = _get_db_context
     _db_mod.get_session = MagicMock()
+    _db_mod.get_async_db_context = MagicMock()
+    _db_mod.is_async_db_enabled = lambda: False
     sys.modules["open_webui.internal.db"] = _db_mod
 
 # Mock the env module to avoid importing its heavy deps
@@ -90,6 +92,43 @@ if "open_webui.env" not in sys.modules:
         "UVICORN_WORKERS": 1,
         "STATIC_DIR": "/tmp",
         "FRONTEND_BUILD_DIR": "/tmp",
+        "REDIS_URL": "",
+        "REDIS_CLUSTER": False,
+        "REDIS_KEY_PREFIX": "open-webui",
+        "REDIS_SENTINEL_HOSTS": "",
+        "REDIS_SENTINEL_PORT": "26379",
+        "REDIS_SENTINEL_MAX_RETRY_COUNT": 2,
+        "REDIS_SOCKET_CONNECT_TIMEOUT": None,
+        "REDIS_RECONNECT_DELAY": None,
+        "WEBSOCKET_MANAGER": "",
+        "WEBSOCKET_REDIS_URL": "",
+        "WEBSOCKET_REDIS_CLUSTER": False,
+        "WEBSOCKET_SENTINEL_HOSTS": "",
+        "WEBSOCKET_SENTINEL_PORT": "26379",
+        "ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES": False,
+        "ENABLE_AIOHTTP_CLIENT_SESSION_POOL": True,
+        "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST": 100,
+        "AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT": 30.0,
+        "AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL": 300,
+        "GROUP_MEMBERSHIP_CACHE_TTL": 10.0,
+        "CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SIZE": 8,
+        "CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TTL": 600.0,
+        "CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SCOPE": "chat",
+        "DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL": None,
+        "CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE": None,
+        "DEFAULT_GROUP_SHARE_PERMISSION": True,
+        "PIP_OPTIONS": [],
+        "PIP_PACKAGE_INDEX_OPTIONS": [],
+        "OFFLINE_MODE": True,
+        "ENABLE_PIP_INSTALL_FRONTMATTER_REQUIREMENTS": True,
+        "OLLAMA_ROUTING_STRATEGY": "least_outstanding",
+        "OLLAMA_ROUTING_RESIDENCY_TTL": 10.0,
+        "LOCAL_INFERENCE_SOCKET_PATH": "/tmp/open-webui-local-inference.sock",
+        "LOCAL_INFERENCE_MAX_BATCH_SIZE": 32,
+        "LOCAL_INFERENCE_MAX_WAIT_MS": 10.0,
+        "LOCAL_INFERENCE_TIMEOUT": 300.0,
+        "CHAT_IMAGE_CACHE_MAX_BYTES": 128 * 1024 * 1024,
+        "CHAT_IMAGE_MAX_SIZE": None,
     }
     for attr, val in _env_attrs.items():
         setattr(_env_mod, attr, val)
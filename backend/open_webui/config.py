@@ -4,6 +4,8 @@ import os
 import shutil
 import socket
 import base64
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 import redis
 
@@ -16,6 +18,7 @@ import requests
 from pydantic import BaseModel
 from sqlalchemy import JSON, Column, DateTime, Integer, func
 from authlib.integrations.starlette_client import OAuth
+from opentelemetry import metrics
 
 
 from open_webui.env import (
@@ -27,6 +30,7 @@ from open_webui.env import (
     REDIS_KEY_PREFIX,
     REDIS_SENTINEL_HOSTS,
     REDIS_SENTINEL_PORT,
+    REDIS_CONFIG_CACHE_TTL,
     FRONTEND_BUILD_DIR,
     OFFLINE_MODE,
     OPEN_WEBUI_DIR,
@@ -225,7 +229,27 @@ class PersistentConfig(Generic[T]):
         self.config_value = self.value
 
 
+_CONFIG_INVALIDATION_LAG = metrics.get_meter(__name__).create_histogram(
+    name="webui.config.invalidation.lag",
+    description="Delay between a config write and its pub/sub update being applied on a worker.",
+    unit="ms",
+)
+
+# Sentinel so the first read always pulls every key from Redis
+_UNSYNCED = object()
+
+
 class AppConfig:
+    """
+    Config registry shared across workers through Redis.
+
+    Reads are served from an in-process snapshot. Writes bump a version
+    counter in Redis and publish the new value, which every worker applies
+    from a background subscriber thread. If an update is missed, the
+    snapshot is re-checked against the version counter at most every
+    REDIS_CONFIG_CACHE_TTL seconds.
+    """
+
     _redis: Union[redis.Redis, redis.cluster.RedisCluster] = None
     _redis_key_prefix: str
 
@@ -237,7 +261,14 @@ class AppConfig:
         redis_sentinels: Optional[list] = [],
         redis_cluster: Optional[bool] = False,
         redis_key_prefix: str = "open-webui",
+        cache_ttl: float = REDIS_CONFIG_CACHE_TTL,
     ):
+        super().__setattr__("_state", {})
+        super().__setattr__("_cache_ttl", cache_ttl)
+        super().__setattr__("_version", _UNSYNCED)
+        super().__setattr__("_synced_at", float("-inf"))
+        super().__setattr__("_sync_lock", threading.Lock())
+
         if redis_url:
             super().__setattr__("_redis_key_prefix", redis_key_prefix)
             super().__setattr__(
@@ -250,7 +281,81 @@ class AppConfig:
                 ),
             )
 
-        super().__setattr__("_state", {})
+            if ENABLE_PERSISTENT_CONFIG and cache_ttl > 0:
+                threading.Thread(
+                    target=self._listen, name="config-pubsub", daemon=True
+                ).start()
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self._redis_key_prefix}:config:_version"
+
+    @property
+    def _channel(self) -> str:
+        return f"{self._redis_key_prefix}:config:updates"
+
+    def _apply_value(self, key: str, value):
+        if key in self._state and self._state[key].value != value:
+            self._state[key].value = value
+            log.info(f"Updated {key} from Redis: {value}")
+
+    def _listen(self):
+        """Apply config updates published by any worker."""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+
+                    update = json.loads(message["data"])
+                    self._apply_value(update["key"], update["value"])
+                    _CONFIG_INVALIDATION_LAG.record(
+                        max(0.0, (time.time() - update["timestamp"]) * 1000)
+                    )
+
+                    # Only advance on contiguous versions; a gap means an
+                    # update was missed and the next sync reloads everything.
+                    with self._sync_lock:
+                        if (
+                            isinstance(self._version, int)
+                            and update["version"] == self._version + 1
+                        ):
+                            super().__setattr__("_version", update["version"])
+            except Exception as e:
+                log.warning(f"Config pub/sub listener error, reconnecting: {e}")
+                time.sleep(1)
+
+    def _sync(self):
+        """Reload the snapshot from Redis if the version counter moved."""
+        with self._sync_lock:
+            if time.monotonic() - self._synced_at < self._cache_ttl:
+                return
+
+            try:
+                version = int(self._redis.get(self._version_key) or 0)
+                if version != self._version:
+                    keys = list(self._state.keys())
+                    pipe = self._redis.pipeline()
+                    for key in keys:
+                        pipe.get(f"{self._redis_key_prefix}:config:{key}")
+
+                    for key, redis_value in zip(keys, pipe.execute()):
+                        if redis_value is None:
+                            continue
+                        try:
+                            self._apply_value(key, json.loads(redis_value))
+                        except json.JSONDecodeError:
+                            log.error(
+                                f"Invalid JSON format in Redis for {key}: {redis_value}"
+                            )
+
+                    super().__setattr__("_version", version)
+            except Exception as e:
+                log.warning(f"Failed to sync config from Redis: {e}")
+
+            super().__setattr__("_synced_at", time.monotonic())
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
@@ -263,12 +368,30 @@ class AppConfig:
                 redis_key = f"{self._redis_key_prefix}:config:{key}"
                 self._redis.set(redis_key, json.dumps(self._state[key].value))
 
+                version = self._redis.incr(self._version_key)
+                self._redis.publish(
+                    self._channel,
+                    json.dumps(
+                        {
+                            "key": key,
+                            "value": self._state[key].value,
+                            "version": version,
+                            "timestamp": time.time(),
+                        }
+                    ),
+                )
+
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
         # If Redis is available and persistent config is enabled, check for an updated value
         if self._redis and ENABLE_PERSISTENT_CONFIG:
+            if self._cache_ttl > 0:
+                if time.monotonic() - self._synced_at >= self._cache_ttl:
+                    self._sync()
+                return self._state[key].value
+
             redis_key = f"{self._redis_key_prefix}:config:{key}"
             redis_value = self._redis.get(redis_key)
 
@@ -969,6 +1092,15 @@ if CUSTOM_NAME:
 
 STORAGE_PROVIDER = os.environ.get("STORAGE_PROVIDER", "local")  # defaults to local, s3
 
+# Uploads are streamed in chunks of this size (S3 parts are at least 5 MiB)
+STORAGE_UPLOAD_CHUNK_SIZE = int(
+    os.environ.get("STORAGE_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024))
+)
+# Upload bytes a worker may hold in memory across concurrent uploads; 0 = no limit
+STORAGE_UPLOAD_MAX_IN_FLIGHT_BYTES = int(
+    os.environ.get("STORAGE_UPLOAD_MAX_IN_FLIGHT_BYTES", str(256 * 1024 * 1024))
+)
+
 S3_ACCESS_KEY_ID = os.environ.get("S3_ACCESS_KEY_ID", None)
 S3_SECRET_ACCESS_KEY = os.environ.get("S3_SECRET_ACCESS_KEY", None)
 S3_REGION_NAME = os.environ.get("S3_REGION_NAME", None)
@@ -2348,6 +2480,11 @@ CODE_INTERPRETER_PYODIDE_PROMPT = """
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Persistent per-collection BM25 index for hybrid search. The index lives on
+# local disk, so multi-node deployments need RAG_BM25_INDEX_DIR on shared storage.
+ENABLE_RAG_BM25_INDEX = os.environ.get("ENABLE_RAG_BM25_INDEX", "False").lower() == "true"
+RAG_BM25_INDEX_DIR = os.environ.get("RAG_BM25_INDEX_DIR", f"{DATA_DIR}/bm25_index")
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -2964,6 +3101,13 @@ RAG_HYBRID_BM25_WEIGHT = PersistentConfig(
     float(os.environ.get("RAG_HYBRID_BM25_WEIGHT", "0.5")),
 )
 
+# "vector" reuses the vector DB's similarity scores, "rrf" ranks by fused rank only
+RAG_HYBRID_SCORING_MODE = PersistentConfig(
+    "RAG_HYBRID_SCORING_MODE",
+    "rag.hybrid_scoring_mode",
+    os.environ.get("RAG_HYBRID_SCORING_MODE", "vector"),
+)
+
 ENABLE_RAG_HYBRID_SEARCH = PersistentConfig(
     "ENABLE_RAG_HYBRID_SEARCH",
     "rag.enable_hybrid_search",
@@ -3093,6 +3237,30 @@ RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
 
+# Cache embedding results by (engine, model, prefix, sha256(text)). An in-process
+# LRU always fronts the backend: "memory" (LRU only), "sqlite" or "redis".
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "False").lower() == "true"
+)
+RAG_EMBEDDING_CACHE_BACKEND = os.environ.get("RAG_EMBEDDING_CACHE_BACKEND", "memory")
+RAG_EMBEDDING_CACHE_MEMORY_MAX_BYTES = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024))
+)
+RAG_EMBEDDING_CACHE_MAX_BYTES = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+RAG_EMBEDDING_CACHE_DIR = os.environ.get(
+    "RAG_EMBEDDING_CACHE_DIR", f"{CACHE_DIR}/embeddings"
+)
+RAG_EMBEDDING_CACHE_TTL = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_TTL", str(7 * 24 * 60 * 60))
+)
+
+# Files re-embedded in parallel by the background knowledge reindex job
+KNOWLEDGE_REINDEX_CONCURRENCY = int(
+    os.environ.get("KNOWLEDGE_REINDEX_CONCURRENCY", "4")
+)
+
 RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
@@ -4044,6 +4212,11 @@ WHISPER_MULTILINGUAL = os.getenv("WHISPER_MULTILINGUAL", "False").lower() == "tr
 
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "").lower() or None
 
+# Chunks of a long recording transcribed in parallel
+AUDIO_STT_MAX_CONCURRENT_CHUNKS = int(
+    os.getenv("AUDIO_STT_MAX_CONCURRENT_CHUNKS", "4")
+)
+
 # Add Deepgram configuration
 DEEPGRAM_API_KEY = PersistentConfig(
     "DEEPGRAM_API_KEY",
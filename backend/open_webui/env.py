@@ -5,6 +5,7 @@ import os
 import pkgutil
 import sys
 import shutil
+import tempfile
 import traceback
 from datetime import datetime, timezone
 from typing import Any
@@ -413,6 +414,12 @@ DATABASE_ENABLE_SESSION_SHARING = (
     os.environ.get("DATABASE_ENABLE_SESSION_SHARING", "False").lower() == "true"
 )
 
+# When enabled, per-request lookups use an asyncio engine (asyncpg / aiosqlite)
+# instead of running the sync query in a worker thread
+DATABASE_ENABLE_ASYNC = (
+    os.environ.get("DATABASE_ENABLE_ASYNC", "False").lower() == "true"
+)
+
 # Enable public visibility of active user count (when disabled, only admins can see it)
 ENABLE_PUBLIC_ACTIVE_USERS_COUNT = (
     os.environ.get("ENABLE_PUBLIC_ACTIVE_USERS_COUNT", "True").lower() == "true"
@@ -426,6 +433,13 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Keep in-flight message content in the chat_message_delta table and fold it
+# into the chat JSON blob once, instead of rewriting the blob on every flush.
+ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES = (
+    os.environ.get("ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES", "False").lower()
+    == "true"
+)
+
 ENABLE_QUERIES_CACHE = os.environ.get("ENABLE_QUERIES_CACHE", "False").lower() == "true"
 
 RAG_SYSTEM_CONTEXT = os.environ.get("RAG_SYSTEM_CONTEXT", "False").lower() == "true"
@@ -451,6 +465,23 @@ try:
 except ValueError:
     REDIS_SENTINEL_MAX_RETRY_COUNT = 2
 
+# Seconds a worker may serve a user's group memberships (and so their
+# permissions) from memory. Group writes invalidate it on every node; 0 queries
+# the database on every check.
+GROUP_MEMBERSHIP_CACHE_TTL = os.environ.get("GROUP_MEMBERSHIP_CACHE_TTL", "10")
+try:
+    GROUP_MEMBERSHIP_CACHE_TTL = float(GROUP_MEMBERSHIP_CACHE_TTL)
+except ValueError:
+    GROUP_MEMBERSHIP_CACHE_TTL = 10.0
+
+# Upper bound (seconds) on how stale a worker's in-process config snapshot may
+# get if a Redis pub/sub update is missed. 0 reads every key from Redis.
+REDIS_CONFIG_CACHE_TTL = os.environ.get("REDIS_CONFIG_CACHE_TTL", "5")
+try:
+    REDIS_CONFIG_CACHE_TTL = float(REDIS_CONFIG_CACHE_TTL)
+except ValueError:
+    REDIS_CONFIG_CACHE_TTL = 5.0
+
 
 REDIS_SOCKET_CONNECT_TIMEOUT = os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", "")
 try:
@@ -668,6 +699,20 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# How requests for a model served by several Ollama connections pick one:
+# least_outstanding, ewma, weighted, affinity or random
+OLLAMA_ROUTING_STRATEGY = os.environ.get(
+    "OLLAMA_ROUTING_STRATEGY", "least_outstanding"
+).lower()
+
+# Seconds a connection's loaded models (/api/ps) are trusted by "affinity"
+try:
+    OLLAMA_ROUTING_RESIDENCY_TTL = float(
+        os.environ.get("OLLAMA_ROUTING_RESIDENCY_TTL", "10")
+    )
+except ValueError:
+    OLLAMA_ROUTING_RESIDENCY_TTL = 10.0
+
 
 ####################################
 # CHAT
@@ -692,6 +737,26 @@ else:
     except Exception:
         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE = 1
 
+# Send streamed chat:completion content as seq-numbered patches with periodic
+# full snapshots instead of the whole message on every update.
+ENABLE_CHAT_RESPONSE_STREAM_PATCHES = (
+    os.environ.get("ENABLE_CHAT_RESPONSE_STREAM_PATCHES", "True").lower() == "true"
+)
+
+try:
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = int(
+        os.environ.get("CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL", "100")
+    )
+except Exception:
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = 100
+
+try:
+    CHAT_RESPONSE_STREAM_HISTORY_SIZE = int(
+        os.environ.get("CHAT_RESPONSE_STREAM_HISTORY_SIZE", "256")
+    )
+except Exception:
+    CHAT_RESPONSE_STREAM_HISTORY_SIZE = 256
+
 
 CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = os.environ.get(
     "CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES", "30"
@@ -721,6 +786,28 @@ else:
         CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE = None
 
 
+# Images in the chat history are sent to models as data URIs; keep the
+# encoded ones in memory so repeat turns don't re-read and re-encode them.
+try:
+    CHAT_IMAGE_CACHE_MAX_BYTES = int(
+        os.environ.get("CHAT_IMAGE_CACHE_MAX_BYTES", str(128 * 1024 * 1024))
+    )
+except Exception:
+    CHAT_IMAGE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# Downscale images sent to models to this many pixels on the longest side.
+# Models can override it with the `image_max_size` param.
+CHAT_IMAGE_MAX_SIZE = os.environ.get("CHAT_IMAGE_MAX_SIZE", "")
+
+if CHAT_IMAGE_MAX_SIZE == "":
+    CHAT_IMAGE_MAX_SIZE = None
+else:
+    try:
+        CHAT_IMAGE_MAX_SIZE = int(CHAT_IMAGE_MAX_SIZE)
+    except Exception:
+        CHAT_IMAGE_MAX_SIZE = None
+
+
 ####################################
 # WEBSOCKET SUPPORT
 ####################################
@@ -813,6 +900,53 @@ else:
 AIOHTTP_CLIENT_SESSION_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_SSL", "True").lower() == "true"
 )
+# Shared upstream connection pools (one aiohttp session per upstream base URL)
+ENABLE_AIOHTTP_CLIENT_SESSION_POOL = (
+    os.environ.get("ENABLE_AIOHTTP_CLIENT_SESSION_POOL", "True").lower() == "true"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(
+        os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100")
+    )
+except ValueError:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+try:
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = float(
+        os.environ.get("AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT", "30")
+    )
+except ValueError:
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = 30.0
+
+try:
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = int(
+        os.environ.get("AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL", "300")
+    )
+except ValueError:
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = 300
+
+
+# Warm Jupyter kernels for the code interpreter, kept per chat (or per user)
+# between code blocks. A pool size of 0 starts a fresh kernel per execution.
+try:
+    CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SIZE = int(
+        os.environ.get("CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SIZE", "8")
+    )
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SIZE = 8
+
+try:
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TTL = float(
+        os.environ.get("CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TTL", "600")
+    )
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TTL = 600.0
+
+CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SCOPE = os.environ.get(
+    "CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SCOPE", "chat"
+).lower()
+
 
 AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = os.environ.get(
     "AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST",
@@ -913,6 +1047,35 @@ SENTENCE_TRANSFORMERS_CROSS_ENCODER_SIGMOID_ACTIVATION_FUNCTION = (
     == "true"
 )
 
+####################################
+# LOCAL INFERENCE SERVICE
+####################################
+
+# Used by the "local_service" embedding and reranking engines
+LOCAL_INFERENCE_SOCKET_PATH = os.environ.get(
+    "LOCAL_INFERENCE_SOCKET_PATH",
+    os.path.join(tempfile.gettempdir(), "open-webui-local-inference.sock"),
+)
+
+try:
+    LOCAL_INFERENCE_MAX_BATCH_SIZE = int(
+        os.environ.get("LOCAL_INFERENCE_MAX_BATCH_SIZE", "32")
+    )
+except ValueError:
+    LOCAL_INFERENCE_MAX_BATCH_SIZE = 32
+
+try:
+    LOCAL_INFERENCE_MAX_WAIT_MS = float(
+        os.environ.get("LOCAL_INFERENCE_MAX_WAIT_MS", "10")
+    )
+except ValueError:
+    LOCAL_INFERENCE_MAX_WAIT_MS = 10.0
+
+try:
+    LOCAL_INFERENCE_TIMEOUT = float(os.environ.get("LOCAL_INFERENCE_TIMEOUT", "300"))
+except ValueError:
+    LOCAL_INFERENCE_TIMEOUT = 300.0
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -1,7 +1,7 @@
 import os
 import json
 import logging
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
@@ -15,10 +15,17 @@ from open_webui.env import (
     DATABASE_POOL_TIMEOUT,
     DATABASE_ENABLE_SQLITE_WAL,
     DATABASE_ENABLE_SESSION_SHARING,
+    DATABASE_ENABLE_ASYNC,
     ENABLE_DB_MIGRATIONS,
 )
 from peewee_migrate import Router
 from sqlalchemy import Dialect, create_engine, MetaData, event, types
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker, Session
 from sqlalchemy.pool import QueuePool, NullPool
@@ -189,3 +196,84 @@ def get_db_context(db: Optional[Session] = None):
     else:
         with get_db() as session:
             yield session
+
+
+# Async engine for per-request lookups on the event loop. Only postgres and
+# plain sqlite have asyncio drivers; for everything else (or when the driver
+# is not installed) the async model methods run their sync twin in a thread.
+def get_async_database_url(url: str) -> Optional[str]:
+    try:
+        url = make_url(url)
+    except Exception:
+        return None
+
+    if url.drivername in ("postgresql", "postgres", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg spells libpq's sslmode as ssl
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"]).update_query_dict(
+                {"ssl": sslmode}
+            )
+        return url.render_as_string(hide_password=False)
+    elif url.drivername in ("sqlite", "sqlite+pysqlite"):
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(
+            hide_password=False
+        )
+    return None
+
+
+async_engine = None
+ASYNC_DATABASE_URL = (
+    get_async_database_url(SQLALCHEMY_DATABASE_URL) if DATABASE_ENABLE_ASYNC else None
+)
+
+if ASYNC_DATABASE_URL:
+    try:
+        if ASYNC_DATABASE_URL.startswith("sqlite"):
+            async_engine = create_async_engine(ASYNC_DATABASE_URL)
+            event.listen(async_engine.sync_engine, "connect", on_connect)
+        elif isinstance(DATABASE_POOL_SIZE, int) and DATABASE_POOL_SIZE > 0:
+            async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT,
+                pool_recycle=DATABASE_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+        elif isinstance(DATABASE_POOL_SIZE, int):
+            async_engine = create_async_engine(
+                ASYNC_DATABASE_URL, pool_pre_ping=True, poolclass=NullPool
+            )
+        else:
+            async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+    except Exception as e:
+        log.warning(
+            f"Async database engine unavailable, falling back to threaded sync queries: {e}"
+        )
+        async_engine = None
+elif DATABASE_ENABLE_ASYNC:
+    log.warning(
+        "DATABASE_ENABLE_ASYNC is set but the database URL has no async driver, "
+        "falling back to threaded sync queries"
+    )
+
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+
+def is_async_db_enabled() -> bool:
+    return AsyncSessionLocal is not None
+
+
+@asynccontextmanager
+async def get_async_db_context(db: Optional[AsyncSession] = None):
+    if isinstance(db, AsyncSession) and DATABASE_ENABLE_SESSION_SHARING:
+        yield db
+    else:
+        async with AsyncSessionLocal() as session:
+            yield session
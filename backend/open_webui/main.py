@@ -67,6 +67,7 @@ from open_webui.socket.main import (
     periodic_session_pool_cleanup,
     get_event_emitter,
     get_models_in_use,
+    emit_file_status,
 )
 from open_webui.routers import (
     analytics,
@@ -106,10 +107,11 @@ from open_webui.routers.retrieval import (
     get_ef,
     get_rf,
 )
+from open_webui.retrieval.embedding_cache import get_embedding_cache
 
 
 from sqlalchemy.orm import Session
-from open_webui.internal.db import ScopedSession, engine, get_session
+from open_webui.internal.db import ScopedSession, async_engine, engine, get_session
 
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
@@ -245,10 +247,17 @@ from open_webui.config import (
     RAG_EMBEDDING_BATCH_SIZE,
     ENABLE_ASYNC_EMBEDDING,
     RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_BACKEND,
+    RAG_EMBEDDING_CACHE_MEMORY_MAX_BYTES,
+    RAG_EMBEDDING_CACHE_MAX_BYTES,
+    RAG_EMBEDDING_CACHE_DIR,
+    RAG_EMBEDDING_CACHE_TTL,
     RAG_TOP_K,
     RAG_TOP_K_RERANKER,
     RAG_RELEVANCE_THRESHOLD,
     RAG_HYBRID_BM25_WEIGHT,
+    RAG_HYBRID_SCORING_MODE,
     RAG_ALLOWED_FILE_EXTENSIONS,
     RAG_FILE_MAX_COUNT,
     RAG_FILE_MAX_SIZE,
@@ -514,7 +523,7 @@ from open_webui.env import (
 from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
-    check_model_access,
+    acheck_model_access,
     get_filtered_models,
 )
 from open_webui.utils.chat import (
@@ -549,6 +558,14 @@ from open_webui.utils.oauth import (
 )
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.http_pool import CLIENT_SESSION_POOL
+from open_webui.utils.code_interpreter import JUPYTER_KERNEL_POOL
+from open_webui.utils.upstream_router import OLLAMA_ROUTER
+from open_webui.retrieval.models.local_service import LOCAL_INFERENCE_SERVICE
+from open_webui.utils.file_status import FILE_STATUS_BUS
+from open_webui.utils.group_cache import (
+    request_scope as group_membership_request_scope,
+)
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -607,6 +624,11 @@ async def lifespan(app: FastAPI):
     # This allows sync functions to schedule work on the main loop without blocking health checks
     app.state.main_loop = asyncio.get_running_loop()
 
+    # Shared upstream connection pools for LLM provider traffic
+    CLIENT_SESSION_POOL.start()
+    app.state.CLIENT_SESSION_POOL = CLIENT_SESSION_POOL
+    JUPYTER_KERNEL_POOL.start()
+
     app.state.instance_id = INSTANCE_ID
     start_logger()
 
@@ -641,6 +663,10 @@ async def lifespan(app: FastAPI):
             redis_task_command_listener(app)
         )
 
+    OLLAMA_ROUTER.start(redis=app.state.redis)
+
+    FILE_STATUS_BUS.start(asyncio.get_running_loop(), socket_emitter=emit_file_status)
+
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
@@ -706,6 +732,13 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    await CLIENT_SESSION_POOL.close()
+    await JUPYTER_KERNEL_POOL.close()
+    LOCAL_INFERENCE_SERVICE.close()
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -942,6 +975,7 @@ app.state.config.TOP_K = RAG_TOP_K
 app.state.config.TOP_K_RERANKER = RAG_TOP_K_RERANKER
 app.state.config.RELEVANCE_THRESHOLD = RAG_RELEVANCE_THRESHOLD
 app.state.config.HYBRID_BM25_WEIGHT = RAG_HYBRID_BM25_WEIGHT
+app.state.config.HYBRID_SCORING_MODE = RAG_HYBRID_SCORING_MODE
 
 
 app.state.config.ALLOWED_FILE_EXTENSIONS = RAG_ALLOWED_FILE_EXTENSIONS
@@ -1107,6 +1141,29 @@ app.state.RERANKING_FUNCTION = None
 app.state.ef = None
 app.state.rf = None
 
+app.state.EMBEDDING_CACHE = (
+    get_embedding_cache(
+        RAG_EMBEDDING_CACHE_BACKEND,
+        memory_max_bytes=RAG_EMBEDDING_CACHE_MEMORY_MAX_BYTES,
+        max_bytes=RAG_EMBEDDING_CACHE_MAX_BYTES,
+        cache_dir=RAG_EMBEDDING_CACHE_DIR,
+        ttl=RAG_EMBEDDING_CACHE_TTL,
+        redis=(
+            get_redis_connection(
+                REDIS_URL,
+                get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+                REDIS_CLUSTER,
+                decode_responses=False,
+            )
+            if RAG_EMBEDDING_CACHE_BACKEND == "redis" and REDIS_URL
+            else None
+        ),
+        redis_key_prefix=REDIS_KEY_PREFIX,
+    )
+    if ENABLE_RAG_EMBEDDING_CACHE
+    else None
+)
+
 app.state.YOUTUBE_LOADER_TRANSLATION = None
 
 
@@ -1162,6 +1219,7 @@ app.state.EMBEDDING_FUNCTION = get_embedding_function(
     ),
     enable_async=app.state.config.ENABLE_ASYNC_EMBEDDING,
     concurrent_requests=app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    embedding_cache=app.state.EMBEDDING_CACHE,
 )
 
 app.state.RERANKING_FUNCTION = get_reranking_function(
@@ -1449,6 +1507,12 @@ class APIKeyRestrictionMiddleware:
 app.add_middleware(APIKeyRestrictionMiddleware)
 
 
+@app.middleware("http")
+async def scope_group_membership_to_request(request: Request, call_next):
+    with group_membership_request_scope():
+        return await call_next(request)
+
+
 @app.middleware("http")
 async def commit_session_after_request(request: Request, call_next):
     response = await call_next(request)
@@ -1703,14 +1767,14 @@ async def chat_completion(
                 raise Exception("Model not found")
 
             model = request.app.state.MODELS[model_id]
-            model_info = Models.get_model_by_id(model_id)
+            model_info = await Models.aget_model_by_id(model_id)
 
             # Check if user has access to the model
             if not BYPASS_MODEL_ACCESS_CONTROL and (
                 user.role != "admin" or not BYPASS_ADMIN_ACCESS_CONTROL
             ):
                 try:
-                    check_model_access(user, model)
+                    await acheck_model_access(user, model)
                 except Exception as e:
                     raise e
         else:
@@ -1799,6 +1863,7 @@ async def chat_completion(
                     )
                     else "default"
                 ),
+                "image_max_size": model_info_params.get("image_max_size"),
             },
         }
 
@@ -1810,7 +1875,7 @@ async def chat_completion(
                 # Verify chat ownership — lightweight EXISTS check avoids
                 # deserializing the full chat JSON blob just to confirm the row exists
                 if (
-                    not Chats.is_chat_owner(metadata["chat_id"], user.id)
+                    not await Chats.ais_chat_owner(metadata["chat_id"], user.id)
                     and user.role != "admin"
                 ):  # admins can access any chat
                     raise HTTPException(
@@ -0,0 +1,190 @@
+"""Add chat full-text search index
+
+Revision ID: a5d7e9f1c3b6
+Revises: f4c6d9e2b3a5
+Create Date: 2026-10-16 00:00:03.000000
+
+Adds chat_search (one row per chat: title, message text, tags) and its
+full-text index: an FTS5 external-content table kept in sync by triggers on
+SQLite, a generated tsvector with GIN indexes on PostgreSQL. Existing chats
+are backfilled.
+"""
+
+import json
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from open_webui.models.chat_search import get_chat_search_content, get_tag_token
+
+log = logging.getLogger(__name__)
+
+revision: str = "a5d7e9f1c3b6"
+down_revision: Union[str, None] = "f4c6d9e2b3a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+SQLITE_DDL = [
+    """
+    CREATE TABLE chat_search (
+        id INTEGER PRIMARY KEY,
+        chat_id TEXT NOT NULL UNIQUE,
+        user_id TEXT,
+        title TEXT,
+        content TEXT,
+        tags TEXT
+    )
+    """,
+    "CREATE INDEX chat_search_user_id_idx ON chat_search (user_id)",
+    """
+    CREATE VIRTUAL TABLE chat_search_fts USING fts5(
+        title, content, tags,
+        content='chat_search', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER chat_search_ai AFTER INSERT ON chat_search BEGIN
+        INSERT INTO chat_search_fts (rowid, title, content, tags)
+        VALUES (new.id, new.title, new.content, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER chat_search_ad AFTER DELETE ON chat_search BEGIN
+        INSERT INTO chat_search_fts (chat_search_fts, rowid, title, content, tags)
+        VALUES ('delete', old.id, old.title, old.content, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER chat_search_au AFTER UPDATE ON chat_search BEGIN
+        INSERT INTO chat_search_fts (chat_search_fts, rowid, title, content, tags)
+        VALUES ('delete', old.id, old.title, old.content, old.tags);
+        INSERT INTO chat_search_fts (rowid, title, content, tags)
+        VALUES (new.id, new.title, new.content, new.tags);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    """
+    CREATE TABLE chat_search (
+        chat_id TEXT PRIMARY KEY REFERENCES chat (id) ON DELETE CASCADE,
+        user_id TEXT,
+        title TEXT,
+        content TEXT,
+        tags TEXT[] NOT NULL DEFAULT '{}',
+        search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX chat_search_user_id_idx ON chat_search (user_id)",
+    "CREATE INDEX chat_search_vector_idx ON chat_search USING GIN (search_vector)",
+    "CREATE INDEX chat_search_tags_idx ON chat_search USING GIN (tags)",
+]
+
+
+def _load_json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except Exception:
+            return None
+    return value
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        ddl = SQLITE_DDL
+    elif dialect == "postgresql":
+        ddl = POSTGRES_DDL
+    else:
+        log.info(f"Chat search index is not supported on {dialect}, skipping")
+        return
+
+    savepoint = conn.begin_nested()
+    try:
+        for statement in ddl:
+            conn.execute(sa.text(statement))
+        savepoint.commit()
+    except Exception as e:
+        # e.g. SQLite built without FTS5; search falls back to JSON scans
+        savepoint.rollback()
+        log.warning(f"Could not create chat search index: {e}")
+        return
+
+    chat_table = sa.table(
+        "chat",
+        sa.column("id", sa.Text()),
+        sa.column("user_id", sa.Text()),
+        sa.column("title", sa.Text()),
+        sa.column("chat", sa.JSON()),
+        sa.column("meta", sa.JSON()),
+    )
+    chat_search_table = sa.table(
+        "chat_search",
+        sa.column("chat_id", sa.Text()),
+        sa.column("user_id", sa.Text()),
+        sa.column("title", sa.Text()),
+        sa.column("content", sa.Text()),
+        sa.column("tags"),
+    )
+
+    result = conn.execute(
+        sa.select(
+            chat_table.c.id,
+            chat_table.c.user_id,
+            chat_table.c.title,
+            chat_table.c.chat,
+            chat_table.c.meta,
+        )
+        .where(~chat_table.c.user_id.like("shared-%"))
+        .execution_options(yield_per=BATCH_SIZE, stream_results=True)
+    )
+
+    batch = []
+    total = 0
+    for chat_id, user_id, title, chat, meta in result:
+        tags = (_load_json(meta) or {}).get("tags", []) or []
+        batch.append(
+            {
+                "chat_id": chat_id,
+                "user_id": user_id,
+                # PostgreSQL text can't hold NUL; older rows may predate sanitizing
+                "title": (title or "").replace("\x00", ""),
+                "content": get_chat_search_content(_load_json(chat)).replace(
+                    "\x00", ""
+                ),
+                "tags": (
+                    list(tags)
+                    if dialect == "postgresql"
+                    else " ".join(get_tag_token(tag) for tag in tags)
+                ),
+            }
+        )
+
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(sa.insert(chat_search_table), batch)
+            total += len(batch)
+            batch.clear()
+
+    if batch:
+        conn.execute(sa.insert(chat_search_table), batch)
+        total += len(batch)
+
+    log.info(f"Indexed {total} chats for full-text search")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS chat_search_fts")
+    op.execute("DROP TABLE IF EXISTS chat_search")
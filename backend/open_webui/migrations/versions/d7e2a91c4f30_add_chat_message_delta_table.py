@@ -0,0 +1,39 @@
+"""Add chat_message_delta table
+
+Revision ID: d7e2a91c4f30
+Revises: 41c140e7633d
+Create Date: 2026-10-16 00:00:00.000000
+
+Holds in-flight message content written by the append-only streaming path
+(ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES) until it is folded into chat.chat.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "d7e2a91c4f30"
+down_revision: Union[str, None] = "41c140e7633d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if "chat_message_delta" not in inspector.get_table_names():
+        op.create_table(
+            "chat_message_delta",
+            sa.Column("id", sa.Text(), primary_key=True),
+            sa.Column("chat_id", sa.Text(), nullable=False, index=True),
+            sa.Column("message_id", sa.Text(), nullable=False),
+            sa.Column("data", sa.JSON(), nullable=True),
+            sa.Column("updated_at", sa.BigInteger()),
+            sa.ForeignKeyConstraint(["chat_id"], ["chat.id"], ondelete="CASCADE"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_message_delta")
@@ -0,0 +1,40 @@
+"""Add packed topic centroid columns to chat table
+
+Revision ID: e3b5c8f1a2d4
+Revises: d7e2a91c4f30
+Create Date: 2026-10-16 00:00:01.000000
+
+Stores the running topic centroid as a float32/float16 blob plus its decay
+weight. The JSON topic_embedding / message_embeddings columns are kept for
+existing rows and cleared as chats are re-scored.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e3b5c8f1a2d4"
+down_revision: Union[str, None] = "d7e2a91c4f30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = {col["name"] for col in inspector.get_columns("chat")}
+
+    if "topic_centroid" not in columns:
+        op.add_column(
+            "chat", sa.Column("topic_centroid", sa.LargeBinary(), nullable=True)
+        )
+    if "topic_centroid_weight" not in columns:
+        op.add_column(
+            "chat", sa.Column("topic_centroid_weight", sa.Float(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("chat", "topic_centroid_weight")
+    op.drop_column("chat", "topic_centroid")
@@ -0,0 +1,55 @@
+"""Add knowledge reindex checkpoint tables
+
+Revision ID: f4c6d9e2b3a5
+Revises: e3b5c8f1a2d4
+Create Date: 2026-10-16 00:00:02.000000
+
+Tracks background knowledge reindex jobs and per-file progress so an
+interrupted job can resume where it stopped.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "f4c6d9e2b3a5"
+down_revision: Union[str, None] = "e3b5c8f1a2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "knowledge_reindex_job" not in tables:
+        op.create_table(
+            "knowledge_reindex_job",
+            sa.Column("id", sa.Text(), primary_key=True),
+            sa.Column("user_id", sa.Text(), nullable=False),
+            sa.Column("status", sa.Text(), nullable=False),
+            sa.Column("total", sa.BigInteger(), nullable=False),
+            sa.Column("created_at", sa.BigInteger(), nullable=False),
+            sa.Column("started_at", sa.BigInteger(), nullable=True),
+            sa.Column("finished_at", sa.BigInteger(), nullable=True),
+            sa.Column("heartbeat_at", sa.BigInteger(), nullable=True),
+        )
+
+    if "knowledge_reindex_file" not in tables:
+        op.create_table(
+            "knowledge_reindex_file",
+            sa.Column("id", sa.Text(), primary_key=True),
+            sa.Column("job_id", sa.Text(), nullable=False, index=True),
+            sa.Column("knowledge_id", sa.Text(), nullable=False),
+            sa.Column("file_id", sa.Text(), nullable=False),
+            sa.Column("status", sa.Text(), nullable=False),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("updated_at", sa.BigInteger(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("knowledge_reindex_file")
+    op.drop_table("knowledge_reindex_job")
@@ -1,13 +1,27 @@
+import asyncio
 import logging
 import time
 import uuid
 from typing import Optional
 
 from sqlalchemy.orm import Session
-from open_webui.internal.db import Base, get_db_context
+from open_webui.internal.db import (
+    Base,
+    get_async_db_context,
+    get_db_context,
+    is_async_db_enabled,
+)
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, Text, UniqueConstraint, or_, and_
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Text,
+    UniqueConstraint,
+    or_,
+    and_,
+    select,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 
 log = logging.getLogger(__name__)
@@ -493,6 +507,23 @@ class AccessGrantsTable:
             )
             return [AccessGrantModel.model_validate(g) for g in grants]
 
+    async def aget_grants_by_resource(
+        self, resource_type: str, resource_id: str
+    ) -> list[AccessGrantModel]:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(
+                self.get_grants_by_resource, resource_type, resource_id
+            )
+
+        async with get_async_db_context() as db:
+            grants = await db.scalars(
+                select(AccessGrant).filter_by(
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                )
+            )
+            return [AccessGrantModel.model_validate(g) for g in grants]
+
     def get_grants_by_resources(
         self,
         resource_type: str,
@@ -554,7 +585,7 @@ class AccessGrantsTable:
             if user_group_ids is None:
                 from open_webui.models.groups import Groups
 
-                user_groups = Groups.get_groups_by_member_id(user_id, db=db)
+                user_groups = Groups.get_cached_groups_by_member_id(user_id, db=db)
                 user_group_ids = {group.id for group in user_groups}
 
             if user_group_ids:
@@ -577,6 +608,66 @@ class AccessGrantsTable:
             )
             return exists is not None
 
+    async def ahas_access(
+        self,
+        user_id: str,
+        resource_type: str,
+        resource_id: str,
+        permission: str = "read",
+        user_group_ids: Optional[set[str]] = None,
+    ) -> bool:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(
+                self.has_access,
+                user_id,
+                resource_type,
+                resource_id,
+                permission,
+                user_group_ids,
+            )
+
+        conditions = [
+            and_(
+                AccessGrant.principal_type == "user",
+                AccessGrant.principal_id.in_(["*", user_id]),
+            ),
+        ]
+
+        if user_group_ids is None:
+            from open_webui.models.groups import GroupMember
+
+            # Resolve group membership in the same round trip
+            conditions.append(
+                and_(
+                    AccessGrant.principal_type == "group",
+                    AccessGrant.principal_id.in_(
+                        select(GroupMember.group_id).where(
+                            GroupMember.user_id == user_id
+                        )
+                    ),
+                )
+            )
+        elif user_group_ids:
+            conditions.append(
+                and_(
+                    AccessGrant.principal_type == "group",
+                    AccessGrant.principal_id.in_(user_group_ids),
+                )
+            )
+
+        async with get_async_db_context() as db:
+            grant_id = await db.scalar(
+                select(AccessGrant.id)
+                .where(
+                    AccessGrant.resource_type == resource_type,
+                    AccessGrant.resource_id == resource_id,
+                    AccessGrant.permission == permission,
+                    or_(*conditions),
+                )
+                .limit(1)
+            )
+            return grant_id is not None
+
     def get_accessible_resource_ids(
         self,
         user_id: str,
@@ -609,7 +700,7 @@ class AccessGrantsTable:
             if user_group_ids is None:
                 from open_webui.models.groups import Groups
 
-                user_groups = Groups.get_groups_by_member_id(user_id, db=db)
+                user_groups = Groups.get_cached_groups_by_member_id(user_id, db=db)
                 user_group_ids = {group.id for group in user_groups}
 
             if user_group_ids:
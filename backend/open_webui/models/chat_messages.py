@@ -91,6 +91,28 @@ class ChatMessage(Base):
     )
 
 
+class ChatMessageDelta(Base):
+    """
+    In-flight content for a message that is still being generated.
+
+    Rows live here only until the message is folded back into the
+    `chat.chat` JSON blob, so readers merge them on top of the blob.
+    """
+
+    __tablename__ = "chat_message_delta"
+
+    # Composite ID: {chat_id}-{message_id}
+    id = Column(Text, primary_key=True)
+    chat_id = Column(
+        Text, ForeignKey("chat.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    message_id = Column(Text, nullable=False)
+
+    data = Column(JSON, nullable=True)
+
+    updated_at = Column(BigInteger)
+
+
 ####################
 # Pydantic Models
 ####################
@@ -118,6 +140,16 @@ class ChatMessageModel(BaseModel):
     updated_at: int
 
 
+class ChatMessageDeltaModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    chat_id: str
+    message_id: str
+    data: Optional[dict] = None
+    updated_at: int
+
+
 ####################
 # Table Operations
 ####################
@@ -311,6 +343,42 @@ class ChatMessageTable:
             db.commit()
             return True
 
+    def upsert_message_delta(
+        self,
+        chat_id: str,
+        message_id: str,
+        data: dict,
+        db: Optional[Session] = None,
+    ) -> Optional[ChatMessageDeltaModel]:
+        """Merge in-flight message fields without touching the chat blob."""
+        with get_db_context(db) as db:
+            composite_id = f"{chat_id}-{message_id}"
+
+            delta = db.get(ChatMessageDelta, composite_id)
+            if delta:
+                delta.data = {**(delta.data or {}), **data}
+                delta.updated_at = int(time.time())
+            else:
+                delta = ChatMessageDelta(
+                    id=composite_id,
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    data=data,
+                    updated_at=int(time.time()),
+                )
+                db.add(delta)
+            db.commit()
+            db.refresh(delta)
+            return ChatMessageDeltaModel.model_validate(delta)
+
+    def get_message_deltas_by_chat_id(
+        self, chat_id: str, db: Optional[Session] = None
+    ) -> dict[str, dict]:
+        """Return pending deltas for a chat as {message_id: data}."""
+        with get_db_context(db) as db:
+            deltas = db.query(ChatMessageDelta).filter_by(chat_id=chat_id).all()
+            return {delta.message_id: delta.data or {} for delta in deltas}
+
     # Analytics methods
     def get_message_count_by_model(
         self,
@@ -0,0 +1,267 @@
+"""
+Full-text search index over chat titles, message text and tags.
+
+One chat_search row per chat holds its title, the plain text of its messages
+and its tag ids. On SQLite the row is mirrored into the chat_search_fts FTS5
+table by triggers. On PostgreSQL it carries a generated, GIN-indexed tsvector
+and a GIN-indexed tag array. ChatTable keeps the row current on every write,
+except streaming flushes: a streamed message is indexed once it completes.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import Float, Text, text
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+# PostgreSQL caps a tsvector at 1MB; very long chats are indexed up to here
+MAX_CONTENT_LENGTH = 500_000
+
+SNIPPET_WORDS = 24
+
+chat_search_table = sa.table(
+    "chat_search",
+    sa.column("chat_id", sa.Text()),
+    sa.column("user_id", sa.Text()),
+    sa.column("title", sa.Text()),
+    sa.column("content", sa.Text()),
+    sa.column("tags"),
+)
+
+
+def get_chat_search_content(chat: Optional[dict]) -> str:
+    """Plain text of every message in a chat blob."""
+    if not chat:
+        return ""
+
+    messages = chat.get("history", {}).get("messages", {})
+    messages = messages.values() if messages else chat.get("messages", [])
+
+    parts = []
+    for message in messages:
+        if not isinstance(message, dict):
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(
+                block["text"]
+                for block in content
+                if isinstance(block, dict) and isinstance(block.get("text"), str)
+            )
+
+    return "\n".join(parts)[:MAX_CONTENT_LENGTH]
+
+
+def get_search_terms(search_text: str) -> list[str]:
+    return re.findall(r"\w+", search_text.lower())
+
+
+def get_tag_token(tag_id: str) -> str:
+    # Tag ids may contain punctuation the FTS5 tokenizer splits on; a hex
+    # token matches exactly one tag
+    return "t" + hashlib.sha1(tag_id.encode("utf-8")).hexdigest()[:16]
+
+
+class ChatSearchTable:
+    def __init__(self):
+        self._available: dict[str, bool] = {}
+
+    def is_available(self, db: Session) -> bool:
+        """True once the chat_search migration has run on this database."""
+        dialect = db.bind.dialect.name
+        if dialect not in ("sqlite", "postgresql"):
+            return False
+
+        if dialect not in self._available:
+            self._available[dialect] = sa.inspect(db.bind).has_table("chat_search")
+        return self._available[dialect]
+
+    def _row(self, chat_item, dialect: str) -> dict:
+        tags = (chat_item.meta or {}).get("tags", [])
+        return {
+            "chat_id": chat_item.id,
+            "user_id": chat_item.user_id,
+            "title": chat_item.title or "",
+            "content": get_chat_search_content(chat_item.chat),
+            "tags": (
+                list(tags)
+                if dialect == "postgresql"
+                else " ".join(get_tag_token(tag) for tag in tags)
+            ),
+        }
+
+    def upsert_chats(self, chat_items: list, db: Session):
+        """
+        Write the index rows for ORM chats in the caller's transaction.
+
+        Runs in a savepoint so an indexing error never fails the chat write.
+        """
+        chat_items = [
+            chat_item
+            for chat_item in chat_items
+            if not (chat_item.user_id or "").startswith("shared-")
+        ]
+        if not chat_items or not self.is_available(db):
+            return
+
+        dialect = db.bind.dialect.name
+        rows = [self._row(chat_item, dialect) for chat_item in chat_items]
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        # On SQLite, ON CONFLICT DO UPDATE fires the FTS update trigger
+        stmt = insert(chat_search_table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["chat_id"],
+            set_={
+                "title": stmt.excluded.title,
+                "content": stmt.excluded.content,
+                "tags": stmt.excluded.tags,
+            },
+        )
+        try:
+            db.flush()
+            with db.begin_nested():
+                db.execute(stmt)
+        except Exception as e:
+            log.warning(f"Failed to update chat search index: {e}")
+
+    def delete_by_chat_ids(self, chat_ids, db: Session):
+        """`chat_ids` may be a list or a select of chat ids."""
+        if not self.is_available(db):
+            return
+        try:
+            with db.begin_nested():
+                db.execute(
+                    sa.delete(chat_search_table).where(
+                        chat_search_table.c.chat_id.in_(chat_ids)
+                    )
+                )
+        except Exception as e:
+            log.warning(f"Failed to delete from chat search index: {e}")
+
+    def get_match_subquery(
+        self,
+        db: Session,
+        user_id: str,
+        terms: list[str],
+        tag_ids: list[str],
+    ):
+        """
+        Chats of `user_id` containing every term (as a prefix) and every tag.
+
+        Returns a subquery with `chat_id` and `rank`, where a higher rank is a
+        better match.
+        """
+        if db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import ARRAY
+
+            clauses = ["user_id = :user_id"]
+            params = [sa.bindparam("user_id", user_id)]
+            rank = "0.0"
+            if terms:
+                clauses.append("search_vector @@ to_tsquery('simple', :tsquery)")
+                params.append(
+                    sa.bindparam(
+                        "tsquery", " & ".join(f"{term}:*" for term in terms)
+                    )
+                )
+                rank = "ts_rank(search_vector, to_tsquery('simple', :tsquery))"
+            if tag_ids:
+                clauses.append("tags @> :tags")
+                params.append(sa.bindparam("tags", tag_ids, type_=ARRAY(Text)))
+
+            sql = (
+                f"SELECT chat_id, {rank} AS rank FROM chat_search "
+                f"WHERE {' AND '.join(clauses)}"
+            )
+        else:
+            # bm25() is lower-is-better; negate it to match ts_rank
+            sql = (
+                "SELECT chat_search.chat_id AS chat_id, "
+                "-bm25(chat_search_fts, 10.0, 1.0, 0.0) AS rank "
+                "FROM chat_search_fts "
+                "JOIN chat_search ON chat_search.id = chat_search_fts.rowid "
+                "WHERE chat_search_fts MATCH :match "
+                "AND chat_search.user_id = :user_id"
+            )
+            params = [
+                sa.bindparam("user_id", user_id),
+                sa.bindparam("match", self._fts_match(terms, tag_ids)),
+            ]
+
+        return (
+            text(sql)
+            .bindparams(*params)
+            .columns(chat_id=Text, rank=Float)
+            .subquery("chat_match")
+        )
+
+    @staticmethod
+    def _fts_match(terms: list[str], tag_ids: list[str]) -> str:
+        # Terms are \w+ only, so quoting them is enough to escape FTS5 syntax
+        parts = []
+        if terms:
+            parts.append(
+                "{title content} : (" + " AND ".join(f'"{t}"*' for t in terms) + ")"
+            )
+        if tag_ids:
+            parts.append(
+                "tags : ("
+                + " AND ".join(f'"{get_tag_token(t)}"' for t in tag_ids)
+                + ")"
+            )
+        return " AND ".join(parts)
+
+    def get_snippets(
+        self, db: Session, chat_ids: list[str], terms: list[str]
+    ) -> dict[str, str]:
+        """Best matching fragment of each chat's messages, for a page of results."""
+        if not chat_ids or not terms:
+            return {}
+
+        if db.bind.dialect.name == "postgresql":
+            sql = text(
+                "SELECT chat_id, ts_headline('simple', content, "
+                "to_tsquery('simple', :tsquery), :options) AS snippet "
+                "FROM chat_search WHERE chat_id IN :chat_ids"
+            ).bindparams(
+                sa.bindparam("chat_ids", expanding=True),
+                tsquery=" & ".join(f"{term}:*" for term in terms),
+                options=(
+                    f"StartSel=\"\", StopSel=\"\", MaxFragments=1, "
+                    f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 3}, "
+                    f"FragmentDelimiter=\" ... \""
+                ),
+            )
+        else:
+            sql = text(
+                "SELECT chat_search.chat_id, "
+                f"snippet(chat_search_fts, 1, '', '', '...', {SNIPPET_WORDS}) "
+                "FROM chat_search_fts "
+                "JOIN chat_search ON chat_search.id = chat_search_fts.rowid "
+                "WHERE chat_search_fts MATCH :match "
+                "AND chat_search.chat_id IN :chat_ids"
+            ).bindparams(
+                sa.bindparam("chat_ids", expanding=True),
+                match=self._fts_match(terms, []),
+            )
+
+        try:
+            rows = db.execute(sql, {"chat_ids": list(chat_ids)}).all()
+        except Exception as e:
+            log.warning(f"Failed to build chat search snippets: {e}")
+            return {}
+        return {chat_id: snippet for chat_id, snippet in rows if snippet}
+
+
+ChatSearches = ChatSearchTable()
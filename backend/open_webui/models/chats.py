@@ -1,14 +1,24 @@
+import asyncio
 import logging
 import json
 import time
 import uuid
-from typing import Optional
+from typing import Iterator, Optional
 
 from sqlalchemy.orm import Session
-from open_webui.internal.db import Base, JSONField, get_db, get_db_context
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_async_db_context,
+    get_db,
+    get_db_context,
+    is_async_db_enabled,
+)
+from open_webui.env import ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.folders import Folders
-from open_webui.models.chat_messages import ChatMessage, ChatMessages
+from open_webui.models.chat_messages import ChatMessage, ChatMessageDelta, ChatMessages
+from open_webui.models.chat_search import ChatSearches, get_search_terms
 from open_webui.utils.misc import sanitize_data_for_db, sanitize_text_for_db
 
 from pydantic import BaseModel, ConfigDict
@@ -16,7 +26,9 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Float,
     ForeignKey,
+    LargeBinary,
     String,
     Text,
     JSON,
@@ -58,8 +70,12 @@ class Chat(Base):
     split_summary = Column(Text, nullable=True)
 
     # Jaco topic-tracking fields
+    # Legacy JSON storage; superseded by topic_centroid and cleared on next write
     topic_embedding = Column(JSON, nullable=True)
     message_embeddings = Column(JSON, nullable=True)
+    # Decayed running centroid as a packed float blob (see topic_classifier)
+    topic_centroid = Column(LargeBinary, nullable=True)
+    topic_centroid_weight = Column(Float, nullable=True)
 
     __table_args__ = (
         # Performance indexes for common queries
@@ -192,6 +208,12 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+class ChatSearchResultModel(BaseModel):
+    chat: ChatModel
+    # Best matching fragment of the messages; None without the search index
+    snippet: Optional[str] = None
+
+
 class SharedChatResponse(BaseModel):
     id: str
     title: str
@@ -336,6 +358,7 @@ class ChatTable:
 
             chat_item = Chat(**chat.model_dump())
             db.add(chat_item)
+            ChatSearches.upsert_chats([chat_item], db=db)
             db.commit()
             db.refresh(chat_item)
 
@@ -397,6 +420,7 @@ class ChatTable:
                 chats.append(Chat(**chat.model_dump()))
 
             db.add_all(chats)
+            ChatSearches.upsert_chats(chats, db=db)
             db.commit()
 
             # Dual-write messages to chat_message table
@@ -419,20 +443,40 @@ class ChatTable:
 
             return [ChatModel.model_validate(chat) for chat in chats]
 
+    def _set_chat(
+        self, chat_item: Chat, chat: dict, db: Session, index: bool = True
+    ) -> None:
+        chat_item.chat = self._clean_null_bytes(chat)
+        chat_item.title = (
+            self._clean_null_bytes(chat["title"]) if "title" in chat else "New Chat"
+        )
+
+        chat_item.updated_at = int(time.time())
+
+        if index:
+            ChatSearches.upsert_chats([chat_item], db=db)
+
     def update_chat_by_id(
-        self, id: str, chat: dict, db: Optional[Session] = None
+        self,
+        id: str,
+        chat: dict,
+        db: Optional[Session] = None,
+        index: bool = True,
     ) -> Optional[ChatModel]:
+        """Replace the chat blob; index=False leaves the search index as is."""
         try:
             with get_db_context(db) as db:
                 chat_item = db.get(Chat, id)
-                chat_item.chat = self._clean_null_bytes(chat)
-                chat_item.title = (
-                    self._clean_null_bytes(chat["title"])
-                    if "title" in chat
-                    else "New Chat"
-                )
+                self._set_chat(chat_item, chat, db, index=index)
 
-                chat_item.updated_at = int(time.time())
+                # The blob now holds these messages as given; a delta left by
+                # a stream that never committed would keep overlaying them
+                message_ids = list(chat.get("history", {}).get("messages", {}))
+                if ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES and message_ids:
+                    db.query(ChatMessageDelta).filter(
+                        ChatMessageDelta.chat_id == id,
+                        ChatMessageDelta.message_id.in_(message_ids),
+                    ).delete(synchronize_session=False)
 
                 db.commit()
                 db.refresh(chat_item)
@@ -465,6 +509,7 @@ class ChatTable:
 
             # Single meta update
             chat.meta = {**chat.meta, "tags": new_tag_ids}
+            ChatSearches.upsert_chats([chat], db=db)
             db.commit()
             db.refresh(chat)
 
@@ -502,44 +547,142 @@ class ChatTable:
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
     def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
+        self, id: str, message_id: str, message: dict, index: bool = True
     ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = sanitize_text_for_db(message["content"])
 
-        user_id = chat.user_id
-        chat = chat.chat
-        history = chat.get("history", {})
+        try:
+            with get_db_context() as db:
+                chat_item = db.get(Chat, id)
+                if chat_item is None:
+                    return None
 
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+                # The stored blob, not get_chat_by_id(): that overlays the
+                # other messages' in-flight deltas, which must stay deltas.
+                # Copied so the session's JSON value is never mutated.
+                user_id = chat_item.user_id
+                chat = {**chat_item.chat}
+                history = {**chat.get("history", {})}
+                history["messages"] = {**history.get("messages", {})}
+
+                # Fold the pending in-flight delta into the blob and drop it
+                # in the same transaction, so a failed write keeps the delta
+                if ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES:
+                    delta = db.get(ChatMessageDelta, f"{id}-{message_id}")
+                    if delta is not None:
+                        message = {**(delta.data or {}), **message}
+                        db.delete(delta)
+
+                if message_id in history.get("messages", {}):
+                    history["messages"][message_id] = {
+                        **history["messages"][message_id],
+                        **message,
+                    }
+                else:
+                    history["messages"][message_id] = message
 
-        history["currentId"] = message_id
+                history["currentId"] = message_id
 
-        chat["history"] = history
+                chat["history"] = history
 
-        # Dual-write to chat_message table
-        try:
-            ChatMessages.upsert_message(
-                message_id=message_id,
-                chat_id=id,
-                user_id=user_id,
-                data=history["messages"][message_id],
+                # Dual-write to chat_message table
+                try:
+                    ChatMessages.upsert_message(
+                        message_id=message_id,
+                        chat_id=id,
+                        user_id=user_id,
+                        data=history["messages"][message_id],
+                    )
+                except Exception as e:
+                    log.warning(f"Failed to write to chat_message table: {e}")
+
+                self._set_chat(chat_item, chat, db, index=index)
+                db.commit()
+                db.refresh(chat_item)
+                return ChatModel.model_validate(chat_item)
+        except Exception as e:
+            log.warning(f"Failed to upsert message {message_id} in chat {id}: {e}")
+            return None
+
+    def upsert_message_delta_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict
+    ) -> bool:
+        """
+        Append-only write path for streaming flushes.
+
+        Stores the in-flight fields in chat_message_delta without loading or
+        rewriting the chat JSON blob. The delta is folded into the blob by the
+        next upsert_message_to_chat_by_id_and_message_id or by
+        commit_message_delta_by_id_and_message_id.
+
+        Flushes don't update the search index; the completed message is
+        indexed when it is committed.
+        """
+        if not ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES:
+            return (
+                self.upsert_message_to_chat_by_id_and_message_id(
+                    id, message_id, message, index=False
+                )
+                is not None
             )
+
+        if isinstance(message.get("content"), str):
+            message["content"] = sanitize_text_for_db(message["content"])
+
+        try:
+            ChatMessages.upsert_message_delta(id, message_id, message)
+            return True
         except Exception as e:
-            log.warning(f"Failed to write to chat_message table: {e}")
+            log.warning(f"Failed to write to chat_message_delta table: {e}")
+            return False
 
-        return self.update_chat_by_id(id, chat)
+    def commit_message_delta_by_id_and_message_id(
+        self, id: str, message_id: str
+    ) -> Optional[ChatModel]:
+        """
+        Patch the chat blob once with the pending delta for a message, and
+        index the completed message.
+        """
+        if not ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES:
+            # Flushes already wrote the blob, only the index is behind
+            self.index_chat_by_id(id)
+            return None
+
+        # upsert folds the pending delta in on its own
+        return self.upsert_message_to_chat_by_id_and_message_id(id, message_id, {})
+
+    def index_chat_by_id(self, id: str, db: Optional[Session] = None) -> None:
+        """Bring the search index row of a chat up to date."""
+        with get_db_context(db) as db:
+            chat_item = db.get(Chat, id)
+            if chat_item is not None:
+                ChatSearches.upsert_chats([chat_item], db=db)
+                db.commit()
+
+    def _merge_message_deltas(
+        self, chat_item: ChatModel, db: Session, deltas: Optional[dict] = None
+    ) -> ChatModel:
+        """
+        Overlay in-flight chat_message_delta rows onto the chat blob. Callers
+        that already hold the chat's deltas as {message_id: data} pass them in.
+        """
+        if deltas is None:
+            deltas = ChatMessages.get_message_deltas_by_chat_id(chat_item.id, db=db)
+        if not deltas:
+            return chat_item
+
+        # Copy on the way down so the session's JSON value is never mutated
+        chat = {**chat_item.chat}
+        history = {**chat.get("history", {})}
+        messages = {**history.get("messages", {})}
+        for message_id, data in deltas.items():
+            messages[message_id] = {**messages.get(message_id, {}), **data}
+
+        history["messages"] = messages
+        chat["history"] = history
+        return chat_item.model_copy(update={"chat": chat})
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
@@ -557,7 +700,7 @@ class ChatTable:
             history["messages"][message_id]["statusHistory"] = status_history
 
         chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return self.update_chat_by_id(id, chat, index=False)
 
     def add_message_files_by_id_and_message_id(
         self, id: str, message_id: str, files: list[dict]
@@ -578,7 +721,7 @@ class ChatTable:
                 history["messages"][message_id]["files"] = message_files
 
             chat["history"] = history
-            self.update_chat_by_id(id, chat, db=db)
+            self.update_chat_by_id(id, chat, db=db, index=False)
             return message_files
 
     def insert_shared_chat_by_chat_id(
@@ -969,7 +1112,10 @@ class ChatTable:
                     db.commit()
                     db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                chat = ChatModel.model_validate(chat_item)
+                if ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES:
+                    chat = self._merge_message_deltas(chat, db)
+                return chat
         except Exception:
             return None
 
@@ -994,8 +1140,14 @@ class ChatTable:
     ) -> Optional[ChatModel]:
         try:
             with get_db_context(db) as db:
-                chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                chat_item = db.query(Chat).filter_by(id=id, user_id=user_id).first()
+                if chat_item is None:
+                    return None
+
+                chat = ChatModel.model_validate(chat_item)
+                if ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES:
+                    chat = self._merge_message_deltas(chat, db)
+                return chat
         except Exception:
             return None
 
@@ -1014,6 +1166,18 @@ class ChatTable:
         except Exception:
             return False
 
+    async def ais_chat_owner(self, id: str, user_id: str) -> bool:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(self.is_chat_owner, id, user_id)
+
+        try:
+            async with get_async_db_context() as db:
+                return await db.scalar(
+                    select(exists().where(and_(Chat.id == id, Chat.user_id == user_id)))
+                )
+        except Exception:
+            return False
+
     def get_chat_folder_id(
         self, id: str, user_id: str, db: Optional[Session] = None
     ) -> Optional[str]:
@@ -1091,6 +1255,63 @@ class ChatTable:
                 }
             )
 
+    def get_chats_page_for_export(
+        self,
+        user_id: Optional[str] = None,
+        archived: Optional[bool] = None,
+        updated_from: Optional[int] = None,
+        updated_to: Optional[int] = None,
+        after: Optional[tuple[int, str]] = None,
+        limit: int = 100,
+        db: Optional[Session] = None,
+    ) -> Iterator[ChatModel]:
+        """
+        Up to `limit` chats ordered by (updated_at, id), starting after the
+        `after` key. Seeking on the key instead of an offset keeps every page
+        as cheap as the first, and rows stream from a server-side cursor
+        where the database supports one. In-flight message deltas are
+        overlaid, so chats that are still streaming export their latest
+        content.
+        """
+        with get_db_context(db) as db:
+            query = db.query(Chat)
+            if user_id is not None:
+                query = query.filter(Chat.user_id == user_id)
+            if archived is not None:
+                query = query.filter(Chat.archived == archived)
+            if updated_from is not None:
+                query = query.filter(Chat.updated_at >= updated_from)
+            if updated_to is not None:
+                query = query.filter(Chat.updated_at < updated_to)
+            if after is not None:
+                updated_at, id = after
+                query = query.filter(
+                    or_(
+                        Chat.updated_at > updated_at,
+                        and_(Chat.updated_at == updated_at, Chat.id > id),
+                    )
+                )
+
+            query = query.order_by(Chat.updated_at.asc(), Chat.id.asc()).limit(limit)
+
+            # Deltas only exist for messages still being generated, so the
+            # page's are few and read up front in one query
+            deltas = {}
+            if ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES:
+                page = query.with_entities(Chat.id).subquery()
+                for delta in db.query(ChatMessageDelta).filter(
+                    ChatMessageDelta.chat_id.in_(select(page.c.id))
+                ):
+                    deltas.setdefault(delta.chat_id, {})[delta.message_id] = (
+                        delta.data or {}
+                    )
+
+            for chat in query.yield_per(min(limit, 50)):
+                chat = ChatModel.model_validate(chat)
+                if chat.id in deltas:
+                    chat = self._merge_message_deltas(chat, db, deltas[chat.id])
+                yield chat
+
     def get_pinned_chats_by_user_id(
         self, user_id: str, db: Optional[Session] = None
     ) -> list[ChatTitleIdResponse]:
@@ -1134,14 +1355,45 @@ class ChatTable:
         db: Optional[Session] = None,
     ) -> list[ChatModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Filters chats based on a search query, allowing pagination using skip and limit.
+        """
+        return [
+            result.chat
+            for result in self.search_chats_by_user_id_and_search_text(
+                user_id,
+                search_text,
+                include_archived=include_archived,
+                skip=skip,
+                limit=limit,
+                with_snippets=False,
+                db=db,
+            )
+        ]
+
+    def search_chats_by_user_id_and_search_text(
+        self,
+        user_id: str,
+        search_text: str,
+        include_archived: bool = False,
+        skip: int = 0,
+        limit: int = 60,
+        with_snippets: bool = True,
+        db: Optional[Session] = None,
+    ) -> list[ChatSearchResultModel]:
+        """
+        Search chats by title and message text, ranked by relevance when the
+        chat_search index is available. `tag:`, `folder:`, `pinned:`,
+        `archived:` and `shared:` words filter the results.
         """
         search_text = sanitize_text_for_db(search_text).lower().strip()
 
         if not search_text:
-            return self.get_chat_list_by_user_id(
-                user_id, include_archived, filter={}, skip=skip, limit=limit, db=db
-            )
+            return [
+                ChatSearchResultModel(chat=chat)
+                for chat in self.get_chat_list_by_user_id(
+                    user_id, include_archived, filter={}, skip=skip, limit=limit, db=db
+                )
+            ]
 
         search_text_words = search_text.split(" ")
 
@@ -1215,6 +1467,32 @@ class ChatTable:
             if folder_ids:
                 query = query.filter(Chat.folder_id.in_(folder_ids))
 
+            terms = get_search_terms(search_text)
+            if (
+                (terms or tag_ids)
+                and "none" not in tag_ids
+                and ChatSearches.is_available(db)
+            ):
+                match = ChatSearches.get_match_subquery(db, user_id, terms, tag_ids)
+                query = query.join(match, match.c.chat_id == Chat.id)
+                if terms:
+                    query = query.order_by(match.c.rank.desc())
+                query = query.order_by(Chat.updated_at.desc(), Chat.id)
+
+                chats = query.offset(skip).limit(limit).all()
+                snippets = (
+                    ChatSearches.get_snippets(db, [chat.id for chat in chats], terms)
+                    if with_snippets
+                    else {}
+                )
+                return [
+                    ChatSearchResultModel(
+                        chat=ChatModel.model_validate(chat),
+                        snippet=snippets.get(chat.id),
+                    )
+                    for chat in chats
+                ]
+
             query = query.order_by(Chat.updated_at.desc(), Chat.id)
 
             # Check if the database dialect is either 'sqlite' or 'postgresql'
@@ -1321,7 +1599,10 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatSearchResultModel(chat=ChatModel.model_validate(chat))
+                for chat in all_chats
+            ]
 
     def get_chats_by_folder_id_and_user_id(
         self,
@@ -1433,6 +1714,7 @@ class ChatTable:
                         **chat.meta,
                         "tags": list(set(chat.meta.get("tags", []) + [tag_id])),
                     }
+                    ChatSearches.upsert_chats([chat], db=db)
                 db.commit()
                 db.refresh(chat)
                 return ChatModel.model_validate(chat)
@@ -1516,6 +1798,7 @@ class ChatTable:
                     **chat.meta,
                     "tags": list(set(tags)),
                 }
+                ChatSearches.upsert_chats([chat], db=db)
                 db.commit()
                 return True
         except Exception:
@@ -1531,6 +1814,7 @@ class ChatTable:
                     **chat.meta,
                     "tags": [],
                 }
+                ChatSearches.upsert_chats([chat], db=db)
                 db.commit()
 
                 return True
@@ -1541,6 +1825,8 @@ class ChatTable:
         try:
             with get_db_context(db) as db:
                 db.query(ChatMessage).filter_by(chat_id=id).delete()
+                db.query(ChatMessageDelta).filter_by(chat_id=id).delete()
+                ChatSearches.delete_by_chat_ids([id], db=db)
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -1554,6 +1840,10 @@ class ChatTable:
         try:
             with get_db_context(db) as db:
                 db.query(ChatMessage).filter_by(chat_id=id).delete()
+                db.query(ChatMessageDelta).filter_by(chat_id=id).delete()
+                ChatSearches.delete_by_chat_ids(
+                    select(Chat.id).filter_by(id=id, user_id=user_id), db=db
+                )
                 db.query(Chat).filter_by(id=id, user_id=user_id).delete()
                 db.commit()
 
@@ -1574,6 +1864,12 @@ class ChatTable:
                 db.query(ChatMessage).filter(
                     ChatMessage.chat_id.in_(chat_id_subquery)
                 ).delete(synchronize_session=False)
+                db.query(ChatMessageDelta).filter(
+                    ChatMessageDelta.chat_id.in_(chat_id_subquery)
+                ).delete(synchronize_session=False)
+                ChatSearches.delete_by_chat_ids(
+                    select(Chat.id).filter_by(user_id=user_id), db=db
+                )
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -1594,6 +1890,13 @@ class ChatTable:
                 db.query(ChatMessage).filter(
                     ChatMessage.chat_id.in_(chat_id_subquery)
                 ).delete(synchronize_session=False)
+                db.query(ChatMessageDelta).filter(
+                    ChatMessageDelta.chat_id.in_(chat_id_subquery)
+                ).delete(synchronize_session=False)
+                ChatSearches.delete_by_chat_ids(
+                    select(Chat.id).filter_by(user_id=user_id, folder_id=folder_id),
+                    db=db,
+                )
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -1772,35 +2075,57 @@ class ChatTable:
     def update_chat_topic_embedding_by_id(
         self,
         id: str,
-        topic_embedding: list,
-        message_embeddings: list,
+        topic_centroid: bytes,
+        topic_centroid_weight: float,
         db: Optional[Session] = None,
-    ) -> Optional[ChatModel]:
+    ) -> bool:
+        """
+        Store the packed topic centroid. Column-targeted UPDATE, so the chat
+        JSON blob is neither loaded nor rewritten.
+        """
         try:
             with get_db_context(db) as db:
-                chat = db.get(Chat, id)
-                if chat is None:
-                    return None
-                chat.topic_embedding = topic_embedding
-                chat.message_embeddings = message_embeddings
-                chat.updated_at = int(time.time())
+                updated = (
+                    db.query(Chat)
+                    .filter_by(id=id)
+                    .update(
+                        {
+                            "topic_centroid": topic_centroid,
+                            "topic_centroid_weight": topic_centroid_weight,
+                            "topic_embedding": None,
+                            "message_embeddings": None,
+                            "updated_at": int(time.time()),
+                        },
+                        synchronize_session=False,
+                    )
+                )
                 db.commit()
-                db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return updated > 0
         except Exception:
-            return None
+            return False
 
     def get_chat_topic_data_by_id(
         self, id: str, db: Optional[Session] = None
     ) -> Optional[dict]:
         try:
             with get_db_context(db) as db:
-                chat = db.get(Chat, id)
-                if chat is None:
+                row = (
+                    db.query(
+                        Chat.topic_centroid,
+                        Chat.topic_centroid_weight,
+                        Chat.topic_embedding,
+                        Chat.message_embeddings,
+                    )
+                    .filter_by(id=id)
+                    .first()
+                )
+                if row is None:
                     return None
                 return {
-                    "topic_embedding": chat.topic_embedding,
-                    "message_embeddings": chat.message_embeddings,
+                    "topic_centroid": row.topic_centroid,
+                    "topic_centroid_weight": row.topic_centroid_weight,
+                    "topic_embedding": row.topic_embedding,
+                    "message_embeddings": row.message_embeddings,
                 }
         except Exception:
             return None
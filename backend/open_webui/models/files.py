@@ -10,6 +10,13 @@ from sqlalchemy import BigInteger, Column, String, Text, JSON
 
 log = logging.getLogger(__name__)
 
+
+def _invalidate_image_cache(file_id: Optional[str] = None):
+    from open_webui.utils.image_cache import IMAGE_CACHE
+
+    IMAGE_CACHE.invalidate(file_id)
+
+
 ####################
 # Files DB Schema
 ####################
@@ -388,6 +395,7 @@ class FilesTable:
             try:
                 db.query(File).filter_by(id=id).delete()
                 db.commit()
+                _invalidate_image_cache(id)
 
                 return True
             except Exception:
@@ -398,6 +406,7 @@ class FilesTable:
             try:
                 db.query(File).delete()
                 db.commit()
+                _invalidate_image_cache()
 
                 return True
             except Exception:
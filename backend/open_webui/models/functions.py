@@ -10,6 +10,13 @@ from sqlalchemy import BigInteger, Boolean, Column, String, Text, Index
 
 log = logging.getLogger(__name__)
 
+
+def _invalidate_function_registry():
+    from open_webui.utils.function_registry import FUNCTION_REGISTRY
+
+    FUNCTION_REGISTRY.invalidate()
+
+
 ####################
 # Functions DB Schema
 ####################
@@ -126,6 +133,7 @@ class FunctionsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                _invalidate_function_registry()
                 if result:
                     return FunctionModel.model_validate(result)
                 else:
@@ -176,6 +184,7 @@ class FunctionsTable:
                         db.delete(func)
 
                 db.commit()
+                _invalidate_function_registry()
 
                 return [
                     FunctionModel.model_validate(func)
@@ -259,19 +268,24 @@ class FunctionsTable:
             ]
 
     def get_functions_by_type(
-        self, type: str, active_only=False, db: Optional[Session] = None
-    ) -> list[FunctionModel]:
+        self,
+        type: str,
+        active_only=False,
+        include_valves=False,
+        db: Optional[Session] = None,
+    ) -> list[FunctionModel | FunctionWithValvesModel]:
+        model = FunctionWithValvesModel if include_valves else FunctionModel
         with get_db_context(db) as db:
             if active_only:
                 return [
-                    FunctionModel.model_validate(function)
+                    model.model_validate(function)
                     for function in db.query(Function)
                     .filter_by(type=type, is_active=True)
                     .all()
                 ]
             else:
                 return [
-                    FunctionModel.model_validate(function)
+                    model.model_validate(function)
                     for function in db.query(Function).filter_by(type=type).all()
                 ]
 
@@ -339,6 +353,7 @@ class FunctionsTable:
                 function.valves = valves
                 function.updated_at = int(time.time())
                 db.commit()
+                _invalidate_function_registry()
                 db.refresh(function)
                 return FunctionModel.model_validate(function)
             except Exception:
@@ -359,6 +374,7 @@ class FunctionsTable:
 
                     function.updated_at = int(time.time())
                     db.commit()
+                    _invalidate_function_registry()
                     db.refresh(function)
                     return FunctionModel.model_validate(function)
                 else:
@@ -422,6 +438,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                _invalidate_function_registry()
                 function = db.get(Function, id)
                 return FunctionModel.model_validate(function) if function else None
             except Exception:
@@ -437,6 +454,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                _invalidate_function_registry()
                 return True
             except Exception:
                 return None
@@ -446,6 +464,7 @@ class FunctionsTable:
             try:
                 db.query(Function).filter_by(id=id).delete()
                 db.commit()
+                _invalidate_function_registry()
 
                 return True
             except Exception:
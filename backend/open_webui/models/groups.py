@@ -9,6 +9,7 @@ from open_webui.internal.db import Base, JSONField, get_db, get_db_context
 from open_webui.env import DEFAULT_GROUP_SHARE_PERMISSION
 
 from open_webui.models.files import FileMetadataResponse
+from open_webui.utils.group_cache import GROUP_MEMBERSHIP_CACHE
 
 
 from pydantic import BaseModel, ConfigDict
@@ -319,6 +320,14 @@ class GroupTable:
                 .all()
             ]
 
+    def get_cached_groups_by_member_id(
+        self, user_id: str, db: Optional[Session] = None
+    ) -> list[GroupModel]:
+        """Groups of a user for permission checks, served from the membership cache."""
+        return GROUP_MEMBERSHIP_CACHE.get(
+            user_id, lambda: self.get_groups_by_member_id(user_id, db=db)
+        )
+
     def get_groups_by_member_ids(
         self, user_ids: list[str], db: Optional[Session] = None
     ) -> dict[str, list[GroupModel]]:
@@ -405,6 +414,9 @@ class GroupTable:
             db.add_all(new_members)
             db.commit()
 
+        # Previous members are unknown here; drop everyone's cached groups
+        GROUP_MEMBERSHIP_CACHE.invalidate()
+
     def get_group_member_count_by_id(
         self, id: str, db: Optional[Session] = None
     ) -> int:
@@ -446,6 +458,8 @@ class GroupTable:
                     }
                 )
                 db.commit()
+                # Permissions may have changed for every member
+                GROUP_MEMBERSHIP_CACHE.invalidate()
                 return self.get_group_by_id(id=id, db=db)
         except Exception as e:
             log.exception(e)
@@ -456,6 +470,7 @@ class GroupTable:
             with get_db_context(db) as db:
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.invalidate()
                 return True
         except Exception:
             return False
@@ -465,6 +480,7 @@ class GroupTable:
             try:
                 db.query(Group).delete()
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.invalidate()
 
                 return True
             except Exception:
@@ -494,6 +510,7 @@ class GroupTable:
                     )
 
                 db.commit()
+                GROUP_MEMBERSHIP_CACHE.invalidate([user_id])
                 return True
 
             except Exception:
@@ -592,6 +609,8 @@ class GroupTable:
                     )
 
                 db.commit()
+                if groups_to_add or groups_to_remove:
+                    GROUP_MEMBERSHIP_CACHE.invalidate([user_id])
                 return True
 
             except Exception as e:
@@ -633,6 +652,7 @@ class GroupTable:
                 group.updated_at = now
                 db.commit()
                 db.refresh(group)
+                GROUP_MEMBERSHIP_CACHE.invalidate(user_ids or [])
 
                 return GroupModel.model_validate(group)
 
@@ -665,6 +685,7 @@ class GroupTable:
 
                 db.commit()
                 db.refresh(group)
+                GROUP_MEMBERSHIP_CACHE.invalidate(user_ids)
                 return GroupModel.model_validate(group)
 
         except Exception as e:
@@ -0,0 +1,197 @@
+"""Checkpoint tables for background knowledge reindex jobs."""
+
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from open_webui.internal.db import Base, get_db_context
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Text, func
+
+####################
+# KnowledgeReindex DB Schema
+####################
+
+
+class KnowledgeReindexJob(Base):
+    __tablename__ = "knowledge_reindex_job"
+
+    id = Column(Text, primary_key=True)
+    user_id = Column(Text, nullable=False)
+    status = Column(Text, nullable=False)  # pending, running, completed
+    total = Column(BigInteger, nullable=False, default=0)
+
+    created_at = Column(BigInteger, nullable=False)
+    started_at = Column(BigInteger, nullable=True)
+    finished_at = Column(BigInteger, nullable=True)
+    # Bumped while a worker owns the job; a stale heartbeat means it died
+    heartbeat_at = Column(BigInteger, nullable=True)
+
+
+class KnowledgeReindexFile(Base):
+    __tablename__ = "knowledge_reindex_file"
+
+    id = Column(Text, primary_key=True)
+    job_id = Column(Text, nullable=False, index=True)
+    knowledge_id = Column(Text, nullable=False)
+    file_id = Column(Text, nullable=False)
+    status = Column(Text, nullable=False)  # pending, done, failed
+    error = Column(Text, nullable=True)
+    updated_at = Column(BigInteger, nullable=False)
+
+
+class KnowledgeReindexJobModel(BaseModel):
+    id: str
+    user_id: str
+    status: str
+    total: int = 0
+
+    created_at: int
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
+    heartbeat_at: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class KnowledgeReindexFileModel(BaseModel):
+    id: str
+    job_id: str
+    knowledge_id: str
+    file_id: str
+    status: str
+    error: Optional[str] = None
+    updated_at: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class KnowledgeReindexTable:
+    def create_job(
+        self,
+        user_id: str,
+        files: list[tuple[str, str]],
+        db: Optional[Session] = None,
+    ) -> KnowledgeReindexJobModel:
+        """Create a job with one pending checkpoint row per (knowledge_id, file_id)."""
+        files = list(dict.fromkeys(files))
+        with get_db_context(db) as db:
+            now = int(time.time())
+            job = KnowledgeReindexJob(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                status="pending",
+                total=len(files),
+                created_at=now,
+            )
+            db.add(job)
+            db.add_all(
+                [
+                    KnowledgeReindexFile(
+                        id=f"{job.id}-{knowledge_id}-{file_id}",
+                        job_id=job.id,
+                        knowledge_id=knowledge_id,
+                        file_id=file_id,
+                        status="pending",
+                        updated_at=now,
+                    )
+                    for knowledge_id, file_id in files
+                ]
+            )
+            db.commit()
+            db.refresh(job)
+            return KnowledgeReindexJobModel.model_validate(job)
+
+    def get_job_by_id(
+        self, id: str, db: Optional[Session] = None
+    ) -> Optional[KnowledgeReindexJobModel]:
+        with get_db_context(db) as db:
+            job = db.get(KnowledgeReindexJob, id)
+            return KnowledgeReindexJobModel.model_validate(job) if job else None
+
+    def get_latest_job(
+        self, db: Optional[Session] = None
+    ) -> Optional[KnowledgeReindexJobModel]:
+        with get_db_context(db) as db:
+            job = (
+                db.query(KnowledgeReindexJob)
+                .order_by(KnowledgeReindexJob.created_at.desc())
+                .first()
+            )
+            return KnowledgeReindexJobModel.model_validate(job) if job else None
+
+    def update_job_by_id(
+        self, id: str, updated: dict, db: Optional[Session] = None
+    ) -> Optional[KnowledgeReindexJobModel]:
+        with get_db_context(db) as db:
+            db.query(KnowledgeReindexJob).filter_by(id=id).update(updated)
+            db.commit()
+            job = db.get(KnowledgeReindexJob, id)
+            return KnowledgeReindexJobModel.model_validate(job) if job else None
+
+    def get_pending_files_by_job_id(
+        self, job_id: str, db: Optional[Session] = None
+    ) -> list[KnowledgeReindexFileModel]:
+        with get_db_context(db) as db:
+            return [
+                KnowledgeReindexFileModel.model_validate(item)
+                for item in db.query(KnowledgeReindexFile)
+                .filter_by(job_id=job_id, status="pending")
+                .all()
+            ]
+
+    def get_failed_files_by_job_id(
+        self, job_id: str, limit: int = 100, db: Optional[Session] = None
+    ) -> list[KnowledgeReindexFileModel]:
+        with get_db_context(db) as db:
+            return [
+                KnowledgeReindexFileModel.model_validate(item)
+                for item in db.query(KnowledgeReindexFile)
+                .filter_by(job_id=job_id, status="failed")
+                .limit(limit)
+                .all()
+            ]
+
+    def update_file_status(
+        self,
+        id: str,
+        status: str,
+        error: Optional[str] = None,
+        db: Optional[Session] = None,
+    ):
+        with get_db_context(db) as db:
+            db.query(KnowledgeReindexFile).filter_by(id=id).update(
+                {"status": status, "error": error, "updated_at": int(time.time())}
+            )
+            db.commit()
+
+    def count_processed_files_since(
+        self, job_id: str, since: int, db: Optional[Session] = None
+    ) -> int:
+        with get_db_context(db) as db:
+            return (
+                db.query(func.count(KnowledgeReindexFile.id))
+                .filter(
+                    KnowledgeReindexFile.job_id == job_id,
+                    KnowledgeReindexFile.status != "pending",
+                    KnowledgeReindexFile.updated_at >= since,
+                )
+                .scalar()
+            )
+
+    def get_status_counts_by_job_id(
+        self, job_id: str, db: Optional[Session] = None
+    ) -> dict[str, int]:
+        with get_db_context(db) as db:
+            rows = (
+                db.query(KnowledgeReindexFile.status, func.count())
+                .filter_by(job_id=job_id)
+                .group_by(KnowledgeReindexFile.status)
+                .all()
+            )
+            return {status: count for status, count in rows}
+
+
+KnowledgeReindex = KnowledgeReindexTable()
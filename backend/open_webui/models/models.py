@@ -1,9 +1,17 @@
+import asyncio
 import logging
 import time
 from typing import Optional
 
 from sqlalchemy.orm import Session
-from open_webui.internal.db import Base, JSONField, get_db, get_db_context
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_async_db_context,
+    get_db,
+    get_db_context,
+    is_async_db_enabled,
+)
 
 from open_webui.models.groups import Groups
 from open_webui.models.users import User, UserModel, Users, UserResponse
@@ -383,6 +391,20 @@ class ModelsTable:
         except Exception:
             return None
 
+    async def aget_model_by_id(self, id: str) -> Optional[ModelModel]:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(self.get_model_by_id, id)
+
+        try:
+            async with get_async_db_context() as db:
+                model = await db.get(Model, id)
+                if not model:
+                    return None
+            access_grants = await AccessGrants.aget_grants_by_resource("model", id)
+            return self._to_model_model(model, access_grants=access_grants)
+        except Exception:
+            return None
+
     def get_models_by_ids(
         self, ids: list[str], db: Optional[Session] = None
     ) -> list[ModelModel]:
@@ -1,8 +1,16 @@
+import asyncio
 import time
 from typing import Optional
 
 from sqlalchemy.orm import Session, defer
-from open_webui.internal.db import Base, JSONField, get_db, get_db_context
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_async_db_context,
+    get_db,
+    get_db_context,
+    is_async_db_enabled,
+)
 
 
 from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
@@ -303,6 +311,17 @@ class UsersTable:
         except Exception:
             return None
 
+    async def aget_user_by_id(self, id: str) -> Optional[UserModel]:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(self.get_user_by_id, id)
+
+        try:
+            async with get_async_db_context() as db:
+                user = await db.scalar(select(User).filter_by(id=id))
+                return UserModel.model_validate(user)
+        except Exception:
+            return None
+
     def get_user_by_api_key(
         self, api_key: str, db: Optional[Session] = None
     ) -> Optional[UserModel]:
@@ -573,6 +592,23 @@ class UsersTable:
         except Exception:
             return None
 
+    async def aget_user_webhook_url_by_id(self, id: str) -> Optional[str]:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(self.get_user_webhook_url_by_id, id)
+
+        try:
+            async with get_async_db_context() as db:
+                settings = await db.scalar(select(User.settings).filter_by(id=id))
+                if settings is None:
+                    return None
+                return (
+                    settings.get("ui", {})
+                    .get("notifications", {})
+                    .get("webhook_url", None)
+                )
+        except Exception:
+            return None
+
     def get_num_users_active_today(self, db: Optional[Session] = None) -> Optional[int]:
         with get_db_context(db) as db:
             current_timestamp = int(datetime.datetime.now().timestamp())
@@ -852,5 +888,18 @@ class UsersTable:
                 return user.last_active_at >= three_minutes_ago
             return False
 
+    async def ais_user_active(self, user_id: str) -> bool:
+        if not is_async_db_enabled():
+            return await asyncio.to_thread(self.is_user_active, user_id)
+
+        async with get_async_db_context() as db:
+            last_active_at = await db.scalar(
+                select(User.last_active_at).filter_by(id=user_id)
+            )
+            if last_active_at:
+                # Consider user active if last_active_at within the last 3 minutes
+                return last_active_at >= int(time.time()) - 180
+            return False
+
 
 Users = UsersTable()
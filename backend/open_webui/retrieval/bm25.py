@@ -0,0 +1,569 @@
+"""
+Persistent BM25 index for hybrid search.
+
+Each collection gets its own SQLite file holding postings lists, document
+frequencies and document-length stats, so hybrid search can score a query
+against the postings of its terms instead of re-tokenizing the whole
+collection on every request.
+
+Two token streams are kept per chunk: the raw text and the "enriched" text
+(text + filename/title/headings/source/snippet). The query picks one based on
+ENABLE_RAG_HYBRID_SEARCH_ENRICHED_TEXTS, so toggling it needs no rebuild.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Union
+
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+)
+
+log = logging.getLogger(__name__)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+_ID_BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def get_enriched_text(text: str, metadata: dict) -> str:
+    metadata = metadata or {}
+    metadata_parts = [text]
+
+    # Add filename (repeat twice for extra weight in BM25 scoring)
+    if metadata.get("name"):
+        filename = metadata["name"]
+        filename_tokens = filename.replace("_", " ").replace("-", " ").replace(".", " ")
+        metadata_parts.append(f"Filename: {filename} {filename_tokens} {filename_tokens}")
+
+    # Add title if available
+    if metadata.get("title"):
+        metadata_parts.append(f"Title: {metadata['title']}")
+
+    # Add document section headings if available (from markdown splitter)
+    if metadata.get("headings") and isinstance(metadata["headings"], list):
+        headings = " > ".join(str(h) for h in metadata["headings"])
+        metadata_parts.append(f"Section: {headings}")
+
+    # Add source URL/path if available
+    if metadata.get("source"):
+        metadata_parts.append(f"Source: {metadata['source']}")
+
+    # Add snippet for web search results
+    if metadata.get("snippet"):
+        metadata_parts.append(f"Snippet: {metadata['snippet']}")
+
+    return " ".join(metadata_parts)
+
+
+class BM25Index:
+    """On-disk BM25 index for a single collection."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS doc (
+                    id TEXT PRIMARY KEY,
+                    text TEXT,
+                    metadata TEXT,
+                    length INTEGER NOT NULL,
+                    enriched_length INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS posting (
+                    term TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    enriched_tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS posting_doc_id_idx ON posting (doc_id);
+                CREATE TABLE IF NOT EXISTS term (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL,
+                    enriched_df INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS stat (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                """
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _get_stat(conn: sqlite3.Connection, key: str) -> int:
+        row = conn.execute("SELECT value FROM stat WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _add_stat(conn: sqlite3.Connection, key: str, delta: int):
+        conn.execute(
+            "INSERT INTO stat (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, delta),
+        )
+
+    @property
+    def is_built(self) -> bool:
+        with closing(self._connect()) as conn:
+            return self._get_stat(conn, "built") == 1
+
+    def mark_built(self):
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stat (key, value) VALUES ('built', 1)"
+            )
+            conn.commit()
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return self._get_stat(conn, "doc_count")
+
+    def _delete_ids(self, conn: sqlite3.Connection, ids: list[str]):
+        for i in range(0, len(ids), _ID_BATCH_SIZE):
+            batch = ids[i : i + _ID_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+
+            docs = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0), "
+                f"COALESCE(SUM(enriched_length), 0) FROM doc WHERE id IN ({placeholders})",
+                batch,
+            ).fetchone()
+            if not docs[0]:
+                continue
+
+            conn.execute(
+                f"""
+                UPDATE term SET
+                    df = df - (
+                        SELECT COUNT(*) FROM posting p
+                        WHERE p.term = term.term AND p.tf > 0
+                        AND p.doc_id IN ({placeholders})
+                    ),
+                    enriched_df = enriched_df - (
+                        SELECT COUNT(*) FROM posting p
+                        WHERE p.term = term.term
+                        AND p.doc_id IN ({placeholders})
+                    )
+                WHERE term IN (
+                    SELECT term FROM posting WHERE doc_id IN ({placeholders})
+                )
+                """,
+                batch * 3,
+            )
+            conn.execute(
+                f"""
+                DELETE FROM term WHERE enriched_df <= 0 AND term IN (
+                    SELECT term FROM posting WHERE doc_id IN ({placeholders})
+                )
+                """,
+                batch,
+            )
+            conn.execute(
+                f"DELETE FROM posting WHERE doc_id IN ({placeholders})", batch
+            )
+            conn.execute(f"DELETE FROM doc WHERE id IN ({placeholders})", batch)
+
+            self._add_stat(conn, "doc_count", -docs[0])
+            self._add_stat(conn, "total_length", -docs[1])
+            self._add_stat(conn, "total_enriched_length", -docs[2])
+
+    def add(self, items: list[dict]):
+        """Add or replace items shaped like VectorItem (id, text, metadata)."""
+        if not items:
+            return
+
+        with self._lock, closing(self._connect()) as conn:
+            self._delete_ids(conn, [item["id"] for item in items])
+
+            docs = []
+            postings = []
+            df = Counter()
+            enriched_df = Counter()
+            total_length = 0
+            total_enriched_length = 0
+
+            for item in items:
+                text = item.get("text") or ""
+                metadata = item.get("metadata") or {}
+
+                tf = Counter(tokenize(text))
+                enriched_tf = Counter(tokenize(get_enriched_text(text, metadata)))
+                length = sum(tf.values())
+                enriched_length = sum(enriched_tf.values())
+
+                docs.append(
+                    (
+                        item["id"],
+                        text,
+                        json.dumps(metadata, default=str),
+                        length,
+                        enriched_length,
+                    )
+                )
+                for term, count in enriched_tf.items():
+                    postings.append((term, item["id"], tf.get(term, 0), count))
+                    enriched_df[term] += 1
+                    if tf.get(term, 0):
+                        df[term] += 1
+
+                total_length += length
+                total_enriched_length += enriched_length
+
+            conn.executemany("INSERT INTO doc VALUES (?, ?, ?, ?, ?)", docs)
+            conn.executemany("INSERT INTO posting VALUES (?, ?, ?, ?)", postings)
+            conn.executemany(
+                "INSERT INTO term (term, df, enriched_df) VALUES (?, ?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET "
+                "df = df + excluded.df, enriched_df = enriched_df + excluded.enriched_df",
+                [(term, df.get(term, 0), count) for term, count in enriched_df.items()],
+            )
+
+            self._add_stat(conn, "doc_count", len(docs))
+            self._add_stat(conn, "total_length", total_length)
+            self._add_stat(conn, "total_enriched_length", total_enriched_length)
+            conn.commit()
+
+    def delete(self, ids: Optional[list[str]] = None, filter: Optional[dict] = None):
+        with self._lock, closing(self._connect()) as conn:
+            if filter:
+                clauses = []
+                params = []
+                for key, value in filter.items():
+                    if not re.fullmatch(r"[A-Za-z0-9_]+", key):
+                        raise ValueError(f"Unsupported BM25 filter key: {key}")
+                    clauses.append(f"json_extract(metadata, '$.{key}') = ?")
+                    params.append(value)
+                query = f"SELECT id FROM doc WHERE {' AND '.join(clauses)}"
+                if ids:
+                    query += f" AND id IN ({','.join('?' * len(ids))})"
+                    params.extend(ids)
+                ids = [row[0] for row in conn.execute(query, params)]
+
+            if ids:
+                self._delete_ids(conn, list(ids))
+                conn.commit()
+
+    def search(
+        self, query: str, k: int, enable_enriched_texts: bool = False
+    ) -> list[tuple[str, str, dict, float]]:
+        """Return the top-k (id, text, metadata, score) for a query."""
+        terms = Counter(tokenize(query))
+        if not terms:
+            return []
+
+        prefix = "enriched_" if enable_enriched_texts else ""
+
+        with closing(self._connect()) as conn:
+            doc_count = self._get_stat(conn, "doc_count")
+            if doc_count <= 0:
+                return []
+            avgdl = (
+                self._get_stat(conn, f"total_{prefix}length") / doc_count
+            ) or 1.0
+
+            query_terms = list(terms.keys())
+            placeholders = ",".join("?" * len(query_terms))
+            term_dfs = conn.execute(
+                f"SELECT term, {prefix}df FROM term WHERE term IN ({placeholders})",
+                query_terms,
+            ).fetchall()
+
+            # Lucene-style non-negative IDF, weighted by query term frequency
+            weights = [
+                (
+                    term,
+                    terms[term]
+                    * math.log(1 + (doc_count - df + 0.5) / (df + 0.5)),
+                )
+                for term, df in term_dfs
+                if df > 0
+            ]
+            if not weights:
+                return []
+
+            values = ",".join(["(?, ?)"] * len(weights))
+            params = [value for weight in weights for value in weight]
+            rows = conn.execute(
+                f"""
+                WITH q(term, weight) AS (VALUES {values})
+                SELECT d.id, d.text, d.metadata,
+                    SUM(
+                        q.weight * p.{prefix}tf * ({BM25_K1} + 1)
+                        / (p.{prefix}tf + {BM25_K1} * (1 - {BM25_B}
+                            + {BM25_B} * d.{prefix}length / ?))
+                    ) AS score
+                FROM q
+                JOIN posting p ON p.term = q.term
+                JOIN doc d ON d.id = p.doc_id
+                WHERE p.{prefix}tf > 0
+                GROUP BY d.id
+                ORDER BY score DESC
+                LIMIT ?
+                """,
+                [*params, avgdl, k],
+            ).fetchall()
+
+        return [
+            (doc_id, text, json.loads(metadata) if metadata else {}, score)
+            for doc_id, text, metadata, score in rows
+        ]
+
+
+class BM25IndexManager:
+    """Maps collection names to their on-disk BM25 index files."""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._indexes: dict[str, BM25Index] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def _get_path(self, collection_name: str) -> str:
+        if re.fullmatch(r"[A-Za-z0-9_.-]+", collection_name):
+            filename = collection_name
+        else:
+            filename = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.index_dir, f"{filename}.sqlite")
+
+    def exists(self, collection_name: str) -> bool:
+        return collection_name in self._indexes or os.path.exists(
+            self._get_path(collection_name)
+        )
+
+    def get(self, collection_name: str, create: bool = False) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._indexes.get(collection_name)
+            if index is not None:
+                if os.path.exists(index.path):
+                    return index
+                # Dropped by another worker
+                del self._indexes[collection_name]
+
+            if not create and not os.path.exists(self._get_path(collection_name)):
+                return None
+
+            index = BM25Index(self._get_path(collection_name))
+            self._indexes[collection_name] = index
+            return index
+
+    def drop(self, collection_name: str):
+        with self._lock:
+            self._indexes.pop(collection_name, None)
+            path = self._get_path(collection_name)
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(f"{path}{suffix}")
+                except FileNotFoundError:
+                    pass
+
+    def reset(self):
+        with self._lock:
+            self._indexes.clear()
+            shutil.rmtree(self.index_dir, ignore_errors=True)
+            os.makedirs(self.index_dir, exist_ok=True)
+
+
+class BM25IndexedVectorDB(VectorDBBase):
+    """
+    Vector DB client wrapper that keeps the per-collection BM25 indexes in
+    sync with every insert, upsert and delete. All other calls are passed
+    through to the wrapped client. The async writes use the base class's
+    thread offload so they go through the indexing methods below.
+    """
+
+    def __init__(self, client: VectorDBBase, index_manager: BM25IndexManager):
+        self.client = client
+        self.bm25 = index_manager
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def to_cosine_similarity(self, score: float) -> Optional[float]:
+        return self.client.to_cosine_similarity(score)
+
+    def _index_items(self, collection_name: str, items: List[VectorItem]):
+        try:
+            index = self.bm25.get(collection_name)
+            if index is not None:
+                index.add([dict(item) for item in items])
+        except Exception as e:
+            log.warning(f"Failed to update BM25 index for {collection_name}: {e}")
+            # A partial index would silently miss chunks; rebuild lazily
+            self.bm25.drop(collection_name)
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        self.client.delete_collection(collection_name)
+        self.bm25.drop(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        # Only start an index for brand-new collections; existing ones are
+        # backfilled from the vector DB on first hybrid query.
+        is_new = not self.bm25.exists(
+            collection_name
+        ) and not self.client.has_collection(collection_name)
+
+        self.client.insert(collection_name, items)
+
+        if is_new:
+            self.bm25.get(collection_name, create=True).mark_built()
+        self._index_items(collection_name, items)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self.client.upsert(collection_name, items)
+        self._index_items(collection_name, items)
+
+    def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return self.client.search(
+            collection_name=collection_name,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return self.client.query(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.client.get(collection_name)
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Dict[str, Optional[SearchResult]]:
+        return self.client.search_many(
+            collection_names=collection_names,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await self.client.asearch(
+            collection_name=collection_name,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+    async def aquery(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await self.client.aquery(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        return await self.client.aget(collection_name)
+
+    async def asearch_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Dict[str, Optional[SearchResult]]:
+        return await self.client.asearch_many(
+            collection_names=collection_names,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        self.client.delete(collection_name=collection_name, ids=ids, filter=filter)
+
+        try:
+            index = self.bm25.get(collection_name)
+            if index is not None:
+                index.delete(ids=ids, filter=filter)
+        except Exception as e:
+            log.warning(f"Failed to delete from BM25 index {collection_name}: {e}")
+            self.bm25.drop(collection_name)
+
+    def reset(self) -> None:
+        self.client.reset()
+        self.bm25.reset()
+
+    def get_index(self, collection_name: str) -> Optional[BM25Index]:
+        """
+        Return a built BM25 index for the collection, backfilling it from the
+        vector DB the first time the collection is searched.
+        """
+        index = self.bm25.get(collection_name)
+        if index is not None and index.is_built:
+            return index
+
+        result = self.client.get(collection_name=collection_name)
+        if result is None or not result.ids:
+            return None
+
+        # Start from scratch in case a previous build was interrupted
+        self.bm25.drop(collection_name)
+        index = self.bm25.get(collection_name, create=True)
+        index.add(
+            [
+                {"id": id, "text": text, "metadata": metadata}
+                for id, text, metadata in zip(
+                    result.ids[0], result.documents[0], result.metadatas[0]
+                )
+            ]
+        )
+        index.mark_built()
+        return index
@@ -0,0 +1,454 @@
+"""
+Embedding result cache.
+
+Vectors are keyed by (engine, model, prefix, sha256(text)) and stored as
+float32 blobs. A bounded in-process LRU sits in front of an optional shared
+store (Redis or a local SQLite file), and `wrap` turns any embedding function
+into one that serves cached vectors and only sends the misses upstream.
+
+QueryEmbeddingMemo is the short-lived counterpart: one per request, so the
+same query is not embedded again by every retriever that needs it.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Optional
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+_KEY_BATCH_SIZE = 500
+
+
+def encode_vector(vector) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def decode_vector(blob: bytes) -> list[float]:
+    return np.frombuffer(blob, dtype="<f4").tolist()
+
+
+class MemoryEmbeddingStore:
+    """Process-local LRU bounded by total vector bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                blob = self._items.get(key)
+                if blob is not None:
+                    self._items.move_to_end(key)
+                    found[key] = blob
+        return found
+
+    def set_many(self, items: dict[str, bytes]):
+        with self._lock:
+            for key, blob in items.items():
+                previous = self._items.pop(key, None)
+                if previous is not None:
+                    self.size_bytes -= len(previous)
+                if len(blob) > self.max_bytes:
+                    continue
+                self._items[key] = blob
+                self.size_bytes += len(blob)
+
+            while self.size_bytes > self.max_bytes and self._items:
+                _, blob = self._items.popitem(last=False)
+                self.size_bytes -= len(blob)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size_bytes = 0
+
+
+class SqliteEmbeddingStore:
+    """
+    On-disk store shared by all workers on a host. Least recently read
+    vectors are evicted once the file holds more than `max_bytes` of vectors.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS embedding (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS embedding_accessed_at_idx
+                    ON embedding (accessed_at);
+                """
+            )
+            conn.commit()
+            self.size_bytes = self._total_size(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _total_size(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embedding").fetchone()
+        return row[0]
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        found = {}
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn:
+            for i in range(0, len(keys), _KEY_BATCH_SIZE):
+                batch = keys[i : i + _KEY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embedding WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    hit_keys = [key for key, _ in rows]
+                    conn.execute(
+                        f"UPDATE embedding SET accessed_at = ? "
+                        f"WHERE key IN ({','.join('?' * len(hit_keys))})",
+                        [now, *hit_keys],
+                    )
+            conn.commit()
+        return found
+
+    def set_many(self, items: dict[str, bytes]):
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding (key, vector, size, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, blob, len(blob), now) for key, blob in items.items()],
+            )
+            self.size_bytes += sum(len(blob) for blob in items.values())
+
+            if self.size_bytes > self.max_bytes:
+                # Other workers write to the same file; get the real total first
+                self.size_bytes = self._total_size(conn)
+                self._evict(conn, target=int(self.max_bytes * 0.9))
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, target: int):
+        while self.size_bytes > target:
+            rows = conn.execute(
+                "SELECT key, size FROM embedding ORDER BY accessed_at LIMIT ?",
+                (_KEY_BATCH_SIZE,),
+            ).fetchall()
+            if not rows:
+                self.size_bytes = 0
+                break
+
+            evicted = []
+            for key, size in rows:
+                if self.size_bytes <= target:
+                    break
+                evicted.append(key)
+                self.size_bytes -= size
+
+            conn.execute(
+                f"DELETE FROM embedding WHERE key IN ({','.join('?' * len(evicted))})",
+                evicted,
+            )
+            self.evictions += len(evicted)
+
+    def clear(self):
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute("DELETE FROM embedding")
+            conn.commit()
+            self.size_bytes = 0
+
+
+class RedisEmbeddingStore:
+    """
+    Store shared across nodes. Entries expire after `ttl` seconds; size is
+    bounded by the server's maxmemory policy (use an allkeys-lru policy).
+    """
+
+    def __init__(self, redis, key_prefix: str, ttl: int):
+        self._redis = redis
+        self._key_prefix = f"{key_prefix}:embedding_cache"
+        self._ttl = ttl
+        self.size_bytes = None
+        self.evictions = None
+
+    def _key(self, key: str) -> str:
+        return f"{self._key_prefix}:{key}"
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        # Pipelined GETs rather than MGET, so keys may live on different cluster slots
+        pipe = self._redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(self._key(key))
+        values = pipe.execute()
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items: dict[str, bytes]):
+        pipe = self._redis.pipeline(transaction=False)
+        for key, blob in items.items():
+            if self._ttl > 0:
+                pipe.set(self._key(key), blob, ex=self._ttl)
+            else:
+                pipe.set(self._key(key), blob)
+        pipe.execute()
+
+    def clear(self):
+        for key in self._redis.scan_iter(match=f"{self._key_prefix}:*"):
+            self._redis.delete(key)
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        memory: MemoryEmbeddingStore,
+        store: Optional[SqliteEmbeddingStore | RedisEmbeddingStore] = None,
+    ):
+        self.memory = memory
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def make_key(engine: str, model: str, prefix: Optional[str], text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{engine or 'local'}:{model}:{prefix or ''}:{digest}"
+
+    async def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        blobs = self.memory.get_many(keys)
+
+        missing = [key for key in keys if key not in blobs]
+        if missing and self.store is not None:
+            try:
+                stored = await asyncio.to_thread(self.store.get_many, missing)
+            except Exception as e:
+                log.warning(f"Embedding cache read failed: {e}")
+                stored = {}
+            if stored:
+                self.memory.set_many(stored)
+                blobs.update(stored)
+
+        return {key: decode_vector(blob) for key, blob in blobs.items()}
+
+    async def set_many(self, vectors: dict[str, list[float]]):
+        blobs = {key: encode_vector(vector) for key, vector in vectors.items()}
+        self.memory.set_many(blobs)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.set_many, blobs)
+            except Exception as e:
+                log.warning(f"Embedding cache write failed: {e}")
+
+    def wrap(self, embedding_function, engine: str, model: str):
+        """
+        Wrap an `async (query, prefix=None, user=None)` embedding function.
+
+        Cached vectors are served directly; the remaining distinct texts are
+        embedded in one upstream call and written back to the cache.
+        """
+
+        async def cached_embedding_function(query, prefix=None, user=None):
+            texts = query if isinstance(query, list) else [query]
+            keys = [self.make_key(engine, model, prefix, text) for text in texts]
+            found = await self.get_many(keys)
+
+            missing: dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in found:
+                    missing.setdefault(key, text)
+
+            # Served from cache or deduplicated within the batch
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+            self.bytes_saved += sum(len(text.encode("utf-8")) for text in texts) - sum(
+                len(text.encode("utf-8")) for text in missing.values()
+            )
+
+            if missing:
+                miss_keys = list(missing)
+                miss_texts = list(missing.values())
+
+                raw = await embedding_function(
+                    miss_texts if isinstance(query, list) else miss_texts[0],
+                    prefix=prefix,
+                    user=user,
+                )
+                vectors = raw if isinstance(query, list) else [raw]
+
+                if not raw or len(vectors) != len(miss_texts):
+                    # Upstream failed or returned a partial batch; don't cache it
+                    if len(miss_texts) == len(texts):
+                        return raw
+                    return await embedding_function(query, prefix=prefix, user=user)
+
+                fresh = dict(zip(miss_keys, vectors))
+                await self.set_many(fresh)
+                found.update(fresh)
+
+            result = [found[key] for key in keys]
+            return result if isinstance(query, list) else result[0]
+
+        return cached_embedding_function
+
+    def get_stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "memory": {
+                "entries": len(self.memory),
+                "size_bytes": self.memory.size_bytes,
+                "max_bytes": self.memory.max_bytes,
+                "evictions": self.memory.evictions,
+            },
+            "store": (
+                {
+                    "type": type(self.store).__name__,
+                    "size_bytes": self.store.size_bytes,
+                    "evictions": self.store.evictions,
+                }
+                if self.store is not None
+                else None
+            ),
+        }
+
+    def clear(self):
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+class QueryEmbeddingMemo:
+    """
+    Per-request memo in front of an `async (query, prefix)` embedding function.
+
+    Every (text, prefix) is embedded at most once for the lifetime of the
+    memo, and concurrent callers asking for the same text share one upstream
+    call. `prime` embeds all queries of a turn in a single batched call so the
+    per-collection retrievers and the reranking compressor only hit the memo.
+    """
+
+    def __init__(self, embedding_function):
+        self.embedding_function = embedding_function
+        self._embeddings: dict[tuple[Optional[str], str], asyncio.Future] = {}
+        # Upstream calls made and texts sent, for the per-turn debug log
+        self.calls = 0
+        self.texts = 0
+        self.hits = 0
+
+    async def prime(self, queries: list[str], prefix: Optional[str] = None):
+        try:
+            await self(list(queries), prefix)
+        except Exception as e:
+            # The retrievers will retry their own query and surface the error
+            log.warning(f"Failed to embed queries up front: {e}")
+
+    async def __call__(self, query, prefix=None):
+        texts = query if isinstance(query, list) else [query]
+
+        owned: dict[str, asyncio.Future] = {}
+        futures: dict[str, asyncio.Future] = {}
+        loop = asyncio.get_running_loop()
+        for text in texts:
+            key = (prefix, text)
+            if key not in self._embeddings:
+                owned[text] = self._embeddings[key] = loop.create_future()
+            futures[text] = self._embeddings[key]
+        self.hits += len(texts) - len(owned)
+
+        if owned:
+            missing = list(owned)
+            self.calls += 1
+            self.texts += len(missing)
+            try:
+                vectors = await self.embedding_function(
+                    missing if isinstance(query, list) else missing[0], prefix
+                )
+                vectors = vectors if isinstance(query, list) else [vectors]
+                if not vectors or len(vectors) != len(missing):
+                    raise ValueError(
+                        f"Expected {len(missing)} embeddings, got "
+                        f"{len(vectors) if vectors else 0}"
+                    )
+            except BaseException as e:
+                for text, future in owned.items():
+                    # Drop failed entries so a later call can retry them
+                    del self._embeddings[(prefix, text)]
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                        # Waiters re-raise it; mark it retrieved for the others
+                        future.exception()
+                    else:
+                        # Cancelled: waiters embed the text themselves
+                        future.cancel()
+                raise
+
+            for text, vector in zip(missing, vectors):
+                owned[text].set_result(vector)
+
+        results = []
+        for text in texts:
+            try:
+                # Shielded so a cancelled waiter doesn't cancel the shared call
+                results.append(await asyncio.shield(futures[text]))
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                results.append(await self(text, prefix))
+        return results if isinstance(query, list) else results[0]
+
+
+def get_embedding_cache(
+    backend: str,
+    memory_max_bytes: int,
+    max_bytes: int,
+    cache_dir: str,
+    ttl: int,
+    redis=None,
+    redis_key_prefix: str = "open-webui",
+) -> EmbeddingCache:
+    store = None
+    if backend == "sqlite":
+        store = SqliteEmbeddingStore(os.path.join(cache_dir, "embeddings.db"), max_bytes)
+    elif backend == "redis":
+        if redis is None:
+            log.warning("Embedding cache backend is redis but REDIS_URL is not set")
+        else:
+            store = RedisEmbeddingStore(redis, redis_key_prefix, ttl)
+    elif backend != "memory":
+        log.warning(f"Unknown embedding cache backend {backend}, using memory only")
+
+    return EmbeddingCache(MemoryEmbeddingStore(memory_max_bytes), store)
@@ -0,0 +1,615 @@
+"""
+Out-of-process local embedding and reranking.
+
+With the "" engines every uvicorn worker loads its own SentenceTransformer /
+CrossEncoder / ColBERT and runs one request at a time in a thread. With the
+"local_service" engines the workers instead talk to a single sidecar per host
+over a Unix socket:
+
+- the sidecar holds one copy of each model and loads it on first use, through
+  the same get_ef / get_rf as the "" engines, so the model settings are the
+  same;
+- concurrent requests for the same model are coalesced into micro-batches of
+  up to LOCAL_INFERENCE_MAX_BATCH_SIZE inputs, waiting at most
+  LOCAL_INFERENCE_MAX_WAIT_MS for a batch to fill; large requests are split
+  so they don't hold up small ones;
+- one worker per host wins a file lock and spawns the sidecar, restarting it
+  if it exits; if that worker goes away another one takes over.
+
+Queue depth, batch sizes and queue wait are exported as OpenTelemetry metrics
+from the workers.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+import numpy as np
+from opentelemetry import metrics
+
+from open_webui.env import (
+    LOCAL_INFERENCE_MAX_BATCH_SIZE,
+    LOCAL_INFERENCE_MAX_WAIT_MS,
+    LOCAL_INFERENCE_SOCKET_PATH,
+    LOCAL_INFERENCE_TIMEOUT,
+)
+from open_webui.retrieval.models.base_reranker import BaseReranker
+
+log = logging.getLogger(__name__)
+
+_meter = metrics.get_meter(__name__)
+_BATCH_SIZE = _meter.create_histogram(
+    name="webui.local_inference.batch_size",
+    description="Inputs in the local inference batch that served a request.",
+)
+_QUEUE_WAIT = _meter.create_histogram(
+    name="webui.local_inference.queue_wait",
+    description="Time a request waited in the local inference queue.",
+    unit="ms",
+)
+
+_HEADER = struct.Struct(">I")
+_MAX_IDLE_CONNECTIONS = 8
+
+
+####################################
+# Wire format: length-prefixed JSON
+####################################
+
+
+def _encode(message: dict) -> bytes:
+    body = json.dumps(message).encode()
+    return _HEADER.pack(len(body)) + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Local inference service closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+async def _read_message(reader: asyncio.StreamReader) -> dict:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(size))
+
+
+####################################
+# Sidecar
+####################################
+
+
+@dataclass
+class _Pending:
+    items: list
+    future: asyncio.Future
+    enqueued: float
+    # Inputs queued ahead of this one
+    depth: int
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests for one model into batches.
+
+    `run` takes the inputs of each request in the batch and returns their
+    results in the same shape; it runs on `executor`, so one batch at a time
+    uses the device while the next one fills.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[list[list]], list[list]],
+        executor: ThreadPoolExecutor,
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+    ):
+        self.run = run
+        self.executor = executor
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait
+        self.depth = 0
+        self._pending: deque[_Pending] = deque()
+        self._arrived = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, items: list) -> Tuple[list, list[dict]]:
+        """Results for `items`, and stats for each batch that served them."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        futures = []
+        for i in range(0, len(items), self.max_batch_size):
+            chunk = items[i : i + self.max_batch_size]
+            future = loop.create_future()
+            self._pending.append(_Pending(chunk, future, loop.time(), self.depth))
+            self.depth += len(chunk)
+            futures.append(future)
+        self._arrived.set()
+
+        results, stats = [], []
+        for part, batch_stats in await asyncio.gather(*futures):
+            results.extend(part)
+            stats.append(batch_stats)
+        return results, stats
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _queued(self) -> int:
+        return sum(len(p.items) for p in self._pending)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._pending:
+                self._arrived.clear()
+                await self._arrived.wait()
+
+            deadline = loop.time() + self.max_wait
+            while self._queued() < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [self._pending.popleft()]
+            size = len(batch[0].items)
+            while (
+                self._pending
+                and size + len(self._pending[0].items) <= self.max_batch_size
+            ):
+                batch.append(self._pending.popleft())
+                size += len(batch[-1].items)
+            self.depth -= size
+
+            started = loop.time()
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.run, [p.items for p in batch]
+                )
+            except Exception as e:
+                log.exception(f"Local inference batch failed: {e}")
+                for p in batch:
+                    if not p.future.done():
+                        p.future.set_exception(e)
+                continue
+
+            for p, result in zip(batch, results):
+                if not p.future.done():
+                    p.future.set_result(
+                        (
+                            result,
+                            {
+                                "batch_size": size,
+                                "queue_depth": p.depth,
+                                "wait_ms": (started - p.enqueued) * 1000,
+                            },
+                        )
+                    )
+
+
+def load_model(kind: str, name: str):
+    """Load a model the way the "" engines do."""
+    from open_webui.routers.retrieval import get_ef, get_rf
+
+    model = get_ef("", name) if kind == "embed" else get_rf("", name)
+    if model is None:
+        raise RuntimeError(f"Failed to load {kind} model {name}")
+    return model
+
+
+class InferenceServer:
+    def __init__(
+        self,
+        socket_path: str,
+        loader: Callable[[str, str], Any] = load_model,
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+    ):
+        self.socket_path = socket_path
+        self.loader = loader
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # Models run, and load, on one thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="local-inference"
+        )
+        # kind -> (name, model); switching models drops the previous one
+        self._models: dict[str, tuple[str, Any]] = {}
+        self._batchers: dict[tuple, MicroBatcher] = {}
+        self._requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _model(self, kind: str, name: str):
+        loaded = self._models.get(kind)
+        if loaded is None or loaded[0] != name:
+            self._models.pop(kind, None)
+            log.info(f"Loading {kind} model {name}")
+            self._models[kind] = (name, self.loader(kind, name))
+        return self._models[kind][1]
+
+    def _embed(self, name: str, prefix: Optional[str], groups: list[list[str]]):
+        texts = [text for group in groups for text in group]
+        embeddings = self._model("embed", name).encode(
+            texts,
+            batch_size=len(texts),
+            **({"prompt": prefix} if prefix else {}),
+        )
+        results, start = [], 0
+        for group in groups:
+            results.append(embeddings[start : start + len(group)])
+            start += len(group)
+        return results
+
+    def _rerank(self, name: str, groups: list[list[list[str]]]):
+        model = self._model("rerank", name)
+        if isinstance(model, BaseReranker):
+            # ColBERT scores every pair against the first query
+            return [list(model.predict(group)) for group in groups]
+
+        scores = model.predict([tuple(pair) for group in groups for pair in group])
+        results, start = [], 0
+        for group in groups:
+            results.append(list(scores[start : start + len(group)]))
+            start += len(group)
+        return results
+
+    def _batcher(self, key: tuple, run) -> MicroBatcher:
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            batcher = self._batchers[key] = MicroBatcher(
+                run, self._executor, self.max_batch_size, self.max_wait
+            )
+        return batcher
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": sum(b.depth for b in self._batchers.values()),
+            "requests": self._requests,
+            "models": {kind: name for kind, (name, _) in self._models.items()},
+        }
+
+    async def handle(self, message: dict) -> dict:
+        op = message.get("op")
+        if op == "stats":
+            return self.stats()
+
+        self._requests += 1
+        model = message["model"]
+        if op == "embed":
+            prefix = message.get("prefix")
+            batcher = self._batcher(
+                ("embed", model, prefix),
+                lambda groups: self._embed(model, prefix, groups),
+            )
+            vectors, stats = await batcher.submit(message["texts"])
+            array = np.asarray(vectors, dtype="<f4")
+            return {
+                "shape": list(array.shape),
+                "data": base64.b64encode(array.tobytes()).decode(),
+                "batches": stats,
+            }
+        elif op == "rerank":
+            batcher = self._batcher(
+                ("rerank", model), lambda groups: self._rerank(model, groups)
+            )
+            scores, stats = await batcher.submit(message["pairs"])
+            return {"scores": [float(s) for s in scores], "batches": stats}
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    message = await _read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    response = await self.handle(message)
+                except Exception as e:
+                    response = {"error": str(e) or type(e).__name__}
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        # Only the lock holder starts a server, so a leftover socket is stale
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=self.socket_path
+        )
+        os.chmod(self.socket_path, 0o600)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for batcher in self._batchers.values():
+            batcher.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(socket_path: str, max_batch_size: int, max_wait: float):
+    server = InferenceServer(
+        socket_path, max_batch_size=max_batch_size, max_wait=max_wait
+    )
+    await server.start()
+    log.info(f"Local inference service listening on {socket_path}")
+
+    # Exit with the worker that spawned us rather than linger as an orphan
+    parent = os.getppid()
+    try:
+        while os.getppid() == parent:
+            await asyncio.sleep(2)
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=LOCAL_INFERENCE_SOCKET_PATH)
+    parser.add_argument(
+        "--max-batch-size", type=int, default=LOCAL_INFERENCE_MAX_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=LOCAL_INFERENCE_MAX_WAIT_MS
+    )
+    args = parser.parse_args()
+    asyncio.run(serve(args.socket, args.max_batch_size, args.max_wait_ms / 1000))
+
+
+####################################
+# Workers
+####################################
+
+
+class LocalInferenceService:
+    """Client for the sidecar, and its supervisor in the worker that wins the lock."""
+
+    def __init__(
+        self,
+        socket_path: str,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        timeout: float = 300.0,
+        command: Optional[list[str]] = None,
+        lock_retry: float = 5.0,
+    ):
+        self.socket_path = socket_path
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.timeout = timeout
+        self.command = command or [
+            sys.executable,
+            "-m",
+            "open_webui.retrieval.models.local_service",
+        ]
+        self.lock_retry = lock_retry
+
+        self._idle: list[socket.socket] = []
+        self._idle_lock = threading.Lock()
+        self._supervisor: Optional[threading.Thread] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._lock_file = None
+        self._closed = threading.Event()
+
+    @property
+    def started(self) -> bool:
+        return self._supervisor is not None
+
+    def start(self):
+        """Make sure some worker on this host runs the sidecar."""
+        if self._supervisor is None:
+            self._closed.clear()
+            self._supervisor = threading.Thread(
+                target=self._supervise, name="local-inference-supervisor", daemon=True
+            )
+            self._supervisor.start()
+
+    def close(self):
+        self._closed.set()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        with self._idle_lock:
+            for sock in self._idle:
+                sock.close()
+            self._idle.clear()
+        self._supervisor = None
+
+    def _acquire_lock(self) -> bool:
+        import fcntl
+
+        lock_file = open(f"{self.socket_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _supervise(self):
+        backoff = 1.0
+        while not self._closed.is_set():
+            if self._lock_file is None and not self._acquire_lock():
+                # Another worker runs the sidecar; take over if it goes away
+                self._closed.wait(self.lock_retry)
+                continue
+
+            started = time.monotonic()
+            self._process = subprocess.Popen(
+                self.command
+                + [
+                    "--socket",
+                    self.socket_path,
+                    "--max-batch-size",
+                    str(self.max_batch_size),
+                    "--max-wait-ms",
+                    str(self.max_wait_ms),
+                ]
+            )
+            code = self._process.wait()
+            if self._closed.is_set():
+                break
+
+            if time.monotonic() - started > 60:
+                backoff = 1.0
+            log.warning(
+                f"Local inference service exited with {code}, restarting in {backoff:.0f}s"
+            )
+            self._closed.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _connect(self, wait: bool = True) -> socket.socket:
+        with self._idle_lock:
+            if self._idle:
+                return self._idle.pop()
+
+        # The sidecar may still be starting
+        deadline = time.monotonic() + (self.timeout if wait else 0)
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    def request(self, message: dict, wait: bool = True) -> dict:
+        sock = self._connect(wait)
+        try:
+            sock.settimeout(self.timeout)
+            sock.sendall(_encode(message))
+            (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+            response = json.loads(_recv_exact(sock, size))
+        except BaseException:
+            sock.close()
+            raise
+
+        with self._idle_lock:
+            if len(self._idle) < _MAX_IDLE_CONNECTIONS:
+                self._idle.append(sock)
+            else:
+                sock.close()
+
+        if "error" in response:
+            raise Exception(f"Local inference service: {response['error']}")
+        for batch in response.get("batches", []):
+            _BATCH_SIZE.record(batch["batch_size"])
+            _QUEUE_WAIT.record(batch["wait_ms"])
+        return response
+
+    def embed(
+        self, model: str, texts: list[str], prefix: Optional[str] = None
+    ) -> list[list[float]]:
+        if not texts:
+            return []
+        response = self.request(
+            {"op": "embed", "model": model, "texts": texts, "prefix": prefix}
+        )
+        return (
+            np.frombuffer(base64.b64decode(response["data"]), dtype="<f4")
+            .reshape(response["shape"])
+            .tolist()
+        )
+
+    def rerank(self, model: str, pairs: List[Tuple[str, str]]) -> list[float]:
+        if not pairs:
+            return []
+        return self.request(
+            {"op": "rerank", "model": model, "pairs": [list(p) for p in pairs]}
+        )["scores"]
+
+    def stats(self) -> dict:
+        return self.request({"op": "stats"}, wait=False)
+
+
+class LocalServiceEmbedder:
+    def __init__(self, service: LocalInferenceService, model: str):
+        self.service = service
+        self.model = model
+
+    def encode(
+        self, text: Union[str, list[str]], prefix: Optional[str] = None
+    ) -> Union[list[float], list[list[float]]]:
+        if isinstance(text, str):
+            return self.service.embed(self.model, [text], prefix)[0]
+        return self.service.embed(self.model, text, prefix)
+
+
+class LocalServiceReranker(BaseReranker):
+    def __init__(self, service: LocalInferenceService, model: str):
+        self.service = service
+        self.model = model
+
+    def predict(
+        self, sentences: List[Tuple[str, str]], user=None
+    ) -> Optional[List[float]]:
+        return self.service.rerank(self.model, sentences)
+
+
+LOCAL_INFERENCE_SERVICE = LocalInferenceService(
+    LOCAL_INFERENCE_SOCKET_PATH,
+    max_batch_size=LOCAL_INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=LOCAL_INFERENCE_MAX_WAIT_MS,
+    timeout=LOCAL_INFERENCE_TIMEOUT,
+)
+
+
+def _observe_queue_depth(options):
+    if not LOCAL_INFERENCE_SERVICE.started:
+        return []
+    try:
+        return [metrics.Observation(LOCAL_INFERENCE_SERVICE.stats()["queue_depth"])]
+    except Exception:
+        return []
+
+
+_meter.create_observable_gauge(
+    name="webui.local_inference.queue_depth",
+    callbacks=[_observe_queue_depth],
+    description="Inputs waiting in the local inference queue.",
+)
+
+
+if __name__ == "__main__":
+    main()
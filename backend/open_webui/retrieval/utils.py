@@ -6,7 +6,6 @@ import requests
 import aiohttp
 import asyncio
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
 import time
 import re
 
@@ -32,6 +31,8 @@ from open_webui.models.notes import Notes
 from open_webui.models.access_grants import AccessGrants
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.bm25 import BM25IndexedVectorDB, get_enriched_text
+from open_webui.retrieval.embedding_cache import QueryEmbeddingMemo
 from open_webui.utils.headers import include_user_info_headers
 from open_webui.utils.misc import get_message_list
 
@@ -89,6 +90,10 @@ def get_content_from_url(request, url: str) -> str:
 
 
 CHUNK_HASH_KEY = "_chunk_hash"
+# Cosine similarity recovered from the vector DB's score, carried through the
+# ensemble so the compressor can score without re-embedding the candidates
+VECTOR_SCORE_KEY = "_vector_score"
+RRF_SCORE_KEY = "_rrf_score"
 
 
 def _content_hash(text: str) -> str:
@@ -122,7 +127,7 @@ class VectorSearchRetriever(BaseRetriever):
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
         embedding = await self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-        result = VECTOR_DB_CLIENT.search(
+        result = await VECTOR_DB_CLIENT.asearch(
             collection_name=self.collection_name,
             vectors=[embedding],
             limit=self.top_k,
@@ -131,11 +136,17 @@ class VectorSearchRetriever(BaseRetriever):
         ids = result.ids[0]
         metadatas = result.metadatas[0]
         documents = result.documents[0]
+        distances = result.distances[0] if result.distances else []
 
         results = []
         for idx in range(len(ids)):
             metadata = metadatas[idx]
             metadata[CHUNK_HASH_KEY] = _content_hash(documents[idx])
+            if idx < len(distances) and distances[idx] is not None:
+                # Each backend reports its own scale; unknown ones are re-embedded
+                similarity = VECTOR_DB_CLIENT.to_cosine_similarity(distances[idx])
+                if similarity is not None:
+                    metadata[VECTOR_SCORE_KEY] = similarity
             results.append(
                 Document(
                     metadata=metadata,
@@ -165,6 +176,26 @@ def query_doc(
         raise e
 
 
+async def aquery_doc(
+    collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
+):
+    try:
+        log.debug(f"aquery_doc:doc {collection_name}")
+        result = await VECTOR_DB_CLIENT.asearch(
+            collection_name=collection_name,
+            vectors=[query_embedding],
+            limit=k,
+        )
+
+        if result:
+            log.info(f"aquery_doc:result {result.ids} {result.metadatas}")
+
+        return result
+    except Exception as e:
+        log.exception(f"Error querying doc {collection_name} with limit {k}: {e}")
+        raise e
+
+
 def get_doc(collection_name: str, user: UserModel = None):
     try:
         log.debug(f"get_doc:doc {collection_name}")
@@ -180,41 +211,68 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 
 def get_enriched_texts(collection_result: GetResult) -> list[str]:
-    enriched_texts = []
-    for idx, text in enumerate(collection_result.documents[0]):
-        metadata = collection_result.metadatas[0][idx]
-        metadata_parts = [text]
-
-        # Add filename (repeat twice for extra weight in BM25 scoring)
-        if metadata.get("name"):
-            filename = metadata["name"]
-            filename_tokens = (
-                filename.replace("_", " ").replace("-", " ").replace(".", " ")
-            )
-            metadata_parts.append(
-                f"Filename: {filename} {filename_tokens} {filename_tokens}"
-            )
+    return [
+        get_enriched_text(text, collection_result.metadatas[0][idx])
+        for idx, text in enumerate(collection_result.documents[0])
+    ]
+
 
-        # Add title if available
-        if metadata.get("title"):
-            metadata_parts.append(f"Title: {metadata['title']}")
+class BM25IndexRetriever(BaseRetriever):
+    index: Any
+    top_k: int
+    enable_enriched_texts: bool = False
 
-        # Add document section headings if available (from markdown splitter)
-        if metadata.get("headings") and isinstance(metadata["headings"], list):
-            headings = " > ".join(str(h) for h in metadata["headings"])
-            metadata_parts.append(f"Section: {headings}")
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return []
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        hits = await asyncio.to_thread(
+            self.index.search, query, self.top_k, self.enable_enriched_texts
+        )
+        return [
+            Document(
+                metadata={**metadata, CHUNK_HASH_KEY: _content_hash(text)},
+                page_content=text,
+            )
+            for _, text, metadata, _ in hits
+        ]
 
-        # Add source URL/path if available
-        if metadata.get("source"):
-            metadata_parts.append(f"Source: {metadata['source']}")
 
-        # Add snippet for web search results
-        if metadata.get("snippet"):
-            metadata_parts.append(f"Snippet: {metadata['snippet']}")
+class ScoredEnsembleRetriever(EnsembleRetriever):
+    """
+    EnsembleRetriever that keeps what the fusion step knows about each doc.
 
-        enriched_texts.append(" ".join(metadata_parts))
+    Deduplication keeps the first copy of a chunk, which drops the vector
+    score when BM25 also found it. The score is copied onto the kept copy,
+    along with the weighted RRF score.
+    """
 
-    return enriched_texts
+    def weighted_reciprocal_rank(
+        self, doc_lists: list[list[Document]]
+    ) -> list[Document]:
+        rrf_scores: dict[str, float] = {}
+        vector_scores: dict[str, float] = {}
+        for doc_list, weight in zip(doc_lists, self.weights):
+            for rank, doc in enumerate(doc_list, start=1):
+                key = doc.metadata[self.id_key]
+                rrf_scores[key] = rrf_scores.get(key, 0.0) + weight / (rank + self.c)
+                if VECTOR_SCORE_KEY in doc.metadata:
+                    vector_scores[key] = doc.metadata[VECTOR_SCORE_KEY]
+
+        fused = super().weighted_reciprocal_rank(doc_lists)
+        for doc in fused:
+            key = doc.metadata[self.id_key]
+            doc.metadata[RRF_SCORE_KEY] = rrf_scores[key]
+            if key in vector_scores:
+                doc.metadata[VECTOR_SCORE_KEY] = vector_scores[key]
+        return fused
 
 
 async def query_doc_with_hybrid_search(
@@ -228,10 +286,22 @@ async def query_doc_with_hybrid_search(
     r: float,
     hybrid_bm25_weight: float,
     enable_enriched_texts: bool = False,
+    bm25_index=None,
+    scoring_mode: str = "vector",
 ) -> dict:
     try:
+        if bm25_index is not None:
+            if bm25_index.count() == 0:
+                log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+                return {"documents": [], "metadatas": [], "distances": []}
+
+            bm25_retriever = BM25IndexRetriever(
+                index=bm25_index,
+                top_k=k,
+                enable_enriched_texts=enable_enriched_texts,
+            )
         # First check if collection_result has the required attributes
-        if (
+        elif (
             not collection_result
             or not hasattr(collection_result, "documents")
             or not hasattr(collection_result, "metadatas")
@@ -240,33 +310,37 @@ async def query_doc_with_hybrid_search(
             return {"documents": [], "metadatas": [], "distances": []}
 
         # Now safely check the documents content after confirming attributes exist
-        if (
+        elif (
             not collection_result.documents
             or len(collection_result.documents) == 0
             or not collection_result.documents[0]
         ):
             log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
             return {"documents": [], "metadatas": [], "distances": []}
+        else:
+            original_texts = collection_result.documents[0]
+            bm25_metadatas = [
+                {**meta, CHUNK_HASH_KEY: _content_hash(original_texts[idx])}
+                for idx, meta in enumerate(collection_result.metadatas[0])
+            ]
+
+            bm25_texts = (
+                get_enriched_texts(collection_result)
+                if enable_enriched_texts
+                else original_texts
+            )
 
-        log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-
-        original_texts = collection_result.documents[0]
-        bm25_metadatas = [
-            {**meta, CHUNK_HASH_KEY: _content_hash(original_texts[idx])}
-            for idx, meta in enumerate(collection_result.metadatas[0])
-        ]
+            bm25_retriever = BM25Retriever.from_texts(
+                texts=bm25_texts,
+                metadatas=bm25_metadatas,
+            )
+            bm25_retriever.k = k
 
-        bm25_texts = (
-            get_enriched_texts(collection_result)
-            if enable_enriched_texts
-            else original_texts
-        )
+        log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=bm25_texts,
-            metadatas=bm25_metadatas,
-        )
-        bm25_retriever.k = k
+        # The retriever and the compressor both embed the query
+        if not isinstance(embedding_function, QueryEmbeddingMemo):
+            embedding_function = QueryEmbeddingMemo(embedding_function)
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -276,19 +350,19 @@ async def query_doc_with_hybrid_search(
 
         # Use CHUNK_HASH_KEY for dedup so enriched BM25 texts don't defeat RRF
         if hybrid_bm25_weight <= 0:
-            ensemble_retriever = EnsembleRetriever(
+            ensemble_retriever = ScoredEnsembleRetriever(
                 retrievers=[vector_search_retriever],
                 weights=[1.0],
                 id_key=CHUNK_HASH_KEY,
             )
         elif hybrid_bm25_weight >= 1:
-            ensemble_retriever = EnsembleRetriever(
+            ensemble_retriever = ScoredEnsembleRetriever(
                 retrievers=[bm25_retriever],
                 weights=[1.0],
                 id_key=CHUNK_HASH_KEY,
             )
         else:
-            ensemble_retriever = EnsembleRetriever(
+            ensemble_retriever = ScoredEnsembleRetriever(
                 retrievers=[bm25_retriever, vector_search_retriever],
                 weights=[hybrid_bm25_weight, 1.0 - hybrid_bm25_weight],
                 id_key=CHUNK_HASH_KEY,
@@ -299,6 +373,7 @@ async def query_doc_with_hybrid_search(
             top_n=k_reranker,
             reranking_function=reranking_function,
             r_score=r,
+            scoring_mode=scoring_mode,
         )
 
         compression_retriever = ContextualCompressionRetriever(
@@ -424,30 +499,28 @@ def get_all_items_from_collections(collection_names: list[str]) -> dict:
     return merge_get_results(results)
 
 
+async def aget_all_items_from_collections(collection_names: list[str]) -> dict:
+    async def get_items(collection_name):
+        try:
+            return await VECTOR_DB_CLIENT.aget(collection_name=collection_name)
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+            return None
+
+    results = await asyncio.gather(
+        *[get_items(name) for name in collection_names if name]
+    )
+    return merge_get_results(
+        [result.model_dump() for result in results if result is not None]
+    )
+
+
 async def query_collection(
     collection_names: list[str],
     queries: list[str],
     embedding_function,
     k: int,
 ) -> dict:
-    results = []
-    error = False
-
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
-
     # Generate all query embeddings (in one call)
     query_embeddings = await embedding_function(
         queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
@@ -456,23 +529,33 @@ async def query_collection(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    collection_names = [name for name in collection_names if name]
+    try:
+        # Every collection and query in one call; one row per query embedding
+        search_results = await VECTOR_DB_CLIENT.asearch_many(
+            collection_names=collection_names,
+            vectors=query_embeddings,
+            limit=k,
+        )
+    except Exception as e:
+        log.exception(f"Error when querying the collections: {e}")
+        search_results = {name: None for name in collection_names}
 
-    for result, err in task_results:
-        if err is not None:
-            error = True
-        elif result is not None:
-            results.append(result)
+    results = []
+    for result in search_results.values():
+        if result is None or not result.ids:
+            continue
+        for idx in range(len(result.ids)):
+            results.append(
+                {
+                    "ids": [result.ids[idx]],
+                    "distances": [result.distances[idx]] if result.distances else [],
+                    "documents": [result.documents[idx]] if result.documents else [],
+                    "metadatas": [result.metadatas[idx]] if result.metadatas else [],
+                }
+            )
 
-    if error and not results:
+    if search_results and all(result is None for result in search_results.values()):
         log.warning("All collection queries failed. No results returned.")
 
     return merge_and_sort_query_results(results, k=k)
@@ -488,18 +571,32 @@ async def query_collection_with_hybrid_search(
     r: float,
     hybrid_bm25_weight: float,
     enable_enriched_texts: bool = False,
+    scoring_mode: str = "vector",
 ) -> dict:
     results = []
     error = False
     # Fetch collection data once per collection sequentially
     # Avoid fetching the same data multiple times later
     collection_results = {}
+    bm25_indexes = {}
     for collection_name in collection_names:
+        if isinstance(VECTOR_DB_CLIENT, BM25IndexedVectorDB):
+            # Persistent BM25 index: never pull the whole collection per query
+            try:
+                bm25_indexes[collection_name] = await asyncio.to_thread(
+                    VECTOR_DB_CLIENT.get_index, collection_name
+                )
+            except Exception as e:
+                log.exception(f"Failed to load BM25 index {collection_name}: {e}")
+                bm25_indexes[collection_name] = None
+            collection_results[collection_name] = None
+            continue
+
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
+            collection_results[collection_name] = await VECTOR_DB_CLIENT.aget(
                 collection_name=collection_name
             )
         except Exception as e:
@@ -510,6 +607,12 @@ async def query_collection_with_hybrid_search(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
     )
 
+    # Each query is embedded once and shared by every collection's retriever
+    # and the reranking compressor
+    if not isinstance(embedding_function, QueryEmbeddingMemo):
+        embedding_function = QueryEmbeddingMemo(embedding_function)
+    await embedding_function.prime(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+
     async def process_query(collection_name, query):
         try:
             result = await query_doc_with_hybrid_search(
@@ -523,6 +626,8 @@ async def query_collection_with_hybrid_search(
                 r=r,
                 hybrid_bm25_weight=hybrid_bm25_weight,
                 enable_enriched_texts=enable_enriched_texts,
+                bm25_index=bm25_indexes.get(collection_name),
+                scoring_mode=scoring_mode,
             )
             return result, None
         except Exception as e:
@@ -535,6 +640,7 @@ async def query_collection_with_hybrid_search(
         (collection_name, query)
         for collection_name in collection_names
         if collection_results[collection_name] is not None
+        or bm25_indexes.get(collection_name) is not None
         for query in queries
     ]
 
@@ -830,6 +936,7 @@ def get_embedding_function(
     azure_api_version=None,
     enable_async=True,
     concurrent_requests=0,
+    embedding_cache=None,
 ) -> Awaitable:
     if embedding_engine == "":
         # Sentence transformers: CPU-bound sync operation
@@ -846,7 +953,11 @@ def get_embedding_function(
                 prefix,
             )
 
-        return async_embedding_function
+    elif embedding_engine == "local_service":
+        # Batched across workers by the local inference service
+        async def async_embedding_function(query, prefix=None, user=None):
+            return await asyncio.to_thread(embedding_function.encode, query, prefix)
+
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
         embedding_function = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -914,10 +1025,15 @@ def get_embedding_function(
             else:
                 return await embedding_function(query, prefix, user)
 
-        return async_embedding_function
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if embedding_cache is not None:
+        return embedding_cache.wrap(
+            async_embedding_function, embedding_engine, embedding_model
+        )
+    return async_embedding_function
+
 
 async def generate_embeddings(
     engine: str,
@@ -998,6 +1114,7 @@ async def get_sources_from_items(
         f"items: {items} {queries} {embedding_function} {reranking_function} {full_context}"
     )
 
+    embedding_function = QueryEmbeddingMemo(embedding_function)
     extracted_collections = []
     query_results = []
 
@@ -1214,7 +1331,9 @@ async def get_sources_from_items(
 
             try:
                 if full_context:
-                    query_result = get_all_items_from_collections(collection_names)
+                    query_result = await aget_all_items_from_collections(
+                        collection_names
+                    )
                 else:
                     query_result = None  # Initialize to None
                     if hybrid_search:
@@ -1229,6 +1348,7 @@ async def get_sources_from_items(
                                 r=r,
                                 hybrid_bm25_weight=hybrid_bm25_weight,
                                 enable_enriched_texts=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH_ENRICHED_TEXTS,
+                                scoring_mode=request.app.state.config.HYBRID_SCORING_MODE,
                             )
                         except Exception as e:
                             log.debug(
@@ -1269,6 +1389,12 @@ async def get_sources_from_items(
                     sources.append(source)
         except Exception as e:
             log.exception(e)
+
+    log.debug(
+        f"get_sources_from_items: {embedding_function.calls} embedding calls "
+        f"for {embedding_function.texts} texts, {embedding_function.hits} served "
+        f"from the request memo"
+    )
     return sources
 
 
@@ -1327,6 +1453,8 @@ class RerankCompressor(BaseDocumentCompressor):
     top_n: int
     reranking_function: Any
     r_score: float
+    # "vector" scores by cosine similarity, "rrf" by fused rank alone
+    scoring_mode: str = "vector"
 
     class Config:
         extra = "forbid"
@@ -1351,6 +1479,34 @@ class RerankCompressor(BaseDocumentCompressor):
         """
         return []
 
+    async def _get_similarity_scores(
+        self, documents: Sequence[Document], query: str
+    ) -> list[float]:
+        """
+        Cosine similarity of each document to the query.
+
+        Only documents without a stored similarity (BM25-only hits, or hits
+        from a vector DB whose scores aren't cosine based) are embedded.
+        """
+        scores = [doc.metadata.get(VECTOR_SCORE_KEY) for doc in documents]
+
+        missing = [idx for idx, score in enumerate(scores) if score is None]
+        if missing:
+            from sentence_transformers import util
+
+            query_embedding = await self.embedding_function(
+                query, RAG_EMBEDDING_QUERY_PREFIX
+            )
+            document_embedding = await self.embedding_function(
+                [documents[idx].page_content for idx in missing],
+                RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            similarities = util.cos_sim(query_embedding, document_embedding)[0]
+            for idx, similarity in zip(missing, similarities.tolist()):
+                scores[idx] = similarity
+
+        return scores
+
     async def acompress_documents(
         self,
         documents: Sequence[Document],
@@ -1360,18 +1516,15 @@ class RerankCompressor(BaseDocumentCompressor):
         reranking = self.reranking_function is not None
 
         scores = None
+        r_score = self.r_score
         if reranking:
             scores = await asyncio.to_thread(self.reranking_function, query, documents)
+        elif self.scoring_mode == "rrf":
+            scores = [doc.metadata.get(RRF_SCORE_KEY, 0.0) for doc in documents]
+            # Rank-based scores aren't on the relevance threshold's scale
+            r_score = None
         else:
-            from sentence_transformers import util
-
-            query_embedding = await self.embedding_function(
-                query, RAG_EMBEDDING_QUERY_PREFIX
-            )
-            document_embedding = await self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = await self._get_similarity_scores(documents, query)
 
         if scores is not None:
             docs_with_scores = list(
@@ -1380,10 +1533,8 @@ class RerankCompressor(BaseDocumentCompressor):
                     scores.tolist() if not isinstance(scores, list) else scores,
                 )
             )
-            if self.r_score:
-                docs_with_scores = [
-                    (d, s) for d, s in docs_with_scores if s >= self.r_score
-                ]
+            if r_score:
+                docs_with_scores = [(d, s) for d, s in docs_with_scores if s >= r_score]
 
             result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
             final_results = []
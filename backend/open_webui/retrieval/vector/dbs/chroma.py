@@ -29,6 +29,8 @@ log = logging.getLogger(__name__)
 
 
 class ChromaClient(VectorDBBase):
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -2,7 +2,7 @@
 NOTE: This vector database integration is community-supported and maintained on a best-effort basis.
 """
 
-from elasticsearch import Elasticsearch, BadRequestError
+from elasticsearch import AsyncElasticsearch, Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
 from elasticsearch.helpers import bulk, scan
@@ -13,6 +13,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_rows,
 )
 from open_webui.config import (
     ELASTICSEARCH_URL,
@@ -27,6 +28,8 @@ from open_webui.config import (
 
 
 class ElasticsearchClient(VectorDBBase):
+    SCORE_SCALE = "cosine_plus_one"
+
     """
     Important:
     in order to reduce the number of indexes and since the embedding vector length is fixed, we avoid creating
@@ -36,18 +39,20 @@ class ElasticsearchClient(VectorDBBase):
 
     def __init__(self):
         self.index_prefix = ELASTICSEARCH_INDEX_PREFIX
-        self.client = Elasticsearch(
-            hosts=[ELASTICSEARCH_URL],
-            ca_certs=ELASTICSEARCH_CA_CERTS,
-            api_key=ELASTICSEARCH_API_KEY,
-            cloud_id=ELASTICSEARCH_CLOUD_ID,
-            basic_auth=(
+        client_kwargs = {
+            "hosts": [ELASTICSEARCH_URL],
+            "ca_certs": ELASTICSEARCH_CA_CERTS,
+            "api_key": ELASTICSEARCH_API_KEY,
+            "cloud_id": ELASTICSEARCH_CLOUD_ID,
+            "basic_auth": (
                 (ELASTICSEARCH_USERNAME, ELASTICSEARCH_PASSWORD)
                 if ELASTICSEARCH_USERNAME and ELASTICSEARCH_PASSWORD
                 else None
             ),
-            ssl_assert_fingerprint=SSL_ASSERT_FINGERPRINT,
-        )
+            "ssl_assert_fingerprint": SSL_ASSERT_FINGERPRINT,
+        }
+        self.client = Elasticsearch(**client_kwargs)
+        self.async_client = AsyncElasticsearch(**client_kwargs)
 
     # Status: works
     def _get_index_name(self, dimension: int) -> str:
@@ -163,7 +168,62 @@ class ElasticsearchClient(VectorDBBase):
         filter: Optional[dict] = None,
         limit: int = 10,
     ) -> Optional[SearchResult]:
-        query = {
+        result = self.client.search(
+            index=self._get_index_name(len(vectors[0])),
+            body=self._get_search_body(collection_name, vectors[0], limit),
+        )
+
+        return self._result_to_search_result(result)
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        result = await self.async_client.search(
+            index=self._get_index_name(len(vectors[0])),
+            body=self._get_search_body(collection_name, vectors[0], limit),
+        )
+
+        return self._result_to_search_result(result)
+
+    async def asearch_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> dict[str, Optional[SearchResult]]:
+        # Every collection and query vector in a single msearch round trip
+        collection_names = list(dict.fromkeys(collection_names))
+        if not collection_names or not vectors:
+            return {}
+
+        index = self._get_index_name(len(vectors[0]))
+        body = []
+        for collection_name in collection_names:
+            for vector in vectors:
+                body.append({"index": index})
+                body.append(self._get_search_body(collection_name, vector, limit))
+
+        response = await self.async_client.msearch(body=body)
+        responses = response["responses"]
+
+        results = {}
+        for idx, collection_name in enumerate(collection_names):
+            rows = responses[idx * len(vectors) : (idx + 1) * len(vectors)]
+            if any("error" in row for row in rows):
+                results[collection_name] = None
+                continue
+            results[collection_name] = merge_search_rows(
+                [self._result_to_search_result(row) for row in rows]
+            )
+        return results
+
+    def _get_search_body(self, collection_name: str, vector: list[float], limit: int):
+        return {
             "size": limit,
             "_source": ["text", "metadata"],
             "query": {
@@ -173,20 +233,12 @@ class ElasticsearchClient(VectorDBBase):
                     },
                     "script": {
                         "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
-                        "params": {
-                            "vector": vectors[0]
-                        },  # Assuming single query vector
+                        "params": {"vector": vector},
                     },
                 }
             },
         }
 
-        result = self.client.search(
-            index=self._get_index_name(len(vectors[0])), body=query
-        )
-
-        return self._result_to_search_result(result)
-
     # Status: only tested halfwat
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
@@ -110,6 +110,8 @@ class MariaDBVectorClient(VectorDBBase):
 
         if self.distance_strategy not in {"cosine", "euclidean"}:
             raise ValueError("distance_strategy must be 'cosine' or 'euclidean'")
+        # _score_from_dist() turns cosine distances back into cos
+        self.SCORE_SCALE = "cosine" if self.distance_strategy == "cosine" else None
 
         if not self.db_url.lower().startswith("mariadb+mariadbconnector://"):
             raise ValueError(
@@ -34,6 +34,10 @@ log = logging.getLogger(__name__)
 
 
 class MilvusClient(VectorDBBase):
+    MULTI_VECTOR_SEARCH = True
+    # search() maps COSINE scores to (1 + cos) / 2
+    SCORE_SCALE = "half_cosine" if MILVUS_METRIC_TYPE.upper() == "COSINE" else None
+
     def __init__(self):
         self.collection_prefix = "open_webui"
         if MILVUS_TOKEN is None:
@@ -37,6 +37,9 @@ RESOURCE_ID_FIELD = "resource_id"
 
 
 class MilvusClient(VectorDBBase):
+    MULTI_VECTOR_SEARCH = True
+    SCORE_SCALE = "cosine" if MILVUS_METRIC_TYPE.upper() == "COSINE" else None
+
     def __init__(self):
         # Milvus collection names can only contain numbers, letters, and underscores.
         self.collection_prefix = MILVUS_COLLECTION_PREFIX.replace("-", "_")
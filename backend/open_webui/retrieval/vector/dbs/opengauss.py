@@ -94,6 +94,9 @@ class DocumentChunk(Base):
 
 
 class OpenGaussClient(VectorDBBase):
+    MULTI_VECTOR_SEARCH = True
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self) -> None:
         if not OPENGAUSS_DB_URL:
             from open_webui.internal.db import ScopedSession
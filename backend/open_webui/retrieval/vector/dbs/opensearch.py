@@ -2,7 +2,7 @@
 NOTE: This vector database integration is community-supported and maintained on a best-effort basis.
 """
 
-from opensearchpy import OpenSearch
+from opensearchpy import AsyncOpenSearch, OpenSearch
 from opensearchpy.helpers import bulk
 from typing import Optional
 
@@ -12,6 +12,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_rows,
 )
 from open_webui.config import (
     OPENSEARCH_URI,
@@ -23,14 +24,18 @@ from open_webui.config import (
 
 
 class OpenSearchClient(VectorDBBase):
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self):
         self.index_prefix = "open_webui"
-        self.client = OpenSearch(
-            hosts=[OPENSEARCH_URI],
-            use_ssl=OPENSEARCH_SSL,
-            verify_certs=OPENSEARCH_CERT_VERIFY,
-            http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
-        )
+        client_kwargs = {
+            "hosts": [OPENSEARCH_URI],
+            "use_ssl": OPENSEARCH_SSL,
+            "verify_certs": OPENSEARCH_CERT_VERIFY,
+            "http_auth": (OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
+        }
+        self.client = OpenSearch(**client_kwargs)
+        self.async_client = AsyncOpenSearch(**client_kwargs)
 
     def _get_index_name(self, collection_name: str) -> str:
         return f"{self.index_prefix}_{collection_name}"
@@ -127,25 +132,9 @@ class OpenSearchClient(VectorDBBase):
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
-                    }
-                },
-            }
-
             result = self.client.search(
-                index=self._get_index_name(collection_name), body=query
+                index=self._get_index_name(collection_name),
+                body=self._get_search_body(vectors[0], limit),
             )
 
             return self._result_to_search_result(result)
@@ -153,6 +142,77 @@ class OpenSearchClient(VectorDBBase):
         except Exception as e:
             return None
 
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        try:
+            index = self._get_index_name(collection_name)
+            if not await self.async_client.indices.exists(index=index):
+                return None
+
+            result = await self.async_client.search(
+                index=index, body=self._get_search_body(vectors[0], limit)
+            )
+            return self._result_to_search_result(result)
+
+        except Exception as e:
+            return None
+
+    async def asearch_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> dict[str, Optional[SearchResult]]:
+        # Every collection and query vector in a single msearch round trip;
+        # a missing index comes back as an error entry for that collection
+        collection_names = list(dict.fromkeys(collection_names))
+        if not collection_names or not vectors:
+            return {}
+
+        body = []
+        for collection_name in collection_names:
+            for vector in vectors:
+                body.append({"index": self._get_index_name(collection_name)})
+                body.append(self._get_search_body(vector, limit))
+
+        response = await self.async_client.msearch(body=body)
+        responses = response["responses"]
+
+        results = {}
+        for idx, collection_name in enumerate(collection_names):
+            rows = responses[idx * len(vectors) : (idx + 1) * len(vectors)]
+            if any("error" in row for row in rows):
+                results[collection_name] = None
+                continue
+            results[collection_name] = merge_search_rows(
+                [self._result_to_search_result(row) for row in rows]
+            )
+        return results
+
+    def _get_search_body(self, vector: list[float | int], limit: int) -> dict:
+        return {
+            "size": limit,
+            "_source": ["text", "metadata"],
+            "query": {
+                "script_score": {
+                    "query": {"match_all": {}},
+                    "script": {
+                        "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                        "params": {
+                            "field": "vector",
+                            "query_value": vector,
+                        },
+                    },
+                }
+            },
+        }
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
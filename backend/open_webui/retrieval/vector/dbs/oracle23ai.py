@@ -73,6 +73,8 @@ class Oracle23aiClient(VectorDBBase):
         pool: Connection pool for Oracle database connections
     """
 
+    SCORE_SCALE = "cosine_distance"
+
     def __init__(self) -> None:
         """
         Initialize the Oracle23aiClient with a connection pool.
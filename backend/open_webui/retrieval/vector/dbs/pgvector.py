@@ -85,6 +85,9 @@ class DocumentChunk(Base):
 
 
 class PgvectorClient(VectorDBBase):
+    MULTI_VECTOR_SEARCH = True
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
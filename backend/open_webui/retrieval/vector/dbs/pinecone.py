@@ -56,6 +56,8 @@ class PineconeClient(VectorDBBase):
         self.index_name = PINECONE_INDEX_NAME
         self.dimension = PINECONE_DIMENSION
         self.metric = PINECONE_METRIC
+        # _normalize_distance() only maps cosine scores to (1 + cos) / 2
+        self.SCORE_SCALE = "half_cosine" if self.metric.lower() == "cosine" else None
         self.cloud = PINECONE_CLOUD
 
         # Initialize Pinecone client for improved performance
@@ -2,11 +2,12 @@
 NOTE: This vector database integration is community-supported and maintained on a best-effort basis.
 """
 
+import asyncio
 from typing import Optional
 import logging
 from urllib.parse import urlparse
 
-from qdrant_client import QdrantClient as Qclient
+from qdrant_client import AsyncQdrantClient, QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
@@ -33,6 +34,8 @@ log = logging.getLogger(__name__)
 
 
 class QdrantClient(VectorDBBase):
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -45,6 +48,7 @@ class QdrantClient(VectorDBBase):
 
         if not self.QDRANT_URI:
             self.client = None
+            self.async_client = None
             return
 
         # Unified handling for either scheme
@@ -53,20 +57,24 @@ class QdrantClient(VectorDBBase):
         http_port = parsed.port or 6333  # default REST port
 
         if self.PREFER_GRPC:
-            self.client = Qclient(
-                host=host,
-                port=http_port,
-                grpc_port=self.GRPC_PORT,
-                prefer_grpc=self.PREFER_GRPC,
-                api_key=self.QDRANT_API_KEY,
-                timeout=self.QDRANT_TIMEOUT,
-            )
+            client_kwargs = {
+                "host": host,
+                "port": http_port,
+                "grpc_port": self.GRPC_PORT,
+                "prefer_grpc": self.PREFER_GRPC,
+                "api_key": self.QDRANT_API_KEY,
+                "timeout": self.QDRANT_TIMEOUT,
+            }
         else:
-            self.client = Qclient(
-                url=self.QDRANT_URI,
-                api_key=self.QDRANT_API_KEY,
-                timeout=QDRANT_TIMEOUT,
-            )
+            client_kwargs = {
+                "url": self.QDRANT_URI,
+                "api_key": self.QDRANT_API_KEY,
+                "timeout": QDRANT_TIMEOUT,
+            }
+
+        self.client = Qclient(**client_kwargs)
+        # Used by the async read path so searches don't hold a worker thread
+        self.async_client = AsyncQdrantClient(**client_kwargs)
 
     def _result_to_get_result(self, points) -> GetResult:
         ids = []
@@ -87,6 +95,18 @@ class QdrantClient(VectorDBBase):
             }
         )
 
+    def _points_to_search_result(self, rows) -> SearchResult:
+        get_results = [self._result_to_get_result(points) for points in rows]
+        return SearchResult(
+            ids=[result.ids[0] for result in get_results],
+            documents=[result.documents[0] for result in get_results],
+            metadatas=[result.metadatas[0] for result in get_results],
+            # qdrant distance is [-1, 1], normalize to [0, 1]
+            distances=[
+                [(point.score + 1.0) / 2.0 for point in points] for points in rows
+            ],
+        )
+
     def _create_collection(self, collection_name: str, dimension: int):
         collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
         self.client.create_collection(
@@ -164,14 +184,59 @@ class QdrantClient(VectorDBBase):
             query=vectors[0],
             limit=limit,
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+        return self._points_to_search_result([query_response.points])
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT
+
+        query_response = await self.async_client.query_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            query=vectors[0],
+            limit=limit,
+        )
+        return self._points_to_search_result([query_response.points])
+
+    async def asearch_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> dict[str, Optional[SearchResult]]:
+        if limit is None:
+            limit = NO_LIMIT
+
+        async def search_collection(collection_name):
+            # One round trip per collection for all query vectors
+            try:
+                responses = await self.async_client.query_batch_points(
+                    collection_name=f"{self.collection_prefix}_{collection_name}",
+                    requests=[
+                        models.QueryRequest(
+                            query=vector, limit=limit, with_payload=True
+                        )
+                        for vector in vectors
+                    ],
+                )
+                return self._points_to_search_result(
+                    [response.points for response in responses]
+                )
+            except Exception as e:
+                log.exception(f"Error searching collection '{collection_name}': {e}")
+                return None
+
+        collection_names = list(dict.fromkeys(collection_names))
+        results = await asyncio.gather(
+            *[search_collection(name) for name in collection_names]
         )
+        return dict(zip(collection_names, results))
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -181,17 +246,9 @@ class QdrantClient(VectorDBBase):
             if limit is None:
                 limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-            field_conditions = []
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}", match=models.MatchValue(value=value)
-                    )
-                )
-
             points = self.client.scroll(
                 collection_name=f"{self.collection_prefix}_{collection_name}",
-                scroll_filter=models.Filter(should=field_conditions),
+                scroll_filter=self._get_query_filter(filter),
                 limit=limit,
             )
             return self._result_to_get_result(points[0])
@@ -199,6 +256,33 @@ class QdrantClient(VectorDBBase):
             log.exception(f"Error querying a collection '{collection_name}': {e}")
             return None
 
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
+        if not await self.async_client.collection_exists(collection_name_with_prefix):
+            return None
+        try:
+            points = await self.async_client.scroll(
+                collection_name=collection_name_with_prefix,
+                scroll_filter=self._get_query_filter(filter),
+                limit=NO_LIMIT if limit is None else limit,
+            )
+            return self._result_to_get_result(points[0])
+        except Exception as e:
+            log.exception(f"Error querying a collection '{collection_name}': {e}")
+            return None
+
+    def _get_query_filter(self, filter: dict) -> models.Filter:
+        return models.Filter(
+            should=[
+                models.FieldCondition(
+                    key=f"metadata.{key}", match=models.MatchValue(value=value)
+                )
+                for key, value in filter.items()
+            ]
+        )
+
     def get(self, collection_name: str) -> Optional[GetResult]:
         # Get all the items in the collection.
         points = self.client.scroll(
@@ -207,6 +291,13 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points[0])
 
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        points = await self.async_client.scroll(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            limit=NO_LIMIT,
+        )
+        return self._result_to_get_result(points[0])
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
@@ -48,6 +48,8 @@ def _metadata_filter(key: str, value: Any) -> models.FieldCondition:
 
 
 class QdrantClient(VectorDBBase):
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -22,6 +22,8 @@ class S3VectorClient(VectorDBBase):
     AWS S3 Vector integration for Open WebUI Knowledge.
     """
 
+    SCORE_SCALE = "cosine_distance"
+
     def __init__(self):
         self.bucket_name = S3_VECTOR_BUCKET_NAME
         self.region = S3_VECTOR_REGION
@@ -55,6 +55,8 @@ def _convert_uuids_to_strings(obj: Any) -> Any:
 
 
 class WeaviateClient(VectorDBBase):
+    SCORE_SCALE = "half_cosine"
+
     def __init__(self):
         self.url = WEAVIATE_HTTP_HOST
         try:
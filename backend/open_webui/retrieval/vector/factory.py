@@ -4,6 +4,8 @@ from open_webui.config import (
     VECTOR_DB,
     ENABLE_QDRANT_MULTITENANCY_MODE,
     ENABLE_MILVUS_MULTITENANCY_MODE,
+    ENABLE_RAG_BM25_INDEX,
+    RAG_BM25_INDEX_DIR,
 )
 
 
@@ -86,3 +88,10 @@ class Vector:
 
 
 VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+
+if ENABLE_RAG_BM25_INDEX:
+    from open_webui.retrieval.bm25 import BM25IndexedVectorDB, BM25IndexManager
+
+    VECTOR_DB_CLIENT = BM25IndexedVectorDB(
+        VECTOR_DB_CLIENT, BM25IndexManager(RAG_BM25_INDEX_DIR)
+    )
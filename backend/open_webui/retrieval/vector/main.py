@@ -1,7 +1,11 @@
+import asyncio
+import logging
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
 
+log = logging.getLogger(__name__)
+
 
 class VectorItem(BaseModel):
     id: str
@@ -29,8 +33,37 @@ class VectorDBBase(ABC):
 
     Any custom vector database integration must inherit from this class and
     implement all abstract methods.
+
+    The async variants (`asearch`, `aquery`, `aget`, `ainsert`, `aupsert`,
+    `adelete`, `asearch_many`) run the sync method in a worker thread by
+    default. Backends with an async client override them.
     """
 
+    # True if search() returns one result row per query vector, so
+    # search_many() can send all vectors for a collection in one call.
+    MULTI_VECTOR_SEARCH = False
+
+    # What the scores in search()'s `distances` are, so callers can recover
+    # the cosine similarity without re-embedding:
+    #   "half_cosine": (1 + cos) / 2
+    #   "cosine_plus_one": 1 + cos
+    #   "cosine": cos
+    #   "cosine_distance": 1 - cos (lower is closer)
+    # None if the scores aren't cosine based.
+    SCORE_SCALE: Optional[str] = None
+
+    def to_cosine_similarity(self, score: float) -> Optional[float]:
+        """Cosine similarity for a search() score, or None if it can't be known."""
+        if self.SCORE_SCALE == "half_cosine":
+            return 2 * score - 1
+        if self.SCORE_SCALE == "cosine_plus_one":
+            return score - 1
+        if self.SCORE_SCALE == "cosine":
+            return score
+        if self.SCORE_SCALE == "cosine_distance":
+            return 1 - score
+        return None
+
     @abstractmethod
     def has_collection(self, collection_name: str) -> bool:
         """Check if the collection exists in the vector DB."""
@@ -88,3 +121,117 @@ class VectorDBBase(ABC):
     def reset(self) -> None:
         """Reset the vector database by removing all collections or those matching a condition."""
         pass
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """
+        Search several collections with several query vectors.
+
+        Each result has one row per query vector, in order. A collection that
+        failed to search maps to None.
+        """
+        results = {}
+        for collection_name in dict.fromkeys(collection_names):
+            try:
+                if self.MULTI_VECTOR_SEARCH:
+                    results[collection_name] = self.search(
+                        collection_name=collection_name,
+                        vectors=vectors,
+                        filter=filter,
+                        limit=limit,
+                    )
+                else:
+                    results[collection_name] = merge_search_rows(
+                        [
+                            self.search(
+                                collection_name=collection_name,
+                                vectors=[vector],
+                                filter=filter,
+                                limit=limit,
+                            )
+                            for vector in vectors
+                        ]
+                    )
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+                results[collection_name] = None
+        return results
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await asyncio.to_thread(
+            self.search,
+            collection_name=collection_name,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+    async def aquery(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await asyncio.to_thread(
+            self.query, collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        return await asyncio.to_thread(self.get, collection_name=collection_name)
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await asyncio.to_thread(self.insert, collection_name, items)
+
+    async def aupsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await asyncio.to_thread(self.upsert, collection_name, items)
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        await asyncio.to_thread(
+            self.delete, collection_name=collection_name, ids=ids, filter=filter
+        )
+
+    async def asearch_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Dict[str, Optional[SearchResult]]:
+        return await asyncio.to_thread(
+            self.search_many,
+            collection_names=collection_names,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+
+def merge_search_rows(results: List[Optional[SearchResult]]) -> SearchResult:
+    """Stack single-vector search results into one result with a row per vector."""
+    merged = SearchResult(ids=[], documents=[], metadatas=[], distances=[])
+    for result in results:
+        has_rows = result is not None and bool(result.ids)
+        merged.ids.append(result.ids[0] if has_rows else [])
+        merged.documents.append(
+            result.documents[0] if has_rows and result.documents else []
+        )
+        merged.metadatas.append(
+            result.metadatas[0] if has_rows and result.metadatas else []
+        )
+        merged.distances.append(
+            result.distances[0] if has_rows and result.distances else []
+        )
+    return merged
@@ -33,6 +33,7 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
 
+from open_webui.utils.audio import AudioChunker, AudioChunkError
 from open_webui.utils.misc import strict_match_mime_type
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_permission
@@ -46,6 +47,7 @@ from open_webui.config import (
     WHISPER_LANGUAGE,
     WHISPER_MULTILINGUAL,
     ELEVENLABS_API_BASE_URL,
+    AUDIO_STT_MAX_CONCURRENT_CHUNKS,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -1071,122 +1073,57 @@ def transcribe(
 ):
     log.info(f"transcribe: {file_path} {metadata}")
 
-    if is_audio_conversion_required(file_path):
+    chunker = None
+    if os.path.getsize(file_path) > MAX_FILE_SIZE:
+        # Re-encoded while splitting, so no separate conversion pass
+        chunker = AudioChunker(file_path, MAX_FILE_SIZE)
+    elif is_audio_conversion_required(file_path):
         file_path = convert_audio_to_mp3(file_path)
 
-    try:
-        file_path = compress_audio(file_path)
-    except Exception as e:
-        log.exception(e)
+    def chunk_result(future):
+        try:
+            return future.result()
+        except HTTPException:
+            raise
+        except Exception as transcribe_exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error transcribing chunk: {transcribe_exc}",
+            )
 
-    # Always produce a list of chunk paths (could be one entry if small)
+    executor = ThreadPoolExecutor(max_workers=max(AUDIO_STT_MAX_CONCURRENT_CHUNKS, 1))
+    futures = []
     try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
-    except Exception as e:
+        # Chunks are transcribed as soon as ffmpeg has written them
+        for chunk_path in chunker if chunker else [file_path]:
+            futures.append(
+                executor.submit(
+                    transcription_handler, request, chunk_path, metadata, user
+                )
+            )
+            # Stop splitting early if a chunk has already failed
+            for future in futures:
+                if future.done():
+                    chunk_result(future)
+
+        results = [chunk_result(future) for future in futures]
+    except AudioChunkError as e:
         log.exception(e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ERROR_MESSAGES.DEFAULT(e),
         )
-
-    results = []
-    try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(
-                    transcription_handler, request, chunk_path, metadata, user
-                )
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
-            for future in futures:
-                try:
-                    results.append(future.result())
-                except HTTPException:
-                    raise
-                except Exception as transcribe_exc:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error transcribing chunk: {transcribe_exc}",
-                    )
     finally:
-        # Clean up only the temporary chunks, never the original file
-        for chunk_path in chunk_paths:
-            if chunk_path != file_path and os.path.isfile(chunk_path):
-                try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Removes the temporary chunks, never the original file
+        if chunker:
+            chunker.close()
 
     return {
         "text": " ".join([result["text"] for result in results]),
     }
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
-
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
-
-        return compressed_path
-    else:
-        return file_path
-
-
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
-    """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
-    """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
-
-    audio = AudioSegment.from_file(file_path)
-    duration_ms = len(audio)
-    orig_size = file_size
-
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
-    chunks = []
-    start = 0
-    i = 0
-
-    base, _ = os.path.splitext(file_path)
-
-    while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
-
-        chunks.append(chunk_path)
-        start = end
-        i += 1
-
-    return chunks
-
-
 @router.post("/transcriptions")
 def transcription(
     request: Request,
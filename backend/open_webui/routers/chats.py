@@ -35,6 +35,10 @@ from pydantic import BaseModel
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_permission
+from open_webui.utils.chat_export import (
+    decode_chat_export_cursor,
+    generate_chats_export,
+)
 from open_webui.utils.step_mode import StepContext, get_next_step, get_all_steps
 
 log = logging.getLogger(__name__)
@@ -791,6 +795,55 @@ async def get_all_user_chats_in_db(
     return [ChatResponse(**chat.model_dump()) for chat in Chats.get_chats(db=db)]
 
 
+############################
+# ExportChats
+############################
+
+
+@router.get("/all/export")
+async def export_chats(
+    user_id: Optional[str] = None,
+    updated_from: Optional[int] = None,
+    updated_to: Optional[int] = None,
+    archived: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    user=Depends(get_verified_user),
+):
+    """
+    Stream chats as gzip-compressed NDJSON, oldest update first. Each page is
+    followed by a {"cursor": ...} line; pass the last one received as `cursor`
+    to resume an interrupted export (the other filters are then taken from
+    it). Admins may export another user's chats, or everyone's by omitting
+    `user_id`, when ENABLE_ADMIN_EXPORT is set.
+    """
+    after = None
+    if cursor:
+        filters, after = decode_chat_export_cursor(cursor)
+    else:
+        filters = {
+            "user_id": user_id,
+            "archived": archived,
+            "updated_from": updated_from,
+            "updated_to": updated_to,
+        }
+
+    if user.role != "admin":
+        filters["user_id"] = user.id
+    elif filters["user_id"] != user.id and not ENABLE_ADMIN_EXPORT:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
+        )
+
+    return StreamingResponse(
+        generate_chats_export(filters, after),
+        media_type="application/gzip",
+        headers={
+            "Content-Disposition": "attachment; filename=chats-export.ndjson.gz"
+        },
+    )
+
+
 ############################
 # GetArchivedChats
 ############################
@@ -2,6 +2,7 @@ import logging
 import os
 import uuid
 import json
+import time
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote
@@ -49,6 +50,7 @@ from open_webui.storage.provider import Storage
 
 from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.file_status import FILE_STATUS_BUS, TERMINAL_STATUSES
 from open_webui.utils.misc import strict_match_mime_type
 from pydantic import BaseModel
 
@@ -148,14 +150,18 @@ def process_uploaded_file(
 
         except Exception as e:
             log.error(f"Error processing file: {file_item.id}")
+            error = str(e.detail) if hasattr(e, "detail") else str(e)
             Files.update_file_data_by_id(
                 file_item.id,
                 {
                     "status": "failed",
-                    "error": str(e.detail) if hasattr(e, "detail") else str(e),
+                    "error": error,
                 },
                 db=db_session,
             )
+            FILE_STATUS_BUS.publish(
+                file_item.id, "failed", error, user_id=file_item.user_id
+            )
 
     if db:
         _process_handler(db)
@@ -234,7 +240,7 @@ def upload_file_handler(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(
+        uploaded, file_path = Storage.upload_file(
             file.file,
             filename,
             {
@@ -262,7 +268,8 @@ def upload_file_handler(
                             if isinstance(file.content_type, str)
                             else None
                         ),
-                        "size": len(contents),
+                        "size": uploaded.size,
+                        "sha256": uploaded.sha256,
                         "data": file_metadata,
                     },
                 }
@@ -479,31 +486,40 @@ async def get_file_process_status(
             MAX_FILE_PROCESSING_DURATION = 3600 * 2
 
             async def event_stream(file_id):
-                # NOTE: We intentionally do NOT capture the request's db session here.
-                # Each poll creates its own short-lived session to avoid holding a
-                # connection for hours. A WebSocket push would be more efficient.
-                for _ in range(MAX_FILE_PROCESSING_DURATION):
-                    file_item = Files.get_file_by_id(file_id)  # Creates own session
-                    if file_item:
-                        data = file_item.model_dump().get("data", {})
-                        status = data.get("status")
-
-                        if status:
-                            event = {"status": status}
-                            if status == "failed":
-                                event["error"] = data.get("error")
+                # Status transitions are pushed by process_file; the file row is
+                # only read on subscribe and after a missed-events resync.
+                # NOTE: We intentionally do NOT capture the request's db session here
+                # to avoid holding a connection for hours.
+                deadline = time.monotonic() + MAX_FILE_PROCESSING_DURATION
+                async with FILE_STATUS_BUS.subscribe(file_id) as queue:
+                    event = {"status": "resync"}
+                    while True:
+                        if event["status"] == "resync":
+                            file_item = await asyncio.to_thread(
+                                Files.get_file_by_id, file_id
+                            )
+                            if not file_item:
+                                yield f"data: {json.dumps({'status': 'not_found'})}\n\n"
+                                break
 
-                            yield f"data: {json.dumps(event)}\n\n"
-                            if status in ("completed", "failed"):
+                            data = file_item.data or {}
+                            if not data.get("status"):
+                                # Legacy
                                 break
-                        else:
-                            # Legacy
+                            event = {"status": data["status"]}
+                            if event["status"] == "failed":
+                                event["error"] = data.get("error")
+
+                        yield f"data: {json.dumps(event)}\n\n"
+                        if event["status"] in TERMINAL_STATUSES:
                             break
-                    else:
-                        yield f"data: {json.dumps({'status': 'not_found'})}\n\n"
-                        break
 
-                    await asyncio.sleep(1)
+                        try:
+                            event = await asyncio.wait_for(
+                                queue.get(), timeout=deadline - time.monotonic()
+                            )
+                        except asyncio.TimeoutError:
+                            break
 
             return StreamingResponse(
                 event_stream(file.id),
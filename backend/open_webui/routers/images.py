@@ -648,8 +648,13 @@ async def image_generations(
                 else:
                     image_data, content_type = get_image_data(image["b64_json"])
 
-                _, url = upload_image(
-                    request, image_data, content_type, {**data, **metadata}, user
+                _, url = await asyncio.to_thread(
+                    upload_image,
+                    request,
+                    image_data,
+                    content_type,
+                    {**data, **metadata},
+                    user,
                 )
                 images.append({"url": url})
             return images
@@ -700,8 +705,13 @@ async def image_generations(
                     image_data, content_type = get_image_data(
                         image["bytesBase64Encoded"]
                     )
-                    _, url = upload_image(
-                        request, image_data, content_type, {**data, **metadata}, user
+                    _, url = await asyncio.to_thread(
+                        upload_image,
+                        request,
+                        image_data,
+                        content_type,
+                        {**data, **metadata},
+                        user,
                     )
                     images.append({"url": url})
             elif model.endswith(":generateContent"):
@@ -711,7 +721,8 @@ async def image_generations(
                             image_data, content_type = get_image_data(
                                 part["inlineData"]["data"]
                             )
-                            _, url = upload_image(
+                            _, url = await asyncio.to_thread(
+                                upload_image,
                                 request,
                                 image_data,
                                 content_type,
@@ -773,7 +784,8 @@ async def image_generations(
                     }
 
                 image_data, content_type = get_image_data(image["url"], headers)
-                _, url = upload_image(
+                _, url = await asyncio.to_thread(
+                    upload_image,
                     request,
                     image_data,
                     content_type,
@@ -827,7 +839,8 @@ async def image_generations(
 
             for image in res["images"]:
                 image_data, content_type = get_image_data(image)
-                _, url = upload_image(
+                _, url = await asyncio.to_thread(
+                    upload_image,
                     request,
                     image_data,
                     content_type,
@@ -1003,8 +1016,13 @@ async def image_edits(
                 else:
                     image_data, content_type = get_image_data(image["b64_json"])
 
-                _, url = upload_image(
-                    request, image_data, content_type, {**data, **metadata}, user
+                _, url = await asyncio.to_thread(
+                    upload_image,
+                    request,
+                    image_data,
+                    content_type,
+                    {**data, **metadata},
+                    user,
                 )
                 images.append({"url": url})
             return images
@@ -1058,7 +1076,8 @@ async def image_edits(
                         image_data, content_type = get_image_data(
                             part["inlineData"]["data"]
                         )
-                        _, url = upload_image(
+                        _, url = await asyncio.to_thread(
+                            upload_image,
                             request,
                             image_data,
                             content_type,
@@ -1140,7 +1159,8 @@ async def image_edits(
                     }
 
                 image_data, content_type = get_image_data(image_url, headers)
-                _, url = upload_image(
+                _, url = await asyncio.to_thread(
+                    upload_image,
                     request,
                     image_data,
                     content_type,
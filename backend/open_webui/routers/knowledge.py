@@ -18,6 +18,7 @@ from open_webui.models.knowledge import (
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
+from open_webui.models.knowledge_reindex import KnowledgeReindex
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 from open_webui.routers.retrieval import (
     process_file,
@@ -26,6 +27,11 @@ from open_webui.routers.retrieval import (
     BatchProcessFilesForm,
 )
 from open_webui.storage.provider import Storage
+from open_webui.utils.knowledge_reindex import (
+    KNOWLEDGE_REINDEX_RUNNER,
+    get_reindex_job_status,
+    get_resumable_job,
+)
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user, get_admin_user
@@ -33,7 +39,7 @@ from open_webui.utils.access_control import has_permission, filter_allowed_acces
 from open_webui.models.access_grants import AccessGrants
 
 
-from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
+from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL, KNOWLEDGE_REINDEX_CONCURRENCY
 from open_webui.models.models import Models, ModelForm
 
 log = logging.getLogger(__name__)
@@ -293,67 +299,67 @@ async def create_new_knowledge(
 ############################
 
 
-@router.post("/reindex", response_model=bool)
+@router.post("/reindex", response_model=dict)
 async def reindex_knowledge_files(
     request: Request,
     user=Depends(get_verified_user),
-    db: Session = Depends(get_session),
 ):
+    """Start (or resume) the background reindex of all knowledge files. Admin only.
+
+    Returns the job status; poll GET /reindex/status for progress.
+    """
     if user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_MESSAGES.UNAUTHORIZED,
         )
 
-    knowledge_bases = Knowledges.get_knowledge_bases(db=db)
+    job = await run_in_threadpool(get_resumable_job)
+    if job is not None:
+        if KNOWLEDGE_REINDEX_RUNNER.is_active(job):
+            return await run_in_threadpool(get_reindex_job_status, job)
+        log.info(f"Resuming interrupted reindex job {job.id}")
+    else:
 
-    log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
+        def create_job():
+            knowledge_bases = Knowledges.get_knowledge_bases()
+            log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
+            return KnowledgeReindex.create_job(
+                user.id,
+                [
+                    (knowledge_base.id, file.id)
+                    for knowledge_base in knowledge_bases
+                    for file in Knowledges.get_files_by_id(knowledge_base.id)
+                ],
+            )
 
-    for knowledge_base in knowledge_bases:
-        try:
-            files = Knowledges.get_files_by_id(knowledge_base.id, db=db)
-            try:
-                if VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_base.id):
-                    VECTOR_DB_CLIENT.delete_collection(
-                        collection_name=knowledge_base.id
-                    )
-            except Exception as e:
-                log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
-                continue  # Skip, don't raise
-
-            failed_files = []
-            for file in files:
-                try:
-                    await run_in_threadpool(
-                        process_file,
-                        request,
-                        ProcessFileForm(
-                            file_id=file.id, collection_name=knowledge_base.id
-                        ),
-                        user=user,
-                        db=db,
-                    )
-                except Exception as e:
-                    log.error(
-                        f"Error processing file {file.filename} (ID: {file.id}): {str(e)}"
-                    )
-                    failed_files.append({"file_id": file.id, "error": str(e)})
-                    continue
+        job = await run_in_threadpool(create_job)
 
-        except Exception as e:
-            log.error(f"Error processing knowledge base {knowledge_base.id}: {str(e)}")
-            # Don't raise, just continue
-            continue
+    KNOWLEDGE_REINDEX_RUNNER.start(
+        request, job, user, concurrency=KNOWLEDGE_REINDEX_CONCURRENCY
+    )
+    job = await run_in_threadpool(KnowledgeReindex.get_job_by_id, job.id)
+    return await run_in_threadpool(get_reindex_job_status, job)
 
-        if failed_files:
-            log.warning(
-                f"Failed to process {len(failed_files)} files in knowledge base {knowledge_base.id}"
-            )
-            for failed in failed_files:
-                log.warning(f"File ID: {failed['file_id']}, Error: {failed['error']}")
 
-    log.info(f"Reindexing completed.")
-    return True
+@router.get("/reindex/status", response_model=Optional[dict])
+async def get_reindex_knowledge_files_status(
+    id: Optional[str] = None,
+    user=Depends(get_admin_user),
+):
+    """Progress of a reindex job (the latest one if no id is given)."""
+    if id:
+        job = await run_in_threadpool(KnowledgeReindex.get_job_by_id, id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=ERROR_MESSAGES.NOT_FOUND,
+            )
+    else:
+        job = await run_in_threadpool(KnowledgeReindex.get_latest_job)
+        if job is None:
+            return None
+    return await run_in_threadpool(get_reindex_job_status, job)
 
 
 ############################
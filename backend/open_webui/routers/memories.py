@@ -87,7 +87,7 @@ async def add_memory(
 
     vector = await request.app.state.EMBEDDING_FUNCTION(memory.content, user=user)
 
-    VECTOR_DB_CLIENT.upsert(
+    await VECTOR_DB_CLIENT.aupsert(
         collection_name=f"user-memory-{user.id}",
         items=[
             {
@@ -142,7 +142,7 @@ async def query_memory(
 
     vector = await request.app.state.EMBEDDING_FUNCTION(form_data.content, user=user)
 
-    results = VECTOR_DB_CLIENT.search(
+    results = await VECTOR_DB_CLIENT.asearch(
         collection_name=f"user-memory-{user.id}",
         vectors=[vector],
         limit=form_data.k,
@@ -193,7 +193,7 @@ async def reset_memory_from_vector_db(
         ]
     )
 
-    VECTOR_DB_CLIENT.upsert(
+    await VECTOR_DB_CLIENT.aupsert(
         collection_name=f"user-memory-{user.id}",
         items=[
             {
@@ -288,7 +288,7 @@ async def update_memory_by_id(
     if form_data.content is not None:
         vector = await request.app.state.EMBEDDING_FUNCTION(memory.content, user=user)
 
-        VECTOR_DB_CLIENT.upsert(
+        await VECTOR_DB_CLIENT.aupsert(
             collection_name=f"user-memory-{user.id}",
             items=[
                 {
@@ -335,7 +335,7 @@ async def delete_memory_by_id(
     result = Memories.delete_memory_by_id_and_user_id(memory_id, user.id, db=db)
 
     if result:
-        VECTOR_DB_CLIENT.delete(
+        await VECTOR_DB_CLIENT.adelete(
             collection_name=f"user-memory-{user.id}", ids=[memory_id]
         )
         return True
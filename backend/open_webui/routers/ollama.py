@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -38,6 +33,7 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, validator
+from starlette.background import BackgroundTask
 
 from sqlalchemy.orm import Session
 
@@ -52,6 +48,8 @@ from open_webui.utils.misc import (
     cleanup_response,
     stream_wrapper,
 )
+from open_webui.utils.http_pool import CLIENT_SESSION_POOL
+from open_webui.utils.upstream_router import OLLAMA_ROUTER, Candidate, UpstreamLease
 from open_webui.utils.payload import (
     apply_model_params_to_body_ollama,
     apply_model_params_to_body_openai,
@@ -83,26 +81,29 @@ log = logging.getLogger(__name__)
 
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
+    session = CLIENT_SESSION_POOL.get_session(url)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            headers = {
-                "Content-Type": "application/json",
-                **({"Authorization": f"Bearer {key}"} if key else {}),
-            }
+        headers = {
+            "Content-Type": "application/json",
+            **({"Authorization": f"Bearer {key}"} if key else {}),
+        }
 
-            if ENABLE_FORWARD_USER_INFO_HEADERS and user:
-                headers = include_user_info_headers(headers, user)
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+            headers = include_user_info_headers(headers, user)
 
-            async with session.get(
-                url,
-                headers=headers,
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        async with session.get(
+            url,
+            headers=headers,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
+    finally:
+        await cleanup_response(None, session)
 
 
 async def send_post_request(
@@ -113,14 +114,13 @@ async def send_post_request(
     content_type: Optional[str] = None,
     user: UserModel = None,
     metadata: Optional[dict] = None,
+    lease: Optional[UpstreamLease] = None,
 ):
 
     r = None
     streaming = False
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = CLIENT_SESSION_POOL.get_session(url)
 
         headers = {
             "Content-Type": "application/json",
@@ -137,7 +137,10 @@ async def send_post_request(
             data=payload,
             headers=headers,
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
+        if lease:
+            lease.report(r.status)
 
         if r.ok is False:
             try:
@@ -162,18 +165,24 @@ async def send_post_request(
                 response_headers["Content-Type"] = content_type
 
             streaming = True
+            stream = stream_wrapper(r, session)
             return StreamingResponse(
-                stream_wrapper(r, session),
+                lease.wrap_stream(stream) if lease else stream,
                 status_code=r.status,
                 headers=response_headers,
+                background=BackgroundTask(lease.release) if lease else None,
             )
         else:
             res = await r.json()
+            if lease:
+                lease.first_byte()
             return res
 
     except HTTPException as e:
         raise e  # Re-raise HTTPException to be handled by FastAPI
     except Exception as e:
+        if lease and r is None:
+            lease.failure()
         detail = f"Ollama: {e}"
 
         raise HTTPException(
@@ -183,6 +192,8 @@ async def send_post_request(
     finally:
         if not streaming:
             await cleanup_response(r, session)
+            if lease:
+                await lease.release()
 
 
 def get_api_key(idx, url, configs):
@@ -193,6 +204,56 @@ def get_api_key(idx, url, configs):
     )  # Legacy support
 
 
+async def choose_ollama_url_idx(request: Request, model: str, url_indices: list[int]):
+    """Pick the connection to send a request for `model` to; see OLLAMA_ROUTER."""
+    candidates = []
+    for idx in url_indices:
+        url = request.app.state.config.OLLAMA_BASE_URLS[idx]
+        api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        )
+
+        name = model
+        prefix_id = api_config.get("prefix_id", None)
+        if prefix_id:
+            name = model.replace(f"{prefix_id}.", "")
+
+        if OLLAMA_ROUTER.wants_residency:
+            key = get_api_key(idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
+            OLLAMA_ROUTER.refresh_residency(
+                url, lambda url=url, key=key: get_running_model_names(url, key)
+            )
+
+        try:
+            weight = float(api_config.get("weight", 1))
+        except (TypeError, ValueError):
+            weight = 1.0
+
+        candidates.append(
+            Candidate(
+                idx=idx,
+                url=url,
+                weight=weight,
+                resident=OLLAMA_ROUTER.is_resident(url, name),
+            )
+        )
+
+    return (await OLLAMA_ROUTER.choose(candidates)).idx
+
+
+async def get_running_model_names(url: str, key: Optional[str] = None):
+    res = await send_get_request(f"{url}/api/ps", key)
+    if res is None:
+        return None
+    return [
+        name
+        for model in res.get("models", [])
+        for name in (model.get("name"), model.get("model"))
+        if name
+    ]
+
+
 ##########################################
 #
 # API routes
@@ -961,7 +1022,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = await choose_ollama_url_idx(request, model, models[model]["urls"])
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1034,7 +1095,9 @@ async def embed(
             models = request.app.state.OLLAMA_MODELS
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = await choose_ollama_url_idx(
+                request, model, models[model]["urls"]
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1052,6 +1115,8 @@ async def embed(
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    r = None
+    lease = await OLLAMA_ROUTER.acquire(url)
     try:
         headers = {
             "Content-Type": "application/json",
@@ -1067,12 +1132,16 @@ async def embed(
             headers=headers,
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        lease.first_byte()
+        lease.report(r.status_code)
         r.raise_for_status()
 
         data = r.json()
         return data
     except Exception as e:
         log.exception(e)
+        if r is None:
+            lease.failure()
 
         detail = None
         if r is not None:
@@ -1087,6 +1156,8 @@ async def embed(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        await lease.release()
 
 
 class GenerateEmbeddingsForm(BaseModel):
@@ -1119,7 +1190,9 @@ async def embeddings(
             models = request.app.state.OLLAMA_MODELS
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = await choose_ollama_url_idx(
+                request, model, models[model]["urls"]
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1137,6 +1210,8 @@ async def embeddings(
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    r = None
+    lease = await OLLAMA_ROUTER.acquire(url)
     try:
         headers = {
             "Content-Type": "application/json",
@@ -1152,12 +1227,16 @@ async def embeddings(
             headers=headers,
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
+        lease.first_byte()
+        lease.report(r.status_code)
         r.raise_for_status()
 
         data = r.json()
         return data
     except Exception as e:
         log.exception(e)
+        if r is None:
+            lease.failure()
 
         detail = None
         if r is not None:
@@ -1172,6 +1251,8 @@ async def embeddings(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        await lease.release()
 
 
 class GenerateCompletionForm(BaseModel):
@@ -1206,7 +1287,9 @@ async def generate_completion(
 
         model = form_data.model
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = await choose_ollama_url_idx(
+                request, model, models[model]["urls"]
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1228,6 +1311,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        lease=await OLLAMA_ROUTER.acquire(url),
     )
 
 
@@ -1273,7 +1357,9 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = await choose_ollama_url_idx(
+            request, model, models[model].get("urls", [])
+        )
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1379,6 +1465,7 @@ async def generate_chat_completion(
         content_type="application/x-ndjson",
         user=user,
         metadata=metadata,
+        lease=await OLLAMA_ROUTER.acquire(url),
     )
 
 
@@ -1490,6 +1577,7 @@ async def generate_openai_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        lease=await OLLAMA_ROUTER.acquire(url),
     )
 
 
@@ -1577,6 +1665,7 @@ async def generate_openai_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        lease=await OLLAMA_ROUTER.acquire(url),
     )
 
 
@@ -54,6 +54,7 @@ from open_webui.utils.misc import (
     stream_chunks_handler,
     stream_wrapper,
 )
+from open_webui.utils.http_pool import CLIENT_SESSION_POOL
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.headers import include_user_info_headers
@@ -71,25 +72,28 @@ log = logging.getLogger(__name__)
 
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
+    session = CLIENT_SESSION_POOL.get_session(url)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            headers = {
-                **({"Authorization": f"Bearer {key}"} if key else {}),
-            }
+        headers = {
+            **({"Authorization": f"Bearer {key}"} if key else {}),
+        }
 
-            if ENABLE_FORWARD_USER_INFO_HEADERS and user:
-                headers = include_user_info_headers(headers, user)
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+            headers = include_user_info_headers(headers, user)
 
-            async with session.get(
-                url,
-                headers=headers,
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        async with session.get(
+            url,
+            headers=headers,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
+    finally:
+        await cleanup_response(None, session)
 
 
 async def get_models_request(url, key=None, user: UserModel = None):
@@ -577,71 +581,73 @@ async def get_models(
         )
 
         r = None
-        async with aiohttp.ClientSession(
-            trust_env=True,
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
-        ) as session:
-            try:
-                headers, cookies = await get_headers_and_cookies(
-                    request, url, key, api_config, user=user
-                )
-
-                if api_config.get("azure", False):
-                    models = {
-                        "data": api_config.get("model_ids", []) or [],
-                        "object": "list",
-                    }
-                elif is_anthropic_url(url):
-                    models = await get_anthropic_models(url, key, user=user)
-                    if models is None:
-                        raise Exception("Failed to connect to Anthropic API")
-                else:
-                    async with session.get(
-                        f"{url}/models",
-                        headers=headers,
-                        cookies=cookies,
-                        ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                    ) as r:
-                        if r.status != 200:
-                            error_detail = f"HTTP Error: {r.status}"
-                            try:
-                                res = await r.json()
-                                if "error" in res:
-                                    error_detail = f"External Error: {res['error']}"
-                            except Exception:
-                                pass
-                            raise Exception(error_detail)
+        session = CLIENT_SESSION_POOL.get_session(url)
+        try:
+            headers, cookies = await get_headers_and_cookies(
+                request, url, key, api_config, user=user
+            )
 
-                        response_data = await r.json()
+            if api_config.get("azure", False):
+                models = {
+                    "data": api_config.get("model_ids", []) or [],
+                    "object": "list",
+                }
+            elif is_anthropic_url(url):
+                models = await get_anthropic_models(url, key, user=user)
+                if models is None:
+                    raise Exception("Failed to connect to Anthropic API")
+            else:
+                async with session.get(
+                    f"{url}/models",
+                    headers=headers,
+                    cookies=cookies,
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                    timeout=aiohttp.ClientTimeout(
+                        total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST
+                    ),
+                ) as r:
+                    if r.status != 200:
+                        error_detail = f"HTTP Error: {r.status}"
+                        try:
+                            res = await r.json()
+                            if "error" in res:
+                                error_detail = f"External Error: {res['error']}"
+                        except Exception:
+                            pass
+                        raise Exception(error_detail)
+
+                    response_data = await r.json()
+
+                    if "api.openai.com" in url:
+                        response_data["data"] = [
+                            model
+                            for model in response_data.get("data", [])
+                            if not any(
+                                name in model["id"]
+                                for name in [
+                                    "babbage",
+                                    "dall-e",
+                                    "davinci",
+                                    "embedding",
+                                    "tts",
+                                    "whisper",
+                                ]
+                            )
+                        ]
 
-                        if "api.openai.com" in url:
-                            response_data["data"] = [
-                                model
-                                for model in response_data.get("data", [])
-                                if not any(
-                                    name in model["id"]
-                                    for name in [
-                                        "babbage",
-                                        "dall-e",
-                                        "davinci",
-                                        "embedding",
-                                        "tts",
-                                        "whisper",
-                                    ]
-                                )
-                            ]
-
-                        models = response_data
-            except aiohttp.ClientError as e:
-                # ClientError covers all aiohttp requests issues
-                log.exception(f"Client error: {str(e)}")
-                raise HTTPException(
-                    status_code=500, detail="Open WebUI: Server Connection Error"
-                )
-            except Exception as e:
-                log.exception(f"Unexpected error: {e}")
-                error_detail = f"Unexpected error: {str(e)}"
-                raise HTTPException(status_code=500, detail=error_detail)
+                    models = response_data
+        except aiohttp.ClientError as e:
+            # ClientError covers all aiohttp requests issues
+            log.exception(f"Client error: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail="Open WebUI: Server Connection Error"
+            )
+        except Exception as e:
+            log.exception(f"Unexpected error: {e}")
+            error_detail = f"Unexpected error: {str(e)}"
+            raise HTTPException(status_code=500, detail=error_detail)
+        finally:
+            await cleanup_response(None, session)
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
         models["data"] = await get_filtered_models(models, user)
@@ -1097,13 +1103,12 @@ async def generate_chat_completion(
     response = None
 
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = CLIENT_SESSION_POOL.get_session(request_url)
 
         r = await session.request(
             method="POST",
             url=request_url,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             data=payload,
             headers=headers,
             cookies=cookies,
@@ -1188,13 +1193,11 @@ async def embeddings(request: Request, form_data: dict, user):
         request, url, key, api_config, user=user
     )
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True,
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
-        )
+        session = CLIENT_SESSION_POOL.get_session(f"{url}/embeddings")
         r = await session.request(
             method="POST",
             url=f"{url}/embeddings",
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             data=body,
             headers=headers,
             cookies=cookies,
@@ -1308,13 +1311,11 @@ async def responses(
         else:
             request_url = f"{url}/responses"
 
-        session = aiohttp.ClientSession(
-            trust_env=True,
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
-        )
+        session = CLIENT_SESSION_POOL.get_session(request_url)
         r = await session.request(
             method="POST",
             url=request_url,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             data=body,
             headers=headers,
             cookies=cookies,
@@ -1418,13 +1419,11 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         else:
             request_url = f"{url}/{path}"
 
-        session = aiohttp.ClientSession(
-            trust_env=True,
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
-        )
+        session = CLIENT_SESSION_POOL.get_session(request_url)
         r = await session.request(
             method=request.method,
             url=request_url,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             data=body,
             headers=headers,
             cookies=cookies,
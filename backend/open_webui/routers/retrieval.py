@@ -81,13 +81,13 @@ from open_webui.retrieval.web.yandex import search_yandex
 from open_webui.retrieval.web.ydc import search_youcom
 
 from open_webui.retrieval.utils import (
+    aquery_doc,
     get_content_from_url,
     get_embedding_function,
     get_reranking_function,
     get_model_path,
     query_collection,
     query_collection_with_hybrid_search,
-    query_doc,
     query_doc_with_hybrid_search,
 )
 from open_webui.retrieval.vector.utils import filter_metadata
@@ -96,6 +96,7 @@ from open_webui.utils.misc import (
     sanitize_text_for_db,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.file_status import FILE_STATUS_BUS
 from open_webui.utils.access_control import has_permission
 
 from open_webui.config import (
@@ -137,7 +138,15 @@ def get_ef(
     auto_update: bool = RAG_EMBEDDING_MODEL_AUTO_UPDATE,
 ):
     ef = None
-    if embedding_model and engine == "":
+    if embedding_model and engine == "local_service":
+        from open_webui.retrieval.models.local_service import (
+            LOCAL_INFERENCE_SERVICE,
+            LocalServiceEmbedder,
+        )
+
+        LOCAL_INFERENCE_SERVICE.start()
+        ef = LocalServiceEmbedder(LOCAL_INFERENCE_SERVICE, embedding_model)
+    elif embedding_model and engine == "":
         from sentence_transformers import SentenceTransformer
 
         try:
@@ -168,7 +177,15 @@ def get_rf(
         int(external_reranker_timeout) if external_reranker_timeout else None
     )
     if reranking_model:
-        if any(model in reranking_model for model in ["jinaai/jina-colbert-v2"]):
+        if engine == "local_service":
+            from open_webui.retrieval.models.local_service import (
+                LOCAL_INFERENCE_SERVICE,
+                LocalServiceReranker,
+            )
+
+            LOCAL_INFERENCE_SERVICE.start()
+            rf = LocalServiceReranker(LOCAL_INFERENCE_SERVICE, reranking_model)
+        elif any(model in reranking_model for model in ["jinaai/jina-colbert-v2"]):
             try:
                 from open_webui.retrieval.models.colbert import ColBERT
 
@@ -301,6 +318,23 @@ async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(request: Request, user=Depends(get_admin_user)):
+    cache = request.app.state.EMBEDDING_CACHE
+    return {
+        "enabled": cache is not None,
+        **({"stats": cache.get_stats()} if cache is not None else {}),
+    }
+
+
+@router.post("/embedding/cache/reset")
+async def reset_embedding_cache(request: Request, user=Depends(get_admin_user)):
+    cache = request.app.state.EMBEDDING_CACHE
+    if cache is not None:
+        await asyncio.to_thread(cache.clear)
+    return {"status": True}
+
+
 class OpenAIConfigForm(BaseModel):
     url: str
     key: str
@@ -431,6 +465,7 @@ async def update_embedding_config(
             ),
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
             concurrent_requests=request.app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
+            embedding_cache=request.app.state.EMBEDDING_CACHE,
         )
 
         return {
@@ -477,6 +512,7 @@ async def get_rag_config(request: Request, user=Depends(get_admin_user)):
         "TOP_K_RERANKER": request.app.state.config.TOP_K_RERANKER,
         "RELEVANCE_THRESHOLD": request.app.state.config.RELEVANCE_THRESHOLD,
         "HYBRID_BM25_WEIGHT": request.app.state.config.HYBRID_BM25_WEIGHT,
+        "HYBRID_SCORING_MODE": request.app.state.config.HYBRID_SCORING_MODE,
         # Content extraction settings
         "CONTENT_EXTRACTION_ENGINE": request.app.state.config.CONTENT_EXTRACTION_ENGINE,
         "PDF_EXTRACT_IMAGES": request.app.state.config.PDF_EXTRACT_IMAGES,
@@ -676,6 +712,7 @@ class ConfigForm(BaseModel):
     TOP_K_RERANKER: Optional[int] = None
     RELEVANCE_THRESHOLD: Optional[float] = None
     HYBRID_BM25_WEIGHT: Optional[float] = None
+    HYBRID_SCORING_MODE: Optional[str] = None
 
     # Content extraction settings
     CONTENT_EXTRACTION_ENGINE: Optional[str] = None
@@ -796,6 +833,11 @@ async def update_rag_config(
         if form_data.HYBRID_BM25_WEIGHT is not None
         else request.app.state.config.HYBRID_BM25_WEIGHT
     )
+    request.app.state.config.HYBRID_SCORING_MODE = (
+        form_data.HYBRID_SCORING_MODE
+        if form_data.HYBRID_SCORING_MODE is not None
+        else request.app.state.config.HYBRID_SCORING_MODE
+    )
 
     # Content extraction settings
     request.app.state.config.CONTENT_EXTRACTION_ENGINE = (
@@ -1234,6 +1276,7 @@ async def update_rag_config(
         "TOP_K_RERANKER": request.app.state.config.TOP_K_RERANKER,
         "RELEVANCE_THRESHOLD": request.app.state.config.RELEVANCE_THRESHOLD,
         "HYBRID_BM25_WEIGHT": request.app.state.config.HYBRID_BM25_WEIGHT,
+        "HYBRID_SCORING_MODE": request.app.state.config.HYBRID_SCORING_MODE,
         # Content extraction settings
         "CONTENT_EXTRACTION_ENGINE": request.app.state.config.CONTENT_EXTRACTION_ENGINE,
         "PDF_EXTRACT_IMAGES": request.app.state.config.PDF_EXTRACT_IMAGES,
@@ -1607,6 +1650,7 @@ def save_docs_to_vector_db(
             ),
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
             concurrent_requests=request.app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
+            embedding_cache=request.app.state.EMBEDDING_CACHE,
         )
 
         # Run async embedding in sync context using the main event loop
@@ -1819,6 +1863,7 @@ def process_file(
             if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
                 Files.update_file_data_by_id(file.id, {"status": "completed"}, db=db)
                 Files.update_file_hash_by_id(file.id, hash, db=db)
+                FILE_STATUS_BUS.publish(file.id, "completed", user_id=file.user_id)
                 return {
                     "status": True,
                     "collection_name": None,
@@ -1864,6 +1909,9 @@ def process_file(
                                 db=session,
                             )
                             Files.update_file_hash_by_id(file.id, hash, db=session)
+                            FILE_STATUS_BUS.publish(
+                                file.id, "completed", user_id=file.user_id
+                            )
 
                             return {
                                 "status": True,
@@ -1882,11 +1930,12 @@ def process_file(
             with get_db() as session:
                 Files.update_file_data_by_id(
                     file.id,
-                    {"status": "failed"},
+                    {"status": "failed", "error": str(e)},
                     db=session,
                 )
                 # Clear the hash so the file can be re-uploaded after fixing the issue
                 Files.update_file_hash_by_id(file.id, None, db=session)
+            FILE_STATUS_BUS.publish(file.id, "failed", str(e), user_id=file.user_id)
 
             if "No pandoc was found" in str(e):
                 raise HTTPException(
@@ -2576,13 +2625,14 @@ async def query_doc_handler(
                     if form_data.hybrid_bm25_weight
                     else request.app.state.config.HYBRID_BM25_WEIGHT
                 ),
+                scoring_mode=request.app.state.config.HYBRID_SCORING_MODE,
                 user=user,
             )
         else:
             query_embedding = await request.app.state.EMBEDDING_FUNCTION(
                 form_data.query, prefix=RAG_EMBEDDING_QUERY_PREFIX, user=user
             )
-            return query_doc(
+            return await aquery_doc(
                 collection_name=form_data.collection_name,
                 query_embedding=query_embedding,
                 k=form_data.k if form_data.k else request.app.state.config.TOP_K,
@@ -2647,6 +2697,7 @@ async def query_collection_handler(
                     if form_data.hybrid_bm25_weight
                     else request.app.state.config.HYBRID_BM25_WEIGHT
                 ),
+                scoring_mode=request.app.state.config.HYBRID_SCORING_MODE,
                 enable_enriched_texts=(
                     form_data.enable_enriched_texts
                     if form_data.enable_enriched_texts is not None
@@ -38,9 +38,13 @@ from open_webui.env import (
     WEBSOCKET_SERVER_LOGGING,
     WEBSOCKET_SERVER_ENGINEIO_LOGGING,
     WEBSOCKET_EVENT_CALLER_TIMEOUT,
+    ENABLE_CHAT_RESPONSE_STREAM_PATCHES,
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL,
+    CHAT_RESPONSE_STREAM_HISTORY_SIZE,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.utils.stream_delta import ChatStreamEncoders
+from open_webui.socket.utils import ModelRegistry, RedisDict, RedisLock, YdocManager
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_permission
@@ -119,7 +123,7 @@ if WEBSOCKET_MANAGER == "redis":
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
 
-    MODELS = RedisDict(
+    MODELS = ModelRegistry(
         f"{REDIS_KEY_PREFIX}:models",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
@@ -349,7 +353,7 @@ async def connect(sid, environ, auth):
         data = decode_token(auth["token"])
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.aget_user_by_id(data["id"])
 
         if user:
             SESSION_POOL[sid] = {
@@ -378,7 +382,7 @@ async def user_join(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.aget_user_by_id(data["id"])
     if not user:
         return
 
@@ -425,7 +429,7 @@ async def join_channel(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.aget_user_by_id(data["id"])
     if not user:
         return
 
@@ -447,7 +451,7 @@ async def join_note(sid, data):
     if token_data is None or "id" not in token_data:
         return
 
-    user = Users.get_user_by_id(token_data["id"])
+    user = await Users.aget_user_by_id(token_data["id"])
     if not user:
         return
 
@@ -779,6 +783,76 @@ async def disconnect(sid):
 _MESSAGE_FLUSH_INTERVAL = 1.0  # seconds — flush accumulated content to DB at most this often
 
 
+STREAM_ENCODERS = ChatStreamEncoders(
+    snapshot_interval=CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL,
+    history_size=CHAT_RESPONSE_STREAM_HISTORY_SIZE,
+)
+
+
+def encode_stream_event(chat_id: str, message_id: str, event_data: dict) -> dict:
+    """Swap full chat:completion content for patches against the last event."""
+    event_type = event_data.get("type")
+    if event_type == "chat:completion" and isinstance(event_data.get("data"), dict):
+        return {
+            **event_data,
+            "data": STREAM_ENCODERS.encode(chat_id, message_id, event_data["data"]),
+        }
+
+    if event_type in ("message", "chat:message:delta", "replace", "chat:message"):
+        # Clients changed content outside the patch stream; resend it whole
+        encoder = STREAM_ENCODERS.get(chat_id, message_id)
+        if encoder:
+            encoder.invalidate()
+    return event_data
+
+
+@sio.on("chat:completion:resync")
+async def chat_completion_resync(sid, data):
+    """
+    Return the chat:completion events a client missed after `seq`, or a
+    snapshot of the message when they are no longer held on this worker.
+    """
+    user = SESSION_POOL.get(sid)
+    if not user or not isinstance(data, dict):
+        return None
+
+    chat_id = data.get("chat_id")
+    message_id = data.get("message_id")
+    if not chat_id or not message_id:
+        return None
+
+    chat = await asyncio.to_thread(
+        Chats.get_chat_by_id_and_user_id, chat_id, user["id"]
+    )
+    if not chat:
+        return None
+
+    # Only streams of the chat checked above; message ids come from the client
+    encoder = STREAM_ENCODERS.get(chat_id, message_id)
+    if encoder:
+        seq = data.get("seq")
+        events = encoder.since(seq) if isinstance(seq, int) else None
+        if events is not None:
+            return {"events": events}
+
+        snapshot = encoder.snapshot()
+        if snapshot:
+            return {"snapshot": snapshot}
+
+    # Streamed by another worker, or long finished: fall back to the stored
+    # message. Without a seq the client waits for the next live snapshot.
+    message = await asyncio.to_thread(
+        Chats.get_message_by_id_and_message_id, chat_id, message_id
+    )
+    if not message:
+        return None
+
+    snapshot = {"content": message.get("content", ""), "seq": None, "snapshot": True}
+    if message.get("output") is not None:
+        snapshot["output"] = message["output"]
+    return {"snapshot": snapshot}
+
+
 def get_event_emitter(request_info, update_db=True):
     # Per-emitter state for batching "message" content writes
     _pending_content = ""
@@ -794,7 +868,7 @@ def get_event_emitter(request_info, update_db=True):
             return
 
         content_to_write = _pending_content
-        Chats.upsert_message_to_chat_by_id_and_message_id(
+        Chats.upsert_message_delta_by_id_and_message_id(
             request_info["chat_id"],
             request_info["message_id"],
             {"content": content_to_write},
@@ -808,6 +882,9 @@ def get_event_emitter(request_info, update_db=True):
         chat_id = request_info["chat_id"]
         message_id = request_info["message_id"]
 
+        if ENABLE_CHAT_RESPONSE_STREAM_PATCHES and message_id:
+            event_data = encode_stream_event(chat_id, message_id, event_data)
+
         await sio.emit(
             "events",
             {
@@ -879,6 +956,7 @@ def get_event_emitter(request_info, update_db=True):
                     {
                         "embeds": embeds,
                     },
+                    index=False,
                 )
 
             elif event_type == "files":
@@ -898,6 +976,7 @@ def get_event_emitter(request_info, update_db=True):
                     {
                         "files": files,
                     },
+                    index=False,
                 )
 
             elif event_type in ("source", "citation"):
@@ -919,6 +998,7 @@ def get_event_emitter(request_info, update_db=True):
                         {
                             "sources": sources,
                         },
+                        index=False,
                     )
 
     async def _deferred_flush():
@@ -939,6 +1019,17 @@ def get_event_emitter(request_info, update_db=True):
         return None
 
 
+async def emit_file_status(user_id: str, file_id: str, event: dict):
+    await sio.emit(
+        "events",
+        {
+            "file_id": file_id,
+            "data": {"type": "file:status", "data": event},
+        },
+        room=f"user:{user_id}",
+    )
+
+
 def get_event_call(request_info):
     async def __event_caller__(event_data):
         response = await sio.call(
@@ -1,6 +1,7 @@
 import json
+import threading
 import uuid
-from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.redis import InvalidationChannel, get_redis_connection
 from open_webui.env import REDIS_KEY_PREFIX
 from typing import Optional, List, Tuple
 import pycrdt as Y
@@ -117,6 +118,95 @@ class RedisDict:
         return self[key]
 
 
+class ModelRegistry:
+    """
+    Process-local snapshot of the models hash, shared across nodes.
+
+    Reads never touch Redis. `set` writes the hash, bumps a generation counter
+    and publishes it; every other node reloads the hash in a background
+    thread when it sees a newer generation. Nodes also reload on
+    (re)subscribe, so generations published while disconnected aren't missed.
+    """
+
+    def __init__(self, name, redis_url, redis_sentinels=[], redis_cluster=False):
+        self.name = name
+        self.redis = get_redis_connection(
+            redis_url,
+            redis_sentinels,
+            redis_cluster=redis_cluster,
+            decode_responses=True,
+        )
+        self.generation = 0
+        self._snapshot: dict = {}
+        self._lock = threading.Lock()
+
+        self._updates = InvalidationChannel(
+            self.redis, f"{self.name}:updates", self._on_update, "model registry"
+        )
+        self._updates.listen()
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self.name}:generation"
+
+    def _on_update(self, payload: Optional[dict]):
+        if payload is None or payload.get("generation", 0) > self.generation:
+            self.reload()
+
+    def reload(self):
+        """Load the hash from Redis if its generation is newer than ours."""
+        generation = int(self.redis.get(self._generation_key) or 0)
+        if generation <= self.generation and self._snapshot:
+            return
+
+        snapshot = {
+            k: json.loads(v) for k, v in self.redis.hgetall(self.name).items()
+        }
+        with self._lock:
+            # A newer local set() may have landed while we were reading
+            if generation >= self.generation:
+                self._snapshot = snapshot
+                self.generation = generation
+
+    def set(self, mapping: dict):
+        pipe = self.redis.pipeline()
+        pipe.delete(self.name)
+        if mapping:
+            pipe.hset(self.name, mapping={k: json.dumps(v) for k, v in mapping.items()})
+        pipe.incr(self._generation_key)
+        generation = pipe.execute()[-1]
+
+        with self._lock:
+            self._snapshot = dict(mapping)
+            self.generation = generation
+
+        self._updates.publish(generation=generation)
+
+    def __getitem__(self, key):
+        return self._snapshot[key]
+
+    def __contains__(self, key):
+        return key in self._snapshot
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    def keys(self):
+        return self._snapshot.keys()
+
+    def values(self):
+        return self._snapshot.values()
+
+    def items(self):
+        return self._snapshot.items()
+
+    def get(self, key, default=None):
+        return self._snapshot.get(key, default)
+
+
 class YdocManager:
     COMPACTION_THRESHOLD = 500
 
@@ -3,8 +3,12 @@ import shutil
 import json
 import logging
 import re
+import base64
+import hashlib
+import threading
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple, Dict
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Iterator, NamedTuple, Optional, Tuple, Dict
 
 import boto3
 from botocore.config import Config
@@ -25,6 +29,8 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_UPLOAD_CHUNK_SIZE,
+    STORAGE_UPLOAD_MAX_IN_FLIGHT_BYTES,
     UPLOAD_DIR,
 )
 from google.cloud import storage
@@ -36,6 +42,62 @@ from azure.core.exceptions import ResourceNotFoundError
 
 log = logging.getLogger(__name__)
 
+# S3 rejects multipart parts below 5 MiB (except the last one)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+# GCS resumable uploads take chunks in multiples of 256 KiB
+GCS_CHUNK_MULTIPLE = 256 * 1024
+
+
+class UploadedFile(NamedTuple):
+    size: int
+    sha256: str
+
+
+class UploadByteBudget:
+    """
+    Caps the upload bytes held in memory by one worker.
+
+    Each chunk reserves its size before it is read and releases it once it
+    has been written, so concurrent uploads wait instead of piling up chunks.
+    Waiting blocks the thread, so async code must upload from a worker thread.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, size: int):
+        if self.max_bytes <= 0:
+            yield
+            return
+
+        # A chunk larger than the whole budget still gets to run on its own
+        size = min(size, self.max_bytes)
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight + size <= self.max_bytes)
+            self.in_flight += size
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= size
+                self._condition.notify_all()
+
+
+UPLOAD_BUDGET = UploadByteBudget(STORAGE_UPLOAD_MAX_IN_FLIGHT_BYTES)
+
+
+def read_chunks(file: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Read `file` in chunks, each holding a budget reservation until the next read."""
+    while True:
+        with UPLOAD_BUDGET.reserve(chunk_size):
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -45,7 +107,12 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[UploadedFile, str]:
+        """
+        Stream `file` into storage without holding it in memory.
+
+        Returns the size and SHA-256 of the uploaded bytes, and the file path.
+        """
         pass
 
     @abstractmethod
@@ -60,15 +127,41 @@ class StorageProvider(ABC):
 class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
-        file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        file: BinaryIO, filename: str, tags: Dict[str, str] = None
+    ) -> Tuple[UploadedFile, str]:
+        return LocalStorageProvider.write_chunks(file, filename)
+
+    @staticmethod
+    def write_chunks(
+        file: BinaryIO,
+        filename: str,
+        chunk_size: int = STORAGE_UPLOAD_CHUNK_SIZE,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+    ) -> Tuple[UploadedFile, str]:
+        """
+        Copy `file` to the upload dir chunk by chunk, hashing as it goes.
+
+        Remote providers pass `on_chunk` to send each chunk on while it is
+        still in memory. A failed or empty upload leaves no local file behind.
+        """
         file_path = f"{UPLOAD_DIR}/{filename}"
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(file_path, "wb") as f:
+                for chunk in read_chunks(file, chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+            if size == 0:
+                raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        except BaseException:
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            raise
+        return UploadedFile(size=size, sha256=digest.hexdigest()), file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -102,6 +195,71 @@ class LocalStorageProvider(StorageProvider):
             log.warning(f"Directory {UPLOAD_DIR} not found in local storage.")
 
 
+class S3MultipartUpload:
+    """
+    Sends chunks to S3 as they arrive. A file that fits in one chunk is a
+    single put_object; the multipart upload starts with the second chunk.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = None
+        self.parts = []
+        self._pending: Optional[bytes] = None
+
+    def write(self, chunk: bytes):
+        if self._pending is None and self.upload_id is None:
+            self._pending = chunk
+            return
+
+        if self.upload_id is None:
+            self.upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key
+            )["UploadId"]
+            self._upload_part(self._pending)
+            self._pending = None
+        self._upload_part(chunk)
+
+    def _upload_part(self, chunk: bytes):
+        part_number = len(self.parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=chunk,
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def complete(self):
+        if self.upload_id is None:
+            self.s3_client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=self._pending or b""
+            )
+            self._pending = None
+            return
+
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+
+    def abort(self):
+        self._pending = None
+        if self.upload_id is None:
+            return
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+        except ClientError as e:
+            log.warning(f"Failed to abort S3 multipart upload {self.key}: {e}")
+
+
 class S3StorageProvider(StorageProvider):
     def __init__(self):
         config = Config(
@@ -143,13 +301,27 @@ class S3StorageProvider(StorageProvider):
         return re.sub(r"[^a-zA-Z0-9 äöüÄÖÜß\+\-=\._:/@]", "", s)
 
     def upload_file(
-        self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+        self, file: BinaryIO, filename: str, tags: Dict[str, str] = None
+    ) -> Tuple[UploadedFile, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
+        upload = S3MultipartUpload(self.s3_client, self.bucket_name, s3_key)
+        try:
+            uploaded, _ = LocalStorageProvider.write_chunks(
+                file,
+                filename,
+                chunk_size=max(STORAGE_UPLOAD_CHUNK_SIZE, S3_MIN_PART_SIZE),
+                on_chunk=upload.write,
+            )
+            upload.complete()
+        except ClientError as e:
+            upload.abort()
+            raise RuntimeError(f"Error uploading file to S3: {e}")
+        except BaseException:
+            upload.abort()
+            raise
+
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -165,10 +337,7 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            return uploaded, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -236,15 +405,25 @@ class GCSStorageProvider(StorageProvider):
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
 
     def upload_file(
-        self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+        self, file: BinaryIO, filename: str, tags: Dict[str, str] = None
+    ) -> Tuple[UploadedFile, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        # Rounded up to the resumable upload granularity
+        chunk_size = -(-STORAGE_UPLOAD_CHUNK_SIZE // GCS_CHUNK_MULTIPLE) * (
+            GCS_CHUNK_MULTIPLE
+        )
         try:
             blob = self.bucket.blob(filename)
-            blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            # Resumable upload session; each write is sent once a chunk fills
+            writer = blob.open("wb", chunk_size=chunk_size, ignore_flush=True)
+            uploaded, _ = LocalStorageProvider.write_chunks(
+                file, filename, chunk_size=chunk_size, on_chunk=writer.write
+            )
+            # Only a complete upload is finalized; an abandoned session expires
+            writer.close()
+            return uploaded, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
+            LocalStorageProvider.delete_file(filename)
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
     def get_file(self, file_path: str) -> str:
@@ -308,15 +487,29 @@ class AzureStorageProvider(StorageProvider):
         )
 
     def upload_file(
-        self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+        self, file: BinaryIO, filename: str, tags: Dict[str, str] = None
+    ) -> Tuple[UploadedFile, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        blob_client = self.container_client.get_blob_client(filename)
+        block_ids = []
+
+        def stage_block(chunk: bytes):
+            # Block ids must all have the same length within a blob
+            block_id = base64.b64encode(f"{len(block_ids):08d}".encode()).decode()
+            blob_client.stage_block(block_id=block_id, data=chunk)
+            block_ids.append(block_id)
+
         try:
-            blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            uploaded, _ = LocalStorageProvider.write_chunks(
+                file, filename, on_chunk=stage_block
+            )
+            # Staged blocks only become the blob once the list is committed
+            blob_client.commit_block_list(block_ids)
+            return uploaded, f"{self.endpoint}/{self.container_name}/{filename}"
+        except ValueError:
+            raise
         except Exception as e:
+            LocalStorageProvider.delete_file(filename)
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
     def get_file(self, file_path: str) -> str:
@@ -0,0 +1,137 @@
+"""
+Tests for the persistent BM25 index used by hybrid search.
+
+Tests cover:
+1. BM25Index add/search/delete and stats bookkeeping
+2. Enriched-text scoring
+3. BM25IndexedVectorDB keeping the index in sync with the vector DB
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from open_webui.retrieval.bm25 import (
+    BM25Index,
+    BM25IndexManager,
+    BM25IndexedVectorDB,
+    tokenize,
+)
+from open_webui.retrieval.vector.main import GetResult
+
+
+def _item(id, text, **metadata):
+    return {"id": id, "text": text, "metadata": metadata}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return BM25Index(str(tmp_path / "collection.sqlite"))
+
+
+class TestTokenize:
+    def test_lowercases_and_strips_punctuation(self):
+        assert tokenize("Hello, World!") == ["hello", "world"]
+
+    def test_empty(self):
+        assert tokenize("") == []
+
+
+class TestBM25Index:
+    def test_search_ranks_matching_doc_first(self, index):
+        index.add(
+            [
+                _item("a", "the quick brown fox"),
+                _item("b", "lazy dogs sleep all day"),
+                _item("c", "a fox and a dog"),
+            ]
+        )
+        hits = index.search("fox", k=10)
+        assert {hit[0] for hit in hits} == {"a", "c"}
+
+        hits = index.search("lazy day", k=1)
+        assert [hit[0] for hit in hits] == ["b"]
+
+    def test_search_returns_text_and_metadata(self, index):
+        index.add([_item("a", "alpha beta", file_id="f1")])
+        [(doc_id, text, metadata, score)] = index.search("alpha", k=5)
+        assert doc_id == "a"
+        assert text == "alpha beta"
+        assert metadata == {"file_id": "f1"}
+        assert score > 0
+
+    def test_unknown_terms(self, index):
+        index.add([_item("a", "alpha beta")])
+        assert index.search("gamma", k=5) == []
+        assert index.search("", k=5) == []
+
+    def test_delete_by_ids_updates_stats(self, index):
+        index.add([_item("a", "alpha"), _item("b", "alpha beta")])
+        index.delete(ids=["a"])
+        assert index.count() == 1
+        assert [hit[0] for hit in index.search("alpha", k=5)] == ["b"]
+
+    def test_delete_by_filter(self, index):
+        index.add(
+            [
+                _item("a", "alpha", file_id="f1"),
+                _item("b", "alpha", file_id="f2"),
+            ]
+        )
+        index.delete(filter={"file_id": "f1"})
+        assert [hit[0] for hit in index.search("alpha", k=5)] == ["b"]
+
+    def test_add_replaces_existing_id(self, index):
+        index.add([_item("a", "alpha")])
+        index.add([_item("a", "beta")])
+        assert index.count() == 1
+        assert index.search("alpha", k=5) == []
+        assert [hit[0] for hit in index.search("beta", k=5)] == ["a"]
+
+    def test_enriched_texts_match_metadata(self, index):
+        index.add([_item("a", "body text", name="quarterly_report.pdf")])
+        assert index.search("quarterly", k=5) == []
+        hits = index.search("quarterly", k=5, enable_enriched_texts=True)
+        assert [hit[0] for hit in hits] == ["a"]
+
+
+class TestBM25IndexedVectorDB:
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        client.has_collection.return_value = False
+        return client
+
+    @pytest.fixture
+    def db(self, client, tmp_path):
+        return BM25IndexedVectorDB(client, BM25IndexManager(str(tmp_path)))
+
+    def test_insert_into_new_collection_builds_index(self, db, client):
+        db.insert(collection_name="c", items=[_item("a", "alpha")])
+        client.insert.assert_called_once()
+
+        index = db.get_index("c")
+        assert [hit[0] for hit in index.search("alpha", k=5)] == ["a"]
+        client.get.assert_not_called()
+
+    def test_existing_collection_is_backfilled_once(self, db, client):
+        client.has_collection.return_value = True
+        client.get.return_value = GetResult(
+            ids=[["a", "b"]],
+            documents=[["alpha", "beta"]],
+            metadatas=[[{}, {}]],
+        )
+
+        db.insert(collection_name="c", items=[_item("b", "beta")])
+        index = db.get_index("c")
+        assert index.count() == 2
+        db.get_index("c")
+        client.get.assert_called_once()
+
+    def test_delete_and_delete_collection(self, db, client):
+        db.insert(collection_name="c", items=[_item("a", "alpha", hash="h")])
+        db.delete(collection_name="c", filter={"hash": "h"})
+        assert db.get_index("c").count() == 0
+
+        db.delete_collection("c")
+        assert db.bm25.get("c") is None
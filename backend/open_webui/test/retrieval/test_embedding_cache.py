@@ -0,0 +1,248 @@
+import asyncio
+
+import pytest
+
+from open_webui.retrieval.embedding_cache import (
+    EmbeddingCache,
+    MemoryEmbeddingStore,
+    QueryEmbeddingMemo,
+    SqliteEmbeddingStore,
+    encode_vector,
+    get_embedding_cache,
+)
+
+
+class FakeEmbedder:
+    """Embeds text as [len(text), index-of-call] and records what it was asked."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, query, prefix=None, user=None):
+        self.calls.append(query)
+        if isinstance(query, list):
+            return [[float(len(text)), float(len(self.calls))] for text in query]
+        return [float(len(query)), float(len(self.calls))]
+
+
+def make_cache(store=None, max_bytes=1024 * 1024):
+    return EmbeddingCache(MemoryEmbeddingStore(max_bytes), store)
+
+
+class TestEmbeddingCache:
+    @pytest.mark.asyncio
+    async def test_single_query_hit(self):
+        embedder = FakeEmbedder()
+        fn = make_cache().wrap(embedder, "openai", "text-embedding-3-small")
+
+        first = await fn("hello")
+        second = await fn("hello")
+
+        assert first == second == [5.0, 1.0]
+        assert embedder.calls == ["hello"]
+
+    @pytest.mark.asyncio
+    async def test_batch_sends_only_distinct_misses(self):
+        embedder = FakeEmbedder()
+        cache = make_cache()
+        fn = cache.wrap(embedder, "openai", "m")
+
+        await fn("a")
+        result = await fn(["a", "bb", "bb", "ccc"])
+
+        assert embedder.calls == ["a", ["bb", "ccc"]]
+        assert [vector[0] for vector in result] == [1.0, 2.0, 2.0, 3.0]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+        assert stats["bytes_saved"] == len("a") + len("bb")
+
+    @pytest.mark.asyncio
+    async def test_key_includes_model_and_prefix(self):
+        embedder = FakeEmbedder()
+        cache = make_cache()
+
+        await cache.wrap(embedder, "openai", "m1")("x")
+        await cache.wrap(embedder, "openai", "m2")("x")
+        await cache.wrap(embedder, "openai", "m1")("x", prefix="query: ")
+
+        assert len(embedder.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_upstream_failure_is_not_cached(self):
+        calls = []
+
+        async def failing(query, prefix=None, user=None):
+            calls.append(query)
+            return None
+
+        cache = make_cache()
+        fn = cache.wrap(failing, "ollama", "m")
+
+        assert await fn("x") is None
+        assert await fn("x") is None
+        assert len(calls) == 2
+        assert len(cache.memory) == 0
+
+    @pytest.mark.asyncio
+    async def test_store_backs_memory(self, tmp_path):
+        store = SqliteEmbeddingStore(str(tmp_path / "embeddings.db"), 1024 * 1024)
+        embedder = FakeEmbedder()
+
+        await make_cache(store).wrap(embedder, "", "minilm")(["a", "b"])
+        # A fresh process-local LRU still hits the shared store
+        result = await make_cache(store).wrap(embedder, "", "minilm")(["a", "b"])
+
+        assert len(embedder.calls) == 1
+        assert result == [[1.0, 1.0], [1.0, 1.0]]
+
+
+class TestQueryEmbeddingMemo:
+    @pytest.mark.asyncio
+    async def test_primed_queries_are_not_embedded_again(self):
+        embedder = FakeEmbedder()
+        memo = QueryEmbeddingMemo(embedder)
+
+        await memo.prime(["a", "bb", "a"], prefix="q:")
+        # Five collections searching the same two queries, plus the compressor
+        for _ in range(5):
+            assert await memo("bb", "q:") == [2.0, 1.0]
+            await memo("a", "q:")
+        assert await memo(["a", "bb"], prefix="q:") == [[1.0, 1.0], [2.0, 1.0]]
+
+        assert embedder.calls == [["a", "bb"]]
+        assert (memo.calls, memo.texts) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_prefix_is_part_of_the_key(self):
+        embedder = FakeEmbedder()
+        memo = QueryEmbeddingMemo(embedder)
+
+        await memo("a", "q:")
+        await memo("a", "d:")
+
+        assert embedder.calls == ["a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        embedder = FakeEmbedder()
+        memo = QueryEmbeddingMemo(embedder)
+
+        results = await asyncio.gather(*[memo("a", "q:") for _ in range(4)])
+
+        assert results == [[1.0, 1.0]] * 4
+        assert embedder.calls == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_retried(self):
+        attempts = []
+
+        async def flaky(query, prefix=None):
+            attempts.append(query)
+            if len(attempts) == 1:
+                raise RuntimeError("upstream down")
+            return [1.0]
+
+        memo = QueryEmbeddingMemo(flaky)
+        await memo.prime(["a"], prefix="q:")
+
+        assert await memo("a", "q:") == [1.0]
+        assert attempts == [["a"], "a"]
+
+    @pytest.mark.asyncio
+    async def test_waiters_outlive_a_cancelled_caller(self):
+        started = asyncio.Event()
+        attempts = []
+
+        async def slow(query, prefix=None):
+            attempts.append(query)
+            started.set()
+            await asyncio.sleep(0.05)
+            return [1.0]
+
+        memo = QueryEmbeddingMemo(slow)
+        owner = asyncio.create_task(memo("a", "q:"))
+        await started.wait()
+        waiter = asyncio.create_task(memo("a", "q:"))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        assert await asyncio.wait_for(waiter, 1) == [1.0]
+        assert attempts == ["a", "a"]
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_shared_call(self):
+        release = asyncio.Event()
+        attempts = []
+
+        async def gated(query, prefix=None):
+            attempts.append(query)
+            await release.wait()
+            return [1.0]
+
+        memo = QueryEmbeddingMemo(gated)
+        owner = asyncio.create_task(memo("a", "q:"))
+        waiter = asyncio.create_task(memo("a", "q:"))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        release.set()
+
+        assert await owner == [1.0]
+        assert await memo("a", "q:") == [1.0]
+        assert attempts == ["a"]
+
+
+class TestMemoryEmbeddingStore:
+    def test_evicts_least_recently_used(self):
+        blob = encode_vector([0.0] * 4)  # 16 bytes
+        store = MemoryEmbeddingStore(max_bytes=len(blob) * 2)
+
+        store.set_many({"a": blob, "b": blob})
+        store.get_many(["a"])
+        store.set_many({"c": blob})
+
+        assert set(store.get_many(["a", "b", "c"])) == {"a", "c"}
+        assert store.evictions == 1
+        assert store.size_bytes == len(blob) * 2
+
+    def test_skips_oversized_entries(self):
+        store = MemoryEmbeddingStore(max_bytes=8)
+        store.set_many({"a": encode_vector([0.0] * 4)})
+        assert len(store) == 0
+
+
+class TestSqliteEmbeddingStore:
+    def test_size_based_eviction(self, tmp_path):
+        blob = encode_vector([0.0] * 25)  # 100 bytes
+        store = SqliteEmbeddingStore(str(tmp_path / "e.db"), max_bytes=1000)
+
+        store.set_many({f"k{i}": blob for i in range(8)})
+        store.get_many(["k0"])
+        store.set_many({"k8": blob, "k9": blob, "k10": blob})
+
+        assert store.size_bytes <= 900
+        remaining = store.get_many([f"k{i}" for i in range(11)])
+        # Recently read and newest entries survive
+        assert {"k0", "k10"} <= set(remaining)
+        assert "k1" not in remaining
+
+    def test_size_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "e.db")
+        SqliteEmbeddingStore(path, 1000).set_many({"a": encode_vector([1.0, 2.0])})
+        assert SqliteEmbeddingStore(path, 1000).size_bytes == 8
+
+
+def test_get_embedding_cache_backends(tmp_path):
+    assert get_embedding_cache("memory", 10, 10, str(tmp_path), 0).store is None
+    assert isinstance(
+        get_embedding_cache("sqlite", 10, 10, str(tmp_path), 0).store,
+        SqliteEmbeddingStore,
+    )
+    # Redis without a connection degrades to memory only
+    assert get_embedding_cache("redis", 10, 10, str(tmp_path), 0).store is None
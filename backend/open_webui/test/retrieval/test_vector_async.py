@@ -0,0 +1,188 @@
+"""
+Tests for the async VectorDBBase interface.
+
+Tests cover:
+1. Default async methods offloading the sync calls to a worker thread
+2. search_many with single-vector and multi-vector backends
+3. BM25IndexedVectorDB passing async reads through and indexing async writes
+"""
+
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from open_webui.retrieval.bm25 import BM25IndexManager, BM25IndexedVectorDB
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    merge_search_rows,
+)
+
+
+class InMemoryVectorDB(VectorDBBase):
+    """Dot-product search over dicts; search() only honours vectors[0]."""
+
+    def __init__(self):
+        self.collections = {}
+        self.search_calls = []
+        self.threads = set()
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def insert(self, collection_name, items):
+        self.threads.add(threading.get_ident())
+        self.collections.setdefault(collection_name, {}).update(
+            {item["id"]: item for item in items}
+        )
+
+    def upsert(self, collection_name, items):
+        self.insert(collection_name, items)
+
+    def search(self, collection_name, vectors, filter=None, limit=10):
+        self.threads.add(threading.get_ident())
+        self.search_calls.append((collection_name, len(vectors)))
+        if collection_name not in self.collections:
+            raise ValueError(f"no collection {collection_name}")
+
+        rows = []
+        for vector in vectors if self.MULTI_VECTOR_SEARCH else vectors[:1]:
+            scored = sorted(
+                self.collections[collection_name].values(),
+                key=lambda item: -sum(a * b for a, b in zip(item["vector"], vector)),
+            )[:limit]
+            rows.append(scored)
+
+        return SearchResult(
+            ids=[[item["id"] for item in row] for row in rows],
+            documents=[[item["text"] for item in row] for row in rows],
+            metadatas=[[item["metadata"] for item in row] for row in rows],
+            distances=[
+                [sum(a * b for a, b in zip(item["vector"], vector)) for item in row]
+                for row, vector in zip(rows, vectors)
+            ],
+        )
+
+    def query(self, collection_name, filter, limit=None):
+        return None
+
+    def get(self, collection_name):
+        self.threads.add(threading.get_ident())
+        items = list(self.collections.get(collection_name, {}).values())
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
+    def delete(self, collection_name, ids=None, filter=None):
+        for id in ids or []:
+            self.collections.get(collection_name, {}).pop(id, None)
+
+    def reset(self):
+        self.collections.clear()
+
+
+class MultiVectorDB(InMemoryVectorDB):
+    MULTI_VECTOR_SEARCH = True
+
+
+def _item(id, vector):
+    return {"id": id, "text": id, "vector": vector, "metadata": {}}
+
+
+@pytest.fixture(params=[InMemoryVectorDB, MultiVectorDB])
+def db(request):
+    db = request.param()
+    db.insert("a", [_item("x", [1, 0]), _item("y", [0, 1])])
+    db.insert("b", [_item("z", [1, 1])])
+    db.threads.clear()
+    return db
+
+
+class TestDefaultAsyncMethods:
+    @pytest.mark.asyncio
+    async def test_asearch_runs_off_the_event_loop(self, db):
+        result = await db.asearch("a", vectors=[[1, 0]], limit=1)
+
+        assert result.ids == [["x"]]
+        assert threading.get_ident() not in db.threads
+
+    @pytest.mark.asyncio
+    async def test_async_writes_and_get(self, db):
+        await db.ainsert("c", [_item("w", [1, 0])])
+        await db.aupsert("c", [_item("v", [0, 1])])
+        await db.adelete("c", ids=["w"])
+
+        result = await db.aget("c")
+        assert result.ids == [["v"]]
+
+
+class TestSearchMany:
+    @pytest.mark.asyncio
+    async def test_one_row_per_query_vector(self, db):
+        results = await db.asearch_many(
+            collection_names=["a", "b", "a"], vectors=[[1, 0], [0, 1]], limit=1
+        )
+
+        assert list(results) == ["a", "b"]
+        assert results["a"].ids == [["x"], ["y"]]
+        assert results["b"].ids == [["z"], ["z"]]
+
+    def test_multi_vector_backends_search_each_collection_once(self, db):
+        db.search_many(collection_names=["a", "b"], vectors=[[1, 0], [0, 1]])
+
+        if db.MULTI_VECTOR_SEARCH:
+            assert db.search_calls == [("a", 2), ("b", 2)]
+        else:
+            assert db.search_calls == [("a", 1), ("a", 1), ("b", 1), ("b", 1)]
+
+    def test_failed_collection_maps_to_none(self, db):
+        results = db.search_many(collection_names=["a", "missing"], vectors=[[1, 0]])
+
+        assert results["a"].ids == [["x", "y"]]
+        assert results["missing"] is None
+
+
+def test_merge_search_rows_keeps_empty_rows_aligned():
+    merged = merge_search_rows(
+        [
+            None,
+            SearchResult(
+                ids=[["a"]], documents=[["A"]], metadatas=[[{}]], distances=[[0.5]]
+            ),
+        ]
+    )
+
+    assert merged.ids == [[], ["a"]]
+    assert merged.distances == [[], [0.5]]
+
+
+class TestBM25IndexedVectorDB:
+    @pytest.mark.asyncio
+    async def test_async_reads_use_the_wrapped_client(self, tmp_path):
+        client = MagicMock()
+        client.asearch_many = AsyncMock(return_value={"a": None})
+        db = BM25IndexedVectorDB(client, BM25IndexManager(str(tmp_path)))
+
+        assert await db.asearch_many(collection_names=["a"], vectors=[[1.0]]) == {
+            "a": None
+        }
+        client.asearch_many.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_async_insert_updates_the_index(self, tmp_path):
+        client = InMemoryVectorDB()
+        db = BM25IndexedVectorDB(client, BM25IndexManager(str(tmp_path)))
+
+        await db.ainsert(
+            "c",
+            [{"id": "a", "text": "alpha", "vector": [1.0], "metadata": {}}],
+        )
+
+        assert [hit[0] for hit in db.get_index("c").search("alpha", k=5)] == ["a"]
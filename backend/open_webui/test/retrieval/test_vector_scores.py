@@ -0,0 +1,86 @@
+"""
+Tests for mapping vector DB search scores back to cosine similarity.
+
+Each backend reports search() scores on its own scale; hybrid search reuses
+them as cosine similarities instead of re-embedding the candidates.
+"""
+
+import math
+
+import pytest
+
+from open_webui.retrieval.bm25 import BM25IndexedVectorDB, BM25IndexManager
+from open_webui.retrieval.vector.main import VectorDBBase
+
+
+class ScoredVectorDB(VectorDBBase):
+    """Only reports its score scale; storage is never touched."""
+
+    def __init__(self, scale):
+        self.SCORE_SCALE = scale
+
+    def has_collection(self, collection_name):
+        return False
+
+    def delete_collection(self, collection_name):
+        pass
+
+    def insert(self, collection_name, items):
+        pass
+
+    def upsert(self, collection_name, items):
+        pass
+
+    def search(self, collection_name, vectors, filter=None, limit=10):
+        return None
+
+    def query(self, collection_name, filter, limit=None):
+        return None
+
+    def get(self, collection_name):
+        return None
+
+    def delete(self, collection_name, ids=None, filter=None):
+        pass
+
+    def reset(self):
+        pass
+
+
+# cos(query, doc) for a close, an orthogonal and an opposite document
+COSINES = [0.8, 0.0, -0.6]
+
+SCALES = {
+    # chroma, pgvector, opengauss, qdrant, weaviate, opensearch, milvus, pinecone
+    "half_cosine": lambda cos: (1 + cos) / 2,
+    # elasticsearch
+    "cosine_plus_one": lambda cos: cos + 1,
+    # mariadb (cosine), milvus multitenancy
+    "cosine": lambda cos: cos,
+    # oracle23ai, s3vector
+    "cosine_distance": lambda cos: 1 - cos,
+}
+
+
+class TestToCosineSimilarity:
+    @pytest.mark.parametrize("scale", list(SCALES))
+    def test_recovers_cosine_and_ranking(self, scale):
+        client = ScoredVectorDB(scale)
+        scores = [SCALES[scale](cos) for cos in COSINES]
+
+        similarities = [client.to_cosine_similarity(score) for score in scores]
+        assert similarities == pytest.approx(COSINES)
+        # Closest first, whichever direction the raw scores run
+        assert sorted(range(3), key=lambda i: -similarities[i]) == [0, 1, 2]
+
+    def test_unknown_scale_is_not_reused(self):
+        # e.g. euclidean distances, or a custom backend
+        client = ScoredVectorDB(None)
+        assert client.to_cosine_similarity(0.5) is None
+        assert client.to_cosine_similarity(math.inf) is None
+
+    def test_bm25_wrapper_uses_the_wrapped_scale(self, tmp_path):
+        client = BM25IndexedVectorDB(
+            ScoredVectorDB("cosine_distance"), BM25IndexManager(str(tmp_path))
+        )
+        assert client.to_cosine_similarity(0.25) == pytest.approx(0.75)
@@ -0,0 +1,75 @@
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from open_webui.socket import utils as socket_utils
+from open_webui.socket.utils import ModelRegistry
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def make_registry():
+    server = fakeredis.FakeServer()
+
+    def factory():
+        with patch.object(
+            socket_utils,
+            "get_redis_connection",
+            lambda *args, **kwargs: fakeredis.FakeRedis(
+                server=server, decode_responses=True
+            ),
+        ):
+            return ModelRegistry("test:models", redis_url="redis://test")
+
+    return factory
+
+
+class TestModelRegistry:
+    def test_set_updates_local_snapshot(self, make_registry):
+        registry = make_registry()
+        registry.set({"a": {"id": "a"}})
+
+        assert "a" in registry
+        assert registry["a"] == {"id": "a"}
+        assert len(registry) == 1
+        assert registry.get("missing") is None
+        assert registry.generation == 1
+
+    def test_reads_do_not_touch_redis(self, make_registry):
+        registry = make_registry()
+        registry.set({"a": {"id": "a"}})
+
+        with patch.object(registry, "redis") as redis:
+            assert registry["a"]["id"] == "a"
+            assert "b" not in registry
+            assert list(registry.values()) == [{"id": "a"}]
+            redis.assert_not_called()
+            assert redis.method_calls == []
+
+    def test_refresh_propagates_to_other_nodes(self, make_registry):
+        node_a = make_registry()
+        node_b = make_registry()
+        # Let node_b's listener subscribe before node_a publishes
+        time.sleep(0.2)
+
+        node_a.set({"a": {"id": "a"}, "b": {"id": "b"}})
+
+        assert wait_for(lambda: node_b.generation == node_a.generation)
+        assert set(node_b.keys()) == {"a", "b"}
+
+    def test_new_node_loads_existing_models(self, make_registry):
+        make_registry().set({"a": {"id": "a"}})
+
+        late = make_registry()
+        assert wait_for(lambda: "a" in late)
+        assert late.generation == 1
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark for reasoning tag detection on streamed output.
+
+Replays provider streams chunk by chunk and times the full-text regex search
+the streaming handler used to run on every chunk against StreamTagScanner.
+
+Streams are recorded SSE bodies, one `data: {...}` chat completion chunk per
+line, as saved from an OpenAI-compatible provider:
+
+    python -m open_webui.test.utils.bench_stream_tags recording.sse ...
+
+Without arguments a synthetic recording is replayed: a long `<think>` trace
+streamed in small chunks, the shape reasoning models produce.
+"""
+
+import json
+import random
+import sys
+import time
+
+from open_webui.utils.stream_tags import (
+    StreamTagScanner,
+    end_tag_pattern,
+    start_tag_pattern,
+)
+
+TAGS = [
+    ("<think>", "</think>"),
+    ("<thinking>", "</thinking>"),
+    ("<reason>", "</reason>"),
+    ("<reasoning>", "</reasoning>"),
+    ("<thought>", "</thought>"),
+    ("<Thought>", "</Thought>"),
+    ("<|begin_of_thought|>", "<|end_of_thought|>"),
+    ("◁think▷", "◁/think▷"),
+]
+
+
+def load_recording(path: str) -> list[str]:
+    chunks = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            try:
+                choices = json.loads(data).get("choices") or [{}]
+            except json.JSONDecodeError:
+                continue
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                chunks.append(content)
+    return chunks
+
+
+def synthetic_recording(words: int = 20000, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    vocab = ["the", "so", "then", "<", "x", "=", "think", "step", "\n", "check"]
+    text = "<think>\n" + " ".join(rng.choice(vocab) for _ in range(words))
+    text += "\n</think>\n\nThe answer is 42."
+
+    chunks, i = [], 0
+    while i < len(text):
+        step = rng.randint(2, 8)
+        chunks.append(text[i : i + step])
+        i += step
+    return chunks
+
+
+def replay_full_search(chunks: list[str]) -> int:
+    """Search the whole item text for every tag on every chunk."""
+    text, end_tag, hits = "", None, 0
+    for chunk in chunks:
+        text += chunk
+        if end_tag is None:
+            for start_tag, end in TAGS:
+                match = start_tag_pattern(start_tag).search(text)
+                if match:
+                    text, end_tag, hits = text[match.end() :], end, hits + 1
+                    break
+        elif end_tag_pattern(end_tag).search(text):
+            text, end_tag, hits = "", None, hits + 1
+    return hits
+
+
+def replay_scanner(chunks: list[str]) -> int:
+    scanner = StreamTagScanner()
+    text, end_tag, item, hits = "", None, 0, 0
+    for chunk in chunks:
+        text += chunk
+        if end_tag is None:
+            found = scanner.search_start(str(item), text, TAGS)
+            if found:
+                item += 1
+                text, end_tag, hits = text[found[2].end() :], found[1], hits + 1
+        elif scanner.has_end(str(item), text, end_tag):
+            item += 1
+            text, end_tag, hits = "", None, hits + 1
+    return hits
+
+
+def bench(name: str, chunks: list[str], repeat: int = 3):
+    results = {}
+    for label, replay in (
+        ("full search", replay_full_search),
+        ("scanner", replay_scanner),
+    ):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits = replay(chunks)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = (best, hits)
+
+    full, scanned = results["full search"], results["scanner"]
+    assert full[1] == scanned[1], f"{name}: tag transitions differ"
+    print(
+        f"{name}: {len(chunks)} chunks, {sum(map(len, chunks))} chars, "
+        f"{full[1]} transitions | full search {full[0] * 1000:.1f} ms | "
+        f"scanner {scanned[0] * 1000:.1f} ms | {full[0] / scanned[0]:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if paths:
+        for path in paths:
+            bench(path, load_recording(path))
+    else:
+        bench("synthetic", synthetic_recording())
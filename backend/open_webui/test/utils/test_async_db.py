@@ -0,0 +1,95 @@
+"""
+Round trips through the async model methods on a real asyncio engine.
+
+Rows are written with the sync engine and read back through the `a*`
+methods on an aiosqlite engine over the same SQLite file, as they are with
+DATABASE_ENABLE_ASYNC.
+"""
+
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from open_webui.models import chats as chats_module
+from open_webui.models import users as users_module
+from open_webui.models.chats import Chat, Chats
+from open_webui.models.users import User, Users
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def sessions(monkeypatch, tmp_path):
+    path = tmp_path / "webui.db"
+    engine = create_engine(f"sqlite:///{path}")
+    for model in (User, Chat):
+        model.__table__.create(engine)
+
+    # Connections are not pooled, so none outlive the test's event loop
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=NullPool
+    )
+    AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def get_async_db_context(db=None):
+        async with AsyncSession() as session:
+            yield session
+
+    for module in (chats_module, users_module):
+        monkeypatch.setattr(module, "is_async_db_enabled", lambda: True)
+        monkeypatch.setattr(module, "get_async_db_context", get_async_db_context)
+
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as session:
+        now = int(time.time())
+        session.add(
+            User(
+                id="u1",
+                email="u1@example.com",
+                name="User",
+                role="user",
+                profile_image_url="",
+                last_active_at=now,
+                updated_at=now,
+                created_at=now,
+            )
+        )
+        session.add(
+            Chat(
+                id="c1",
+                user_id="u1",
+                title="Chat",
+                chat={},
+                meta={},
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        session.commit()
+    return Session
+
+
+class TestAsyncModelMethods:
+    @pytest.mark.asyncio
+    async def test_user_round_trip(self, sessions):
+        user = await Users.aget_user_by_id("u1")
+
+        assert user.id == "u1" and user.email == "u1@example.com"
+        assert await Users.aget_user_by_id("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_chat_owner_round_trip(self, sessions):
+        assert await Chats.ais_chat_owner("c1", "u1") is True
+        assert await Chats.ais_chat_owner("c1", "u2") is False
+
+        # Writes from the sync engine are seen by the next async read
+        with sessions() as session:
+            session.get(Chat, "c1").user_id = "u2"
+            session.commit()
+        assert await Chats.ais_chat_owner("c1", "u2") is True
@@ -0,0 +1,92 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from open_webui.utils.audio import AudioChunker, AudioChunkError, segment_seconds
+
+# Stands in for ffmpeg: writes FAKE_CHUNKS segments of FAKE_CHUNK_SIZE bytes
+# to the output pattern and lists each on the segment list (stdout).
+FAKE_FFMPEG = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os, sys
+    args = sys.argv[1:]
+    with open(os.environ["FAKE_FFMPEG_ARGS"], "w") as f:
+        f.write("\\n".join(args))
+    for i in range(int(os.environ.get("FAKE_CHUNKS", "3"))):
+        path = args[-1] % i
+        with open(path, "wb") as f:
+            f.write(b"x" * int(os.environ.get("FAKE_CHUNK_SIZE", "10")))
+        print(os.path.basename(path), flush=True)
+    if os.environ.get("FAKE_FAIL"):
+        print("Invalid data found when processing input", file=sys.stderr)
+        sys.exit(1)
+    """
+)
+
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    path = tmp_path / "ffmpeg"
+    path.write_text(FAKE_FFMPEG)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("FAKE_FFMPEG_ARGS", str(tmp_path / "args"))
+    return str(path)
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = tmp_path / "upload" / "meeting.m4a"
+    path.parent.mkdir()
+    path.write_bytes(b"audio")
+    return str(path)
+
+
+class TestAudioChunker:
+    def test_segment_length_fits_size_cap(self):
+        # 32 kbps is 4000 bytes a second
+        assert segment_seconds(20 * 1024 * 1024, 32) * 4000 < 20 * 1024 * 1024
+        assert segment_seconds(100, 32) == 1
+
+    def test_yields_chunks_in_order_and_cleans_up(self, ffmpeg, recording, tmp_path):
+        with AudioChunker(recording, 100, ffmpeg=ffmpeg) as chunker:
+            chunks = list(chunker)
+            assert [os.path.basename(c) for c in chunks] == [
+                "meeting_chunk_0000.mp3",
+                "meeting_chunk_0001.mp3",
+                "meeting_chunk_0002.mp3",
+            ]
+            assert all(os.path.isfile(c) for c in chunks)
+
+        assert not any(os.path.exists(c) for c in chunks)
+        assert os.listdir(os.path.dirname(recording)) == ["meeting.m4a"]
+
+        args = (tmp_path / "args").read_text().splitlines()
+        assert args[args.index("-i") + 1] == recording
+        assert args[args.index("-segment_list") + 1] == "pipe:1"
+        assert args[args.index("-segment_time") + 1] == str(segment_seconds(100, 32))
+
+    def test_ffmpeg_failure_raises(self, ffmpeg, recording, monkeypatch):
+        monkeypatch.setenv("FAKE_FAIL", "1")
+        with AudioChunker(recording, 100, ffmpeg=ffmpeg) as chunker:
+            with pytest.raises(AudioChunkError, match="Invalid data"):
+                list(chunker)
+
+    def test_oversized_chunk_raises(self, ffmpeg, recording, monkeypatch):
+        monkeypatch.setenv("FAKE_CHUNK_SIZE", "500")
+        with AudioChunker(recording, 100, ffmpeg=ffmpeg) as chunker:
+            with pytest.raises(AudioChunkError, match="max file size"):
+                list(chunker)
+
+    def test_leaving_early_stops_ffmpeg(self, ffmpeg, recording, monkeypatch):
+        monkeypatch.setenv("FAKE_CHUNKS", "1000")
+        with AudioChunker(recording, 100, ffmpeg=ffmpeg) as chunker:
+            first = next(iter(chunker))
+            assert os.path.isfile(first)
+            process = chunker._process
+
+        assert process.poll() is not None
+        assert os.listdir(os.path.dirname(recording)) == ["meeting.m4a"]
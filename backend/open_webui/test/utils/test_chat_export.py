@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import json
+import zlib
+from contextlib import contextmanager
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from open_webui.models import chats as chats_module
+from open_webui.models.chat_messages import ChatMessageDelta
+from open_webui.models.chats import Chat
+from open_webui.utils.chat_export import (
+    decode_chat_export_cursor,
+    encode_chat_export_cursor,
+    generate_chats_export,
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # Pages are read in worker threads
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    for model in (Chat, ChatMessageDelta):
+        model.__table__.create(engine)
+    with Session(engine) as session:
+
+        @contextmanager
+        def get_db_context(db=None):
+            yield session
+
+        monkeypatch.setattr(chats_module, "get_db_context", get_db_context)
+        yield session
+
+
+def add_chats(db, *chats):
+    for id, user_id, updated_at, archived in chats:
+        db.add(
+            Chat(
+                id=id,
+                user_id=user_id,
+                title=id,
+                chat={},
+                meta={},
+                created_at=updated_at,
+                updated_at=updated_at,
+                archived=archived,
+            )
+        )
+    db.commit()
+
+
+def export(filters, after=None, batch_size=2):
+    async def collect():
+        return [c async for c in generate_chats_export(filters, after, batch_size)]
+
+    return asyncio.run(collect())
+
+
+def read(chunks):
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def filters(**kwargs):
+    return {
+        "user_id": None,
+        "archived": None,
+        "updated_from": None,
+        "updated_to": None,
+        **kwargs,
+    }
+
+
+class TestChatExport:
+    def test_pages_in_key_order_with_checkpoints(self, db):
+        # Ties on updated_at are broken by id
+        add_chats(
+            db,
+            ("c", "u1", 20, False),
+            ("a", "u1", 10, False),
+            ("b", "u1", 20, False),
+            ("d", "u1", 30, False),
+            ("e", "u1", 40, False),
+        )
+        lines = read(export(filters()))
+
+        assert [line.get("id") for line in lines] == [
+            "a",
+            "b",
+            None,
+            "c",
+            "d",
+            None,
+            "e",
+            None,
+        ]
+        assert decode_chat_export_cursor(lines[2]["cursor"]) == (filters(), (20, "b"))
+        assert decode_chat_export_cursor(lines[-1]["cursor"])[1] == (40, "e")
+
+    def test_filters(self, db):
+        add_chats(
+            db,
+            ("a", "u1", 10, False),
+            ("b", "u2", 20, False),
+            ("c", "u1", 30, True),
+            ("d", "u1", 40, False),
+        )
+
+        def ids(**kwargs):
+            return [
+                line["id"] for line in read(export(filters(**kwargs))) if "id" in line
+            ]
+
+        assert ids(user_id="u1") == ["a", "c", "d"]
+        assert ids(user_id="u1", archived=False) == ["a", "d"]
+        assert ids(archived=True) == ["c"]
+        assert ids(updated_from=20, updated_to=40) == ["b", "c"]
+        assert ids(user_id="nobody") == []
+
+    def test_resumes_from_cursor(self, db):
+        add_chats(db, *((f"c{i}", "u1", i, False) for i in range(5)))
+        first = read(export(filters(user_id="u1")))
+        resume_filters, after = decode_chat_export_cursor(first[2]["cursor"])
+
+        rest = read(export(resume_filters, after))
+        assert [line["id"] for line in rest if "id" in line] == ["c2", "c3", "c4"]
+
+        with pytest.raises(HTTPException) as e:
+            decode_chat_export_cursor("not-a-cursor")
+        assert e.value.status_code == 400
+
+    def test_each_page_decompresses_on_arrival(self, db):
+        add_chats(db, *((f"c{i}", "u1", i, False) for i in range(3)))
+        chunks = export(filters())
+        assert len(chunks) == 3
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        page = decompressor.decompress(chunks[0]).decode().splitlines()
+        assert [json.loads(line).get("id") for line in page] == ["c0", "c1", None]
+
+    def test_streaming_messages_export_their_deltas(self, db, monkeypatch):
+        monkeypatch.setattr(
+            chats_module, "ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES", True
+        )
+        add_chats(db, ("a", "u1", 10, False), ("b", "u1", 20, False))
+        for chat in db.query(Chat):
+            chat.chat = {"history": {"messages": {"m1": {"content": "Hel"}}}}
+        db.add(
+            ChatMessageDelta(
+                id="b-m1", chat_id="b", message_id="m1", data={"content": "Hello"}
+            )
+        )
+        db.commit()
+
+        contents = {
+            line["id"]: line["chat"]["history"]["messages"]["m1"]["content"]
+            for line in read(export(filters()))
+            if "id" in line
+        }
+        assert contents == {"a": "Hel", "b": "Hello"}
+
+    def test_cursor_round_trip(self):
+        token = encode_chat_export_cursor(
+            filters(user_id="u1", archived=True), (5, "x")
+        )
+        assert "=" not in token
+        assert decode_chat_export_cursor(token) == (
+            filters(user_id="u1", archived=True),
+            (5, "x"),
+        )
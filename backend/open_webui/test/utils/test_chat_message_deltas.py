@@ -0,0 +1,195 @@
+"""
+Tests for the append-only chat_message_delta write path.
+
+Each get_db_context() call opens its own session, as it does without
+DATABASE_ENABLE_SESSION_SHARING, on a shared in-memory SQLite database.
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.models import chat_messages as chat_messages_module
+from open_webui.models import chats as chats_module
+from open_webui.models.chat_messages import ChatMessage, ChatMessageDelta
+from open_webui.models.chats import Chat, Chats
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    for model in (Chat, ChatMessage, ChatMessageDelta):
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_db_context(db=None):
+        with Session() as session:
+            yield session
+
+    for module in (chats_module, chat_messages_module):
+        monkeypatch.setattr(module, "get_db_context", get_db_context)
+    monkeypatch.setattr(chats_module, "ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES", True)
+
+    with Session() as session:
+        session.add(
+            Chat(
+                id="c1",
+                user_id="u1",
+                title="Chat",
+                chat={
+                    "title": "Chat",
+                    "history": {
+                        "messages": {"m1": {"role": "assistant", "content": ""}}
+                    },
+                },
+                meta={},
+                created_at=0,
+                updated_at=0,
+            )
+        )
+        session.commit()
+    return Session
+
+
+class IndexedChats:
+    def __init__(self):
+        self.contents = []
+
+    def upsert_chats(self, chat_items, db):
+        for chat_item in chat_items:
+            message = chat_item.chat["history"]["messages"]["m1"]
+            self.contents.append(message["content"])
+
+
+def stored_content(Session):
+    with Session() as session:
+        return session.get(Chat, "c1").chat["history"]["messages"]["m1"]["content"]
+
+
+def pending_deltas(Session):
+    with Session() as session:
+        return session.query(ChatMessageDelta).count()
+
+
+class TestMessageDeltas:
+    def test_both_getters_show_in_flight_content(self, sessions):
+        assert Chats.upsert_message_delta_by_id_and_message_id(
+            "c1", "m1", {"content": "Hello wor"}
+        )
+        assert stored_content(sessions) == ""
+
+        for chat in (
+            Chats.get_chat_by_id("c1"),
+            Chats.get_chat_by_id_and_user_id("c1", "u1"),
+        ):
+            assert chat.chat["history"]["messages"]["m1"]["content"] == "Hello wor"
+        assert Chats.get_chat_by_id_and_user_id("c1", "u2") is None
+
+    def test_folding_writes_the_blob_and_drops_the_delta_together(self, sessions):
+        Chats.upsert_message_delta_by_id_and_message_id(
+            "c1", "m1", {"content": "Hello wor"}
+        )
+        Chats.commit_message_delta_by_id_and_message_id("c1", "m1")
+
+        assert stored_content(sessions) == "Hello wor"
+        assert pending_deltas(sessions) == 0
+
+    def test_failed_blob_write_keeps_the_delta(self, sessions, monkeypatch):
+        Chats.upsert_message_delta_by_id_and_message_id(
+            "c1", "m1", {"content": "Hello wor"}
+        )
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(Chats, "_set_chat", fail)
+        assert Chats.commit_message_delta_by_id_and_message_id("c1", "m1") is None
+
+        assert stored_content(sessions) == ""
+        assert pending_deltas(sessions) == 1
+        chat = Chats.get_chat_by_id_and_user_id("c1", "u1")
+        assert chat.chat["history"]["messages"]["m1"]["content"] == "Hello wor"
+
+    def test_full_chat_save_replaces_a_stale_delta(self, sessions):
+        # Left behind by a stream that ended without committing
+        Chats.upsert_message_delta_by_id_and_message_id(
+            "c1", "m1", {"content": "Hello wor"}
+        )
+
+        chat = Chats.get_chat_by_id("c1").chat
+        chat["history"]["messages"]["m1"]["content"] = "Edited"
+        Chats.update_chat_by_id("c1", chat, index=False)
+
+        assert pending_deltas(sessions) == 0
+        chat = Chats.get_chat_by_id("c1")
+        assert chat.chat["history"]["messages"]["m1"]["content"] == "Edited"
+
+    def test_upserting_a_message_keeps_other_deltas_in_flight(self, sessions):
+        Chats.upsert_message_delta_by_id_and_message_id(
+            "c1", "m1", {"content": "Hello wor"}
+        )
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            "c1", "m2", {"role": "user", "content": "Hi"}, index=False
+        )
+
+        assert stored_content(sessions) == ""
+        assert pending_deltas(sessions) == 1
+        messages = Chats.get_chat_by_id("c1").chat["history"]["messages"]
+        assert messages["m1"]["content"] == "Hello wor"
+        assert messages["m2"]["content"] == "Hi"
+
+    @pytest.mark.parametrize("append_only", [True, False])
+    def test_streamed_message_is_indexed_once_on_commit(
+        self, sessions, monkeypatch, append_only
+    ):
+        monkeypatch.setattr(
+            chats_module, "ENABLE_CHAT_MESSAGE_APPEND_ONLY_WRITES", append_only
+        )
+        index = IndexedChats()
+        monkeypatch.setattr(chats_module, "ChatSearches", index)
+
+        for content in ("Hello", "Hello wor", "Hello world"):
+            Chats.upsert_message_delta_by_id_and_message_id(
+                "c1", "m1", {"content": content}
+            )
+        Chats.add_message_status_to_chat_by_id_and_message_id(
+            "c1", "m1", {"done": True}
+        )
+        assert index.contents == []
+
+        Chats.commit_message_delta_by_id_and_message_id("c1", "m1")
+        assert index.contents == ["Hello world"]
+        assert stored_content(sessions) == "Hello world"
+
+    @pytest.mark.parametrize(
+        "delete",
+        [
+            lambda: Chats.delete_chat_by_id("c1"),
+            lambda: Chats.delete_chat_by_id_and_user_id("c1", "u1"),
+            lambda: Chats.delete_chats_by_user_id("u1"),
+            lambda: Chats.delete_chats_by_user_id_and_folder_id("u1", None),
+        ],
+        ids=["chat", "user_chat", "user_chats", "folder_chats"],
+    )
+    def test_deleting_the_chat_drops_its_deltas(self, sessions, monkeypatch, delete):
+        monkeypatch.setattr(
+            chats_module,
+            "ChatSearches",
+            SimpleNamespace(delete_by_chat_ids=lambda chat_ids, db: None),
+        )
+        Chats.upsert_message_delta_by_id_and_message_id(
+            "c1", "m1", {"content": "Hello wor"}
+        )
+
+        # SQLite does not enforce the foreign key's ON DELETE CASCADE
+        assert delete()
+        assert pending_deltas(sessions) == 0
@@ -0,0 +1,174 @@
+"""
+Tests for the chat full-text search index on SQLite (FTS5).
+
+The index tables are created from the migration's DDL on an in-memory
+database; chats are minimal stand-ins for ORM rows.
+"""
+
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from open_webui.models.chat_search import (
+    ChatSearchTable,
+    get_chat_search_content,
+    get_search_terms,
+)
+
+MIGRATION = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "migrations",
+    "versions",
+    "a5d7e9f1c3b6_add_chat_search_index.py",
+)
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("chat_search_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for statement in load_migration().SQLITE_DDL:
+            conn.execute(text(statement))
+    with Session(engine) as session:
+        yield session
+
+
+def make_chat(id, title, *contents, user_id="u1", tags=()):
+    return SimpleNamespace(
+        id=id,
+        user_id=user_id,
+        title=title,
+        chat={
+            "history": {
+                "messages": {
+                    f"m{i}": {"role": "user", "content": c}
+                    for i, c in enumerate(contents)
+                }
+            }
+        },
+        meta={"tags": list(tags)},
+    )
+
+
+def search(db, index, query, user_id="u1", tag_ids=()):
+    match = index.get_match_subquery(
+        db, user_id, get_search_terms(query), list(tag_ids)
+    )
+    rows = db.execute(
+        select(match.c.chat_id).order_by(match.c.rank.desc(), match.c.chat_id)
+    ).all()
+    return [chat_id for (chat_id,) in rows]
+
+
+class TestChatSearchTable:
+    def test_matches_term_prefixes_for_the_user_only(self, db):
+        index = ChatSearchTable()
+        index.upsert_chats(
+            [
+                make_chat("a", "Trip planning", "Book the hotel in Lisbon"),
+                make_chat("b", "Groceries", "Buy apples"),
+                make_chat("c", "Lisbon", "Lisbon again", user_id="u2"),
+            ],
+            db=db,
+        )
+
+        assert search(db, index, "lisb") == ["a"]
+        assert search(db, index, "TRIP hot") == ["a"]
+        assert search(db, index, "lisbon apples") == []
+
+    def test_title_matches_rank_first(self, db):
+        index = ChatSearchTable()
+        index.upsert_chats(
+            [
+                make_chat("a", "Weekly sync", "we talked about kubernetes upgrades"),
+                make_chat("b", "Kubernetes", "cluster notes"),
+            ],
+            db=db,
+        )
+
+        assert search(db, index, "kubernetes") == ["b", "a"]
+
+    def test_tags_match_exactly(self, db):
+        index = ChatSearchTable()
+        index.upsert_chats(
+            [
+                make_chat("a", "Report", "quarterly numbers", tags=["work-stuff"]),
+                make_chat("b", "Report draft", "quarterly numbers", tags=["work"]),
+            ],
+            db=db,
+        )
+
+        assert search(db, index, "", tag_ids=["work-stuff"]) == ["a"]
+        assert search(db, index, "quarterly", tag_ids=["work"]) == ["b"]
+        assert search(db, index, "", tag_ids=["stuff"]) == []
+
+    def test_upsert_and_delete_keep_the_fts_table_in_sync(self, db):
+        index = ChatSearchTable()
+        index.upsert_chats([make_chat("a", "Draft", "first version")], db=db)
+        index.upsert_chats([make_chat("a", "Draft", "second version")], db=db)
+
+        assert search(db, index, "first") == []
+        assert search(db, index, "second") == ["a"]
+        assert db.execute(text("SELECT count(*) FROM chat_search")).scalar() == 1
+
+        index.delete_by_chat_ids(["a"], db=db)
+        assert search(db, index, "second") == []
+        assert search(db, index, "draft") == []
+
+    def test_snippets(self, db):
+        index = ChatSearchTable()
+        index.upsert_chats(
+            [make_chat("a", "Notes", "the deployment failed on tuesday night")],
+            db=db,
+        )
+
+        snippets = index.get_snippets(db, ["a"], get_search_terms("deploy"))
+        assert "deployment failed" in snippets["a"]
+
+    def test_shared_chats_are_not_indexed(self, db):
+        index = ChatSearchTable()
+        index.upsert_chats(
+            [make_chat("a", "Shared", "public", user_id="shared-abc")], db=db
+        )
+
+        assert db.execute(text("SELECT count(*) FROM chat_search")).scalar() == 0
+
+    def test_unavailable_without_migration(self):
+        engine = create_engine("sqlite://")
+        with Session(engine) as session:
+            index = ChatSearchTable()
+            assert index.is_available(session) is False
+            # No-ops instead of failing the chat write
+            index.upsert_chats([make_chat("a", "Title", "text")], db=session)
+            index.delete_by_chat_ids(["a"], db=session)
+
+
+def test_get_chat_search_content_handles_text_blocks():
+    chat = {
+        "history": {
+            "messages": {
+                "a": {"content": "hello"},
+                "b": {"content": [{"type": "text", "text": "world"}, {"x": 1}]},
+            }
+        }
+    }
+    assert get_chat_search_content(chat) == "hello\nworld"
+    assert get_chat_search_content({"messages": [{"content": "legacy"}]}) == "legacy"
+    assert get_chat_search_content(None) == ""
+
+
+def test_get_search_terms():
+    assert get_search_terms("Héllo, wörld! foo-bar") == ["héllo", "wörld", "foo", "bar"]
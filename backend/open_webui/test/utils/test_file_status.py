@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import fakeredis
+import pytest
+
+from open_webui.utils.file_status import RESYNC, FileStatusBus
+
+
+async def next_event(queue):
+    return await asyncio.wait_for(queue.get(), timeout=2)
+
+
+class TestFileStatusBus:
+    @pytest.mark.asyncio
+    async def test_delivers_only_to_subscribers_of_the_file(self):
+        bus = FileStatusBus()
+        async with bus.subscribe("a") as a, bus.subscribe("b") as b:
+            bus.publish("a", "failed", "boom")
+            assert await next_event(a) == {"status": "failed", "error": "boom"}
+            assert b.empty()
+
+    @pytest.mark.asyncio
+    async def test_publish_from_worker_thread(self):
+        bus = FileStatusBus()
+        async with bus.subscribe("a") as queue:
+            thread = threading.Thread(target=bus.publish, args=("a", "completed"))
+            thread.start()
+            thread.join()
+            assert await next_event(queue) == {"status": "completed"}
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_cleans_up(self):
+        bus = FileStatusBus()
+        async with bus.subscribe("a"):
+            pass
+        assert bus._subscribers == {}
+
+    @pytest.mark.asyncio
+    async def test_socket_emitter_called_once_per_publish(self):
+        emitted = []
+
+        async def emitter(user_id, file_id, event):
+            emitted.append((user_id, file_id, event))
+
+        bus = FileStatusBus()
+        bus.start(asyncio.get_running_loop(), socket_emitter=emitter)
+        bus.publish("a", "completed", user_id="u1")
+        bus.publish("b", "completed")
+        await asyncio.sleep(0.05)
+
+        assert emitted == [("u1", "a", {"status": "completed"})]
+
+    @pytest.mark.asyncio
+    async def test_redis_fanout_across_buses(self):
+        server = fakeredis.FakeServer()
+        publisher = FileStatusBus(fakeredis.FakeRedis(server=server), "test:files")
+        subscriber = FileStatusBus(fakeredis.FakeRedis(server=server), "test:files")
+        subscriber.start(asyncio.get_running_loop())
+
+        publisher.start(asyncio.get_running_loop())
+        async with subscriber.subscribe("a") as queue, publisher.subscribe("a") as own:
+            # Give the listener threads time to subscribe
+            await asyncio.sleep(0.2)
+            await asyncio.to_thread(publisher.publish, "a", "completed")
+            assert await next_event(queue) == {"status": "completed"}
+
+            # The publishing worker's own subscribers get it once
+            assert await next_event(own) == {"status": "completed"}
+            await asyncio.sleep(0.1)
+            assert own.empty()
+
+    @pytest.mark.asyncio
+    async def test_resync_reaches_every_subscriber(self):
+        bus = FileStatusBus()
+        async with bus.subscribe("a") as a, bus.subscribe("b") as b:
+            # The listener's first subscribe has nothing to catch up on
+            bus._on_message(None)
+            await asyncio.sleep(0.05)
+            assert a.empty() and b.empty()
+
+            bus._on_message(None)
+            assert await next_event(a) == RESYNC
+            assert await next_event(b) == RESYNC
@@ -0,0 +1,169 @@
+import time
+import types
+
+import fakeredis
+import pytest
+
+from open_webui.models.functions import FunctionWithValvesModel
+from open_webui.utils import function_registry
+from open_webui.utils.function_registry import FunctionRegistry
+
+FILTER = """
+from pydantic import BaseModel
+
+class Filter:
+    class Valves(BaseModel):
+        priority: int = 0
+
+    class UserValves(BaseModel):
+        prefix: str = ""
+
+    def __init__(self):
+        self.valves = self.Valves()
+        self.toggle = {toggle}
+"""
+
+
+def make_function(id, valves=None, toggle=False, updated_at=1, is_global=True):
+    return FunctionWithValvesModel(
+        id=id,
+        user_id="admin",
+        name=id,
+        type="filter",
+        content=FILTER.format(toggle=toggle),
+        meta={},
+        is_active=True,
+        is_global=is_global,
+        valves=valves,
+        updated_at=updated_at,
+        created_at=1,
+    )
+
+
+class FakeDB:
+    def __init__(self, *functions):
+        self.functions = {f.id: f for f in functions}
+        self.queries = 0
+        self.compiles = 0
+        self.user_valves_queries = 0
+
+    def get_functions_by_type(self, type, active_only=False, include_valves=False):
+        self.queries += 1
+        return list(self.functions.values())
+
+    def get_user_valves_by_id_and_user_id(self, id, user_id):
+        self.user_valves_queries += 1
+        return {"prefix": "db"}
+
+    def load_function_module_by_id(self, function_id, content):
+        self.compiles += 1
+        module = types.ModuleType(f"function_{function_id}")
+        exec(content, module.__dict__)
+        return module.Filter(), "filter", {}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB(make_function("a", {"priority": 2}), make_function("b", toggle=True))
+    monkeypatch.setattr(function_registry, "Functions", db)
+    monkeypatch.setattr(
+        function_registry, "load_function_module_by_id", db.load_function_module_by_id
+    )
+    return db
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestFunctionRegistry:
+    def test_steady_state_needs_no_queries(self, db):
+        registry = FunctionRegistry()
+        for _ in range(3):
+            assert [f.id for f in registry.get_functions(["b", "x", "a"])] == [
+                "b",
+                "a",
+            ]
+            registry.get_module("a")
+            registry.get_module("b")
+
+        assert db.queries == 1
+        assert db.compiles == 2
+
+    def test_valves_priority_and_toggle(self, db):
+        registry = FunctionRegistry()
+        a, b = registry.get("a"), registry.get("b")
+
+        assert a.priority == 2 and a.module.valves.priority == 2
+        assert not a.toggle and b.toggle
+        assert registry.get("missing") is None
+        with pytest.raises(Exception, match="not found"):
+            registry.get_module("missing")
+
+    def test_invalidate_recompiles_only_changed_content(self, db):
+        registry = FunctionRegistry()
+        module = registry.get_module("a")
+
+        db.functions["a"] = make_function("a", {"priority": 5}, updated_at=2)
+        registry.invalidate()
+        assert registry.get_module("a") is module
+        assert module.valves.priority == 5
+        assert registry.get("a").priority == 5
+        assert db.compiles == 1
+
+        db.functions["a"] = make_function("a", toggle=True, updated_at=3)
+        registry.invalidate()
+        assert registry.get_module("a") is not module
+        assert registry.get("a").toggle
+        assert db.queries == 3
+
+    def test_deleted_or_deactivated_functions_drop_out(self, db):
+        registry = FunctionRegistry()
+        registry.get_module("b")
+
+        del db.functions["b"]
+        registry.invalidate()
+        assert registry.get_functions(["a", "b"])[0].id == "a"
+        assert "b" not in registry.get_filters()
+
+    def test_user_valves_come_from_request_user(self, db):
+        registry = FunctionRegistry()
+        user = {
+            "id": "u1",
+            "settings": {"functions": {"valves": {"a": {"prefix": ">"}}}},
+        }
+
+        first = registry.get_user_valves("a", user)
+        assert first.prefix == ">"
+        assert registry.get_user_valves("a", user) is first
+
+        user["settings"]["functions"]["valves"]["a"] = {"prefix": "#"}
+        assert registry.get_user_valves("a", user).prefix == "#"
+        assert registry.get_user_valves("a", {"id": "u2", "settings": None}).prefix == ""
+        assert db.user_valves_queries == 0
+
+        # Without settings on the user, fall back to the stored ones
+        assert registry.get_user_valves("a", {"id": "u3"}).prefix == "db"
+        assert db.user_valves_queries == 1
+
+    def test_invalidation_reaches_other_nodes(self, db):
+        server = fakeredis.FakeServer()
+        writer = FunctionRegistry(fakeredis.FakeRedis(server=server), "t")
+        reader = FunctionRegistry(fakeredis.FakeRedis(server=server), "t")
+
+        reader.get_filters()
+        # Give the listener thread time to subscribe; subscribing drops
+        # whatever was loaded before it
+        time.sleep(0.2)
+        reader.get_filters()
+        queries = db.queries
+
+        writer.invalidate()
+        assert wait_for(lambda: reader._entries is None)
+        reader.get_filters()
+        assert db.queries == queries + 1
@@ -0,0 +1,104 @@
+import time
+
+import fakeredis
+
+from open_webui.utils.group_cache import GroupMembershipCache, request_scope
+
+
+class Loader:
+    def __init__(self, groups=("g1",)):
+        self.groups = list(groups)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.groups)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestGroupMembershipCache:
+    def test_process_cache_serves_repeat_lookups(self):
+        cache = GroupMembershipCache(ttl=60)
+        loader = Loader()
+        assert cache.get("u1", loader) == ["g1"]
+        assert cache.get("u1", loader) == ["g1"]
+        assert loader.calls == 1
+
+    def test_expired_entries_reload(self):
+        cache = GroupMembershipCache(ttl=0.05)
+        loader = Loader()
+        cache.get("u1", loader)
+        time.sleep(0.1)
+        cache.get("u1", loader)
+        assert loader.calls == 2
+
+    def test_request_scope_without_process_cache(self):
+        cache = GroupMembershipCache(ttl=0)
+        loader = Loader()
+        with request_scope():
+            cache.get("u1", loader)
+            cache.get("u1", loader)
+        cache.get("u1", loader)
+        assert loader.calls == 2
+
+    def test_returned_list_is_a_copy(self):
+        cache = GroupMembershipCache(ttl=60)
+        cache.get("u1", Loader()).append("g2")
+        assert cache.get("u1", Loader()) == ["g1"]
+
+    def test_invalidate_users_and_everyone(self):
+        cache = GroupMembershipCache(ttl=60)
+        u1, u2 = Loader(), Loader()
+        with request_scope():
+            cache.get("u1", u1)
+            cache.get("u2", u2)
+
+            cache.invalidate(["u1"])
+            cache.get("u1", u1)
+            cache.get("u2", u2)
+            assert (u1.calls, u2.calls) == (2, 1)
+
+            cache.invalidate()
+            cache.get("u2", u2)
+            assert u2.calls == 2
+
+    def test_load_overlapping_an_invalidation_is_not_cached(self):
+        cache = GroupMembershipCache(ttl=60)
+        loader = Loader(["old"])
+
+        def stale_load():
+            # Membership changes while this load is still running
+            groups = loader()
+            loader.groups = ["new"]
+            cache.invalidate(["u1"])
+            return groups
+
+        assert cache.get("u1", stale_load) == ["old"]
+        assert cache.get("u1", loader) == ["new"]
+        assert loader.calls == 2
+
+    def test_invalidation_reaches_other_nodes(self):
+        server = fakeredis.FakeServer()
+        writer = GroupMembershipCache(60, fakeredis.FakeRedis(server=server), "t")
+        reader = GroupMembershipCache(60, fakeredis.FakeRedis(server=server), "t")
+
+        loader = Loader()
+        reader.get("u1", loader)
+        # Give the listener thread time to subscribe; subscribing drops
+        # whatever was cached before it
+        time.sleep(0.2)
+        reader.get("u1", loader)
+        calls = loader.calls
+
+        writer.invalidate(["u1"])
+        assert wait_for(lambda: "u1" not in reader._entries)
+        reader.get("u1", loader)
+        assert loader.calls == calls + 1
@@ -0,0 +1,133 @@
+import base64
+import io
+import os
+import time
+
+import fakeredis
+import pytest
+from PIL import Image
+
+from open_webui.utils import image_cache
+from open_webui.utils.image_cache import ImageCache, downscale_image
+
+
+def png(width, height, mode="RGB", noise=False):
+    if noise:
+        image = Image.frombytes(mode, (width, height), os.urandom(width * height * 3))
+    else:
+        image = Image.new(mode, (width, height))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def decode(data_uri):
+    header, data = data_uri.split(",", 1)
+    return header, Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+class FakeStore:
+    def __init__(self, **images):
+        self.images = images
+        self.loads = []
+
+    def __call__(self, url):
+        self.loads.append(url)
+        image = self.images.get(url)
+        return (image, "image/png") if image is not None else None
+
+
+@pytest.fixture
+def store():
+    return FakeStore(a=png(40, 30), b=png(10, 10), big=png(800, 600, noise=True))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestImageCache:
+    def test_repeat_turns_skip_loading(self, store):
+        cache = ImageCache(1024 * 1024, loader=store)
+        first = cache.get_data_uri("a")
+        assert first.startswith("data:image/png;base64,")
+        assert cache.get_data_uri("a") is first
+        assert cache.get_data_uri("missing") is None
+        assert cache.get_data_uri("missing") is None
+        assert store.loads == ["a", "missing", "missing"]
+
+    def test_downscales_per_max_size(self, store):
+        cache = ImageCache(1024 * 1024, loader=store)
+        header, image = decode(cache.get_data_uri("big", 200))
+        assert header == "data:image/jpeg;base64"
+        assert image.size == (200, 150)
+
+        # Each max size is cached separately; small images are left alone
+        assert decode(cache.get_data_uri("big"))[1].size == (800, 600)
+        assert cache.get_data_uri("a", 200) == cache.get_data_uri("a")
+        assert store.loads == ["big", "big", "a", "a"]
+
+    def test_downscale_keeps_transparency_and_unreadable_images(self):
+        data, content_type = downscale_image(png(100, 50, "RGBA"), "image/png", 20)
+        assert content_type == "image/png"
+        assert Image.open(io.BytesIO(data)).size == (20, 10)
+
+        svg = b"<svg xmlns='http://www.w3.org/2000/svg'/>"
+        assert downscale_image(svg, "image/svg+xml", 20) == (svg, "image/svg+xml")
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self, store):
+        size = len(ImageCache(1024 * 1024, loader=store).get_data_uri("a"))
+        cache = ImageCache(size * 2 + 10, loader=store)
+
+        cache.get_data_uri("a")
+        cache.get_data_uri("a", 20)
+        cache.get_data_uri("a")
+        cache.get_data_uri("big")  # Too big to cache at all
+        cache.get_data_uri("b")
+        assert list(cache._entries) == [("a", 0), ("b", 0)]
+        assert cache._bytes <= cache.max_bytes
+
+    def test_deleting_a_file_invalidates_its_images(self, store):
+        cache = ImageCache(1024 * 1024, loader=store)
+        cache.get_data_uri("a")
+        cache.get_data_uri("a", 20)
+        cache.get_data_uri("b")
+
+        cache.invalidate("a")
+        assert list(cache._entries) == [("b", 0)]
+        cache.invalidate()
+        assert not cache._entries and cache._bytes == 0
+
+    def test_remote_urls_expire(self, store, monkeypatch):
+        store.images["https://example.com/x.png"] = png(5, 5)
+        cache = ImageCache(1024 * 1024, loader=store)
+        cache.get_data_uri("https://example.com/x.png")
+        cache.get_data_uri("https://example.com/x.png")
+        assert len(store.loads) == 1
+
+        monkeypatch.setattr(image_cache, "URL_TTL", -1)
+        cache.invalidate()
+        cache.get_data_uri("https://example.com/x.png")
+        cache.get_data_uri("https://example.com/x.png")
+        assert len(store.loads) == 3
+
+    def test_invalidation_reaches_other_nodes(self, store):
+        server = fakeredis.FakeServer()
+        writer = ImageCache(1024 * 1024, fakeredis.FakeRedis(server=server), "t", store)
+        reader = ImageCache(1024 * 1024, fakeredis.FakeRedis(server=server), "t", store)
+
+        reader.get_data_uri("a")
+        # Give the listener thread time to subscribe; subscribing drops
+        # whatever was cached before it
+        time.sleep(0.2)
+        reader.get_data_uri("a")
+        reader.get_data_uri("b")
+
+        writer.invalidate("a")
+        assert wait_for(lambda: ("a", 0) not in reader._entries)
+        assert ("b", 0) in reader._entries
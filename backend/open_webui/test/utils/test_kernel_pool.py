@@ -0,0 +1,213 @@
+import asyncio
+import itertools
+
+import pytest
+
+from open_webui.utils import code_interpreter
+from open_webui.utils.code_interpreter import JupyterKernelPool, ResultModel
+
+
+class FakeResponse:
+    def __init__(self, data=None):
+        self.data = data or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    def post(self, url, params=None):
+        if url == "api/kernels":
+            kernel_id = f"k{next(self.server.ids)}"
+            self.server.started.append(kernel_id)
+            return FakeResponse({"id": kernel_id})
+        self.server.restarted.append(url.split("/")[2])
+        return FakeResponse()
+
+    def delete(self, url, params=None):
+        self.server.deleted.append(url.split("/")[2])
+        return FakeResponse()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, server):
+        self.session = FakeSession(server)
+        self.params = {}
+
+    def init_ws(self, kernel_id):
+        return kernel_id, {}
+
+
+class FakeWebSocket:
+    def __init__(self, kernel_id):
+        self.kernel_id = kernel_id
+
+    async def close(self):
+        pass
+
+
+class FakeJupyter:
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.started, self.restarted, self.deleted = [], [], []
+        self.sign_ins = 0
+        self.runs = []
+
+
+@pytest.fixture
+def jupyter(monkeypatch):
+    server = FakeJupyter()
+
+    async def fake_client(self, key):
+        client = self._clients.get(key)
+        if client is None:
+            server.sign_ins += 1
+            client = self._clients[key] = FakeClient(server)
+        return client
+
+    async def fake_connect(url, additional_headers=None):
+        return FakeWebSocket(url)
+
+    async def fake_run(ws, code, timeout):
+        server.runs.append((ws.kernel_id, code))
+        if code == "hang":
+            return ResultModel(stderr="Execution timed out."), False
+        return ResultModel(stdout=ws.kernel_id), True
+
+    monkeypatch.setattr(JupyterKernelPool, "_client", fake_client)
+    monkeypatch.setattr(code_interpreter.websockets, "connect", fake_connect)
+    monkeypatch.setattr(code_interpreter, "run_in_kernel", fake_run)
+    return server
+
+
+async def execute(pool, session_key, code="1"):
+    return await pool.execute("http://jupyter:8888", code, session_key)
+
+
+class TestJupyterKernelPool:
+    @pytest.mark.asyncio
+    async def test_session_reuses_kernel_and_sign_in(self, jupyter):
+        pool = JupyterKernelPool(max_size=4, idle_ttl=60)
+        pool.start()
+
+        first = await execute(pool, "chat:a")
+        second = await execute(pool, "chat:a")
+        other = await execute(pool, "chat:b")
+
+        assert first["stdout"] == second["stdout"] == "k1"
+        assert other["stdout"] == "k2"
+        assert jupyter.sign_ins == 1
+        assert pool.stats["hits"] == 1 and pool.stats["cold_starts"] == 2
+        await pool.close()
+        assert sorted(jupyter.deleted) == ["k1", "k2"]
+
+    @pytest.mark.asyncio
+    async def test_idle_session_is_reset_and_reused_as_spare(self, jupyter):
+        pool = JupyterKernelPool(max_size=4, idle_ttl=0.01)
+        pool.start()
+
+        await execute(pool, "chat:a")
+        await asyncio.sleep(0.02)
+        await pool.reap()
+        assert jupyter.restarted == ["k1"]
+
+        result = await execute(pool, "chat:b")
+        assert result["stdout"] == "k1"
+        assert pool.stats["spare_hits"] == 1
+
+        # Released again, then dropped once idle as a spare
+        await asyncio.sleep(0.02)
+        await pool.reap()
+        assert jupyter.restarted == ["k1", "k1"] and jupyter.deleted == []
+        await asyncio.sleep(0.02)
+        await pool.reap()
+        assert jupyter.deleted == ["k1"]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_full_pool_evicts_least_recently_used(self, jupyter):
+        pool = JupyterKernelPool(max_size=2, idle_ttl=60)
+        pool.start()
+
+        await execute(pool, "chat:a")
+        await execute(pool, "chat:b")
+        await execute(pool, "chat:a")
+        result = await execute(pool, "chat:c")
+        await asyncio.sleep(0)
+
+        assert result["stdout"] == "k3"
+        assert jupyter.deleted == ["k2"]
+        assert pool.stats["evictions"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_kernel_is_discarded(self, jupyter):
+        pool = JupyterKernelPool(max_size=2, idle_ttl=60)
+        pool.start()
+
+        await execute(pool, "chat:a", "hang")
+        result = await execute(pool, "chat:a")
+
+        assert jupyter.deleted == ["k1"]
+        assert result["stdout"] == "k2"
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_outside_its_loop_or_with_size_zero(self, jupyter):
+        assert not JupyterKernelPool(max_size=2, idle_ttl=60).enabled
+
+        pool = JupyterKernelPool(max_size=0, idle_ttl=60)
+        pool.start()
+        assert not pool.enabled
+
+    @pytest.mark.asyncio
+    async def test_leased_kernel_is_not_evicted_or_reaped(self, jupyter):
+        pool = JupyterKernelPool(max_size=1, idle_ttl=0.01)
+        pool.start()
+        server = ("http://jupyter:8888/", "", "")
+
+        # Handed out, but the caller has not taken kernel.lock yet
+        kernel = await pool._acquire(server, (server, "chat:a"))
+        kernel.last_used -= 1
+
+        assert await execute(pool, "chat:b") is None
+        await pool.reap()
+        assert jupyter.deleted == [] and jupyter.restarted == []
+        assert pool._sessions == {(server, "chat:a"): kernel}
+
+        kernel.leases -= 1
+        assert (await execute(pool, "chat:b"))["stdout"] == "k2"
+        await asyncio.sleep(0)
+        assert jupyter.deleted == ["k1"]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_session_locks_are_dropped_on_every_exit(self, jupyter):
+        pool = JupyterKernelPool(max_size=1, idle_ttl=60)
+        pool.start()
+
+        await asyncio.gather(execute(pool, "chat:a"), execute(pool, "chat:a", "2"))
+        assert await execute(pool, "chat:b", "hang") is not None
+        await execute(pool, "chat:c")
+
+        # Full, with nothing that can be evicted
+        pool._evict_one = lambda: False
+        assert await execute(pool, "chat:d") is None
+        assert pool._key_locks == {}
+        await pool.close()
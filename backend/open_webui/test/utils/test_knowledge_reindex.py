@@ -0,0 +1,194 @@
+"""
+Tests for the background knowledge reindex runner and its checkpoints.
+
+The checkpoint tables live in a SQLite database; embedding and the
+vector DB are replaced by fakes that record which files were re-embedded.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.models import knowledge_reindex as knowledge_reindex_model
+from open_webui.models.knowledge_reindex import (
+    KnowledgeReindex,
+    KnowledgeReindexFile,
+    KnowledgeReindexJob,
+)
+from open_webui.retrieval.vector.main import GetResult
+from open_webui.utils import knowledge_reindex
+from open_webui.utils.knowledge_reindex import (
+    KnowledgeReindexRunner,
+    get_reindex_job_status,
+    get_resumable_job,
+)
+
+FILES = ["f1", "f2", "f3", "f4", "f5"]
+
+
+class FakeVectorDB:
+    """Chunk id -> file id, per collection."""
+
+    def __init__(self):
+        self.chunks: dict[str, dict[str, str]] = {}
+
+    def add(self, collection_name, chunk_id, file_id):
+        self.chunks.setdefault(collection_name, {})[chunk_id] = file_id
+
+    def query(self, collection_name, filter, limit=None):
+        chunks = self.chunks.get(collection_name, {})
+        ids = [id for id, file_id in chunks.items() if file_id == filter["file_id"]]
+        return GetResult(ids=[ids], documents=[ids], metadatas=[[{}] * len(ids)])
+
+    def get(self, collection_name):
+        chunks = self.chunks.get(collection_name, {})
+        return GetResult(
+            ids=[list(chunks)],
+            documents=[list(chunks)],
+            metadatas=[[{"file_id": file_id} for file_id in chunks.values()]],
+        )
+
+    def delete(self, collection_name, ids=None, filter=None):
+        for id in ids or []:
+            self.chunks.get(collection_name, {}).pop(id, None)
+
+
+class FakeEmbedFile:
+    """
+    Embeds a file as one new chunk. A hook in `on_file` runs once, after the
+    file's chunks are written and before the runner checkpoints it.
+    """
+
+    def __init__(self, vector_db):
+        self.vector_db = vector_db
+        self.embedded = []
+        self.on_file = {}
+
+    def __call__(self, request, knowledge_id, file_id, user):
+        self.embedded.append(file_id)
+        self.vector_db.add(knowledge_id, f"{file_id}-{len(self.embedded)}", file_id)
+        hook = self.on_file.pop(file_id, None)
+        if hook:
+            hook()
+
+
+@pytest.fixture
+def reindex(monkeypatch, tmp_path):
+    # On disk so the runner's worker threads each get their own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'webui.db'}")
+    for model in (KnowledgeReindexJob, KnowledgeReindexFile):
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_db_context(db=None):
+        with Session() as session:
+            yield session
+
+    vector_db = FakeVectorDB()
+    for file_id in FILES:
+        vector_db.add("k1", f"{file_id}-old", file_id)
+    # A file that has since been removed from the knowledge base
+    vector_db.add("k1", "removed-old", "removed")
+    embed_file = FakeEmbedFile(vector_db)
+
+    monkeypatch.setattr(knowledge_reindex_model, "get_db_context", get_db_context)
+    monkeypatch.setattr(
+        knowledge_reindex,
+        "Knowledges",
+        SimpleNamespace(
+            get_files_by_id=lambda id: [SimpleNamespace(id=f) for f in FILES]
+        ),
+    )
+    return SimpleNamespace(
+        vector_db=vector_db,
+        embed_file=embed_file,
+        runner=lambda: KnowledgeReindexRunner(vector_db, embed_file),
+    )
+
+
+def statuses(job_id):
+    return {
+        item.file_id: item.status
+        for item in KnowledgeReindex.get_pending_files_by_job_id(job_id)
+    }
+
+
+async def run(runner, job, concurrency=1):
+    runner.start(None, job, SimpleNamespace(id="admin"), concurrency)
+    await runner._tasks[job.id]
+
+
+class TestKnowledgeReindexRunner:
+    @pytest.mark.asyncio
+    async def test_interrupted_job_resumes_from_checkpoint(self, reindex):
+        job = KnowledgeReindex.create_job("admin", [("k1", f) for f in FILES])
+        runner = reindex.runner()
+        loop = asyncio.get_running_loop()
+
+        def interrupt():
+            # The worker goes away before f3 is checkpointed
+            loop.call_soon_threadsafe(runner._tasks[job.id].cancel)
+
+        reindex.embed_file.on_file["f3"] = interrupt
+        with pytest.raises(asyncio.CancelledError):
+            await run(runner, job)
+
+        assert reindex.embed_file.embedded == ["f1", "f2", "f3"]
+        assert statuses(job.id) == {"f3": "pending", "f4": "pending", "f5": "pending"}
+
+        # Still marked running; resumable once its heartbeat goes stale
+        job = get_resumable_job()
+        assert job.status == "running"
+        assert reindex.runner().is_active(job)
+        job = KnowledgeReindex.update_job_by_id(
+            job.id, {"heartbeat_at": int(time.time()) - 3600}
+        )
+        assert not reindex.runner().is_active(job)
+
+        await run(reindex.runner(), job)
+
+        # Finished files are not embedded again
+        assert reindex.embed_file.embedded == ["f1", "f2", "f3", "f3", "f4", "f5"]
+        status = get_reindex_job_status(KnowledgeReindex.get_job_by_id(job.id))
+        assert status["status"] == "completed"
+        assert (status["done"], status["failed"], status["remaining"]) == (5, 0, 0)
+        assert get_resumable_job() is None
+
+        # One chunk per file from its last embedding; the old, the
+        # interrupted and the removed file's chunks are gone
+        assert reindex.vector_db.chunks["k1"] == {
+            "f1-1": "f1",
+            "f2-2": "f2",
+            "f3-4": "f3",
+            "f4-5": "f4",
+            "f5-6": "f5",
+        }
+
+    @pytest.mark.asyncio
+    async def test_failed_file_is_recorded_and_the_job_completes(self, reindex):
+        job = KnowledgeReindex.create_job("admin", [("k1", f) for f in FILES])
+
+        def fail():
+            raise RuntimeError("embedding service down")
+
+        reindex.embed_file.on_file["f2"] = fail
+        await run(reindex.runner(), job, concurrency=2)
+
+        status = get_reindex_job_status(KnowledgeReindex.get_job_by_id(job.id))
+        assert status["status"] == "completed"
+        assert (status["done"], status["failed"]) == (4, 1)
+        assert status["failed_files"] == [
+            {
+                "knowledge_id": "k1",
+                "file_id": "f2",
+                "error": "embedding service down",
+            }
+        ]
+        # The old chunks of the failed file are kept
+        assert "f2-old" in reindex.vector_db.chunks["k1"]
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.models.local_service import (
+    InferenceServer,
+    LocalInferenceService,
+    LocalServiceEmbedder,
+    LocalServiceReranker,
+)
+
+
+class FakeEmbedder:
+    def __init__(self, name):
+        self.name = name
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, prompt=None):
+        self.batches.append(list(texts))
+        time.sleep(0.05)
+        return np.array([[len(t), len(prompt or "")] for t in texts], dtype=float)
+
+
+class FakeCrossEncoder:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs):
+        self.batches.append(list(pairs))
+        return np.array([len(d) / 10 for _, d in pairs])
+
+
+class FakeColBERT(BaseReranker):
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, sentences):
+        self.batches.append(list(sentences))
+        return [1.0 if d.startswith(sentences[0][0]) else 0.0 for _, d in sentences]
+
+
+class Loader:
+    def __init__(self, reranker=FakeCrossEncoder):
+        self.reranker = reranker
+        self.models = {}
+        self.loads = []
+
+    def __call__(self, kind, name):
+        self.loads.append((kind, name))
+        if name == "broken":
+            raise RuntimeError(f"Failed to load {kind} model {name}")
+        model = FakeEmbedder(name) if kind == "embed" else self.reranker()
+        self.models[kind] = model
+        return model
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 characters
+    path = f"/tmp/owui-test-{os.getpid()}-{time.monotonic_ns()}.sock"
+    yield path
+    for leftover in (path, f"{path}.lock"):
+        if os.path.exists(leftover):
+            os.unlink(leftover)
+
+
+@pytest.fixture
+def serve(socket_path):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def serve(loader, max_batch_size=32, max_wait=0.05):
+        server = InferenceServer(socket_path, loader, max_batch_size, max_wait)
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        servers.append(server)
+        return LocalInferenceService(socket_path, timeout=5)
+
+    yield serve
+
+    for server in servers:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+class TestInferenceServer:
+    def test_concurrent_requests_share_a_batch(self, serve):
+        loader = Loader()
+        service = serve(loader)
+        embedder = LocalServiceEmbedder(service, "minilm")
+
+        texts = [["a"], ["bb", "ccc"], "dddd", ["eeeee"]]
+        with ThreadPoolExecutor(len(texts)) as pool:
+            results = list(pool.map(embedder.encode, texts))
+
+        assert results == [[[1, 0]], [[2, 0], [3, 0]], [4, 0], [[5, 0]]]
+        assert loader.loads == [("embed", "minilm")]
+        assert len(loader.models["embed"].batches) < len(texts)
+
+    def test_large_requests_are_split(self, serve):
+        loader = Loader()
+        service = serve(loader, max_batch_size=2, max_wait=0)
+
+        vectors = service.embed("minilm", ["a", "bb", "ccc", "dddd", "eeeee"], "q: ")
+        assert vectors == [[n, 3] for n in range(1, 6)]
+        assert [len(b) for b in loader.models["embed"].batches] == [2, 2, 1]
+
+    def test_rerank_batches_cross_encoder_but_not_colbert(self, serve):
+        loader = Loader()
+        service = serve(loader)
+        reranker = LocalServiceReranker(service, "bge")
+
+        pairs = [[("q", "x" * n) for n in range(1, 4)], [("r", "yyyyy")]]
+        with ThreadPoolExecutor(2) as pool:
+            scores = list(pool.map(reranker.predict, pairs))
+        assert scores == [pytest.approx([0.1, 0.2, 0.3]), pytest.approx([0.5])]
+
+        loader.reranker = FakeColBERT
+        colbert = LocalServiceReranker(service, "jinaai/jina-colbert-v2")
+        pairs = [[("a", "ab"), ("a", "b")], [("b", "ab"), ("b", "b")]]
+        with ThreadPoolExecutor(2) as pool:
+            scores = list(pool.map(colbert.predict, pairs))
+        assert scores == [[1.0, 0.0], [0.0, 1.0]]
+        # Each request against its own query
+        assert all(len({q for q, _ in b}) == 1 for b in loader.models["rerank"].batches)
+
+    def test_switching_models_and_errors(self, serve):
+        loader = Loader()
+        service = serve(loader)
+
+        service.embed("a", ["x"])
+        service.embed("b", ["x"])
+        service.embed("b", ["y"])
+        assert loader.loads == [("embed", "a"), ("embed", "b")]
+        assert service.stats()["models"] == {"embed": "b"}
+
+        with pytest.raises(Exception, match="Failed to load embed model broken"):
+            service.embed("broken", ["x"])
+        # The connection is still usable after an error
+        assert service.embed("b", ["zz"]) == [[2, 0]]
+
+    def test_client_waits_for_sidecar_to_start(self, serve, socket_path):
+        service = LocalInferenceService(socket_path, timeout=5)
+        result = {}
+
+        def request():
+            result["vectors"] = service.embed("minilm", ["abc"])
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        time.sleep(0.3)
+        serve(Loader())
+        thread.join(timeout=5)
+        assert result["vectors"] == [[3, 0]]
+
+
+class TestSupervisor:
+    def test_one_worker_runs_the_sidecar_and_others_take_over(self, socket_path):
+        command = [sys.executable, "-c", "import time; time.sleep(60)", "--"]
+        workers = [
+            LocalInferenceService(socket_path, command=command, lock_retry=0.1)
+            for _ in range(2)
+        ]
+
+        def running():
+            return [w for w in workers if w._process and w._process.poll() is None]
+
+        try:
+            for worker in workers:
+                worker.start()
+            deadline = time.monotonic() + 5
+            while not running() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            time.sleep(0.3)
+            assert len(running()) == 1
+
+            owner = running()[0]
+            process = owner._process
+            owner.close()
+            assert process.poll() is not None
+
+            deadline = time.monotonic() + 5
+            while not running() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert [w is not owner for w in running()] == [True]
+        finally:
+            for worker in workers:
+                worker.close()
+
+    def test_restarts_sidecar_that_exits(self, socket_path):
+        command = [sys.executable, "-c", "import sys; sys.exit(1)", "--"]
+        service = LocalInferenceService(socket_path, command=command)
+        try:
+            service.start()
+            deadline = time.monotonic() + 5
+            seen = set()
+            while len(seen) < 2 and time.monotonic() < deadline:
+                if service._process is not None:
+                    seen.add(service._process.pid)
+                time.sleep(0.05)
+            assert len(seen) == 2
+        finally:
+            service.close()
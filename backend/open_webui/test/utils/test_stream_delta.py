@@ -0,0 +1,178 @@
+import json
+
+from open_webui.utils.stream_delta import (
+    ChatStreamEncoder,
+    ChatStreamEncoders,
+    apply_patch,
+)
+
+
+def message_item(text, status="in_progress"):
+    return {
+        "type": "message",
+        "id": "msg_1",
+        "status": status,
+        "content": [{"type": "output_text", "text": text}],
+    }
+
+
+def replay(events):
+    """Rebuild message state from encoded events the way a client does."""
+    state = {}
+    for event in events:
+        event = json.loads(json.dumps(event))
+        if event.get("snapshot"):
+            state = {k: event[k] for k in ("content", "output") if k in event}
+        else:
+            apply_patch(state, event["patch"])
+    return state
+
+
+class TestChatStreamEncoder:
+    def test_first_event_is_snapshot_then_appends(self):
+        encoder = ChatStreamEncoder()
+        first = encoder.encode({"content": "Hel", "output": [message_item("Hel")]})
+        second = encoder.encode({"content": "Hello", "output": [message_item("Hello")]})
+
+        assert first["snapshot"] is True and first["seq"] == 1
+        assert second["seq"] == 2
+        assert "content" not in second and "output" not in second
+        assert second["patch"] == [
+            {"op": "append", "path": ["content"], "text": "lo"},
+            {
+                "op": "append",
+                "path": ["output", 0, "content", 0, "text"],
+                "text": "lo",
+            },
+        ]
+
+    def test_rewritten_tail_is_spliced(self):
+        encoder = ChatStreamEncoder()
+        encoder.encode({"content": "abc <think"})
+        event = encoder.encode({"content": "abc <details>"})
+
+        assert event["patch"] == [
+            {"op": "splice", "path": ["content"], "at": 5, "text": "details>"}
+        ]
+
+    def test_splice_offset_counts_utf16_units(self):
+        encoder = ChatStreamEncoder()
+        encoder.encode({"content": "😀 abc <think"})
+        event = encoder.encode({"content": "😀 abc <details>"})
+
+        # The emoji is one character here but two code units in JavaScript
+        assert event["patch"] == [
+            {"op": "splice", "path": ["content"], "at": 8, "text": "details>"}
+        ]
+        assert apply_patch({"content": "😀 abc <think"}, event["patch"]) == {
+            "content": "😀 abc <details>"
+        }
+
+    def test_structural_changes_replay_to_the_same_state(self):
+        updates = [
+            {"content": "a", "output": [message_item("a")]},
+            {"content": "ab", "output": [message_item("ab")]},
+            {
+                "content": "ab<x>",
+                "output": [
+                    message_item("ab", "completed"),
+                    {"type": "reasoning", "id": "r_1", "content": []},
+                ],
+            },
+            {"content": "ab", "output": [message_item("ab", "completed")]},
+            {"usage": {"total_tokens": 3}, "content": "ab!"},
+        ]
+        encoder = ChatStreamEncoder()
+        events = [encoder.encode(update) for update in updates]
+
+        assert replay(events) == {
+            "content": "ab!",
+            "output": [message_item("ab", "completed")],
+        }
+        assert events[-1]["usage"] == {"total_tokens": 3}
+
+    def test_periodic_and_done_snapshots(self):
+        encoder = ChatStreamEncoder(snapshot_interval=2)
+        events = [encoder.encode({"content": "x" * i}) for i in range(1, 6)]
+        assert [bool(e.get("snapshot")) for e in events] == [
+            True,
+            False,
+            False,
+            True,
+            False,
+        ]
+        assert encoder.encode({"content": "done", "done": True})["snapshot"]
+
+    def test_invalidate_forces_snapshot(self):
+        encoder = ChatStreamEncoder()
+        encoder.encode({"content": "a"})
+        encoder.invalidate()
+        assert encoder.encode({"content": "ab"})["snapshot"]
+
+    def test_events_without_stream_fields_pass_through(self):
+        encoder = ChatStreamEncoder()
+        data = {"usage": {"total_tokens": 1}}
+        assert encoder.encode(data) is data
+        assert encoder.seq == 0
+
+    def test_caller_ops_are_sent_without_loading_the_message(self):
+        encoder = ChatStreamEncoder()
+        loads = []
+
+        def load():
+            loads.append(1)
+            return {"content": "Hello"}
+
+        events = [encoder.encode_ops([], load, None)]
+        for text in (" wor", "ld"):
+            ops = [{"op": "append", "path": ["content"], "text": text}]
+            events.append(encoder.encode_ops(ops, load, encoder.seq))
+
+        assert len(loads) == 1
+        assert events[1] == {"seq": 2, "patch": [events[1]["patch"][0]]}
+        assert replay(events) == {"content": "Hello world"}
+        assert encoder.snapshot()["content"] == "Hello world"
+
+        # Full updates still diff against the state the ops built
+        event = encoder.encode({"content": "Hello world!"})
+        assert event["patch"] == [{"op": "append", "path": ["content"], "text": "!"}]
+        # and pass through once encoded
+        assert encoder.encode(event) is event
+
+    def test_caller_ops_against_an_old_event_are_not_used(self):
+        encoder = ChatStreamEncoder()
+        encoder.encode({"content": "a"})
+        encoder.encode({"content": "ab"})
+
+        # Built against event 1, so "b" would be appended twice
+        ops = [{"op": "append", "path": ["content"], "text": "bc"}]
+        event = encoder.encode_ops(ops, lambda: {"content": "abc"}, 1)
+        assert event["patch"] == [{"op": "append", "path": ["content"], "text": "c"}]
+
+    def test_since_returns_missed_events_or_none(self):
+        encoder = ChatStreamEncoder(history_size=3)
+        for i in range(1, 6):
+            encoder.encode({"content": "x" * i})
+
+        assert [e["seq"] for e in encoder.since(3)] == [4, 5]
+        assert encoder.since(5) == []
+        assert encoder.since(1) is None
+        assert encoder.snapshot() == {"content": "xxxxx", "seq": 5, "snapshot": True}
+
+
+class TestChatStreamEncoders:
+    def test_shared_sequence_per_message_and_bounded(self):
+        encoders = ChatStreamEncoders(max_messages=2)
+        encoders.encode("c1", "m1", {"content": "a"})
+        assert encoders.encode("c1", "m1", {"content": "ab"})["seq"] == 2
+
+        encoders.encode("c1", "m2", {"content": "a"})
+        encoders.encode("c2", "m3", {"content": "a"})
+        assert encoders.get("c1", "m1") is None
+        assert encoders.get("c2", "m3").seq == 1
+
+    def test_streams_are_only_found_through_their_chat(self):
+        encoders = ChatStreamEncoders()
+        encoders.encode("c1", "m1", {"content": "secret"})
+        assert encoders.get("c2", "m1") is None
+        assert encoders.get("c1", "m1").snapshot()["content"] == "secret"
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from open_webui.utils.stream_tags import StreamTagScanner, start_tag_pattern
+
+TAGS = [
+    ("<think>", "</think>"),
+    ("<reasoning>", "</reasoning>"),
+    ("<|begin_of_thought|>", "<|end_of_thought|>"),
+    ("◁think▷", "◁/think▷"),
+]
+
+
+def naive_start(text, tags):
+    """The full-text search the streaming handler used to run per chunk."""
+    for start_tag, end_tag in tags:
+        match = start_tag_pattern(start_tag).search(text)
+        if match:
+            return start_tag, match.span()
+    return None
+
+
+def chunked(text, seed):
+    rng = random.Random(seed)
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 6)
+        yield text[: i + step]
+        i += step
+
+
+TEXTS = [
+    "Sure.\n<think>\nplan</think>answer",
+    'Intro <think type="summary" depth="2">body',
+    "<thin no tag here <think\n>split attributes",
+    "a <thinking> is not <think",
+    "text then <|begin_of_thought|> trace",
+    "unicode ◁think▷ trace",
+    "first <reasoning> wins over later <think>",
+    "plain text " * 50,
+    "<think x=\"1\"\ny> two lines is no tag <think>",
+]
+
+
+class TestStreamTagScanner:
+    @pytest.mark.parametrize("text", TEXTS)
+    @pytest.mark.parametrize("seed", range(5))
+    def test_start_matches_full_search_at_every_chunk(self, text, seed):
+        scanner = StreamTagScanner()
+        for prefix in chunked(text, seed):
+            found = scanner.search_start("msg_1", prefix, TAGS)
+            result = (found[0], found[2].span()) if found else None
+            assert result == naive_start(prefix, TAGS)
+            if found:
+                break
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_end_tag_split_across_chunks(self, seed):
+        scanner = StreamTagScanner()
+        text = "step one, step two </thi nk> still </think> after"
+        for prefix in chunked(text, seed):
+            found = scanner.has_end("r_1", prefix, "</think>")
+            assert found == ("</think>" in prefix)
+            if found:
+                break
+
+    def test_rewritten_text_is_scanned_again(self):
+        scanner = StreamTagScanner()
+        assert scanner.search_start("msg_1", "a" * 100, TAGS) is None
+        found = scanner.search_start("msg_1", "<think>" + "b" * 100, TAGS)
+        assert found and found[0] == "<think>"
+
+    def test_items_are_tracked_separately(self):
+        scanner = StreamTagScanner()
+        assert not scanner.has_end("r_1", "x" * 50, "</think>")
+        assert scanner.has_end("r_2", "</think>", "</think>")
@@ -2,12 +2,20 @@ import math
 import pytest
 from unittest.mock import AsyncMock
 
+import numpy as np
+
 from open_webui.utils.topic_classifier import (
     TopicConfig,
     SplitDecision,
     cosine_similarity,
+    batch_cosine_similarity,
     compute_running_topic_embedding,
+    update_topic_centroid,
+    seed_topic_centroid,
+    encode_embedding,
+    decode_embedding,
     classify_topic_shift,
+    score_topic_shifts,
     LLM_CONFIRMATION_PROMPT,
 )
 
@@ -363,3 +371,125 @@ class TestClassifyTopicShift:
             message_count=5,
         )
         assert result.should_split is False
+
+
+class TestUpdateTopicCentroid:
+    """Tests for the incremental decayed centroid."""
+
+    def test_first_embedding_is_centroid(self):
+        centroid, weight = update_topic_centroid(None, 0.0, [1.0, 2.0])
+        assert centroid.tolist() == pytest.approx([1.0, 2.0])
+        assert weight == 1.0
+
+    def test_matches_unbounded_window_recompute(self):
+        embeddings = [[1.0, 0.0], [0.0, 1.0], [3.0, 1.0], [0.5, 0.5]]
+        centroid, weight = None, 0.0
+        for emb in embeddings:
+            centroid, weight = update_topic_centroid(centroid, weight, emb, decay=0.5)
+
+        expected = compute_running_topic_embedding(
+            embeddings, decay=0.5, window=len(embeddings)
+        )
+        assert centroid.tolist() == pytest.approx(expected, rel=1e-5)
+        assert weight == pytest.approx(1 + 0.5 + 0.25 + 0.125)
+
+    def test_dimension_change_resets(self):
+        centroid, weight = update_topic_centroid(
+            np.array([1.0, 0.0], dtype=np.float32), 2.0, [0.0, 1.0, 0.0]
+        )
+        assert centroid.tolist() == pytest.approx([0.0, 1.0, 0.0])
+        assert weight == 1.0
+
+    def test_seed_from_legacy_embeddings(self):
+        embeddings = [[1.0, 0.0], [0.0, 1.0]]
+        centroid, weight = seed_topic_centroid(embeddings, decay=0.5, window=5)
+        assert centroid.tolist() == pytest.approx([1 / 3, 2 / 3])
+        assert weight == pytest.approx(1.5)
+
+        # Continuing from the seed matches recomputing over the full history
+        centroid, _ = update_topic_centroid(centroid, weight, [1.0, 1.0], decay=0.5)
+        expected = compute_running_topic_embedding(
+            embeddings + [[1.0, 1.0]], decay=0.5, window=5
+        )
+        assert centroid.tolist() == pytest.approx(expected, rel=1e-5)
+
+    def test_seed_empty(self):
+        assert seed_topic_centroid([]) == (None, 0.0)
+
+
+class TestEmbeddingBlob:
+    """Tests for packed embedding storage."""
+
+    def test_float32_roundtrip(self):
+        emb = [0.1, -0.2, 0.3]
+        blob = encode_embedding(emb)
+        assert len(blob) == 1 + 3 * 4
+        assert decode_embedding(blob).tolist() == pytest.approx(emb, rel=1e-6)
+
+    def test_float16_roundtrip(self):
+        emb = [0.1, -0.2, 0.3]
+        blob = encode_embedding(emb, dtype="float16")
+        assert len(blob) == 1 + 3 * 2
+        decoded = decode_embedding(blob)
+        assert decoded.dtype == np.float32
+        assert decoded.tolist() == pytest.approx(emb, rel=1e-2)
+
+    def test_empty_blob(self):
+        assert decode_embedding(None) is None
+        assert decode_embedding(b"") is None
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            decode_embedding(b"\xff\x00\x00\x00\x00")
+
+    def test_unsupported_dtype(self):
+        with pytest.raises(ValueError):
+            encode_embedding([1.0], dtype="float64")
+
+
+class TestBatchScoring:
+    """Tests for the batch similarity API."""
+
+    def test_batch_cosine_matches_scalar(self):
+        a = [[1.0, 2.0, 3.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+        b = [[4.0, 5.0, 6.0], [0.0, 1.0, 0.0], [1.0, 1.0, 1.0]]
+        result = batch_cosine_similarity(a, b)
+        expected = [cosine_similarity(x, y) for x, y in zip(a, b)]
+        assert result.tolist() == pytest.approx(expected, rel=1e-6)
+
+    def test_batch_shape_mismatch(self):
+        result = batch_cosine_similarity([[1.0, 0.0]], [[1.0, 0.0, 0.0]])
+        assert result.tolist() == [0.0]
+
+    def test_score_topic_shifts(self):
+        config = TopicConfig(enabled=True, similarity_threshold=0.65)
+        decisions = score_topic_shifts(
+            [[1.0, 0.0], [0.0, 1.0]],
+            [[1.0, 0.0], [1.0, 0.0]],
+            config,
+        )
+        assert [d.should_split for d in decisions] == [False, True]
+        assert decisions[1].confidence == pytest.approx(1.0)
+        assert decisions[0].similarity_score == pytest.approx(1.0)
+
+    def test_score_topic_shifts_disabled(self):
+        decisions = score_topic_shifts(
+            [[0.0, 1.0]], [[1.0, 0.0]], TopicConfig(enabled=False)
+        )
+        assert decisions[0].should_split is False
+        assert decisions[0].similarity_score == pytest.approx(0.0)
+
+    @pytest.mark.asyncio
+    async def test_precomputed_topic_embedding(self):
+        config = TopicConfig(enabled=True, use_llm_confirmation=False)
+        result = await classify_topic_shift(
+            new_message="New",
+            new_embedding=[0.0, 1.0],
+            chat_message_embeddings=[],
+            chat_topic_summary="Old",
+            config=config,
+            message_count=5,
+            topic_embedding=np.array([1.0, 0.0], dtype=np.float32),
+        )
+        assert result.should_split is True
+        assert result.similarity_score == pytest.approx(0.0)
@@ -0,0 +1,246 @@
+import asyncio
+from collections import Counter
+
+import fakeredis
+import pytest
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from open_webui.utils.upstream_router import Candidate, UpstreamRouter
+
+A, B, C = "http://a:11434", "http://b:11434", "http://c:11434"
+
+
+def candidates(*urls, weights=None, resident=()):
+    weights = weights or {}
+    return [
+        Candidate(
+            idx=i,
+            url=url,
+            weight=weights.get(url, 1.0),
+            resident=url in resident if resident else None,
+        )
+        for i, url in enumerate(urls)
+    ]
+
+
+async def choose(router, *urls, **kwargs):
+    return (await router.choose(candidates(*urls, **kwargs))).url
+
+
+class TestStrategies:
+    @pytest.mark.asyncio
+    async def test_least_outstanding_avoids_busy_connection(self):
+        router = UpstreamRouter("least_outstanding")
+        await router.acquire(A)
+        await router.acquire(A)
+        await router.acquire(B)
+
+        assert await choose(router, A, B, C) == C
+        await router.acquire(C)
+        assert await choose(router, A, B, C) in (B, C)
+
+    @pytest.mark.asyncio
+    async def test_least_outstanding_is_relative_to_weight(self):
+        router = UpstreamRouter("least_outstanding")
+        for _ in range(3):
+            await router.acquire(A)
+        await router.acquire(B)
+
+        assert await choose(router, A, B, weights={A: 4}) == A
+
+    @pytest.mark.asyncio
+    async def test_weighted_round_robin_follows_weights(self):
+        router = UpstreamRouter("weighted")
+        picks = Counter(
+            [await choose(router, A, B, weights={A: 3, B: 1}) for _ in range(8)]
+        )
+        assert picks == {A: 6, B: 2}
+
+    @pytest.mark.asyncio
+    async def test_zero_weight_drains_connection(self):
+        router = UpstreamRouter("least_outstanding")
+        picks = {await choose(router, A, B, weights={B: 0}) for _ in range(10)}
+        assert picks == {A}
+
+    @pytest.mark.asyncio
+    async def test_ewma_prefers_faster_connection(self):
+        router = UpstreamRouter("ewma")
+        # Unmeasured connections are tried first
+        router.record_latency(A, 2.0)
+        assert await choose(router, A, B) == B
+
+        router.record_latency(B, 0.5)
+        assert await choose(router, A, B) == B
+
+        # ...until its queue outweighs the latency gap
+        for _ in range(4):
+            await router.acquire(B)
+        assert await choose(router, A, B) == A
+
+    @pytest.mark.asyncio
+    async def test_affinity_prefers_resident_connection(self):
+        router = UpstreamRouter("affinity")
+        await router.acquire(B)
+        assert await choose(router, A, B, resident=(B,)) == B
+        assert await choose(router, A, B) == A
+
+
+class TestHealth:
+    @pytest.mark.asyncio
+    async def test_failures_eject_with_backoff_and_success_restores(self):
+        router = UpstreamRouter(eject_after=2, eject_base=60)
+        await router.acquire(B)
+        await router.acquire(B)
+
+        router.record_failure(A)
+        assert await choose(router, A, B) == A
+
+        router.record_failure(A)
+        assert {await choose(router, A, B) for _ in range(5)} == {B}
+        first_backoff = router._node(A).ejected_until
+
+        router.record_failure(A)
+        assert router._node(A).ejected_until > first_backoff + 50
+
+        router.record_success(A)
+        assert await choose(router, A, B) == A
+
+    @pytest.mark.asyncio
+    async def test_all_ejected_falls_back_to_first_due(self):
+        router = UpstreamRouter(eject_after=1, eject_base=60)
+        router.record_failure(A)
+        router.record_failure(A)
+        router.record_failure(B)
+        assert await choose(router, A, B) == B
+
+    @pytest.mark.asyncio
+    async def test_lease_reports_status(self):
+        router = UpstreamRouter(eject_after=1)
+        lease = await router.acquire(A)
+        lease.report(404)
+        assert router._node(A).failures == 0
+        lease.report(503)
+        assert router._node(A).failures == 1
+
+
+class TestLeases:
+    @pytest.mark.asyncio
+    async def test_stream_measures_first_byte_and_releases(self):
+        router = UpstreamRouter()
+        lease = await router.acquire(A)
+
+        async def stream():
+            await asyncio.sleep(0.05)
+            yield b"a"
+            yield b"b"
+
+        assert [chunk async for chunk in lease.wrap_stream(stream())] == [b"a", b"b"]
+        assert router._node(A).in_flight == 0
+        assert router._node(A).latency >= 0.05
+
+        # Releasing twice only counts once
+        await router.acquire(A)
+        await lease.release()
+        assert router._node(A).in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_error_counts_as_failure(self):
+        router = UpstreamRouter(eject_after=1)
+        lease = await router.acquire(A)
+
+        async def stream():
+            yield b"a"
+            raise ConnectionResetError()
+
+        with pytest.raises(ConnectionResetError):
+            async for _ in lease.wrap_stream(stream()):
+                pass
+        assert router._node(A).failures == 1
+        assert router._node(A).in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_client_gone_before_body_releases_in_background(self):
+        router = UpstreamRouter()
+        lease = await router.acquire(A)
+
+        async def stream():
+            yield b"a"
+
+        response = StreamingResponse(
+            lease.wrap_stream(stream()), background=BackgroundTask(lease.release)
+        )
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # Still sending the headers when the client goes away
+            await asyncio.sleep(10)
+
+        await response({"type": "http"}, receive, send)
+        assert router._node(A).in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_local_leases_stop_counting(self):
+        router = UpstreamRouter(lease_ttl=0.05)
+        await router.acquire(A)
+        assert await router._in_flight([A]) == [1]
+        await asyncio.sleep(0.1)
+        assert await router._in_flight([A]) == [0]
+
+    @pytest.mark.asyncio
+    async def test_in_flight_is_shared_through_redis(self):
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        worker_1, worker_2 = UpstreamRouter(), UpstreamRouter()
+        worker_1.start(redis)
+        worker_2.start(redis)
+
+        lease = await worker_1.acquire(A)
+        assert await choose(worker_2, A, B) == B
+
+        await lease.release()
+        assert await worker_2._in_flight([A, B]) == [0, 0]
+
+    @pytest.mark.asyncio
+    async def test_expired_redis_leases_stop_counting(self):
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        router = UpstreamRouter(lease_ttl=0.05)
+        router.start(redis)
+
+        await router.acquire(A)
+        assert await router._in_flight([A]) == [1]
+        await asyncio.sleep(0.1)
+        assert await router._in_flight([A]) == [0]
+
+
+class TestResidency:
+    @pytest.mark.asyncio
+    async def test_refresh_loads_once_per_ttl(self):
+        router = UpstreamRouter("affinity", residency_ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return ["llama3:latest"]
+
+        assert router.is_resident(A, "llama3:latest") is None
+        router.refresh_residency(A, loader)
+        router.refresh_residency(A, loader)
+        await asyncio.sleep(0)
+        router.refresh_residency(A, loader)
+
+        assert calls == [1]
+        assert router.is_resident(A, "llama3:latest")
+        assert router.is_resident(A, "qwen3:8b") is False
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_previous_state(self):
+        router = UpstreamRouter("affinity", residency_ttl=0)
+
+        async def down():
+            return None
+
+        router.refresh_residency(A, down)
+        await asyncio.sleep(0)
+        assert router.is_resident(A, "llama3:latest") is None
@@ -447,7 +447,10 @@ async def execute_code(
                 result = str(output) if output else ""
 
         elif engine == "jupyter":
-            from open_webui.utils.code_interpreter import execute_code_jupyter
+            from open_webui.utils.code_interpreter import (
+                execute_code_jupyter,
+                get_kernel_session_key,
+            )
 
             output = await execute_code_jupyter(
                 __request__.app.state.config.CODE_INTERPRETER_JUPYTER_URL,
@@ -465,6 +468,10 @@ async def execute_code(
                     else None
                 ),
                 __request__.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
+                session_key=get_kernel_session_key(
+                    __metadata__.get("chat_id") if __metadata__ else None,
+                    __user__.get("id") if __user__ else None,
+                ),
             )
 
             stdout = output.get("stdout", "")
@@ -487,7 +494,8 @@ async def execute_code(
                 stdout_lines = stdout.split("\n")
                 for idx, line in enumerate(stdout_lines):
                     if "data:image/png;base64" in line:
-                        image_url = get_image_url_from_base64(
+                        image_url = await asyncio.to_thread(
+                            get_image_url_from_base64,
                             __request__,
                             line,
                             __metadata__ or {},
@@ -502,7 +510,8 @@ async def execute_code(
                 result_lines = result.split("\n")
                 for idx, line in enumerate(result_lines):
                     if "data:image/png;base64" in line:
-                        image_url = get_image_url_from_base64(
+                        image_url = await asyncio.to_thread(
+                            get_image_url_from_base64,
                             __request__,
                             line,
                             __metadata__ or {},
@@ -1017,7 +1026,7 @@ async def search_chats(
     try:
         user_id = __user__.get("id")
 
-        chats = Chats.get_chats_by_user_id_and_search_text(
+        search_results = Chats.search_chats_by_user_id_and_search_text(
             user_id=user_id,
             search_text=query,
             include_archived=False,
@@ -1026,7 +1035,9 @@ async def search_chats(
         )
 
         results = []
-        for chat in chats:
+        for search_result in search_results:
+            chat = search_result.chat
+
             # Skip the current chat to avoid showing it in search results
             if __chat_id__ and chat.id == __chat_id__:
                 continue
@@ -1037,23 +1048,24 @@ async def search_chats(
             if end_timestamp and chat.updated_at > end_timestamp:
                 continue
 
-            # Find a matching message snippet
-            snippet = ""
-            messages = chat.chat.get("history", {}).get("messages", {})
+            # Ranked fragment from the search index, else scan for a match
+            snippet = search_result.snippet or ""
             lower_query = query.lower()
 
-            for msg_id, msg in messages.items():
-                content = msg.get("content", "")
-                if isinstance(content, str) and lower_query in content.lower():
-                    idx = content.lower().find(lower_query)
-                    start = max(0, idx - 50)
-                    end = min(len(content), idx + len(query) + 100)
-                    snippet = (
-                        ("..." if start > 0 else "")
-                        + content[start:end]
-                        + ("..." if end < len(content) else "")
-                    )
-                    break
+            if not snippet:
+                messages = chat.chat.get("history", {}).get("messages", {})
+                for msg_id, msg in messages.items():
+                    content = msg.get("content", "")
+                    if isinstance(content, str) and lower_query in content.lower():
+                        idx = content.lower().find(lower_query)
+                        start = max(0, idx - 50)
+                        end = min(len(content), idx + len(query) + 100)
+                        snippet = (
+                            ("..." if start > 0 else "")
+                            + content[start:end]
+                            + ("..." if end < len(content) else "")
+                        )
+                        break
 
             if not snippet and lower_query in chat.title.lower():
                 snippet = f"Title match: {chat.title}"
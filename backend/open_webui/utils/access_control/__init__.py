@@ -4,7 +4,14 @@ from open_webui.models.groups import Groups
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
-import json
+
+
+def copy_permissions(permissions: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a nested permissions dict; values below the dicts are immutable."""
+    return {
+        key: copy_permissions(value) if isinstance(value, dict) else value
+        for key, value in permissions.items()
+    }
 
 
 def fill_missing_permissions(
@@ -54,10 +61,10 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id, db=db)
+    user_groups = Groups.get_cached_groups_by_member_id(user_id, db=db)
 
     # Deep copy default permissions to avoid modifying the original dict
-    permissions = json.loads(json.dumps(default_permissions))
+    permissions = copy_permissions(default_permissions)
 
     # Combine permissions from all user groups
     for group in user_groups:
@@ -94,7 +101,7 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id, db=db)
+    user_groups = Groups.get_cached_groups_by_member_id(user_id, db=db)
 
     for group in user_groups:
         if get_permission(group.permissions or {}, permission_hierarchy):
@@ -129,7 +136,7 @@ def has_access(
         return False
 
     if user_group_ids is None:
-        user_groups = Groups.get_groups_by_member_id(user_id, db=db)
+        user_groups = Groups.get_cached_groups_by_member_id(user_id, db=db)
         user_group_ids = {group.id for group in user_groups}
 
     for grant in access_grants:
@@ -172,7 +179,9 @@ def has_connection_access(
         return True
 
     if user_group_ids is None:
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user.id)}
+        user_group_ids = {
+            group.id for group in Groups.get_cached_groups_by_member_id(user.id)
+        }
 
     access_grants = (connection.get("config") or {}).get("access_grants", [])
     return has_access(user.id, "read", access_grants, user_group_ids)
@@ -0,0 +1,152 @@
+"""
+Streaming chunker for long audio recordings.
+
+Speech-to-text backends cap the upload size, so long recordings are cut into
+chunks before transcription. AudioChunker runs a single ffmpeg pass that
+downmixes to 16 kHz mono, encodes constant bitrate mp3 and cuts it with the
+segment muxer. The segment length is derived from the bitrate so every chunk
+fits under the size cap, ffmpeg only ever holds a few frames in memory, and
+chunk paths are yielded as each segment is closed so transcription can start
+while the rest of the file is still being encoded.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Iterator, Optional
+
+from pydub import AudioSegment
+
+log = logging.getLogger(__name__)
+
+# Container and frame overhead on top of the nominal bitrate
+_SIZE_HEADROOM = 0.95
+
+
+class AudioChunkError(Exception):
+    pass
+
+
+def segment_seconds(max_bytes: int, bitrate_kbps: int) -> int:
+    """Longest segment, in seconds, that stays under `max_bytes`."""
+    return max(int(max_bytes * _SIZE_HEADROOM / (bitrate_kbps * 125)), 1)
+
+
+class AudioChunker:
+    """
+    Iterate over the chunk paths of `file_path`, in order, as ffmpeg
+    produces them. Use as a context manager: leaving it stops ffmpeg and
+    removes the chunks, so only leave once they have been transcribed.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        max_bytes: int,
+        bitrate_kbps: int = 32,
+        sample_rate: int = 16000,
+        ffmpeg: Optional[str] = None,
+    ):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.bitrate_kbps = bitrate_kbps
+        self.sample_rate = sample_rate
+        self.ffmpeg = ffmpeg or AudioSegment.converter
+
+        self._dir: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+        # A file rather than a pipe, so a chatty ffmpeg can't block on it
+        self._stderr = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _command(self, pattern: str) -> list[str]:
+        return [
+            self.ffmpeg,
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            self.file_path,
+            "-vn",
+            "-map",
+            "0:a:0",
+            "-ac",
+            "1",
+            "-ar",
+            str(self.sample_rate),
+            "-c:a",
+            "libmp3lame",
+            "-b:a",
+            f"{self.bitrate_kbps}k",
+            "-f",
+            "segment",
+            "-segment_time",
+            str(segment_seconds(self.max_bytes, self.bitrate_kbps)),
+            "-reset_timestamps",
+            "1",
+            # One line per finished segment, flushed as soon as it is closed
+            "-segment_list",
+            "pipe:1",
+            "-segment_list_type",
+            "flat",
+            pattern,
+        ]
+
+    def __iter__(self) -> Iterator[str]:
+        if self._process is not None:
+            raise AudioChunkError("AudioChunker can only be iterated once")
+
+        name = os.path.splitext(os.path.basename(self.file_path))[0]
+        self._dir = tempfile.mkdtemp(
+            prefix=f"{name}_chunks_", dir=os.path.dirname(self.file_path) or None
+        )
+        pattern = os.path.join(self._dir, f"{name}_chunk_%04d.mp3")
+
+        self._stderr = tempfile.TemporaryFile(mode="w+")
+        try:
+            self._process = subprocess.Popen(
+                self._command(pattern),
+                stdout=subprocess.PIPE,
+                stderr=self._stderr,
+                text=True,
+            )
+        except OSError as e:
+            raise AudioChunkError(f"Failed to start ffmpeg: {e}") from e
+
+        for line in self._process.stdout:
+            entry = line.strip()
+            if not entry:
+                continue
+            chunk_path = os.path.join(self._dir, os.path.basename(entry))
+            if os.path.getsize(chunk_path) > self.max_bytes:
+                raise AudioChunkError(
+                    "Audio chunk cannot be reduced below max file size."
+                )
+            log.debug(f"Audio chunk ready: {chunk_path}")
+            yield chunk_path
+
+        if self._process.wait() != 0:
+            self._stderr.seek(0)
+            error = self._stderr.read().strip()[-1000:]
+            raise AudioChunkError(f"ffmpeg failed to split audio: {error}")
+
+    def close(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        if self._process is not None:
+            self._process.stdout.close()
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
@@ -36,7 +36,6 @@ from open_webui.routers.pipelines import (
     process_pipeline_outlet_filter,
 )
 
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.utils.models import get_all_models, check_model_access
@@ -49,6 +48,7 @@ from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
 )
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
 
 from open_webui.env import GLOBAL_LOG_LEVEL, BYPASS_MODEL_ACCESS_CONTROL
 
@@ -338,7 +338,7 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
         filter_ids = get_sorted_filter_ids(
             request, model, metadata.get("filter_ids", [])
         )
-        filter_functions = Functions.get_functions_by_ids(filter_ids)
+        filter_functions = FUNCTION_REGISTRY.get_functions(filter_ids)
 
         result, _ = await process_filter_functions(
             request=request,
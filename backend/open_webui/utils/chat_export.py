@@ -0,0 +1,97 @@
+"""
+Streaming chat export as gzip-compressed NDJSON.
+
+Chats are read in pages keyed on (updated_at, id), so each page is a seek
+rather than an OFFSET scan, and every page uses its own short-lived session
+so a long download never holds SQLite's file lock between pages. Each page is
+compressed and sync-flushed as one chunk, followed by a checkpoint line:
+
+    {"cursor": "<token>"}
+
+The token encodes the filters and the last key written. Passing it back as
+`cursor` resumes the export right after that chat, so an interrupted download
+can be continued from the last checkpoint it received intact.
+
+The next page is only read once the previous chunk has been handed to the
+client, so a slow reader throttles the export instead of buffering it all.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import zlib
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.models.chats import ChatResponse, Chats
+
+log = logging.getLogger(__name__)
+
+CHAT_EXPORT_BATCH_SIZE = 100
+
+FILTER_KEYS = ("user_id", "archived", "updated_from", "updated_to")
+
+
+def encode_chat_export_cursor(filters: dict, after: tuple[int, str]) -> str:
+    data = {key: filters.get(key) for key in FILTER_KEYS}
+    data["after"] = list(after)
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def decode_chat_export_cursor(cursor: str) -> tuple[dict, tuple[int, str]]:
+    """Filters and last exported key of a cursor token."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        updated_at, id = data["after"]
+        return {key: data.get(key) for key in FILTER_KEYS}, (int(updated_at), str(id))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Invalid export cursor"),
+        )
+
+
+def export_chats_page(
+    compressor, filters: dict, after: Optional[tuple[int, str]], limit: int
+) -> tuple[bytes, Optional[tuple[int, str]], int]:
+    """
+    Compressed chunk for the page of chats after `after`, the key of its last
+    chat and the number of chats in it.
+    """
+    lines = []
+    last = None
+    count = 0
+    for chat in Chats.get_chats_page_for_export(
+        **filters, after=after, limit=limit, db=None
+    ):
+        lines.append(ChatResponse(**chat.model_dump()).model_dump_json())
+        last = (chat.updated_at, chat.id)
+        count += 1
+
+    if last is not None:
+        lines.append(json.dumps({"cursor": encode_chat_export_cursor(filters, last)}))
+
+    data = compressor.compress("".join(f"{line}\n" for line in lines).encode())
+    return data + compressor.flush(zlib.Z_SYNC_FLUSH), last, count
+
+
+async def generate_chats_export(
+    filters: dict,
+    after: Optional[tuple[int, str]] = None,
+    batch_size: int = CHAT_EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    while True:
+        chunk, last, count = await asyncio.to_thread(
+            export_chats_page, compressor, filters, after, batch_size
+        )
+        if chunk:
+            yield chunk
+        if count < batch_size:
+            break
+        after = last
+
+    yield compressor.flush()
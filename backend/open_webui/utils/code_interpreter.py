@@ -1,15 +1,43 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
+from contextlib import asynccontextmanager
 from typing import Optional
 
 import aiohttp
 import websockets
+from opentelemetry import metrics
 from pydantic import BaseModel
 
+from open_webui.env import (
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TTL,
+    CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SCOPE,
+    CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SIZE,
+)
+
 logger = logging.getLogger(__name__)
 
+_meter = metrics.get_meter(__name__)
+_POOL_HITS = _meter.create_counter(
+    name="webui.code_interpreter.kernel_pool.hits",
+    description="Code interpreter executions served by an already running kernel.",
+)
+_COLD_STARTS = _meter.create_counter(
+    name="webui.code_interpreter.kernel_pool.cold_starts",
+    description="Kernels started for the code interpreter kernel pool.",
+)
+_COLD_START_DURATION = _meter.create_histogram(
+    name="webui.code_interpreter.kernel_pool.cold_start.duration",
+    description="Time to sign in and start a pooled kernel.",
+    unit="ms",
+)
+_EVICTIONS = _meter.create_counter(
+    name="webui.code_interpreter.kernel_pool.evictions",
+    description="Idle kernels shut down to make room in a full pool.",
+)
+
 
 class ResultModel(BaseModel):
     """
@@ -105,10 +133,11 @@ class JupyterCodeExecuter:
             kernel_data = await response.json()
             self.kernel_id = kernel_data["id"]
 
-    def init_ws(self) -> (str, dict):
+    def init_ws(self, kernel_id: Optional[str] = None) -> (str, dict):
+        kernel_id = kernel_id or self.kernel_id
         ws_base = self.base_url.replace("http", "ws", 1)
         ws_params = "?" + "&".join([f"{key}={val}" for key, val in self.params.items()])
-        websocket_url = f"{ws_base}api/kernels/{self.kernel_id}/channels{ws_params if len(ws_params) > 1 else ''}"
+        websocket_url = f"{ws_base}api/kernels/{kernel_id}/channels{ws_params if len(ws_params) > 1 else ''}"
         ws_headers = {}
         if self.password and not self.token:
             ws_headers = {
@@ -132,74 +161,439 @@ class JupyterCodeExecuter:
             await self.execute_in_jupyter(ws)
 
     async def execute_in_jupyter(self, ws) -> None:
-        # send message
-        msg_id = uuid.uuid4().hex
-        await ws.send(
-            json.dumps(
-                {
-                    "header": {
-                        "msg_id": msg_id,
-                        "msg_type": "execute_request",
-                        "username": "user",
-                        "session": uuid.uuid4().hex,
-                        "date": "",
-                        "version": "5.3",
-                    },
-                    "parent_header": {},
-                    "metadata": {},
-                    "content": {
-                        "code": self.code,
-                        "silent": False,
-                        "store_history": True,
-                        "user_expressions": {},
-                        "allow_stdin": False,
-                        "stop_on_error": True,
-                    },
-                    "channel": "shell",
-                }
-            )
+        self.result, _ = await run_in_kernel(ws, self.code, self.timeout)
+
+
+async def run_in_kernel(ws, code: str, timeout: int) -> tuple[ResultModel, bool]:
+    """
+    Run `code` over an open kernel channels websocket.
+
+    Returns the result and whether the kernel went back to idle; False means
+    the execution timed out and the kernel may still be busy.
+    """
+    # send message
+    msg_id = uuid.uuid4().hex
+    await ws.send(
+        json.dumps(
+            {
+                "header": {
+                    "msg_id": msg_id,
+                    "msg_type": "execute_request",
+                    "username": "user",
+                    "session": uuid.uuid4().hex,
+                    "date": "",
+                    "version": "5.3",
+                },
+                "parent_header": {},
+                "metadata": {},
+                "content": {
+                    "code": code,
+                    "silent": False,
+                    "store_history": True,
+                    "user_expressions": {},
+                    "allow_stdin": False,
+                    "stop_on_error": True,
+                },
+                "channel": "shell",
+            }
         )
-        # parse message
-        stdout, stderr, result = "", "", []
+    )
+    # parse message
+    stdout, stderr, result = "", "", []
+    idle = False
+    while True:
+        try:
+            # wait for message
+            message = await asyncio.wait_for(ws.recv(), timeout)
+            message_data = json.loads(message)
+            # msg id not match, skip
+            if message_data.get("parent_header", {}).get("msg_id") != msg_id:
+                continue
+            # check message type
+            msg_type = message_data.get("msg_type")
+            match msg_type:
+                case "stream":
+                    if message_data["content"]["name"] == "stdout":
+                        stdout += message_data["content"]["text"]
+                    elif message_data["content"]["name"] == "stderr":
+                        stderr += message_data["content"]["text"]
+                case "execute_result" | "display_data":
+                    data = message_data["content"]["data"]
+                    if "image/png" in data:
+                        result.append(f"data:image/png;base64,{data['image/png']}")
+                    elif "text/plain" in data:
+                        result.append(data["text/plain"])
+                case "error":
+                    stderr += "\n".join(message_data["content"]["traceback"])
+                case "status":
+                    if message_data["content"]["execution_state"] == "idle":
+                        idle = True
+                        break
+
+        except asyncio.TimeoutError:
+            stderr += "\nExecution timed out."
+            break
+    return (
+        ResultModel(
+            stdout=stdout.strip(),
+            stderr=stderr.strip(),
+            result="\n".join(result).strip() if result else "",
+        ),
+        idle,
+    )
+
+
+class PooledKernel:
+    def __init__(self, server: tuple, kernel_id: str):
+        self.server = server
+        self.id = kernel_id
+        self.ws = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        # Executions handed this kernel by _acquire and not yet done with
+        # it; eviction and reaping leave leased kernels alone
+        self.leases = 0
+
+
+class JupyterKernelPool:
+    """
+    Warm Jupyter kernels shared by the code interpreter.
+
+    Each session key (a chat or a user) keeps its own kernel, so consecutive
+    code blocks skip the kernel start and share state like a notebook. The
+    kernel's websocket and the server's signed-in HTTP session stay open
+    between executions. A session idle for `idle_ttl` seconds gives its kernel
+    back: the kernel is restarted, which clears its state, and kept as a spare
+    for the next new session until it has been idle another `idle_ttl`.
+
+    At most `max_size` kernels exist. When the pool is full, the least
+    recently used idle session is evicted; if every kernel is busy the
+    execution falls back to a one-off kernel.
+    """
+
+    def __init__(self, max_size: int, idle_ttl: float):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: dict[tuple, JupyterCodeExecuter] = {}
+        self._sessions: dict[tuple, PooledKernel] = {}
+        self._spares: list[PooledKernel] = []
+        self._starting = 0
+        self._lock = asyncio.Lock()
+        # Session key -> (lock, callers holding or waiting for it)
+        self._key_locks: dict[tuple, tuple[asyncio.Lock, int]] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "spare_hits": 0, "cold_starts": 0, "evictions": 0}
+
+    def start(self):
+        """Bind the pool to the running (app lifespan) event loop."""
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def enabled(self) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return self.max_size > 0 and self._loop is loop
+
+    def _size(self) -> int:
+        return len(self._sessions) + len(self._spares) + self._starting
+
+    async def execute(
+        self,
+        base_url: str,
+        code: str,
+        session_key: str,
+        token: str = "",
+        password: str = "",
+        timeout: int = 60,
+    ) -> Optional[dict]:
+        """Run `code` in the session's kernel; None if no kernel is free."""
+        if base_url[-1] != "/":
+            base_url += "/"
+        server = (base_url, token or "", password or "")
+
+        try:
+            kernel = await self._acquire(server, (server, session_key))
+        except Exception as err:
+            logger.exception("start pooled kernel failed, %s", err)
+            return ResultModel(stderr=f"Error: {err}").model_dump()
+        if kernel is None:
+            return None
+
+        try:
+            async with kernel.lock:
+                try:
+                    result, idle = await self._run(kernel, code, timeout)
+                except Exception as err:
+                    logger.exception("execute code failed, %s", err)
+                    result, idle = ResultModel(stderr=f"Error: {err}"), False
+
+                kernel.last_used = time.monotonic()
+                if not idle:
+                    # Timed out or broke mid-run; don't hand a busy kernel on
+                    await self._discard((server, session_key), kernel)
+                return result.model_dump()
+        finally:
+            kernel.leases -= 1
+
+    async def _client(self, server: tuple) -> JupyterCodeExecuter:
+        client = self._clients.get(server)
+        if client is None or client.session.closed:
+            base_url, token, password = server
+            client = JupyterCodeExecuter(base_url, "", token, password)
+            await client.sign_in()
+            self._clients[server] = client
+        return client
+
+    @asynccontextmanager
+    async def _key_lock(self, key: tuple):
+        """Serialize acquires per session key; dropped with its last caller."""
+        lock, callers = self._key_locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._key_locks[key] = (lock, callers + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, callers = self._key_locks[key]
+            if callers == 1:
+                del self._key_locks[key]
+            else:
+                self._key_locks[key] = (lock, callers - 1)
+
+    async def _acquire(self, server: tuple, key: tuple) -> Optional[PooledKernel]:
+        """
+        The session's kernel, leased to the caller, who must release it by
+        decrementing `leases`; None if the pool is full of busy kernels.
+        """
+        async with self._key_lock(key):
+            async with self._lock:
+                self._ensure_reaper()
+
+                kernel = self._sessions.get(key)
+                if kernel is not None:
+                    kernel.leases += 1
+                    self.stats["hits"] += 1
+                    _POOL_HITS.add(1, {"source": "session"})
+                    return kernel
+
+                for i, spare in enumerate(self._spares):
+                    if spare.server == server:
+                        kernel = self._spares.pop(i)
+                        kernel.leases += 1
+                        self._sessions[key] = kernel
+                        self.stats["spare_hits"] += 1
+                        _POOL_HITS.add(1, {"source": "spare"})
+                        return kernel
+
+                if self._size() >= self.max_size and not self._evict_one():
+                    return None
+                self._starting += 1
+
+            try:
+                started = time.monotonic()
+                client = await self._client(server)
+                async with client.session.post(
+                    "api/kernels", params=client.params
+                ) as response:
+                    response.raise_for_status()
+                    kernel = PooledKernel(server, (await response.json())["id"])
+                self.stats["cold_starts"] += 1
+                _COLD_STARTS.add(1)
+                _COLD_START_DURATION.record((time.monotonic() - started) * 1000)
+            except Exception:
+                # The sign-in may have expired; start over next time
+                client = self._clients.pop(server, None)
+                if client is not None:
+                    await client.session.close()
+                raise
+            finally:
+                async with self._lock:
+                    self._starting -= 1
+
+            async with self._lock:
+                kernel.leases += 1
+                self._sessions[key] = kernel
+            return kernel
+
+    def _evict_one(self) -> bool:
+        """Drop the least recently used idle kernel; called with _lock held."""
+        if self._spares:
+            kernel = min(self._spares, key=lambda k: k.last_used)
+            self._spares.remove(kernel)
+        else:
+            idle = [
+                (key, kernel)
+                for key, kernel in self._sessions.items()
+                if not kernel.leases
+            ]
+            if not idle:
+                return False
+            key, kernel = min(idle, key=lambda item: item[1].last_used)
+            del self._sessions[key]
+
+        self.stats["evictions"] += 1
+        _EVICTIONS.add(1)
+        asyncio.create_task(self._shutdown(kernel))
+        return True
+
+    async def _run(self, kernel: PooledKernel, code: str, timeout: int):
+        client = await self._client(kernel.server)
+        for attempt in range(2):
+            if kernel.ws is None:
+                websocket_url, ws_headers = client.init_ws(kernel.id)
+                kernel.ws = await websockets.connect(
+                    websocket_url, additional_headers=ws_headers
+                )
+            try:
+                return await run_in_kernel(kernel.ws, code, timeout)
+            except websockets.ConnectionClosed:
+                # Server closed an idle socket; reconnect once
+                kernel.ws = None
+                if attempt:
+                    raise
+
+    async def _close_ws(self, kernel: PooledKernel):
+        if kernel.ws is not None:
+            try:
+                await kernel.ws.close()
+            except Exception:
+                pass
+            kernel.ws = None
+
+    async def _shutdown(self, kernel: PooledKernel):
+        await self._close_ws(kernel)
+        client = self._clients.get(kernel.server)
+        if client is None:
+            return
+        try:
+            async with client.session.delete(
+                f"api/kernels/{kernel.id}", params=client.params
+            ) as response:
+                response.raise_for_status()
+        except Exception as err:
+            logger.warning("close pooled kernel failed, %s", err)
+
+    async def _discard(self, key: tuple, kernel: PooledKernel):
+        async with self._lock:
+            if self._sessions.get(key) is kernel:
+                del self._sessions[key]
+        await self._shutdown(kernel)
+
+    async def _reset(self, kernel: PooledKernel):
+        """Restart a released kernel so the next session starts clean."""
+        await self._close_ws(kernel)
+        client = self._clients.get(kernel.server)
+        try:
+            if client is None:
+                raise RuntimeError("no client for kernel server")
+            async with client.session.post(
+                f"api/kernels/{kernel.id}/restart", params=client.params
+            ) as response:
+                response.raise_for_status()
+        except Exception as err:
+            logger.warning("reset pooled kernel failed, %s", err)
+            await self._shutdown(kernel)
+            return
+
+        kernel.last_used = time.monotonic()
+        async with self._lock:
+            if self._size() < self.max_size:
+                self._spares.append(kernel)
+                return
+        await self._shutdown(kernel)
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self):
         while True:
+            await asyncio.sleep(max(1.0, min(self.idle_ttl / 2, 60.0)))
             try:
-                # wait for message
-                message = await asyncio.wait_for(ws.recv(), self.timeout)
-                message_data = json.loads(message)
-                # msg id not match, skip
-                if message_data.get("parent_header", {}).get("msg_id") != msg_id:
-                    continue
-                # check message type
-                msg_type = message_data.get("msg_type")
-                match msg_type:
-                    case "stream":
-                        if message_data["content"]["name"] == "stdout":
-                            stdout += message_data["content"]["text"]
-                        elif message_data["content"]["name"] == "stderr":
-                            stderr += message_data["content"]["text"]
-                    case "execute_result" | "display_data":
-                        data = message_data["content"]["data"]
-                        if "image/png" in data:
-                            result.append(f"data:image/png;base64,{data['image/png']}")
-                        elif "text/plain" in data:
-                            result.append(data["text/plain"])
-                    case "error":
-                        stderr += "\n".join(message_data["content"]["traceback"])
-                    case "status":
-                        if message_data["content"]["execution_state"] == "idle":
-                            break
-
-            except asyncio.TimeoutError:
-                stderr += "\nExecution timed out."
-                break
-        self.result.stdout = stdout.strip()
-        self.result.stderr = stderr.strip()
-        self.result.result = "\n".join(result).strip() if result else ""
+                await self.reap()
+            except Exception as err:
+                logger.warning("kernel pool reaper failed, %s", err)
+
+    async def reap(self):
+        """Release idle sessions and shut down spares idle past the TTL."""
+        cutoff = time.monotonic() - self.idle_ttl
+        async with self._lock:
+            released = [
+                (key, kernel)
+                for key, kernel in self._sessions.items()
+                if kernel.last_used < cutoff and not kernel.leases
+            ]
+            for key, _ in released:
+                del self._sessions[key]
+
+            expired = [k for k in self._spares if k.last_used < cutoff]
+            self._spares = [k for k in self._spares if k.last_used >= cutoff]
+
+        for _, kernel in released:
+            await self._reset(kernel)
+        for kernel in expired:
+            await self._shutdown(kernel)
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+        async with self._lock:
+            kernels = list(self._sessions.values()) + self._spares
+            self._sessions.clear()
+            self._spares = []
+            self._key_locks.clear()
+
+        for kernel in kernels:
+            await self._shutdown(kernel)
+        for client in self._clients.values():
+            await client.session.close()
+        self._clients.clear()
+        self._loop = None
+
+
+JUPYTER_KERNEL_POOL = JupyterKernelPool(
+    CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SIZE,
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TTL,
+)
+
+
+def get_kernel_session_key(
+    chat_id: Optional[str] = None, user_id: Optional[str] = None
+) -> Optional[str]:
+    """Kernel pool key for a call, per CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SCOPE."""
+    if not user_id:
+        return None
+    if CODE_INTERPRETER_JUPYTER_KERNEL_POOL_SCOPE == "user":
+        return f"user:{user_id}"
+    if chat_id:
+        return f"chat:{user_id}:{chat_id}"
+    return None
 
 
 async def execute_code_jupyter(
-    base_url: str, code: str, token: str = "", password: str = "", timeout: int = 60
+    base_url: str,
+    code: str,
+    token: str = "",
+    password: str = "",
+    timeout: int = 60,
+    session_key: Optional[str] = None,
 ) -> dict:
+    """
+    Execute code on a Jupyter server. With a `session_key` the code runs in
+    that session's pooled kernel; otherwise in a kernel started for this call.
+    """
+    if session_key and JUPYTER_KERNEL_POOL.enabled:
+        result = await JUPYTER_KERNEL_POOL.execute(
+            base_url, code, session_key, token, password, timeout
+        )
+        if result is not None:
+            return result
+
     async with JupyterCodeExecuter(
         base_url, code, token, password, timeout
     ) as executor:
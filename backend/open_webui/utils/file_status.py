@@ -0,0 +1,150 @@
+"""
+File processing status events.
+
+Processing publishes each status transition here instead of clients polling
+the file row. Subscribers get an asyncio.Queue of events for one file. With
+WEBSOCKET_MANAGER=redis, events go through Redis pub/sub so a subscriber on
+any worker sees transitions made on another. Otherwise they stay in process.
+
+Publishing is safe from sync code running in the threadpool, which is where
+process_file runs.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from open_webui.env import (
+    REDIS_KEY_PREFIX,
+    WEBSOCKET_MANAGER,
+    WEBSOCKET_REDIS_CLUSTER,
+    WEBSOCKET_REDIS_URL,
+    WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_SENTINEL_PORT,
+)
+from open_webui.utils.redis import (
+    InvalidationChannel,
+    get_redis_connection,
+    get_sentinels_from_env,
+)
+
+log = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Pushed to every subscriber when the Redis listener reconnects; events sent
+# while it was disconnected are lost, so subscribers re-read the file once.
+RESYNC = {"status": "resync"}
+
+
+class FileStatusBus:
+    def __init__(self, redis=None, channel: str = "open-webui:files:status"):
+        # Other workers' events; this worker's are dispatched as published
+        self._events = InvalidationChannel(
+            redis, channel, self._on_message, "file status"
+        )
+        self._subscribed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+        self._socket_emitter = None
+
+    def start(self, loop: asyncio.AbstractEventLoop, socket_emitter=None):
+        """
+        Bind the bus to the app's event loop.
+
+        `socket_emitter(user_id, file_id, event)` is awaited on that loop for
+        transitions published by this worker, so socket clients are notified
+        once, not once per worker.
+        """
+        self._loop = loop
+        self._socket_emitter = socket_emitter
+        self._events.listen()
+
+    def _on_message(self, payload: Optional[dict]):
+        if payload is None:
+            # (Re)subscribed; only a reconnect can have missed events
+            if self._subscribed:
+                self._dispatch_all(RESYNC)
+            self._subscribed = True
+        else:
+            self._dispatch(payload["file_id"], payload["event"])
+
+    def _dispatch(self, file_id: str, event: dict):
+        with self._lock:
+            queues = list(self._subscribers.get(file_id, ()))
+        for queue in queues:
+            self._put(queue, event)
+
+    def _dispatch_all(self, event: dict):
+        with self._lock:
+            queues = [queue for group in self._subscribers.values() for queue in group]
+        for queue in queues:
+            self._put(queue, event)
+
+    def _put(self, queue: asyncio.Queue, event: dict):
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def publish(
+        self,
+        file_id: str,
+        status: str,
+        error: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ):
+        event = {"status": status}
+        if error is not None:
+            event["error"] = error
+
+        self._dispatch(file_id, event)
+        self._events.publish(file_id=file_id, event=event)
+
+        if user_id and self._socket_emitter and self._loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    self._socket_emitter(user_id, file_id, event), self._loop
+                )
+            except RuntimeError:
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, file_id: str):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(file_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                queues = self._subscribers.get(file_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[file_id]
+
+
+def get_file_status_bus() -> FileStatusBus:
+    redis = None
+    if WEBSOCKET_MANAGER == "redis":
+        redis = get_redis_connection(
+            redis_url=WEBSOCKET_REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+            ),
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+        )
+    return FileStatusBus(redis, f"{REDIS_KEY_PREFIX}:files:status")
+
+
+FILE_STATUS_BUS = get_file_status_bus()
@@ -31,7 +31,8 @@ BASE64_IMAGE_URL_PREFIX = re.compile(r"data:image/\w+;base64,", re.IGNORECASE)
 MARKDOWN_IMAGE_URL_PATTERN = re.compile(r"!\[(.*?)\]\((.+?)\)", re.IGNORECASE)
 
 
-def get_image_base64_from_url(url: str) -> Optional[str]:
+def load_image_from_url(url: str) -> Optional[tuple[bytes, str]]:
+    """Bytes and content type of an image URL or file id."""
     try:
         if url.startswith("http"):
             # Validate URL to prevent SSRF attacks against local/private networks
@@ -39,10 +40,8 @@ def get_image_base64_from_url(url: str) -> Optional[str]:
             # Download the image from the URL
             response = requests.get(url)
             response.raise_for_status()
-            image_data = response.content
-            encoded_string = base64.b64encode(image_data).decode("utf-8")
             content_type = response.headers.get("Content-Type", "image/png")
-            return f"data:{content_type};base64,{encoded_string}"
+            return response.content, content_type
         else:
             file = Files.get_file_by_id(url)
 
@@ -53,10 +52,8 @@ def get_image_base64_from_url(url: str) -> Optional[str]:
             file_path = Path(file_path)
 
             if file_path.is_file():
-                with open(file_path, "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
-                    content_type, _ = mimetypes.guess_type(file_path.name)
-                    return f"data:{content_type};base64,{encoded_string}"
+                content_type, _ = mimetypes.guess_type(file_path.name)
+                return file_path.read_bytes(), content_type
             else:
                 return None
 
@@ -64,6 +61,16 @@ def get_image_base64_from_url(url: str) -> Optional[str]:
         return None
 
 
+def get_image_base64_from_url(url: str) -> Optional[str]:
+    image = load_image_from_url(url)
+    if image is None:
+        return None
+
+    image_data, content_type = image
+    encoded_string = base64.b64encode(image_data).decode("utf-8")
+    return f"data:{content_type};base64,{encoded_string}"
+
+
 def get_image_url_from_base64(request, base64_image_string, metadata, user):
     if BASE64_IMAGE_URL_PREFIX.match(base64_image_string):
         image_url = ""
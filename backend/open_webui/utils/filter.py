@@ -5,7 +5,7 @@ from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
-from open_webui.models.functions import Functions
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
 
 log = logging.getLogger(__name__)
 
@@ -21,40 +21,29 @@ def get_function_module(request, function_id, load_from_db=True):
 
 
 def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
-    def get_priority(function_id):
-        try:
-            function_module = get_function_module(request, function_id)
-            if function_module and hasattr(function_module, "Valves"):
-                valves_db = Functions.get_function_valves_by_id(function_id)
-                valves = function_module.Valves(**(valves_db if valves_db else {}))
-                return getattr(valves, "priority", 0)
-        except Exception:
-            pass
-        return 0
-
-    filter_ids = [function.id for function in Functions.get_global_filter_functions()]
+    filters = FUNCTION_REGISTRY.get_filters()
+
+    filter_ids = [
+        filter_id
+        for filter_id, entry in filters.items()
+        if entry.function.is_global
+    ]
     if "info" in model and "meta" in model["info"]:
         filter_ids.extend(model["info"]["meta"].get("filterIds", []))
         filter_ids = list(set(filter_ids))
-    active_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
 
     def get_active_status(filter_id):
-        function_module = get_function_module(request, filter_id)
+        entry = FUNCTION_REGISTRY.prepare(filters[filter_id])
+        if entry.error is not None:
+            raise entry.error
 
-        if getattr(function_module, "toggle", None):
+        if entry.toggle:
             return filter_id in (enabled_filter_ids or [])
 
         return True
 
-    active_filter_ids = [
-        filter_id for filter_id in active_filter_ids if get_active_status(filter_id)
-    ]
-
-    filter_ids = [fid for fid in filter_ids if fid in active_filter_ids]
-    filter_ids.sort(key=lambda fid: (get_priority(fid), fid))
+    filter_ids = [fid for fid in filter_ids if fid in filters and get_active_status(fid)]
+    filter_ids.sort(key=lambda fid: (filters[fid].priority, fid))
 
     return filter_ids
 
@@ -70,9 +59,7 @@ async def process_filter_functions(
         if not filter:
             continue
 
-        function_module = get_function_module(
-            request, filter_id, load_from_db=(filter_type != "stream")
-        )
+        function_module = FUNCTION_REGISTRY.get_module(filter_id)
         # Prepare handler function
         handler = getattr(function_module, filter_type, None)
         if not handler:
@@ -82,13 +69,6 @@ async def process_filter_functions(
         if filter_type == "inlet" and hasattr(function_module, "file_handler"):
             skip_files = function_module.file_handler
 
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
-
         try:
             # Prepare parameters
             sig = inspect.signature(handler)
@@ -110,9 +90,9 @@ async def process_filter_functions(
             if "__user__" in sig.parameters:
                 if hasattr(function_module, "UserValves"):
                     try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
+                        params["__user__"]["valves"] = (
+                            FUNCTION_REGISTRY.get_user_valves(
+                                filter_id, params["__user__"]
                             )
                         )
                     except Exception as e:
@@ -0,0 +1,180 @@
+"""
+Process-local registry of active filter functions.
+
+Every chat request sorted its filters by loading each function row, re-running
+replace_imports and querying its valves for the priority, and
+process_filter_functions queried the valves again for every call, including
+every streamed chunk. FunctionRegistry loads the active filters in one query
+and keeps, per function version, the compiled module with its valves applied,
+the priority and the toggle flag, so filters run without touching the
+database once loaded.
+
+Writes in models/functions.py invalidate the registry; the next lookup
+reloads the rows and recompiles only the functions whose content changed.
+With REDIS_URL set, invalidations are published so every node reloads, and a
+node reloads whenever it (re)subscribes so messages missed while disconnected
+don't leave it stale.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from open_webui.env import REDIS_KEY_PREFIX, REDIS_URL
+from open_webui.models.functions import FunctionWithValvesModel, Functions
+from open_webui.utils.plugin import load_function_module_by_id, replace_imports
+from open_webui.utils.redis import InvalidationChannel, get_redis_client
+
+log = logging.getLogger(__name__)
+
+_USER_VALVES_CACHE_SIZE = 1024
+
+
+@dataclass
+class FilterEntry:
+    function: FunctionWithValvesModel
+    module: Any = None
+    priority: int = 0
+    toggle: bool = False
+    error: Optional[Exception] = None
+    # user id -> (raw user valves, parsed UserValves)
+    user_valves: dict = field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        return self.function.id
+
+
+class FunctionRegistry:
+    def __init__(self, redis=None, channel: str = "open-webui:functions:invalidate"):
+        self._invalidations = InvalidationChannel(
+            redis,
+            channel,
+            lambda payload: self._invalidate_local(),
+            "function registry",
+        )
+        self._entries: Optional[dict[str, FilterEntry]] = None
+        # Entries from before the last invalidation, reused if unchanged
+        self._previous: dict[str, FilterEntry] = {}
+        # Compiled modules survive reloads while their content is unchanged
+        self._modules: dict[str, tuple[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def _load(self) -> dict[str, FilterEntry]:
+        entries = self._entries
+        if entries is not None:
+            return entries
+
+        self._invalidations.listen()
+        with self._lock:
+            if self._entries is None:
+                self._entries = {}
+                for function in Functions.get_functions_by_type(
+                    "filter", active_only=True, include_valves=True
+                ):
+                    # updated_at has one second resolution, so compare the row
+                    entry = self._previous.get(function.id)
+                    if entry is None or entry.function != function:
+                        entry = FilterEntry(function)
+                    self._entries[function.id] = entry
+                self._previous = {}
+            return self._entries
+
+    def prepare(self, entry: FilterEntry) -> FilterEntry:
+        """Compile the module and apply the valves, once per version."""
+        if entry.module is not None or entry.error is not None:
+            return entry
+
+        with self._lock:
+            if entry.module is not None or entry.error is not None:
+                return entry
+
+            function = entry.function
+            content = replace_imports(function.content)
+            cached = self._modules.get(function.id)
+            try:
+                if cached and cached[0] == content:
+                    module = cached[1]
+                else:
+                    module, _, _ = load_function_module_by_id(function.id, content)
+                    self._modules[function.id] = (content, module)
+
+                if hasattr(module, "Valves"):
+                    valves = module.Valves(**(function.valves or {}))
+                    if hasattr(module, "valves"):
+                        module.valves = valves
+                    entry.priority = getattr(valves, "priority", 0)
+                entry.toggle = bool(getattr(module, "toggle", None))
+                entry.module = module
+            except Exception as e:
+                log.exception(f"Failed to load filter {function.id}: {e}")
+                entry.error = e
+        return entry
+
+    def get(self, function_id: str) -> Optional[FilterEntry]:
+        entry = self._load().get(function_id)
+        return self.prepare(entry) if entry else None
+
+    def get_filters(self) -> dict[str, FilterEntry]:
+        """Active filters by id; modules are compiled on first access."""
+        return self._load()
+
+    def get_functions(self, function_ids: list[str]) -> list[FunctionWithValvesModel]:
+        """Active filter rows for `function_ids`, in the given order."""
+        entries = self._load()
+        return [entries[i].function for i in function_ids if i in entries]
+
+    def get_module(self, function_id: str):
+        entry = self.get(function_id)
+        if entry is None:
+            raise Exception(f"Function not found: {function_id}")
+        if entry.error is not None:
+            raise entry.error
+        return entry.module
+
+    def get_user_valves(self, function_id: str, user: dict):
+        """
+        Parsed UserValves for `user`, from the settings on the request's user
+        so streamed chunks don't reload the user row.
+        """
+        entry = self.get(function_id)
+        module = entry.module if entry else None
+        if module is None or not hasattr(module, "UserValves"):
+            return None
+
+        if "settings" in user:
+            settings = user["settings"] or {}
+            raw = ((settings.get("functions") or {}).get("valves") or {}).get(
+                function_id, {}
+            )
+        else:
+            raw = Functions.get_user_valves_by_id_and_user_id(function_id, user["id"])
+
+        cached = entry.user_valves.get(user["id"])
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+        valves = module.UserValves(**(raw or {}))
+        if len(entry.user_valves) >= _USER_VALVES_CACHE_SIZE:
+            entry.user_valves.clear()
+        entry.user_valves[user["id"]] = (raw, valves)
+        return valves
+
+    def invalidate(self):
+        """Reload the filters on next access, on every node."""
+        self._invalidate_local()
+        self._invalidations.publish()
+
+    def _invalidate_local(self):
+        with self._lock:
+            if self._entries is not None:
+                self._previous = self._entries
+            self._entries = None
+
+
+def get_function_registry() -> FunctionRegistry:
+    redis = get_redis_client() if REDIS_URL else None
+    return FunctionRegistry(redis, f"{REDIS_KEY_PREFIX}:functions:invalidate")
+
+
+FUNCTION_REGISTRY = get_function_registry()
@@ -0,0 +1,117 @@
+"""
+Cached group membership for permission checks.
+
+has_permission, get_permissions and has_access each load the user's groups,
+and one chat turn runs several of them. GroupMembershipCache serves those
+lookups from two layers:
+
+- a request scope (a dict in a ContextVar, set up per HTTP request), so a
+  request sees one consistent membership and queries it at most once;
+- a process cache with a short TTL (GROUP_MEMBERSHIP_CACHE_TTL seconds).
+
+Group writes in models/groups.py invalidate the affected users, or everyone
+when a group's permissions change. With REDIS_URL set, invalidations are
+published so every node drops its copy; the TTL bounds staleness if a message
+is lost.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+from open_webui.env import GROUP_MEMBERSHIP_CACHE_TTL, REDIS_KEY_PREFIX, REDIS_URL
+from open_webui.utils.redis import InvalidationChannel, get_redis_client
+
+log = logging.getLogger(__name__)
+
+_request_groups: ContextVar[Optional[dict]] = ContextVar("request_groups", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Share group lookups between everything run for one request."""
+    token = _request_groups.set({})
+    try:
+        yield
+    finally:
+        _request_groups.reset(token)
+
+
+class GroupMembershipCache:
+    def __init__(
+        self,
+        ttl: float,
+        redis=None,
+        channel: str = "open-webui:groups:invalidate",
+    ):
+        self.ttl = ttl
+        self._invalidations = InvalidationChannel(
+            redis,
+            channel,
+            lambda payload: self._invalidate_local((payload or {}).get("user_ids")),
+            "group cache",
+        )
+        self._entries: dict[str, tuple[float, list]] = {}
+        # Bumped by invalidations so loads that overlap one aren't cached
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, loader: Callable[[], list]) -> list:
+        scope = _request_groups.get()
+        if scope is not None and user_id in scope:
+            return list(scope[user_id])
+
+        groups = None
+        if self.ttl > 0:
+            self._invalidations.listen()
+            with self._lock:
+                entry = self._entries.get(user_id)
+                generation = self._generation
+            if entry and entry[0] > time.monotonic():
+                groups = entry[1]
+
+        if groups is None:
+            groups = loader()
+            if self.ttl > 0:
+                with self._lock:
+                    if generation == self._generation:
+                        self._entries[user_id] = (time.monotonic() + self.ttl, groups)
+
+        if scope is not None:
+            scope[user_id] = groups
+        return list(groups)
+
+    def invalidate(self, user_ids: Optional[Iterable[str]] = None):
+        """Drop cached groups for `user_ids`, or for everyone when None."""
+        user_ids = list(user_ids) if user_ids is not None else None
+        self._invalidate_local(user_ids)
+        self._invalidations.publish(user_ids=user_ids)
+
+    def _invalidate_local(self, user_ids: Optional[list[str]]):
+        scope = _request_groups.get()
+        with self._lock:
+            self._generation += 1
+            if user_ids is None:
+                self._entries.clear()
+                if scope is not None:
+                    scope.clear()
+                return
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                if scope is not None:
+                    scope.pop(user_id, None)
+
+
+def get_group_membership_cache() -> GroupMembershipCache:
+    redis = None
+    if REDIS_URL and GROUP_MEMBERSHIP_CACHE_TTL > 0:
+        redis = get_redis_client()
+    return GroupMembershipCache(
+        GROUP_MEMBERSHIP_CACHE_TTL, redis, f"{REDIS_KEY_PREFIX}:groups:invalidate"
+    )
+
+
+GROUP_MEMBERSHIP_CACHE = get_group_membership_cache()
@@ -0,0 +1,125 @@
+"""
+Shared aiohttp client sessions for upstream LLM traffic.
+
+One session (and connection pool) is kept per upstream origin for the
+lifetime of the app, so chat completions reuse warm keep-alive connections
+instead of paying a TCP+TLS handshake per request.
+
+Sessions are bound to the event loop the pool was started on. Calls made
+from any other loop (e.g. a worker thread running its own loop) get a
+throwaway session, which `cleanup_response` closes as before.
+
+aiohttp speaks HTTP/1.1 only, so connection reuse comes from keep-alive
+rather than HTTP/2 multiplexing.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    ENABLE_AIOHTTP_CLIENT_SESSION_POOL,
+)
+
+log = logging.getLogger(__name__)
+
+
+def _get_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class ClientSessionPool:
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._pooled = weakref.WeakSet()
+
+    def start(self):
+        """Bind the pool to the running (app lifespan) event loop."""
+        self._loop = asyncio.get_running_loop()
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+        self._loop = None
+
+    def is_pooled(self, session: Optional[aiohttp.ClientSession]) -> bool:
+        return session is not None and session in self._pooled
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        """
+        Return the shared session for the origin of `url`.
+
+        Sessions carry no session-level timeout or cookies; pass `timeout=` and
+        `cookies=` per request.
+        Release with `cleanup_response`, which leaves pooled sessions open.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if (
+            not ENABLE_AIOHTTP_CLIENT_SESSION_POOL
+            or self._loop is None
+            or loop is not self._loop
+        ):
+            return aiohttp.ClientSession(
+                trust_env=True, cookie_jar=aiohttp.DummyCookieJar()
+            )
+
+        origin = _get_origin(url)
+        session = self._sessions.get(origin)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                trust_env=True,
+                timeout=aiohttp.ClientTimeout(total=None),
+                # Shared by every user: never store an upstream's Set-Cookie and
+                # replay it on someone else's request. Forwarded request
+                # cookies are still sent per request.
+                cookie_jar=aiohttp.DummyCookieJar(),
+                connector=aiohttp.TCPConnector(
+                    limit=0,
+                    limit_per_host=AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+                    keepalive_timeout=AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+                    use_dns_cache=True,
+                    ttl_dns_cache=AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+                    enable_cleanup_closed=True,
+                ),
+            )
+            self._sessions[origin] = session
+            self._pooled.add(session)
+            log.debug(f"Created pooled client session for {origin}")
+
+        return session
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """Per-origin connection counts: in use, idle and the per-host limit."""
+        stats = {}
+        for origin, session in list(self._sessions.items()):
+            connector = session.connector
+            if connector is None or session.closed:
+                continue
+
+            # aiohttp does not expose these publicly
+            acquired = getattr(connector, "_acquired", ())
+            idle = getattr(connector, "_conns", {})
+            stats[origin] = {
+                "active": len(acquired),
+                "idle": sum(len(conns) for conns in idle.values()),
+                "limit": connector.limit_per_host,
+            }
+        return stats
+
+
+CLIENT_SESSION_POOL = ClientSessionPool()
@@ -0,0 +1,161 @@
+"""
+Process-local cache of the data URIs sent to models for chat images.
+
+Every chat turn converts each image in the whole history to a data URI, so a
+chat with 20 screenshots read and base64-encoded 20 files before every
+request. ImageCache keeps the encoded data URIs by file id (or URL) and max
+size, evicting the least recently used ones beyond CHAT_IMAGE_CACHE_MAX_BYTES.
+
+With a max size (CHAT_IMAGE_MAX_SIZE, or the model's `image_max_size`
+param), larger images are downscaled to fit and recompressed, once, before
+they are cached. Files are immutable once uploaded, so file entries stay until
+the file is deleted; deletions in models/files.py invalidate them on every
+node when REDIS_URL is set. Remote URLs are refetched after URL_TTL.
+"""
+
+import base64
+import io
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.env import CHAT_IMAGE_CACHE_MAX_BYTES, REDIS_KEY_PREFIX, REDIS_URL
+from open_webui.utils.redis import InvalidationChannel, get_redis_client
+
+log = logging.getLogger(__name__)
+
+URL_TTL = 3600
+
+
+def load_image(url: str) -> Optional[tuple[bytes, Optional[str]]]:
+    # Imported on use: utils.files pulls in the images router and the config
+    from open_webui.utils.files import load_image_from_url
+
+    return load_image_from_url(url)
+
+
+def downscale_image(
+    image_data: bytes, content_type: Optional[str], max_size: int
+) -> tuple[bytes, Optional[str]]:
+    """Fit the image within max_size pixels on each side, if it's larger."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            if max(image.size) <= max_size or getattr(image, "is_animated", False):
+                return image_data, content_type
+
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+                image.save(output, format="PNG", optimize=True)
+                return output.getvalue(), "image/png"
+            image.convert("RGB").save(output, format="JPEG", quality=85)
+            return output.getvalue(), "image/jpeg"
+    except Exception as e:
+        # Not something Pillow can read (e.g. SVG): send it as is
+        log.debug(f"Not downscaling image: {e}")
+        return image_data, content_type
+
+
+class ImageCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        redis=None,
+        channel: str = "open-webui:images:invalidate",
+        loader: Callable[[str], Optional[tuple[bytes, Optional[str]]]] = load_image,
+    ):
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._invalidations = InvalidationChannel(
+            redis,
+            channel,
+            lambda payload: self._invalidate_local((payload or {}).get("file_id")),
+            "image cache",
+        )
+        # (file id or URL, max size) -> (data URI, expiry or None)
+        self._entries: OrderedDict[tuple[str, int], tuple[str, Optional[float]]] = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        # Bumped by invalidations so in-flight loads of a deleted file aren't cached
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_data_uri(self, url: str, max_size: Optional[int] = None) -> Optional[str]:
+        """Data URI for an image URL or file id, downscaled to max_size."""
+        key = (url, max_size or 0)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                self._remove(key)
+            generation = self._generation
+
+        self._invalidations.listen()
+        data_uri = self._load(url, max_size)
+        if data_uri is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._store(key, data_uri, url.startswith("http"))
+        return data_uri
+
+    def _load(self, url: str, max_size: Optional[int]) -> Optional[str]:
+        image = self._loader(url)
+        if image is None:
+            return None
+
+        image_data, content_type = image
+        if max_size:
+            image_data, content_type = downscale_image(
+                image_data, content_type, max_size
+            )
+        encoded_string = base64.b64encode(image_data).decode("utf-8")
+        return f"data:{content_type};base64,{encoded_string}"
+
+    def _store(self, key: tuple[str, int], data_uri: str, expires: bool):
+        if len(data_uri) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (
+            data_uri,
+            time.monotonic() + URL_TTL if expires else None,
+        )
+        self._bytes += len(data_uri)
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple[str, int]):
+        data_uri, _ = self._entries.pop(key)
+        self._bytes -= len(data_uri)
+
+    def invalidate(self, file_id: Optional[str] = None):
+        """Drop the cached images of a file, or all of them, on every node."""
+        self._invalidate_local(file_id)
+        self._invalidations.publish(file_id=file_id)
+
+    def _invalidate_local(self, file_id: Optional[str] = None):
+        with self._lock:
+            self._generation += 1
+            if file_id is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                for key in [k for k in self._entries if k[0] == file_id]:
+                    self._remove(key)
+
+
+def get_image_cache() -> ImageCache:
+    redis = get_redis_client() if REDIS_URL else None
+    return ImageCache(
+        CHAT_IMAGE_CACHE_MAX_BYTES, redis, f"{REDIS_KEY_PREFIX}:images:invalidate"
+    )
+
+
+IMAGE_CACHE = get_image_cache()
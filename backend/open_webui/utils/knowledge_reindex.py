@@ -0,0 +1,249 @@
+"""
+Background knowledge reindex.
+
+Files are re-embedded with bounded concurrency and checkpointed one row per
+file in knowledge_reindex_file, so a job interrupted by a restart resumes
+with the files it had not finished.
+
+The vector backends share no rename/alias or vector-read API, so a collection
+cannot be built elsewhere and swapped in. Each file is swapped on its own
+instead. Its new chunks are written next to the old ones, and the old chunk
+ids are deleted once the new chunks are in, so the collection never goes empty.
+When the last file of a knowledge base is done, chunks of files that are no
+longer in that knowledge base are pruned.
+
+The vector DB client and the retrieval router load the app config, so they are
+only imported when a runner first needs them, or passed in.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from open_webui.internal.db import get_db
+from open_webui.models.knowledge import Knowledges
+from open_webui.models.knowledge_reindex import (
+    KnowledgeReindex,
+    KnowledgeReindexFileModel,
+    KnowledgeReindexJobModel,
+)
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_TIMEOUT = 120
+
+
+def get_vector_db_client():
+    from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+
+    return VECTOR_DB_CLIENT
+
+
+def embed_knowledge_file(request: Request, knowledge_id: str, file_id: str, user):
+    """Embed a file into a knowledge collection through the retrieval router."""
+    from open_webui.routers.retrieval import ProcessFileForm, process_file
+
+    with get_db() as db:
+        process_file(
+            request,
+            ProcessFileForm(file_id=file_id, collection_name=knowledge_id),
+            user=user,
+            db=db,
+        )
+
+
+def reindex_file(
+    request: Request,
+    knowledge_id: str,
+    file_id: str,
+    user,
+    vector_db,
+    embed_file: Callable = embed_knowledge_file,
+):
+    try:
+        existing = vector_db.query(
+            collection_name=knowledge_id, filter={"file_id": file_id}
+        )
+        old_ids = existing.ids[0] if existing and existing.ids else []
+    except Exception:
+        old_ids = []
+
+    embed_file(request, knowledge_id, file_id, user)
+
+    if old_ids:
+        vector_db.delete(collection_name=knowledge_id, ids=old_ids)
+
+
+def prune_knowledge_collection(knowledge_id: str, vector_db):
+    """Drop chunks whose file is no longer part of the knowledge base."""
+    file_ids = {file.id for file in Knowledges.get_files_by_id(knowledge_id)}
+    result = vector_db.get(collection_name=knowledge_id)
+    if not result or not result.ids:
+        return
+
+    stale_ids = [
+        id
+        for id, metadata in zip(result.ids[0], result.metadatas[0])
+        if (metadata or {}).get("file_id") and metadata["file_id"] not in file_ids
+    ]
+    if stale_ids:
+        log.info(f"Pruning {len(stale_ids)} stale chunks from {knowledge_id}")
+        vector_db.delete(collection_name=knowledge_id, ids=stale_ids)
+
+
+def get_reindex_job_status(job: KnowledgeReindexJobModel) -> dict:
+    counts = KnowledgeReindex.get_status_counts_by_job_id(job.id)
+    done = counts.get("done", 0)
+    failed = counts.get("failed", 0)
+
+    files_per_second = None
+    if job.started_at:
+        end = job.finished_at or int(time.time())
+        processed = KnowledgeReindex.count_processed_files_since(job.id, job.started_at)
+        files_per_second = processed / max(end - job.started_at, 1)
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "done": done,
+        "failed": failed,
+        "remaining": counts.get("pending", 0),
+        "files_per_second": files_per_second,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "failed_files": [
+            {
+                "knowledge_id": item.knowledge_id,
+                "file_id": item.file_id,
+                "error": item.error,
+            }
+            for item in KnowledgeReindex.get_failed_files_by_job_id(job.id)
+        ],
+    }
+
+
+class KnowledgeReindexRunner:
+    def __init__(self, vector_db=None, embed_file: Optional[Callable] = None):
+        """
+        `vector_db` defaults to the app's vector DB client and `embed_file` to
+        embed_knowledge_file().
+        """
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._vector_db = vector_db
+        self.embed_file = embed_file or embed_knowledge_file
+
+    @property
+    def vector_db(self):
+        if self._vector_db is None:
+            self._vector_db = get_vector_db_client()
+        return self._vector_db
+
+    def is_active(self, job: KnowledgeReindexJobModel) -> bool:
+        """True if this process, or another worker with a live heartbeat, runs the job."""
+        task = self._tasks.get(job.id)
+        if task is not None and not task.done():
+            return True
+        return (
+            job.status == "running"
+            and job.heartbeat_at is not None
+            and time.time() - job.heartbeat_at < HEARTBEAT_TIMEOUT
+        )
+
+    def start(
+        self, request: Request, job: KnowledgeReindexJobModel, user, concurrency: int
+    ):
+        task = asyncio.create_task(self._run(request, job.id, user, concurrency))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await run_in_threadpool(
+                KnowledgeReindex.update_job_by_id,
+                job_id,
+                {"heartbeat_at": int(time.time())},
+            )
+
+    async def _run(self, request: Request, job_id: str, user, concurrency: int):
+        now = int(time.time())
+        await run_in_threadpool(
+            KnowledgeReindex.update_job_by_id,
+            job_id,
+            {"status": "running", "started_at": now, "heartbeat_at": now},
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+
+        try:
+            items = await run_in_threadpool(
+                KnowledgeReindex.get_pending_files_by_job_id, job_id
+            )
+            log.info(f"Reindex job {job_id}: {len(items)} files to process")
+
+            remaining = Counter(item.knowledge_id for item in items)
+            semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+            async def process(item: KnowledgeReindexFileModel):
+                async with semaphore:
+                    try:
+                        await run_in_threadpool(
+                            reindex_file,
+                            request,
+                            item.knowledge_id,
+                            item.file_id,
+                            user,
+                            self.vector_db,
+                            self.embed_file,
+                        )
+                        status, error = "done", None
+                    except Exception as e:
+                        log.error(
+                            f"Error reindexing file {item.file_id} "
+                            f"in knowledge base {item.knowledge_id}: {e}"
+                        )
+                        status, error = "failed", str(e)
+
+                    await run_in_threadpool(
+                        KnowledgeReindex.update_file_status, item.id, status, error
+                    )
+
+                remaining[item.knowledge_id] -= 1
+                if remaining[item.knowledge_id] == 0:
+                    try:
+                        await run_in_threadpool(
+                            prune_knowledge_collection,
+                            item.knowledge_id,
+                            self.vector_db,
+                        )
+                    except Exception as e:
+                        log.error(f"Error pruning {item.knowledge_id}: {e}")
+
+            await asyncio.gather(*(process(item) for item in items))
+
+            await run_in_threadpool(
+                KnowledgeReindex.update_job_by_id,
+                job_id,
+                {"status": "completed", "finished_at": int(time.time())},
+            )
+            log.info(f"Reindex job {job_id} completed")
+        except Exception as e:
+            # Left as running; the stale heartbeat lets the next request resume it
+            log.exception(f"Reindex job {job_id} stopped: {e}")
+        finally:
+            heartbeat.cancel()
+
+
+KNOWLEDGE_REINDEX_RUNNER = KnowledgeReindexRunner()
+
+
+def get_resumable_job() -> Optional[KnowledgeReindexJobModel]:
+    job = KnowledgeReindex.get_latest_job()
+    return job if job and job.status != "completed" else None
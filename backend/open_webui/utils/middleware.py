@@ -31,6 +31,7 @@ from open_webui.models.chats import Chats
 from open_webui.models.folders import Folders
 from open_webui.models.users import Users
 from open_webui.socket.main import (
+    STREAM_ENCODERS,
     get_event_call,
     get_event_emitter,
 )
@@ -72,18 +73,20 @@ from open_webui.utils.step_mode import (
 from open_webui.utils.topic_classifier import (
     TopicConfig,
     classify_topic_shift,
-    compute_running_topic_embedding,
+    decode_embedding,
+    encode_embedding,
+    seed_topic_centroid,
+    update_topic_centroid,
 )
 from open_webui.utils.files import (
     convert_markdown_base64_images,
     get_file_url_from_base64,
-    get_image_base64_from_url,
     get_image_url_from_base64,
 )
+from open_webui.utils.image_cache import IMAGE_CACHE
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.retrieval.utils import get_sources_from_items
@@ -124,9 +127,18 @@ from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
 )
-from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
+from open_webui.utils.code_interpreter import (
+    execute_code_jupyter,
+    get_kernel_session_key,
+)
 from open_webui.utils.payload import apply_system_prompt_to_body
 from open_webui.utils.response import normalize_usage
+from open_webui.utils.stream_tags import (
+    StreamTagScanner,
+    end_tag_pattern,
+    start_tag_pattern,
+)
 from open_webui.utils.mcp.client import MCPClient, mcp_client_pool
 
 
@@ -141,8 +153,10 @@ from open_webui.config import (
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     ENABLE_CHAT_RESPONSE_BASE64_IMAGE_URL_CONVERSION,
+    ENABLE_CHAT_RESPONSE_STREAM_PATCHES,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
     CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES,
+    CHAT_IMAGE_MAX_SIZE,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
     ENABLE_QUERIES_CACHE,
@@ -549,6 +563,26 @@ def serialize_output(output: list) -> str:
     return content.strip()
 
 
+def serialize_output_append_ops(text: str, value: str) -> Optional[list]:
+    """
+    Patch ops for serialize_output(output) after `value` is appended to
+    `text`, the last text part of the message item that ends `output`.
+    Only the ends of `text` are read. Returns None if the part was blank,
+    as its rendering then also depends on the items before it.
+    """
+    if not text or text.isspace():
+        return None
+    if not value or value.isspace():
+        return []
+
+    # The rendered part is text.strip(); its trailing whitespace is now
+    # followed by more text
+    end = len(text)
+    while text[end - 1].isspace():
+        end -= 1
+    return [{"op": "append", "path": ["content"], "text": text[end:] + value.rstrip()}]
+
+
 def deep_merge(target, source):
     """
     Merge source into target recursively (returning new structure).
@@ -1323,7 +1357,8 @@ async def chat_completion_tools_handler(
                     tool_result = str(e)
 
                 tool_result, tool_result_files, tool_result_embeds = (
-                    process_tool_result(
+                    await asyncio.to_thread(
+                        process_tool_result,
                         request,
                         tool_function_name,
                         tool_result,
@@ -2087,6 +2122,7 @@ def apply_params_to_form_data(form_data, model):
         "function_calling": str,
         "reasoning_tags": list,
         "system": str,
+        "image_max_size": int,
     }
 
     for key in list(params.keys()):
@@ -2128,7 +2164,7 @@ def apply_params_to_form_data(form_data, model):
     return form_data
 
 
-async def convert_url_images_to_base64(form_data):
+async def convert_url_images_to_base64(form_data, max_size=None):
     messages = form_data.get("messages", [])
 
     for message in messages:
@@ -2150,7 +2186,7 @@ async def convert_url_images_to_base64(form_data):
                 continue
 
             convert_tasks.append(
-                asyncio.to_thread(get_image_base64_from_url, image_url)
+                asyncio.to_thread(IMAGE_CACHE.get_data_uri, image_url, max_size)
             )
             convert_indices.append(idx)
 
@@ -2275,7 +2311,11 @@ async def process_chat_payload(request, form_data, user, metadata, model):
         except:
             pass
 
-    form_data = await convert_url_images_to_base64(form_data)
+    form_data = await convert_url_images_to_base64(
+        form_data,
+        max_size=metadata.get("params", {}).get("image_max_size")
+        or CHAT_IMAGE_MAX_SIZE,
+    )
 
     event_emitter = get_event_emitter(metadata)
     event_caller = get_event_call(metadata)
@@ -2394,7 +2434,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
         filter_ids = get_sorted_filter_ids(
             request, model, metadata.get("filter_ids", [])
         )
-        filter_functions = Functions.get_functions_by_ids(filter_ids)
+        filter_functions = FUNCTION_REGISTRY.get_functions(filter_ids)
 
         form_data, flags = await process_filter_functions(
             request=request,
@@ -2901,39 +2941,46 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                 new_embedding = await embedding_function(user_message)
 
                 chat_obj = chat_obj if chat_obj else Chats.get_chat_by_id(chat_id)
-                stored_embeddings = (
-                    chat_obj.message_embeddings if chat_obj else None
-                ) or []
+                topic_data = Chats.get_chat_topic_data_by_id(chat_id) or {}
+                topic_config = TopicConfig()
+
+                topic_centroid = decode_embedding(topic_data.get("topic_centroid"))
+                topic_weight = topic_data.get("topic_centroid_weight") or 0.0
+                if topic_centroid is None and topic_data.get("message_embeddings"):
+                    topic_centroid, topic_weight = seed_topic_centroid(
+                        topic_data["message_embeddings"],
+                        decay=topic_config.embedding_decay,
+                        window=topic_config.embedding_window,
+                    )
 
                 # Count messages in chat
                 messages = form_data.get("messages", [])
                 message_count = len([m for m in messages if m.get("role") == "user"])
 
-                topic_config = TopicConfig()
                 decision = await classify_topic_shift(
                     new_message=user_message,
                     new_embedding=new_embedding,
-                    chat_message_embeddings=stored_embeddings,
+                    chat_message_embeddings=[],
                     chat_topic_summary=chat_obj.title if chat_obj else "",
                     config=topic_config,
                     message_count=message_count,
+                    topic_embedding=topic_centroid,
                 )
 
-                # Update stored embeddings with new message
-                updated_embeddings = stored_embeddings + [new_embedding]
-                # Keep only last N embeddings (window size)
-                updated_embeddings = updated_embeddings[-topic_config.embedding_window:]
-
-                topic_emb = compute_running_topic_embedding(
-                    updated_embeddings,
+                # Fold the new message into the decayed centroid
+                topic_centroid, topic_weight = update_topic_centroid(
+                    topic_centroid,
+                    topic_weight,
+                    new_embedding,
                     decay=topic_config.embedding_decay,
-                    window=topic_config.embedding_window,
                 )
 
                 Chats.update_chat_topic_embedding_by_id(
                     chat_id,
-                    topic_embedding=topic_emb or [],
-                    message_embeddings=updated_embeddings,
+                    topic_centroid=encode_embedding(
+                        topic_centroid, dtype=topic_config.embedding_storage_dtype
+                    ),
+                    topic_centroid_weight=topic_weight,
                 )
 
                 metadata["topic_split_decision"] = {
@@ -3400,8 +3447,8 @@ async def non_streaming_chat_response_handler(response, ctx):
                     )
 
                     # Send a webhook notification if the user is not active
-                    if not Users.is_user_active(user.id):
-                        webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                    if not await Users.ais_user_active(user.id):
+                        webhook_url = await Users.aget_user_webhook_url_by_id(user.id)
                         if webhook_url:
                             await post_webhook(
                                 request.app.state.WEBUI_NAME,
@@ -3466,12 +3513,9 @@ async def streaming_chat_response_handler(response, ctx):
         "__model__": model,
     }
 
-    filter_functions = [
-        Functions.get_function_by_id(filter_id)
-        for filter_id in get_sorted_filter_ids(
-            request, model, metadata.get("filter_ids", [])
-        )
-    ]
+    filter_functions = FUNCTION_REGISTRY.get_functions(
+        get_sorted_filter_ids(request, model, metadata.get("filter_ids", []))
+    )
 
     # Standard streaming response handler
     if event_emitter and event_caller:
@@ -3480,6 +3524,8 @@ async def streaming_chat_response_handler(response, ctx):
 
         # Handle as a background task
         async def response_handler(response, events):
+            tag_scanner = StreamTagScanner()
+
             def tag_output_handler(content_type, tags, output):
                 """
                 Detect special tags (reasoning, solution, code_interpreter) in streaming
@@ -3529,101 +3575,96 @@ async def streaming_chat_response_handler(response, ctx):
                 if last_type == "message":
                     # Use the output item's own text for tag detection
                     item_text = get_last_text(output)
-                    for start_tag, end_tag in tags:
+                    found = tag_scanner.search_start(
+                        output[-1].get("id", ""), item_text, tags
+                    )
+                    if found:
+                        start_tag, end_tag, match = found
 
-                        start_tag_pattern = rf"{re.escape(start_tag)}"
-                        if start_tag.startswith("<") and start_tag.endswith(">"):
-                            start_tag_pattern = (
-                                rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>"
-                            )
+                        try:
+                            attr_content = match.group(1) if match.group(1) else ""
+                        except:
+                            attr_content = ""
 
-                        match = re.search(start_tag_pattern, item_text)
-                        if match:
-                            try:
-                                attr_content = match.group(1) if match.group(1) else ""
-                            except:
-                                attr_content = ""
+                        attributes = extract_attributes(attr_content)
 
-                            attributes = extract_attributes(attr_content)
+                        before_tag = item_text[: match.start()]
+                        after_tag = item_text[match.end() :]
 
-                            before_tag = item_text[: match.start()]
-                            after_tag = item_text[match.end() :]
+                        # Keep only text before the tag in the message
+                        set_last_text(output, before_tag)
 
-                            # Keep only text before the tag in the message
-                            set_last_text(output, before_tag)
+                        if not before_tag.strip():
+                            # Remove empty message item
+                            if output and output[-1].get("type") == "message":
+                                output.pop()
 
-                            if not before_tag.strip():
-                                # Remove empty message item
-                                if output and output[-1].get("type") == "message":
-                                    output.pop()
+                        # Append the new output item
+                        if output_item_type == "reasoning":
+                            output.append(
+                                {
+                                    "type": "reasoning",
+                                    "id": output_id("r"),
+                                    "status": "in_progress",
+                                    "start_tag": start_tag,
+                                    "end_tag": end_tag,
+                                    "attributes": attributes,
+                                    "content": [],
+                                    "summary": None,
+                                    "started_at": time.time(),
+                                }
+                            )
+                        elif output_item_type == "open_webui:code_interpreter":
+                            output.append(
+                                {
+                                    "type": "open_webui:code_interpreter",
+                                    "id": output_id("ci"),
+                                    "status": "in_progress",
+                                    "start_tag": start_tag,
+                                    "end_tag": end_tag,
+                                    "attributes": attributes,
+                                    "lang": attributes.get("lang", "python"),
+                                    "code": "",
+                                    "output": None,
+                                    "started_at": time.time(),
+                                }
+                            )
+                        else:
+                            # solution or other text-producing tag
+                            output.append(
+                                {
+                                    "type": "message",
+                                    "id": output_id("msg"),
+                                    "status": "in_progress",
+                                    "role": "assistant",
+                                    "content": [
+                                        {"type": "output_text", "text": ""}
+                                    ],
+                                    "_tag_type": content_type,
+                                    "start_tag": start_tag,
+                                    "end_tag": end_tag,
+                                    "attributes": attributes,
+                                    "started_at": time.time(),
+                                }
+                            )
 
-                            # Append the new output item
+                        if after_tag:
+                            # Set the after_tag content on the new item
                             if output_item_type == "reasoning":
-                                output.append(
-                                    {
-                                        "type": "reasoning",
-                                        "id": output_id("r"),
-                                        "status": "in_progress",
-                                        "start_tag": start_tag,
-                                        "end_tag": end_tag,
-                                        "attributes": attributes,
-                                        "content": [],
-                                        "summary": None,
-                                        "started_at": time.time(),
-                                    }
-                                )
+                                output[-1]["content"] = [
+                                    {"type": "output_text", "text": after_tag}
+                                ]
                             elif output_item_type == "open_webui:code_interpreter":
-                                output.append(
-                                    {
-                                        "type": "open_webui:code_interpreter",
-                                        "id": output_id("ci"),
-                                        "status": "in_progress",
-                                        "start_tag": start_tag,
-                                        "end_tag": end_tag,
-                                        "attributes": attributes,
-                                        "lang": attributes.get("lang", "python"),
-                                        "code": "",
-                                        "output": None,
-                                        "started_at": time.time(),
-                                    }
-                                )
+                                output[-1]["code"] = after_tag
                             else:
-                                # solution or other text-producing tag
-                                output.append(
-                                    {
-                                        "type": "message",
-                                        "id": output_id("msg"),
-                                        "status": "in_progress",
-                                        "role": "assistant",
-                                        "content": [
-                                            {"type": "output_text", "text": ""}
-                                        ],
-                                        "_tag_type": content_type,
-                                        "start_tag": start_tag,
-                                        "end_tag": end_tag,
-                                        "attributes": attributes,
-                                        "started_at": time.time(),
-                                    }
-                                )
-
-                            if after_tag:
-                                # Set the after_tag content on the new item
-                                if output_item_type == "reasoning":
-                                    output[-1]["content"] = [
-                                        {"type": "output_text", "text": after_tag}
-                                    ]
-                                elif output_item_type == "open_webui:code_interpreter":
-                                    output[-1]["code"] = after_tag
-                                else:
-                                    set_last_text(output, after_tag)
+                                set_last_text(output, after_tag)
 
-                                _, recursive_end = tag_output_handler(
-                                    content_type, tags, output
-                                )
-                                if recursive_end:
-                                    end_flag = True
+                            _, recursive_end = tag_output_handler(
+                                content_type, tags, output
+                            )
+                            if recursive_end:
+                                end_flag = True
 
-                            break
 
                 elif (
                     (last_type == "reasoning" and content_type == "reasoning")
@@ -3640,8 +3681,6 @@ async def streaming_chat_response_handler(response, ctx):
                     start_tag = item.get("start_tag", "")
                     end_tag = item.get("end_tag", "")
 
-                    end_tag_pattern = rf"{re.escape(end_tag)}"
-
                     # Get the block content from the item itself
                     if last_type == "reasoning":
                         parts = item.get("content", [])
@@ -3653,21 +3692,17 @@ async def streaming_chat_response_handler(response, ctx):
                     else:
                         block_content = get_last_text(output)
 
-                    if re.search(end_tag_pattern, block_content):
+                    if tag_scanner.has_end(item.get("id", ""), block_content, end_tag):
                         end_flag = True
 
                         # Strip start and end tags from content
-                        start_tag_pattern = rf"{re.escape(start_tag)}"
-                        if start_tag.startswith("<") and start_tag.endswith(">"):
-                            start_tag_pattern = (
-                                rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>"
-                            )
-                        block_content = re.sub(
-                            start_tag_pattern, "", block_content
-                        ).strip()
+                        block_content = (
+                            start_tag_pattern(start_tag).sub("", block_content).strip()
+                        )
 
-                        end_tag_regex = re.compile(end_tag_pattern, re.DOTALL)
-                        split_content = end_tag_regex.split(block_content, maxsplit=1)
+                        split_content = end_tag_pattern(end_tag).split(
+                            block_content, maxsplit=1
+                        )
 
                         block_content = (
                             split_content[0].strip() if split_content else ""
@@ -3827,17 +3862,48 @@ async def streaming_chat_response_handler(response, ctx):
                     )
                     last_delta_data = None
 
+                    # Tokens appended to the last message go out as patch ops
+                    # built from the token alone; `stream_ops` holds those
+                    # since the event at `stream_seq`, or None once something
+                    # else changed and full content has to be sent.
+                    stream_encoder = (
+                        STREAM_ENCODERS.get_or_create(
+                            metadata["chat_id"], metadata["message_id"]
+                        )
+                        if ENABLE_CHAT_RESPONSE_STREAM_PATCHES and event_emitter
+                        else None
+                    )
+                    stream_ops = None
+                    stream_seq = None
+
+                    async def emit_completion_data(data):
+                        nonlocal stream_ops
+                        nonlocal stream_seq
+
+                        if "patch" in data:
+                            data = stream_encoder.encode_ops(
+                                data["patch"],
+                                lambda: {"content": serialize_output(output)},
+                                stream_seq,
+                            )
+
+                        await event_emitter(
+                            {
+                                "type": "chat:completion",
+                                "data": data,
+                            }
+                        )
+
+                        if stream_encoder and ("patch" in data or "content" in data):
+                            stream_ops = []
+                            stream_seq = stream_encoder.seq
+
                     async def flush_pending_delta_data(threshold: int = 0):
                         nonlocal delta_count
                         nonlocal last_delta_data
 
                         if delta_count >= threshold and last_delta_data:
-                            await event_emitter(
-                                {
-                                    "type": "chat:completion",
-                                    "data": last_delta_data,
-                                }
-                            )
+                            await emit_completion_data(last_delta_data)
                             delta_count = 0
                             last_delta_data = None
 
@@ -4079,8 +4145,12 @@ async def streaming_chat_response_handler(response, ctx):
                                                 }
                                             )
 
-                                    image_urls = get_image_urls(
-                                        delta.get("images", []), request, metadata, user
+                                    image_urls = await asyncio.to_thread(
+                                        get_image_urls,
+                                        delta.get("images", []),
+                                        request,
+                                        metadata,
+                                        user,
                                     )
                                     if image_urls:
                                         image_file_list = [
@@ -4149,6 +4219,9 @@ async def streaming_chat_response_handler(response, ctx):
                                         data = {"content": serialize_output(output)}
 
                                     if value:
+                                        output_length = len(output)
+                                        appended = None
+
                                         if (
                                             output
                                             and output[-1].get("type") == "reasoning"
@@ -4181,7 +4254,8 @@ async def streaming_chat_response_handler(response, ctx):
                                             )
 
                                         if ENABLE_CHAT_RESPONSE_BASE64_IMAGE_URL_CONVERSION:
-                                            value = convert_markdown_base64_images(
+                                            value = await asyncio.to_thread(
+                                                convert_markdown_base64_images,
                                                 request,
                                                 value,
                                                 {
@@ -4296,6 +4370,12 @@ async def streaming_chat_response_handler(response, ctx):
                                                 and msg_parts[-1].get("type")
                                                 == "output_text"
                                             ):
+                                                if len(output) == output_length:
+                                                    appended = (
+                                                        output[-1],
+                                                        msg_parts[-1],
+                                                        msg_parts[-1]["text"],
+                                                    )
                                                 msg_parts[-1]["text"] += value
                                             else:
                                                 output[-1]["content"] = [
@@ -4330,7 +4410,7 @@ async def streaming_chat_response_handler(response, ctx):
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            Chats.upsert_message_delta_by_id_and_message_id(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -4339,9 +4419,36 @@ async def streaming_chat_response_handler(response, ctx):
                                                 },
                                             )
                                         else:
-                                            data = {
-                                                "content": serialize_output(output),
-                                            }
+                                            # Only the token was added if the
+                                            # tag handlers left the part alone
+                                            ops = None
+                                            if (
+                                                stream_encoder
+                                                and appended
+                                                and not reasoning_content
+                                                and len(output) == output_length
+                                                and output[-1] is appended[0]
+                                                and output[-1].get("content")
+                                                and output[-1]["content"][-1]
+                                                is appended[1]
+                                                and len(appended[1]["text"])
+                                                == len(appended[2]) + len(value)
+                                            ):
+                                                ops = serialize_output_append_ops(
+                                                    appended[2], value
+                                                )
+
+                                            if (
+                                                ops is not None
+                                                and stream_ops is not None
+                                            ):
+                                                stream_ops.extend(ops)
+                                                data = {"patch": stream_ops}
+                                            else:
+                                                stream_ops = None
+                                                data = {
+                                                    "content": serialize_output(output),
+                                                }
 
                                 if delta:
                                     delta_count += 1
@@ -4349,12 +4456,7 @@ async def streaming_chat_response_handler(response, ctx):
                                     if delta_count >= delta_chunk_size:
                                         await flush_pending_delta_data(delta_chunk_size)
                                 else:
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
+                                    await emit_completion_data(data)
                         except Exception as e:
                             done = "data: [DONE]" in line
                             if done:
@@ -4562,7 +4664,8 @@ async def streaming_chat_response_handler(response, ctx):
                                 tool_result = str(e)
 
                         tool_result, tool_result_files, tool_result_embeds = (
-                            process_tool_result(
+                            await asyncio.to_thread(
+                                process_tool_result,
                                 request,
                                 tool_function_name,
                                 tool_result,
@@ -4854,6 +4957,9 @@ async def streaming_chat_response_handler(response, ctx):
                                             else None
                                         ),
                                         request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
+                                        session_key=get_kernel_session_key(
+                                            metadata.get("chat_id"), user.id
+                                        ),
                                     )
                                 else:
                                     ci_output = {
@@ -4870,7 +4976,8 @@ async def streaming_chat_response_handler(response, ctx):
                                         for idx, line in enumerate(stdoutLines):
 
                                             if "data:image/png;base64" in line:
-                                                image_url = get_image_url_from_base64(
+                                                image_url = await asyncio.to_thread(
+                                                    get_image_url_from_base64,
                                                     request,
                                                     line,
                                                     metadata,
@@ -4889,7 +4996,8 @@ async def streaming_chat_response_handler(response, ctx):
                                         resultLines = result.split("\n")
                                         for idx, line in enumerate(resultLines):
                                             if "data:image/png;base64" in line:
-                                                image_url = get_image_url_from_base64(
+                                                image_url = await asyncio.to_thread(
+                                                    get_image_url_from_base64,
                                                     request,
                                                     line,
                                                     metadata,
@@ -5023,10 +5131,16 @@ async def streaming_chat_response_handler(response, ctx):
                         metadata["message_id"],
                         {"usage": usage},
                     )
+                else:
+                    # Fold the streamed delta into the chat blob once
+                    Chats.commit_message_delta_by_id_and_message_id(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                    )
 
                 # Send a webhook notification if the user is not active
-                if not Users.is_user_active(user.id):
-                    webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                if not await Users.ais_user_active(user.id):
+                    webhook_url = await Users.aget_user_webhook_url_by_id(user.id)
                     if webhook_url:
                         await post_webhook(
                             request.app.state.WEBUI_NAME,
@@ -5072,6 +5186,11 @@ async def streaming_chat_response_handler(response, ctx):
                             "output": output,
                         },
                     )
+                else:
+                    Chats.commit_message_delta_by_id_and_message_id(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                    )
 
             if response.background is not None:
                 await response.background()
@@ -14,6 +14,7 @@ import mimeparse
 
 import collections.abc
 from open_webui.env import CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE
+from open_webui.utils.http_pool import CLIENT_SESSION_POOL
 
 log = logging.getLogger(__name__)
 
@@ -868,7 +869,8 @@ async def cleanup_response(
 ):
     if response:
         response.close()
-    if session:
+    # Shared upstream sessions outlive the request
+    if session and not CLIENT_SESSION_POOL.is_pooled(session):
         await session.close()
 
 
@@ -7,7 +7,7 @@ import sys
 from aiocache import cached
 from fastapi import Request
 
-from open_webui.socket.utils import RedisDict
+from open_webui.socket.utils import ModelRegistry
 from open_webui.routers import openai, ollama
 from open_webui.functions import get_function_models
 
@@ -395,7 +395,7 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
     log.debug(f"get_all_models() returned {len(models)} models")
 
     models_dict = {model["id"]: model for model in models}
-    if isinstance(request.app.state.MODELS, RedisDict):
+    if isinstance(request.app.state.MODELS, ModelRegistry):
         request.app.state.MODELS.set(models_dict)
     else:
         request.app.state.MODELS = models_dict
@@ -431,6 +431,27 @@ def check_model_access(user, model, db=None):
             raise Exception("Model not found")
 
 
+async def acheck_model_access(user, model):
+    if model.get("arena"):
+        # Arena grants live in config; only the group lookup touches the db
+        await asyncio.to_thread(check_model_access, user, model)
+        return
+
+    model_info = await Models.aget_model_by_id(model.get("id"))
+    if not model_info:
+        raise Exception("Model not found")
+    elif not (
+        user.id == model_info.user_id
+        or await AccessGrants.ahas_access(
+            user_id=user.id,
+            resource_type="model",
+            resource_id=model_info.id,
+            permission="read",
+        )
+    ):
+        raise Exception("Model not found")
+
+
 def get_filtered_models(models, user, db=None):
     # Filter out models that the user does not have access to
     if (
@@ -446,7 +467,8 @@ def get_filtered_models(models, user, db=None):
                 model_infos[model["id"]] = info
 
         user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user.id, db=db)
+            group.id
+            for group in Groups.get_cached_groups_by_member_id(user.id, db=db)
         }
 
         # Batch-fetch accessible resource IDs in a single query instead of N has_access calls
@@ -77,6 +77,7 @@ def remove_open_webui_params(params: dict) -> dict:
         "function_calling": str,
         "reasoning_tags": list,
         "system": str,
+        "image_max_size": int,
     }
 
     for key in list(params.keys()):
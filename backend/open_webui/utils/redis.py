@@ -1,7 +1,11 @@
 import inspect
 from urllib.parse import urlparse
 import asyncio
+import json
+import threading
 import time
+import uuid
+from typing import Callable, Optional
 
 import logging
 
@@ -272,3 +276,75 @@ def get_sentinel_url_from_env(redis_url, sentinel_hosts_env, sentinel_port_env):
         f"{host}:{sentinel_port_env}" for host in sentinel_hosts_env.split(",")
     )
     return f"redis+sentinel://{auth_part}{hosts_part}/{redis_config['db']}/{redis_config['service']}"
+
+
+class InvalidationChannel:
+    """
+    Broadcasts cache invalidations, or other events, to the other nodes over
+    Redis pub/sub.
+
+    publish() sends a payload to every other node, and listen() starts a
+    daemon thread, once, that passes their payloads to `on_message`.
+    Messages sent while the listener is disconnected are lost, so it calls
+    `on_message(None)`, meaning anything may have been missed, whenever it
+    (re)subscribes. Without a Redis client both do nothing.
+    """
+
+    def __init__(
+        self,
+        redis,
+        channel: str,
+        on_message: Callable[[Optional[dict]], None],
+        name: str = "cache",
+    ):
+        self._redis = redis
+        self._channel = channel
+        self._on_message = on_message
+        self._name = name
+        self._node_id = str(uuid.uuid4())
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def publish(self, **payload):
+        if self._redis is None:
+            return
+        try:
+            # RedisCluster has no publish(); PUBLISH still reaches every node
+            self._redis.execute_command(
+                "PUBLISH",
+                self._channel,
+                json.dumps({"node": self._node_id, **payload}),
+            )
+        except Exception as e:
+            log.warning(f"Failed to publish {self._name} invalidation: {e}")
+
+    def listen(self):
+        if self._redis is None or self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen,
+                    name=f"{self._name.replace(' ', '-')}-pubsub",
+                    daemon=True,
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                self._on_message(None)
+
+                for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.pop("node", None) != self._node_id:
+                        self._on_message(payload)
+            except Exception as e:
+                log.warning(
+                    f"{self._name.capitalize()} listener error, reconnecting: {e}"
+                )
+                time.sleep(1)
@@ -0,0 +1,269 @@
+"""
+Delta encoding for streamed chat:completion socket events.
+
+The streaming handler emits the whole serialized message (`content`) and the
+output items (`output`) on every update. Encoding replaces those two fields
+with a list of patch ops against what the clients already hold:
+
+    {"op": "append", "path": [...], "text": "..."}      str grew at the end
+    {"op": "splice", "path": [...], "at": 12, "text": "..."}
+                                                        str cut at `at`, then
+                                                        `text` appended
+    {"op": "set", "path": [...], "value": ...}          replace a value
+    {"op": "remove", "path": [...]}                     drop a dict key
+
+Splice offsets count UTF-16 code units, as JavaScript strings do.
+
+Paths start at the message (`["content"]`, `["output", 2, "content", 0,
+"text"]`). Each encoded event carries a per-message `seq`; events that carry
+full `content`/`output` are marked `snapshot`. A snapshot is sent first, every
+`snapshot_interval` events, after invalidate() and on `done`. The last
+`history_size` events are kept so a client that missed some can ask for them
+by seq, and gets a fresh snapshot if they have fallen out of the window.
+
+Callers that already know what changed, like the streaming handler appending
+a token, pass their ops to encode_ops() so neither the full message nor a
+diff of it is built per event.
+"""
+
+import logging
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+STREAM_FIELDS = ("content", "output")
+
+# Prefixes are compared a block at a time before falling back to characters
+_BLOCK = 4096
+
+
+def _clone(value):
+    # Containers only; strings are immutable so the copy costs the structure,
+    # not the text.
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i : i + _BLOCK] == b[i : i + _BLOCK]:
+        i += _BLOCK
+    i = min(i, n)
+    end = min(i + _BLOCK, n)
+    while i < end and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _utf16_slice(text: str, at: int) -> str:
+    # `at` never falls inside a surrogate pair; it is always counted from
+    # whole characters
+    return text.encode("utf-16-le")[: 2 * at].decode("utf-16-le")
+
+
+def diff_text(prev: str, new: str, path: list, ops: list):
+    if prev == new:
+        return
+    if new.startswith(prev):
+        ops.append({"op": "append", "path": path, "text": new[len(prev) :]})
+        return
+    at = _common_prefix_length(prev, new)
+    ops.append(
+        {
+            "op": "splice",
+            "path": path,
+            "at": _utf16_length(new[:at]),
+            "text": new[at:],
+        }
+    )
+
+
+def diff_value(prev, new, path: list, ops: list):
+    """Append the ops that turn `prev` into `new` to `ops`."""
+    if prev is new or prev == new:
+        return
+
+    if isinstance(prev, str) and isinstance(new, str):
+        diff_text(prev, new, path, ops)
+    elif isinstance(prev, dict) and isinstance(new, dict):
+        for key in prev:
+            if key not in new:
+                ops.append({"op": "remove", "path": path + [key]})
+        for key, value in new.items():
+            if key in prev:
+                diff_value(prev[key], value, path + [key], ops)
+            else:
+                ops.append({"op": "set", "path": path + [key], "value": value})
+    elif isinstance(prev, list) and isinstance(new, list) and len(new) >= len(prev):
+        for i, value in enumerate(new):
+            if i < len(prev):
+                diff_value(prev[i], value, path + [i], ops)
+            else:
+                ops.append({"op": "set", "path": path + [i], "value": value})
+    else:
+        ops.append({"op": "set", "path": path, "value": new})
+
+
+def apply_patch(target: dict, ops: list) -> dict:
+    """Apply patch ops to `target` in place; mirrors the client."""
+    for op in ops:
+        *parents, key = op["path"]
+        node = target
+        for part in parents:
+            node = node[part]
+
+        if op["op"] == "append":
+            node[key] = node[key] + op["text"]
+        elif op["op"] == "splice":
+            node[key] = _utf16_slice(node[key], op["at"]) + op["text"]
+        elif op["op"] == "remove":
+            node.pop(key, None)
+        elif isinstance(node, list) and key == len(node):
+            node.append(op["value"])
+        else:
+            node[key] = op["value"]
+    return target
+
+
+class ChatStreamEncoder:
+    """Per-message encoder state shared by every emitter of that message."""
+
+    def __init__(self, snapshot_interval: int = 100, history_size: int = 256):
+        self.seq = 0
+        self.snapshot_interval = max(1, snapshot_interval)
+        self._state: Optional[dict] = None
+        # Ops from encode_ops() not yet applied to _state; applied only when
+        # the state is read, so appending a token never copies the message
+        self._pending: list = []
+        self._since_snapshot = 0
+        self._history: deque = deque(maxlen=max(1, history_size))
+
+    def invalidate(self):
+        """Make the next event a snapshot, e.g. after an out-of-band edit."""
+        self._state = None
+        self._pending = []
+
+    def _current_state(self) -> Optional[dict]:
+        if self._pending:
+            apply_patch(self._state, self._pending)
+            self._pending = []
+        return self._state
+
+    def encode(self, data: dict) -> dict:
+        # Already encoded by encode_ops(), or nothing to encode
+        if "seq" in data or not any(field in data for field in STREAM_FIELDS):
+            return data
+
+        self.seq += 1
+        fields = {field: data[field] for field in STREAM_FIELDS if field in data}
+        rest = {k: v for k, v in data.items() if k not in STREAM_FIELDS}
+
+        snapshot = (
+            self._state is None
+            or data.get("done", False)
+            or self._since_snapshot >= self.snapshot_interval
+        )
+
+        if snapshot:
+            self._state = {}
+            self._pending = []
+            self._since_snapshot = 0
+            encoded = {**rest, **fields, "seq": self.seq, "snapshot": True}
+        else:
+            ops = []
+            self._current_state()
+            for field, value in fields.items():
+                if field in self._state:
+                    diff_value(self._state[field], value, [field], ops)
+                else:
+                    ops.append({"op": "set", "path": [field], "value": value})
+            self._since_snapshot += 1
+            encoded = {**rest, "seq": self.seq, "patch": ops}
+
+        for field, value in fields.items():
+            self._state[field] = _clone(value)
+
+        self._history.append(encoded)
+        return encoded
+
+    def encode_ops(
+        self, ops: list, load: Callable[[], dict], base_seq: Optional[int]
+    ) -> dict:
+        """
+        Encode an update the caller already has as ops against this
+        encoder's event `base_seq`. `load` returns the full fields and is
+        only called when a snapshot is due or another event came in since
+        `base_seq`.
+        """
+        if (
+            self._state is None
+            or base_seq != self.seq
+            or self._since_snapshot >= self.snapshot_interval
+        ):
+            return self.encode(load())
+
+        self.seq += 1
+        self._since_snapshot += 1
+        self._pending.extend(ops)
+        encoded = {"seq": self.seq, "patch": ops}
+        self._history.append(encoded)
+        return encoded
+
+    def since(self, seq: int) -> Optional[list]:
+        """Events after `seq`, or None if some are no longer held."""
+        if seq >= self.seq:
+            return []
+        if not self._history or self._history[0]["seq"] > seq + 1:
+            return None
+        return [event for event in self._history if event["seq"] > seq]
+
+    def snapshot(self) -> Optional[dict]:
+        if self._state is None:
+            return None
+        return {**_clone(self._current_state()), "seq": self.seq, "snapshot": True}
+
+
+class ChatStreamEncoders:
+    """
+    Bounded map of (chat_id, message_id) -> ChatStreamEncoder for this
+    process. Keying on the chat too means a caller that checked access to a
+    chat can only ever reach that chat's streams.
+    """
+
+    def __init__(
+        self,
+        snapshot_interval: int = 100,
+        history_size: int = 256,
+        max_messages: int = 1024,
+    ):
+        self.snapshot_interval = snapshot_interval
+        self.history_size = history_size
+        self.max_messages = max_messages
+        self._encoders: OrderedDict[tuple[str, str], ChatStreamEncoder] = OrderedDict()
+
+    def get(self, chat_id: str, message_id: str) -> Optional[ChatStreamEncoder]:
+        return self._encoders.get((chat_id, message_id))
+
+    def get_or_create(self, chat_id: str, message_id: str) -> ChatStreamEncoder:
+        key = (chat_id, message_id)
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            encoder = ChatStreamEncoder(self.snapshot_interval, self.history_size)
+            self._encoders[key] = encoder
+            while len(self._encoders) > self.max_messages:
+                self._encoders.popitem(last=False)
+        else:
+            self._encoders.move_to_end(key)
+        return encoder
+
+    def encode(self, chat_id: str, message_id: str, data: dict) -> dict:
+        return self.get_or_create(chat_id, message_id).encode(data)
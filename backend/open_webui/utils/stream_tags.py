@@ -0,0 +1,110 @@
+"""
+Incremental tag scanning for streamed model output.
+
+Reasoning, solution and code interpreter blocks are delimited by tags in the
+streamed text. Searching the whole text of the current output item for every
+tag on every chunk is quadratic over a response. StreamTagScanner remembers,
+per output item, how far the text has been ruled out and only searches what
+was appended since, backing up far enough to catch a tag split across chunks.
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+# Length of the scanned text kept to check the item was only appended to
+_SENTINEL = 32
+
+
+@lru_cache(maxsize=256)
+def start_tag_pattern(start_tag: str) -> re.Pattern:
+    """`<name>` tags also match with attributes, e.g. `<think type="x">`."""
+    if start_tag.startswith("<") and start_tag.endswith(">"):
+        return re.compile(rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>")
+    return re.compile(re.escape(start_tag))
+
+
+@lru_cache(maxsize=256)
+def end_tag_pattern(end_tag: str) -> re.Pattern:
+    return re.compile(re.escape(end_tag), re.DOTALL)
+
+
+def _pending_start(tag: str, text: str, pos: int, attributes: bool) -> int:
+    """Earliest offset >= pos where a match of `tag` could still complete."""
+    n = len(text)
+    pending = max(pos, n - len(tag) + 1)
+
+    if attributes and tag.startswith("<") and tag.endswith(">"):
+        # Attributes run to the end of the line after one whitespace char,
+        # which may itself be a newline, so look at the last two lines.
+        head = tag[:-1]
+        last_newline = text.rfind("\n", pos)
+        i = pos
+        if last_newline != -1:
+            i = max(pos, text.rfind("\n", pos, last_newline) + 1)
+
+        i = text.find(head, i)
+        while i != -1 and i < pending:
+            after = i + len(head)
+            if after >= n or text[after].isspace():
+                return i
+            i = text.find(head, after)
+
+    return pending
+
+
+class StreamTagScanner:
+    def __init__(self):
+        # (item id, kind, tags) -> (offset, text[offset - _SENTINEL:offset])
+        self._offsets: dict[tuple, tuple[int, str]] = {}
+
+    def _resume(self, key: tuple, text: str) -> int:
+        state = self._offsets.get(key)
+        if state is None:
+            return 0
+        offset, sentinel = state
+        if offset > len(text) or not text.startswith(
+            sentinel, offset - len(sentinel)
+        ):
+            return 0
+        return offset
+
+    def _mark(self, key: tuple, text: str, offset: int):
+        self._offsets[key] = (offset, text[max(0, offset - _SENTINEL) : offset])
+
+    def search_start(
+        self, item_id: str, text: str, tags: list[tuple[str, str]]
+    ) -> Optional[tuple[str, str, re.Match]]:
+        """
+        Return (start_tag, end_tag, match) for the first of `tags`, in order,
+        whose start tag appears in `text`, or None.
+        """
+        key = (item_id, "start", tuple(tags))
+        pos = self._resume(key, text)
+
+        for start_tag, end_tag in tags:
+            match = start_tag_pattern(start_tag).search(text, pos)
+            if match:
+                self._offsets.pop(key, None)
+                return start_tag, end_tag, match
+
+        self._mark(
+            key,
+            text,
+            min(
+                (_pending_start(start_tag, text, pos, True) for start_tag, _ in tags),
+                default=len(text),
+            ),
+        )
+        return None
+
+    def has_end(self, item_id: str, text: str, end_tag: str) -> bool:
+        key = (item_id, "end", end_tag)
+        pos = self._resume(key, text)
+
+        if text.find(end_tag, pos) != -1:
+            self._offsets.pop(key, None)
+            return True
+
+        self._mark(key, text, _pending_start(end_tag, text, pos, False))
+        return False
@@ -8,6 +8,8 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* webui.config.invalidation.lag (histogram, milliseconds)
+* webui.upstream.connections.active / .idle / .limit (gauges, per upstream)
 
 Attributes used: http.method, http.route, http.status_code
 
@@ -46,6 +48,7 @@ from open_webui.env import (
     OTEL_METRICS_EXPORTER_OTLP_INSECURE,
 )
 from open_webui.models.users import Users
+from open_webui.utils.http_pool import CLIENT_SESSION_POOL
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
 
@@ -101,6 +104,13 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active.today",
         ),
+        View(
+            instrument_name="webui.config.invalidation.lag",
+        ),
+        View(
+            instrument_name="webui.upstream.connections.*",
+            attribute_keys=["upstream"],
+        ),
     ]
 
     provider = MeterProvider(
@@ -176,6 +186,38 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_users_active_today],
     )
 
+    def observe_upstream_connections(field: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [
+                metrics.Observation(value=stats[field], attributes={"upstream": origin})
+                for origin, stats in CLIENT_SESSION_POOL.get_stats().items()
+            ]
+
+        return callback
+
+    meter.create_observable_gauge(
+        name="webui.upstream.connections.active",
+        description="Pooled upstream connections currently in use",
+        unit="connections",
+        callbacks=[observe_upstream_connections("active")],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.upstream.connections.idle",
+        description="Pooled upstream keep-alive connections waiting for reuse",
+        unit="connections",
+        callbacks=[observe_upstream_connections("idle")],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.upstream.connections.limit",
+        description="Per-upstream connection limit of the pool",
+        unit="connections",
+        callbacks=[observe_upstream_connections("limit")],
+    )
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):
@@ -9,12 +9,19 @@ When a shift is confirmed, Jaco shows a 5-second alert banner before splitting.
 """
 
 import logging
-import math
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 log = logging.getLogger(__name__)
 
+# Leading byte of a stored embedding blob, so readers know the element type
+EMBEDDING_BLOB_DTYPES = {
+    b"\x01": np.float32,
+    b"\x02": np.float16,
+}
+
 
 @dataclass
 class TopicConfig:
@@ -24,6 +31,7 @@ class TopicConfig:
     min_messages_before_split: int = 3
     embedding_window: int = 5
     embedding_decay: float = 0.8
+    embedding_storage_dtype: str = "float32"  # or "float16" to halve row size
     use_llm_confirmation: bool = True
     auto_title_on_split: bool = True
     split_timeout_ms: int = 5000
@@ -39,19 +47,37 @@ class SplitDecision:
     llm_confirmed: Optional[bool] = None
 
 
-def cosine_similarity(a: list[float], b: list[float]) -> float:
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
     """Compute cosine similarity between two vectors."""
-    if len(a) != len(b) or len(a) == 0:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if a.shape != b.shape or a.size == 0:
         return 0.0
 
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
+    norm_a = np.linalg.norm(a)
+    norm_b = np.linalg.norm(b)
 
     if norm_a == 0 or norm_b == 0:
         return 0.0
 
-    return dot / (norm_a * norm_b)
+    return float(np.dot(a, b) / (norm_a * norm_b))
+
+
+def batch_cosine_similarity(a, b) -> np.ndarray:
+    """
+    Row-wise cosine similarity of two (n, dim) matrices.
+
+    Rows where either side is a zero vector score 0.0.
+    """
+    a = np.atleast_2d(np.asarray(a, dtype=np.float32))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float32))
+    if a.shape != b.shape or a.size == 0:
+        return np.zeros(len(a), dtype=np.float32)
+
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    dots = np.einsum("ij,ij->i", a, b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(norms > 0, dots / norms, 0.0).astype(np.float32)
 
 
 def compute_running_topic_embedding(
@@ -68,26 +94,86 @@ def compute_running_topic_embedding(
     chat about right now" vector that naturally drifts as conversation
     evolves.
     """
-    if not message_embeddings:
+    if message_embeddings is None or len(message_embeddings) == 0:
         return None
 
-    recent = message_embeddings[-window:]
-    recent.reverse()  # Most recent first
+    recent = np.asarray(message_embeddings[-window:], dtype=np.float64)[::-1]
+    weights = np.power(decay, np.arange(len(recent), dtype=np.float64))
+    weight_total = weights.sum()
+
+    if weight_total == 0:
+        return None
 
-    dim = len(recent[0])
-    weighted_sum = [0.0] * dim
-    weight_total = 0.0
+    return (weights @ recent / weight_total).tolist()
 
-    for i, emb in enumerate(recent):
-        w = decay ** i
-        weight_total += w
-        for d in range(dim):
-            weighted_sum[d] += w * emb[d]
 
-    if weight_total == 0:
+def update_topic_centroid(
+    centroid: Optional[np.ndarray],
+    weight: float,
+    new_embedding: Sequence[float],
+    decay: float = 0.8,
+) -> tuple[np.ndarray, float]:
+    """
+    Fold one message embedding into an exponentially-decayed centroid.
+
+    Equivalent to compute_running_topic_embedding with an unbounded window,
+    but O(dim) per message: the stored centroid and its total weight are
+    enough to add the next term without revisiting older embeddings.
+
+    Returns the new (centroid, weight) pair.
+    """
+    new_embedding = np.asarray(new_embedding, dtype=np.float32)
+    if centroid is None or weight <= 0 or centroid.shape != new_embedding.shape:
+        return new_embedding, 1.0
+
+    decayed = decay * weight
+    new_weight = decayed + 1.0
+    centroid = np.asarray(centroid, dtype=np.float32) * decayed + new_embedding
+    return (centroid / new_weight).astype(np.float32), float(new_weight)
+
+
+def seed_topic_centroid(
+    message_embeddings: list[list[float]],
+    decay: float = 0.8,
+    window: int = 5,
+) -> tuple[Optional[np.ndarray], float]:
+    """
+    Build a (centroid, weight) pair from a legacy list of message embeddings,
+    for chats scored before the centroid was stored directly.
+    """
+    centroid = compute_running_topic_embedding(
+        message_embeddings, decay=decay, window=window
+    )
+    if centroid is None:
+        return None, 0.0
+
+    count = min(len(message_embeddings), window)
+    weight = float(np.power(decay, np.arange(count)).sum())
+    return np.asarray(centroid, dtype=np.float32), weight
+
+
+def encode_embedding(embedding: Sequence[float], dtype=np.float32) -> bytes:
+    """Pack an embedding into a compact blob (dtype tag + raw little-endian values)."""
+    dtype = np.dtype(dtype)
+    for tag, tag_dtype in EMBEDDING_BLOB_DTYPES.items():
+        if np.dtype(tag_dtype) == dtype:
+            values = np.asarray(embedding, dtype=dtype.newbyteorder("<"))
+            return tag + values.tobytes()
+    raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+
+def decode_embedding(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    """Inverse of encode_embedding. Always returns float32."""
+    if not blob:
         return None
 
-    return [x / weight_total for x in weighted_sum]
+    dtype = EMBEDDING_BLOB_DTYPES.get(bytes(blob[:1]))
+    if dtype is None:
+        raise ValueError("Unknown embedding blob format")
+
+    return np.frombuffer(
+        blob, dtype=np.dtype(dtype).newbyteorder("<"), offset=1
+    ).astype(np.float32)
 
 
 LLM_CONFIRMATION_PROMPT = """Given the current conversation topic: "{topic_summary}"
@@ -108,6 +194,7 @@ async def classify_topic_shift(
     config: TopicConfig,
     message_count: int,
     llm_call=None,
+    topic_embedding: Optional[Sequence[float]] = None,
 ) -> SplitDecision:
     """
     Determine if a new message represents a topic shift.
@@ -121,6 +208,8 @@ async def classify_topic_shift(
         message_count: Total messages in the chat so far
         llm_call: Async function to call LLM for confirmation.
                   Signature: async (prompt: str) -> str
+        topic_embedding: Precomputed running topic centroid. When given,
+                  chat_message_embeddings is ignored.
     """
     decision = SplitDecision()
 
@@ -133,11 +222,12 @@ async def classify_topic_shift(
         return decision
 
     # Stage 1: Embedding similarity
-    topic_embedding = compute_running_topic_embedding(
-        chat_message_embeddings,
-        decay=config.embedding_decay,
-        window=config.embedding_window,
-    )
+    if topic_embedding is None:
+        topic_embedding = compute_running_topic_embedding(
+            chat_message_embeddings,
+            decay=config.embedding_decay,
+            window=config.embedding_window,
+        )
 
     if topic_embedding is None:
         return decision
@@ -185,3 +275,28 @@ async def classify_topic_shift(
         decision.confidence = 1.0 - similarity
 
     return decision
+
+
+def score_topic_shifts(
+    new_embeddings,
+    topic_embeddings,
+    config: TopicConfig,
+) -> list[SplitDecision]:
+    """
+    Embedding-only classification for many chats at once (e.g. backfills).
+
+    Row i of new_embeddings is scored against row i of topic_embeddings.
+    There is no LLM confirmation stage and no min-message check; callers
+    pick which chats to score.
+    """
+    similarities = batch_cosine_similarity(new_embeddings, topic_embeddings)
+
+    decisions = []
+    for similarity in similarities.tolist():
+        decision = SplitDecision(similarity_score=similarity)
+        if config.enabled and similarity < config.similarity_threshold:
+            decision.should_split = True
+            decision.new_topic_name = "New Topic"
+            decision.confidence = 1.0 - similarity
+        decisions.append(decision)
+    return decisions
@@ -0,0 +1,343 @@
+"""
+Load-aware routing across upstream connections that serve the same model.
+
+When several Ollama connections serve a model, UpstreamRouter picks one per
+request with a pluggable strategy:
+
+- least_outstanding: fewest requests in flight, relative to the weight;
+- ewma: lowest EWMA time to first byte, scaled by the requests in flight;
+- weighted: smooth weighted round-robin by the configured weights;
+- affinity: connections that already have the model loaded (from /api/ps),
+  then fewest requests in flight;
+- random: the previous behaviour.
+
+Weights come from the connection config (`weight`, default 1; 0 drains a
+connection). Requests hold a lease for as long as the upstream response is
+open, which counts them as in flight; with Redis the leases are shared by
+every worker, so all of them see the same load. Connection errors and 5xx
+responses are observed passively: after a few in a row the connection is
+ejected with exponential backoff, and a success brings it back.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from open_webui.env import (
+    OLLAMA_ROUTING_RESIDENCY_TTL,
+    OLLAMA_ROUTING_STRATEGY,
+    REDIS_KEY_PREFIX,
+)
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Candidate:
+    idx: int
+    url: str
+    weight: float = 1.0
+    # Whether the model is loaded on this connection, None if unknown
+    resident: Optional[bool] = None
+    in_flight: int = 0
+    # EWMA seconds to first byte, None until measured
+    latency: Optional[float] = None
+
+
+class LeastOutstanding:
+    def choose(self, candidates: list[Candidate]) -> Candidate:
+        load = {id(c): c.in_flight / c.weight for c in candidates}
+        lowest = min(load.values())
+        return random.choice([c for c in candidates if load[id(c)] == lowest])
+
+
+class EwmaLatency:
+    def choose(self, candidates: list[Candidate]) -> Candidate:
+        # Measure every connection before trusting the averages
+        unmeasured = [c for c in candidates if c.latency is None]
+        if unmeasured:
+            return LeastOutstanding().choose(unmeasured)
+        return min(candidates, key=lambda c: c.latency * (c.in_flight + 1) / c.weight)
+
+
+class Weighted:
+    """Smooth weighted round-robin, as in nginx."""
+
+    def __init__(self):
+        self._current: dict[str, float] = {}
+
+    def choose(self, candidates: list[Candidate]) -> Candidate:
+        total = 0.0
+        for c in candidates:
+            self._current[c.url] = self._current.get(c.url, 0.0) + c.weight
+            total += c.weight
+        chosen = max(candidates, key=lambda c: self._current[c.url])
+        self._current[chosen.url] -= total
+        return chosen
+
+
+class Affinity:
+    def choose(self, candidates: list[Candidate]) -> Candidate:
+        resident = [c for c in candidates if c.resident]
+        return LeastOutstanding().choose(resident or candidates)
+
+
+class RandomChoice:
+    def choose(self, candidates: list[Candidate]) -> Candidate:
+        return random.choice(candidates)
+
+
+STRATEGIES = {
+    "least_outstanding": LeastOutstanding,
+    "ewma": EwmaLatency,
+    "weighted": Weighted,
+    "affinity": Affinity,
+    "random": RandomChoice,
+}
+
+
+class UpstreamLease:
+    """
+    One request's hold on a connection, released when its response ends.
+
+    wrap_stream() releases it once the body is done; a streaming response
+    should also release it in a background task, which still runs when the
+    client disconnects before the body is iterated.
+    """
+
+    def __init__(self, router: "UpstreamRouter", url: str):
+        self.router = router
+        self.url = url
+        self.id = str(uuid.uuid4())
+        self.started = time.monotonic()
+        self._measured = False
+        self._released = False
+
+    def first_byte(self):
+        if not self._measured:
+            self._measured = True
+            self.router.record_latency(self.url, time.monotonic() - self.started)
+
+    def report(self, status: int):
+        if status >= 500:
+            self.router.record_failure(self.url)
+        else:
+            self.router.record_success(self.url)
+
+    def failure(self):
+        self.router.record_failure(self.url)
+
+    async def release(self):
+        if not self._released:
+            self._released = True
+            await self.router.release(self)
+
+    async def wrap_stream(self, stream: AsyncIterator) -> AsyncIterator:
+        try:
+            async for chunk in stream:
+                self.first_byte()
+                yield chunk
+        except Exception:
+            self.failure()
+            raise
+        finally:
+            await self.release()
+
+
+class _Node:
+    __slots__ = ("leases", "latency", "failures", "ejected_until")
+
+    def __init__(self):
+        # Lease id -> monotonic expiry, like the Redis leases
+        self.leases: dict[str, float] = {}
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        now = time.monotonic()
+        for id, expires in list(self.leases.items()):
+            if expires <= now:
+                del self.leases[id]
+        return len(self.leases)
+
+
+class UpstreamRouter:
+    def __init__(
+        self,
+        strategy: str = "least_outstanding",
+        residency_ttl: float = 10.0,
+        key_prefix: str = "open-webui:upstream",
+        lease_ttl: float = 900.0,
+        ewma_alpha: float = 0.3,
+        eject_after: int = 3,
+        eject_base: float = 5.0,
+        eject_max: float = 300.0,
+    ):
+        if strategy not in STRATEGIES:
+            log.warning(
+                f"Unknown routing strategy {strategy!r}, using least_outstanding"
+            )
+            strategy = "least_outstanding"
+        self.strategy_name = strategy
+        self.strategy = STRATEGIES[strategy]()
+        self.residency_ttl = residency_ttl
+        self.key_prefix = key_prefix
+        # Leases of crashed workers, or of responses that were never closed,
+        # stop counting after this long
+        self.lease_ttl = lease_ttl
+        self.ewma_alpha = ewma_alpha
+        self.eject_after = eject_after
+        self.eject_base = eject_base
+        self.eject_max = eject_max
+
+        self._redis = None
+        self._nodes: dict[str, _Node] = {}
+        self._residency: dict[str, tuple[float, Optional[set[str]]]] = {}
+        self._residency_tasks: dict[str, asyncio.Task] = {}
+
+    def start(self, redis=None):
+        """Share in-flight counts through `redis` (an asyncio client)."""
+        self._redis = redis
+
+    def _node(self, url: str) -> _Node:
+        node = self._nodes.get(url)
+        if node is None:
+            node = self._nodes[url] = _Node()
+        return node
+
+    def _lease_key(self, url: str) -> str:
+        return f"{self.key_prefix}:leases:{url}"
+
+    async def _in_flight(self, urls: list[str]) -> list[int]:
+        if self._redis is not None:
+            try:
+                now = time.time()
+                pipe = self._redis.pipeline()
+                for url in urls:
+                    pipe.zcount(self._lease_key(url), now, "+inf")
+                return [int(count) for count in await pipe.execute()]
+            except Exception as e:
+                log.debug(f"Falling back to local in-flight counts: {e}")
+        return [self._node(url).in_flight for url in urls]
+
+    async def choose(self, candidates: list[Candidate]) -> Candidate:
+        if len(candidates) == 1:
+            return candidates[0]
+
+        now = time.monotonic()
+        healthy = [c for c in candidates if self._node(c.url).ejected_until <= now]
+        if not healthy:
+            # All ejected: try whichever is due back first
+            return min(candidates, key=lambda c: self._node(c.url).ejected_until)
+
+        pool = [c for c in healthy if c.weight > 0]
+        if not pool:
+            pool = healthy
+            for c in pool:
+                c.weight = 1.0
+
+        counts = await self._in_flight([c.url for c in pool])
+        for c, count in zip(pool, counts):
+            c.in_flight = count
+            c.latency = self._node(c.url).latency
+        return self.strategy.choose(pool)
+
+    async def acquire(self, url: str) -> UpstreamLease:
+        lease = UpstreamLease(self, url)
+        self._node(url).leases[lease.id] = time.monotonic() + self.lease_ttl
+
+        if self._redis is not None:
+            try:
+                now = time.time()
+                key = self._lease_key(url)
+                pipe = self._redis.pipeline()
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zadd(key, {lease.id: now + self.lease_ttl})
+                pipe.expire(key, int(self.lease_ttl) + 1)
+                await pipe.execute()
+            except Exception as e:
+                log.debug(f"Failed to record upstream lease: {e}")
+        return lease
+
+    async def release(self, lease: UpstreamLease):
+        self._node(lease.url).leases.pop(lease.id, None)
+
+        if self._redis is not None:
+            try:
+                await self._redis.zrem(self._lease_key(lease.url), lease.id)
+            except Exception as e:
+                log.debug(f"Failed to release upstream lease: {e}")
+
+    def record_latency(self, url: str, seconds: float):
+        node = self._node(url)
+        if node.latency is None:
+            node.latency = seconds
+        else:
+            node.latency += self.ewma_alpha * (seconds - node.latency)
+
+    def record_success(self, url: str):
+        node = self._node(url)
+        if node.failures >= self.eject_after:
+            log.info(f"Upstream {url} recovered")
+        node.failures = 0
+        node.ejected_until = 0.0
+
+    def record_failure(self, url: str):
+        node = self._node(url)
+        node.failures += 1
+        if node.failures >= self.eject_after:
+            backoff = min(
+                self.eject_base * 2 ** (node.failures - self.eject_after),
+                self.eject_max,
+            )
+            node.ejected_until = time.monotonic() + backoff
+            log.warning(
+                f"Ejecting upstream {url} for {backoff:.0f}s "
+                f"after {node.failures} consecutive failures"
+            )
+
+    @property
+    def wants_residency(self) -> bool:
+        return isinstance(self.strategy, Affinity)
+
+    def is_resident(self, url: str, model: str) -> Optional[bool]:
+        entry = self._residency.get(url)
+        if entry is None or entry[1] is None:
+            return None
+        return model in entry[1]
+
+    def refresh_residency(
+        self, url: str, loader: Callable[[], Awaitable[Optional[list[str]]]]
+    ):
+        """Reload the models loaded on `url` in the background when stale."""
+        entry = self._residency.get(url)
+        if entry and time.monotonic() - entry[0] < self.residency_ttl:
+            return
+        task = self._residency_tasks.get(url)
+        if task and not task.done():
+            return
+
+        async def refresh():
+            models = None
+            try:
+                models = await loader()
+            except Exception as e:
+                log.debug(f"Failed to load running models for {url}: {e}")
+            # Keep what was known on failure, but don't retry until stale
+            known = set(models) if models is not None else (entry and entry[1])
+            self._residency[url] = (time.monotonic(), known)
+
+        self._residency_tasks[url] = asyncio.create_task(refresh())
+
+
+OLLAMA_ROUTER = UpstreamRouter(
+    OLLAMA_ROUTING_STRATEGY,
+    residency_ttl=OLLAMA_ROUTING_RESIDENCY_TTL,
+    key_prefix=f"{REDIS_KEY_PREFIX}:ollama",
+)
@@ -1801,3 +1801,29 @@ export const displayFileHandler = (
 		stores.showFileNavPath.set(path);
 	}
 };
+
+/**
+ * Apply chat:completion stream patch ops (see backend utils/stream_delta.py)
+ * to `target` in place.
+ */
+export const applyStreamPatch = (target: object, ops: any[]) => {
+	for (const op of ops ?? []) {
+		const path = op.path;
+		const key = path[path.length - 1];
+		let node = target;
+		for (const part of path.slice(0, -1)) {
+			node = node[part];
+		}
+
+		if (op.op === 'append') {
+			node[key] = (node[key] ?? '') + op.text;
+		} else if (op.op === 'splice') {
+			node[key] = (node[key] ?? '').slice(0, op.at) + op.text;
+		} else if (op.op === 'remove') {
+			delete node[key];
+		} else {
+			node[key] = op.value;
+		}
+	}
+	return target;
+};